@@ -1,20 +1,29 @@
 // Keep Expo config dependency-free so EAS CLI can evaluate it before install.
+import fs from 'fs';
+import path from 'path';
+
 // Production Railway URL — used when env vars are not injected.
 const FALLBACK_API_URL = 'https://thryvin-production-fbdd.up.railway.app';
 
+// Optimized icons and splash from assets/build_assets.py; the source images are
+// used until it has been run.
+const generatedAsset = (file) =>
+  fs.existsSync(path.join(__dirname, 'assets', 'generated', file)) ? `./assets/generated/${file}` : null;
+const splashImage = generatedAsset('splash@3x.png');
+
 export default {
   expo: {
     name: 'Thryvin',
     slug: 'thryvin',
     version: '1.0.0',
     orientation: 'portrait',
-    icon: './assets/icon.png',
+    icon: generatedAsset('icon.png') || './assets/icon.png',
     userInterfaceStyle: 'light',
     newArchEnabled: false,
     scheme: 'thryvin',
     splash: {
-      image: './assets/splash-icon.png',
-      resizeMode: 'contain',
+      image: splashImage || './assets/splash-icon.png',
+      resizeMode: splashImage ? 'cover' : 'contain',
       backgroundColor: '#A259FF',
     },
     ios: {
@@ -23,7 +32,7 @@ export default {
     },
     android: {
       adaptiveIcon: {
-        foregroundImage: './assets/adaptive-icon.png',
+        foregroundImage: generatedAsset('adaptive-icon.png') || './assets/adaptive-icon.png',
         backgroundColor: '#A259FF',
       },
       package: 'com.thryvin.app',
@@ -31,7 +40,7 @@ export default {
       predictiveBackGestureEnabled: false,
     },
     web: {
-      favicon: './assets/favicon.png',
+      favicon: generatedAsset('favicon.png') || './assets/favicon.png',
     },
     plugins: ['expo-router'],
     experiments: {
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+App Asset Build
+---------------
+Renders every logo, icon and splash variant the Expo app needs from the
+declarative manifest in assets.json (replaces the old one-off create-logo.py).
+
+For each target it will:
+1. Render the source (a master image or a text logo) at every density
+   (1x/2x/3x, Android adaptive-icon mipmaps, splash sizes)
+2. Write optimized PNG and/or WebP into assets/generated/
+3. Skip the target entirely when its content hash (manifest entry + source
+   bytes) matches the last build and the outputs are untouched
+
+Targets are rendered in parallel worker processes. app.config.js picks up
+the generated icon, favicon, adaptive-icon foreground and splash when they
+exist and falls back to the source images otherwise.
+
+Usage:
+    python apps/native/assets/build_assets.py [--force] [--jobs 4] [--only logo-text,splash]
+"""
+
+import os
+import io
+import sys
+import json
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+ASSETS_DIR = os.path.dirname(os.path.abspath(__file__))
+MANIFEST_PATH = os.path.join(ASSETS_DIR, 'assets.json')
+CACHE_FILENAME = '.asset-cache.json'
+
+# Bump when rendering logic changes so every target is rebuilt once
+PIPELINE_VERSION = 1
+
+
+def load_manifest(path: str = MANIFEST_PATH) -> dict:
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def expand_outputs(target: dict) -> list:
+    """List (output stem, (width, height)) for a target.
+
+    Targets either give a base 'size' plus 'densities' (React Native
+    @2x/@3x naming) or an explicit list of 'variants'.
+    """
+    if 'variants' in target:
+        return [(v['out'], tuple(v['size'])) for v in target['variants']]
+
+    width, height = target['size']
+    outputs = []
+    for density in target.get('densities', [1]):
+        suffix = '' if density == 1 else f'@{density}x'
+        outputs.append((f"{target['out']}{suffix}", (round(width * density), round(height * density))))
+    return outputs
+
+
+def output_paths(target: dict, out_dir: str) -> list:
+    paths = []
+    for stem, _ in expand_outputs(target):
+        for fmt in target.get('formats', ['png']):
+            paths.append(os.path.join(out_dir, f'{stem}.{fmt}'))
+    return paths
+
+
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def target_cache_key(target: dict, assets_dir: str = ASSETS_DIR) -> str:
+    """Content hash of everything that determines a target's outputs"""
+    h = hashlib.sha256()
+    h.update(f'v{PIPELINE_VERSION}'.encode())
+    h.update(json.dumps(target, sort_keys=True).encode('utf-8'))
+    if 'source' in target:
+        h.update(file_sha256(os.path.join(assets_dir, target['source'])).encode())
+    font = target.get('render', {}).get('font')
+    if font and os.path.exists(font):
+        h.update(file_sha256(font).encode())
+    return h.hexdigest()
+
+
+def is_up_to_date(target: dict, cache_entry: dict, key: str, out_dir: str) -> bool:
+    if not cache_entry or cache_entry.get('key') != key:
+        return False
+    recorded = cache_entry.get('outputs', {})
+    for path in output_paths(target, out_dir):
+        rel = os.path.relpath(path, out_dir)
+        if not os.path.exists(path) or recorded.get(rel) != file_sha256(path):
+            return False
+    return True
+
+
+def _render_text(render: dict, size: tuple, scale: float):
+    from PIL import Image, ImageDraw, ImageFont
+
+    img = Image.new('RGBA', size, (255, 255, 255, 0))
+    draw = ImageDraw.Draw(img)
+    font_size = max(1, round(render.get('fontSize', 40) * scale))
+    try:
+        font = ImageFont.truetype(render['font'], font_size)
+    except (OSError, KeyError):
+        font = ImageFont.load_default()
+
+    bbox = draw.textbbox((0, 0), render['text'], font=font)
+    x = (size[0] - (bbox[2] - bbox[0])) // 2 - bbox[0]
+    y = (size[1] - (bbox[3] - bbox[1])) // 2 - bbox[1]
+    draw.text((x, y), render['text'], fill=tuple(render.get('color', [0, 0, 0, 255])), font=font)
+    return img
+
+
+def _resize(source, size: tuple, fit: str, background):
+    from PIL import Image
+
+    src_w, src_h = source.size
+    if fit == 'cover':
+        scale = max(size[0] / src_w, size[1] / src_h)
+    else:
+        scale = min(size[0] / src_w, size[1] / src_h)
+    scaled = source.resize(
+        (max(1, round(src_w * scale)), max(1, round(src_h * scale))),
+        Image.LANCZOS,
+    )
+    # Center-crop anything that overflows (cover), then center on the canvas
+    left = max(0, (scaled.width - size[0]) // 2)
+    top = max(0, (scaled.height - size[1]) // 2)
+    scaled = scaled.crop((left, top, left + min(size[0], scaled.width), top + min(size[1], scaled.height)))
+
+    canvas = Image.new('RGBA', size, tuple(background))
+    canvas.alpha_composite(scaled, dest=((size[0] - scaled.width) // 2, (size[1] - scaled.height) // 2))
+    return canvas
+
+
+def _encode(img, fmt: str, target: dict) -> bytes:
+    buf = io.BytesIO()
+    opaque = img.getextrema()[3][0] == 255
+    if opaque:
+        img = img.convert('RGB')
+    if fmt == 'png':
+        img.save(buf, 'PNG', optimize=True)
+    elif fmt == 'webp':
+        if target.get('webpLossless'):
+            img.save(buf, 'WEBP', lossless=True, method=6)
+        else:
+            img.save(buf, 'WEBP', quality=target.get('webpQuality', 85), method=6)
+    else:
+        raise ValueError(f"Unsupported format: {fmt}")
+    return buf.getvalue()
+
+
+def render_target(target: dict, assets_dir: str, out_dir: str) -> dict:
+    """Render all outputs of one target. Runs inside a worker process.
+
+    Returns {relative output path: sha256}.
+    """
+    from PIL import Image
+
+    source = None
+    if 'source' in target:
+        source = Image.open(os.path.join(assets_dir, target['source'])).convert('RGBA')
+
+    base_width = target['size'][0] if 'size' in target else None
+    background = target.get('background', [0, 0, 0, 0])
+    written = {}
+
+    for stem, size in expand_outputs(target):
+        if source is not None:
+            img = _resize(source, size, target.get('fit', 'contain'), background)
+        else:
+            scale = size[0] / base_width if base_width else 1
+            img = _render_text(target['render'], size, scale)
+
+        for fmt in target.get('formats', ['png']):
+            data = _encode(img, fmt, target)
+            path = os.path.join(out_dir, f'{stem}.{fmt}')
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(data)
+            written[os.path.relpath(path, out_dir)] = hashlib.sha256(data).hexdigest()
+
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build app icons, logos and splash screens')
+    parser.add_argument('--manifest', default=MANIFEST_PATH)
+    parser.add_argument('--force', action='store_true', help='Ignore the cache and rebuild everything')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 2, help='Worker processes')
+    parser.add_argument('--only', help='Comma-separated target names to build')
+    args = parser.parse_args()
+
+    manifest = load_manifest(args.manifest)
+    assets_dir = os.path.dirname(os.path.abspath(args.manifest))
+    out_dir = os.path.join(assets_dir, manifest.get('outDir', 'generated'))
+    cache_path = os.path.join(out_dir, CACHE_FILENAME)
+
+    cache = {}
+    if os.path.exists(cache_path) and not args.force:
+        with open(cache_path, encoding='utf-8') as f:
+            cache = json.load(f)
+
+    targets = manifest['targets']
+    if args.only:
+        wanted = {n.strip() for n in args.only.split(',')}
+        targets = [t for t in targets if t['name'] in wanted]
+
+    print("=" * 60)
+    print("APP ASSET BUILD")
+    print("=" * 60)
+
+    pending = []
+    for target in targets:
+        key = target_cache_key(target, assets_dir)
+        if is_up_to_date(target, cache.get(target['name']), key, out_dir):
+            print(f"  ⏭️  {target['name']}: up to date")
+        else:
+            pending.append((target, key))
+
+    failures = 0
+    if pending:
+        with ProcessPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+            futures = {
+                pool.submit(render_target, target, assets_dir, out_dir): (target, key)
+                for target, key in pending
+            }
+            for future in as_completed(futures):
+                target, key = futures[future]
+                try:
+                    outputs = future.result()
+                except Exception as e:
+                    print(f"  ❌ {target['name']}: {e}")
+                    failures += 1
+                    continue
+                cache[target['name']] = {'key': key, 'outputs': outputs}
+                total = sum(os.path.getsize(os.path.join(out_dir, p)) for p in outputs)
+                print(f"  ✅ {target['name']}: {len(outputs)} files, {total / 1024:.1f} KB")
+
+    os.makedirs(out_dir, exist_ok=True)
+    with open(cache_path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+
+    print(f"\nBuilt {len(pending) - failures} targets, skipped {len(targets) - len(pending)}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+Streak & Adherence Service
+--------------------------
+storage.calculateWorkoutStreak(), the coach insight streak and
+coach-memory.ts::calculateAdherencePatterns() re-walk a user's completed
+workouts on every call. This service keeps a compact adherence state per
+user in user_adherence so those readers only look at the stored state plus
+the few workouts logged since it was written (see server/adherence.ts).
+
+State per user:
+- run-length encoded training days: run_starts / run_lengths, with days as
+  UTC day numbers (days since 1970-01-01), sorted and never adjacent
+- day-of-week bitmaps: one 7-bit mask per Sunday-first week (bit 0 = Sunday,
+  like getDay()) for the last BITMAP_WEEKS weeks, starting at bitmap_week
+- last_day / last_run_length / longest_streak / totals, and the id of the
+  last user_workouts row applied
+
+Adding a workout is O(1) when it lands on or after the last training day
+(the normal case); an older workout is merged into the runs by bisection.
+
+It will:
+1. --backfill: rebuild every user's state from all user_workouts rows in one
+   vectorized pass (run boundaries via numpy diff, bitmaps via group-bys)
+2. otherwise: apply only user_workouts rows after the job watermark to the
+   stored states of the users they belong to
+
+Deleted workouts are only reflected by the next --backfill.
+
+Usage:
+    python scripts/adherence_service.py              # incremental
+    python scripts/adherence_service.py --backfill   # rebuild all states
+"""
+
+import asyncio
+import argparse
+from bisect import bisect_right
+from datetime import date, datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from db_utils import connect, copy_upsert, fetch_dataframe, get_watermarks, set_watermarks
+
+JOB_NAME = 'adherence:user_workouts'
+BITMAP_WEEKS = 53
+EPOCH = date(1970, 1, 1)
+
+STATE_COLUMNS = [
+    'user_id', 'run_starts', 'run_lengths', 'longest_streak', 'last_day', 'last_run_length',
+    'total_days', 'total_workouts', 'bitmap_week', 'week_bitmaps', 'last_workout_id', 'updated_at',
+]
+
+CREATE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS user_adherence (
+        id SERIAL PRIMARY KEY,
+        user_id INTEGER NOT NULL UNIQUE REFERENCES users(id) ON DELETE CASCADE,
+        run_starts INTEGER[] NOT NULL DEFAULT '{}',
+        run_lengths INTEGER[] NOT NULL DEFAULT '{}',
+        longest_streak INTEGER NOT NULL DEFAULT 0,
+        last_day INTEGER,
+        last_run_length INTEGER NOT NULL DEFAULT 0,
+        total_days INTEGER NOT NULL DEFAULT 0,
+        total_workouts INTEGER NOT NULL DEFAULT 0,
+        bitmap_week INTEGER NOT NULL DEFAULT 0,
+        week_bitmaps INTEGER[] NOT NULL DEFAULT '{}',
+        last_workout_id INTEGER NOT NULL DEFAULT 0,
+        updated_at TIMESTAMP DEFAULT NOW() NOT NULL
+    )
+"""
+
+
+def day_number(ts) -> int:
+    """UTC day number of a timestamp or date"""
+    if isinstance(ts, datetime):
+        ts = (ts if ts.tzinfo is None else ts.astimezone(timezone.utc)).date()
+    return (ts - EPOCH).days
+
+
+def week_and_bit(day: int):
+    """Sunday-first week number and getDay() bit of a day number (1970-01-01 was a Thursday)"""
+    return (day + 4) // 7, (day + 4) % 7
+
+
+def _popcount(mask: int) -> int:
+    return bin(mask).count('1')
+
+
+class AdherenceState:
+    """Run-length encoded training days and weekly day-of-week bitmaps for one user"""
+
+    __slots__ = ('run_starts', 'run_lengths', 'longest_streak', 'total_days', 'total_workouts',
+                 'bitmap_week', 'week_bitmaps', 'last_workout_id')
+
+    def __init__(self, run_starts=None, run_lengths=None, total_workouts=0, bitmap_week=0,
+                 week_bitmaps=None, last_workout_id=0):
+        self.run_starts = list(run_starts or [])
+        self.run_lengths = list(run_lengths or [])
+        self.longest_streak = max(self.run_lengths, default=0)
+        self.total_days = sum(self.run_lengths)
+        self.total_workouts = total_workouts
+        self.bitmap_week = bitmap_week
+        self.week_bitmaps = list(week_bitmaps or [])
+        self.last_workout_id = last_workout_id
+
+    @property
+    def last_day(self):
+        return self.run_starts[-1] + self.run_lengths[-1] - 1 if self.run_starts else None
+
+    @property
+    def last_run_length(self) -> int:
+        return self.run_lengths[-1] if self.run_lengths else 0
+
+    def add(self, day: int, workout_id: int = 0) -> bool:
+        """Apply one completed workout. Returns True when it is a new training day."""
+        self.total_workouts += 1
+        self.last_workout_id = max(self.last_workout_id, workout_id)
+        last = self.last_day
+        if last is not None and day <= last:
+            added = self._insert_old(day)
+        else:
+            if last is not None and day == last + 1:
+                self.run_lengths[-1] += 1
+            else:
+                self.run_starts.append(day)
+                self.run_lengths.append(1)
+            self.longest_streak = max(self.longest_streak, self.run_lengths[-1])
+            added = True
+        if added:
+            self.total_days += 1
+            self._mark(day)
+        return added
+
+    def _insert_old(self, day: int) -> bool:
+        i = bisect_right(self.run_starts, day) - 1
+        if i >= 0 and day < self.run_starts[i] + self.run_lengths[i]:
+            return False
+        joins_prev = i >= 0 and self.run_starts[i] + self.run_lengths[i] == day
+        joins_next = i + 1 < len(self.run_starts) and self.run_starts[i + 1] == day + 1
+        if joins_prev and joins_next:
+            self.run_lengths[i] += 1 + self.run_lengths.pop(i + 1)
+            self.run_starts.pop(i + 1)
+            grown = i
+        elif joins_prev:
+            self.run_lengths[i] += 1
+            grown = i
+        elif joins_next:
+            self.run_starts[i + 1] = day
+            self.run_lengths[i + 1] += 1
+            grown = i + 1
+        else:
+            self.run_starts.insert(i + 1, day)
+            self.run_lengths.insert(i + 1, 1)
+            grown = i + 1
+        self.longest_streak = max(self.longest_streak, self.run_lengths[grown])
+        return True
+
+    def _mark(self, day: int):
+        week, bit = week_and_bit(day)
+        if not self.week_bitmaps:
+            self.bitmap_week = week
+        if week < self.bitmap_week:
+            if self.bitmap_week + len(self.week_bitmaps) - week > BITMAP_WEEKS:
+                return  # older than the bitmap window
+            self.week_bitmaps[:0] = [0] * (self.bitmap_week - week)
+            self.bitmap_week = week
+        offset = week - self.bitmap_week
+        if offset >= len(self.week_bitmaps):
+            self.week_bitmaps.extend([0] * (offset + 1 - len(self.week_bitmaps)))
+        self.week_bitmaps[offset] |= 1 << bit
+        if len(self.week_bitmaps) > BITMAP_WEEKS:
+            drop = len(self.week_bitmaps) - BITMAP_WEEKS
+            while drop < len(self.week_bitmaps) - 1 and self.week_bitmaps[drop] == 0:
+                drop += 1  # the window always starts at a trained week
+            del self.week_bitmaps[:drop]
+            self.bitmap_week += drop
+
+    # -- reads -------------------------------------------------------------
+
+    def current_streak(self, today: int) -> int:
+        """Consecutive training days ending today, else 0 (the coach insight streak)"""
+        return self.last_run_length if self.last_day == today else 0
+
+    def recent_streak(self, today: int, cap: int = 30) -> int:
+        """ai-user-context calculateStreak(): run ending today or yesterday, over the last `cap` days
+        (read by server/adherence.ts getAdherencePatterns())"""
+        last = self.last_day
+        if last is None or last < today - 1 or last > today:
+            return 0
+        return min(self.last_run_length, cap - (today - last))
+
+    def trained_on(self, day: int) -> bool:
+        i = bisect_right(self.run_starts, day) - 1
+        return i >= 0 and day < self.run_starts[i] + self.run_lengths[i]
+
+    def weekday_counts(self, today: int, weeks: int = 4) -> list:
+        """Training days per getDay() weekday over the `weeks` weeks up to and including today's week"""
+        current, _ = week_and_bit(today)
+        counts = [0] * 7
+        for week in range(current - weeks + 1, current + 1):
+            offset = week - self.bitmap_week
+            if 0 <= offset < len(self.week_bitmaps):
+                mask = self.week_bitmaps[offset]
+                for bit in range(7):
+                    counts[bit] += (mask >> bit) & 1
+        return counts
+
+    def strong_weak_days(self, today: int, weeks: int = 4):
+        """calculateAdherencePatterns() thresholds: > 1.2x / < 0.5x the average weekday (and trained)"""
+        counts = self.weekday_counts(today, weeks)
+        avg = sum(counts) / 7
+        strong = [d for d, c in enumerate(counts) if c > avg * 1.2]
+        weak = [d for d, c in enumerate(counts) if c < avg * 0.5 and c > 0]
+        return strong, weak
+
+    def weeks_trained(self, today: int, weeks: int = 4) -> list:
+        """Training days in each of the last `weeks` weeks, oldest first"""
+        current, _ = week_and_bit(today)
+        return [
+            _popcount(self.week_bitmaps[w - self.bitmap_week]) if 0 <= w - self.bitmap_week < len(self.week_bitmaps)
+            else 0
+            for w in range(current - weeks + 1, current + 1)
+        ]
+
+    def patterns(self, today: int, weeks: int = 4) -> dict:
+        """server/adherence.ts getAdherencePatterns() on this state"""
+        strong, weak = self.strong_weak_days(today, weeks)
+        return {'currentStreak': self.current_streak(today), 'recentStreak': self.recent_streak(today),
+                'strongDays': strong, 'weakDays': weak}
+
+    def snapshot(self, newer_days) -> 'AdherenceState':
+        """loadAdherenceSnapshot() in server/adherence.ts: the last run and the bitmaps extended with
+        days logged since the state was written. Days on or before the last training day only mark
+        the bitmaps; the next run of this service merges them into the runs."""
+        last, length = self.last_day, self.last_run_length
+        bitmap_week, bitmaps = self.bitmap_week, list(self.week_bitmaps)
+        for day in sorted(set(newer_days)):
+            week, bit = week_and_bit(day)
+            if not bitmaps:
+                bitmap_week = week
+            offset = week - bitmap_week
+            if offset >= 0:
+                bitmaps.extend([0] * (offset + 1 - len(bitmaps)))
+                bitmaps[offset] |= 1 << bit
+            if last is not None and day <= last:
+                continue
+            length = length + 1 if last is not None and day == last + 1 else 1
+            last = day
+        runs = ([last - length + 1], [length]) if last is not None else ([], [])
+        return AdherenceState(*runs, self.total_workouts, bitmap_week, bitmaps, self.last_workout_id)
+
+    def record(self, user_id: int, updated_at: datetime) -> tuple:
+        return (user_id, self.run_starts, self.run_lengths, self.longest_streak, self.last_day,
+                self.last_run_length, self.total_days, self.total_workouts, self.bitmap_week,
+                self.week_bitmaps, self.last_workout_id, updated_at)
+
+    @classmethod
+    def from_record(cls, row) -> 'AdherenceState':
+        return cls(row['run_starts'], row['run_lengths'], row['total_workouts'], row['bitmap_week'],
+                   row['week_bitmaps'], row['last_workout_id'])
+
+
+def backfill_states(workouts: pd.DataFrame) -> dict:
+    """{user_id: AdherenceState} from user_workouts rows (id, user_id, completed_at) in one pass"""
+    df = workouts[workouts['completed_at'].notna()]
+    if df.empty:
+        return {}
+    day = pd.to_datetime(df['completed_at'], utc=True).dt.tz_localize(None).to_numpy().astype('datetime64[D]').astype(np.int64)
+    frame = pd.DataFrame({'user_id': df['user_id'].to_numpy().astype(np.int64), 'day': day})
+    totals = df.groupby('user_id').agg(total_workouts=('id', 'size'), last_workout_id=('id', 'max'))
+
+    days = frame.drop_duplicates().sort_values(['user_id', 'day'], kind='mergesort')
+    users = days['user_id'].to_numpy()
+    values = days['day'].to_numpy()
+    new_run = np.ones(len(values), dtype=bool)
+    new_run[1:] = (users[1:] != users[:-1]) | (np.diff(values) != 1)
+    run_id = np.cumsum(new_run)
+    runs = pd.DataFrame({'user_id': users, 'start': values, 'run': run_id}).groupby('run').agg(
+        user_id=('user_id', 'first'), start=('start', 'first'), length=('start', 'size'))
+
+    week, bit = (values + 4) // 7, (values + 4) % 7
+    last_week = pd.Series(week).groupby(users).transform('max').to_numpy()
+    in_window = week > last_week - BITMAP_WEEKS
+    masks = pd.DataFrame({'user_id': users[in_window], 'week': week[in_window],
+                          'bit': np.left_shift(1, bit[in_window])}).groupby(['user_id', 'week'])['bit'].sum()
+
+    states = {}
+    for user_id, user_runs in runs.groupby('user_id', sort=False):
+        user_masks = masks.loc[user_id]
+        first_week = int(user_masks.index.min())
+        bitmaps = [0] * (int(user_masks.index.max()) - first_week + 1)
+        for w, m in user_masks.items():
+            bitmaps[int(w) - first_week] = int(m)
+        states[int(user_id)] = AdherenceState(
+            user_runs['start'].astype(int).tolist(), user_runs['length'].astype(int).tolist(),
+            int(totals.at[user_id, 'total_workouts']), first_week, bitmaps,
+            int(totals.at[user_id, 'last_workout_id']),
+        )
+    return states
+
+
+async def _load_states(conn, user_ids: list) -> dict:
+    rows = await conn.fetch(f"""
+        SELECT {', '.join(STATE_COLUMNS[:-1])} FROM user_adherence WHERE user_id = ANY($1::integer[])
+    """, user_ids)
+    return {r['user_id']: AdherenceState.from_record(r) for r in rows}
+
+
+async def load_snapshots(conn, user_ids: list) -> dict:
+    """{user_id: snapshot} for the users that have a stored state, with their newer
+    user_workouts applied the way server/adherence.ts does"""
+    states = await _load_states(conn, user_ids)
+    if not states:
+        return {}
+    rows = await conn.fetch("""
+        SELECT w.user_id, w.completed_at FROM user_workouts w
+        JOIN user_adherence a ON a.user_id = w.user_id
+        WHERE w.user_id = ANY($1::integer[]) AND w.id > a.last_workout_id
+    """, list(states))
+    newer = {}
+    for r in rows:
+        newer.setdefault(r['user_id'], []).append(day_number(r['completed_at']))
+    return {user_id: state.snapshot(newer.get(user_id, [])) for user_id, state in states.items()}
+
+
+async def main():
+    parser = argparse.ArgumentParser(description='Maintain per-user streak and adherence state')
+    parser.add_argument('--backfill', action='store_true', help='Rebuild every state from all user_workouts')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("STREAK & ADHERENCE SERVICE")
+    print("=" * 60)
+    print()
+
+    conn = await connect()
+    try:
+        await conn.execute(CREATE_TABLE_SQL)
+        since = 0 if args.backfill else (await get_watermarks(conn, [JOB_NAME]))[JOB_NAME]
+        # Fix the upper bound first so rows inserted while we run wait for the next run
+        until = await conn.fetchval("SELECT COALESCE(MAX(id), 0) FROM user_workouts")
+        print(f"  user_workouts ids {since} -> {until}")
+        if until <= since:
+            print("\n✅ user_adherence is up to date")
+            return
+
+        started = datetime.now(timezone.utc)
+        workouts = await fetch_dataframe(conn, """
+            SELECT id, user_id, completed_at FROM user_workouts WHERE id > $1 AND id <= $2 ORDER BY id
+        """, since, until)
+        if args.backfill:
+            states = backfill_states(workouts)
+        else:
+            states = await _load_states(conn, sorted(workouts['user_id'].unique().tolist()))
+            for r in workouts.itertuples(index=False):
+                if pd.notna(r.completed_at):
+                    state = states.setdefault(int(r.user_id), AdherenceState())
+                    state.add(day_number(r.completed_at), int(r.id))
+        elapsed = (datetime.now(timezone.utc) - started).total_seconds()
+        print(f"Applied {len(workouts)} workouts to {len(states)} users in {elapsed:.2f}s")
+
+        updated_at = datetime.now(timezone.utc).replace(tzinfo=None)
+        records = [state.record(user_id, updated_at) for user_id, state in sorted(states.items())]
+        async with conn.transaction():
+            if args.backfill:
+                await conn.execute("TRUNCATE user_adherence")
+            written = await copy_upsert(conn, 'user_adherence', STATE_COLUMNS, records, conflict=['user_id'])
+            await set_watermarks(conn, {JOB_NAME: until})
+        print(f"\n✅ Upserted {written} rows into user_adherence")
+    finally:
+        await conn.close()
+    print("\nDone!")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
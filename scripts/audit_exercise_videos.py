@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Exercise Video Payload Audit
+----------------------------
+Demo videos are the biggest downloads in the app. This script probes every
+catalog video and reports what it costs to ship.
+
+It will:
+1. Read the video catalog (directory, JSON manifest - see video_catalog.py -
+   or the Cloudinary URLs stored in exercises.video_url with --from-db)
+2. Probe every video in parallel with ffprobe: duration, resolution, fps,
+   codec, bitrate and size
+3. Flag videos that should be re-encoded (bitrate far above the catalog
+   median, too many bits per pixel, larger than 1080p, legacy codec,
+   unnecessary audio track, very long clips)
+4. Estimate the bytes a typical generated workout downloads by sampling
+   random workouts of --exercises-per-workout videos
+
+Requires ffprobe on PATH.
+
+Usage:
+    python scripts/audit_exercise_videos.py VIDEO_DIR_OR_MANIFEST [--jobs 16] [--out video_audit.json]
+    python scripts/audit_exercise_videos.py --from-db
+"""
+
+import os
+import sys
+import json
+import random
+import asyncio
+import argparse
+from statistics import median
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from script_utils import percentile
+from video_catalog import load_video_entries, probe_video
+
+DATABASE_URL = os.environ.get('DATABASE_URL')
+
+# Codecs every app client can hardware-decode
+EFFICIENT_CODECS = {'h264', 'hevc', 'vp9', 'av1'}
+# Bits per pixel per frame above this is wasteful for talking-head style demos
+MAX_BITS_PER_PIXEL = 0.15
+MAX_SHORT_SIDE = 1080
+MAX_DURATION_SECONDS = 60
+# A bitrate this many MADs above the catalog median is an outlier
+BITRATE_MAD_FACTOR = 3.0
+# When most of the catalog shares one bitrate the MAD is 0; fall back to this multiple of the median
+BITRATE_MEDIAN_FACTOR = 2.0
+# Beginner-to-advanced generated workouts contain 3-8 exercises (see backend_test_workout_realism.py)
+DEFAULT_EXERCISES_PER_WORKOUT = 6
+WORKOUT_SAMPLES = 2000
+
+
+def flag_outliers(rows: list) -> list:
+    """Attach a 'flags' list to each probed row and return the rows"""
+    bitrates = [r['bitrate'] for r in rows if r.get('bitrate')]
+    med = median(bitrates) if bitrates else 0
+    mad = median([abs(b - med) for b in bitrates]) if bitrates else 0
+    bitrate_limit = med + BITRATE_MAD_FACTOR * mad if mad else BITRATE_MEDIAN_FACTOR * med
+
+    for row in rows:
+        flags = []
+        width, height, fps, bitrate = row.get('width'), row.get('height'), row.get('fps'), row.get('bitrate')
+        if bitrate_limit and bitrate and bitrate > bitrate_limit:
+            flags.append('bitrate_outlier')
+        if bitrate and width and height and fps:
+            bpp = bitrate / (width * height * fps)
+            row['bitsPerPixel'] = round(bpp, 3)
+            if bpp > MAX_BITS_PER_PIXEL:
+                flags.append('high_bits_per_pixel')
+        if width and height and min(width, height) > MAX_SHORT_SIDE:
+            flags.append('above_1080p')
+        if row.get('codec') and row['codec'] not in EFFICIENT_CODECS:
+            flags.append('legacy_codec')
+        if row.get('audioCodec'):
+            flags.append('has_audio')
+        if row.get('duration') and row['duration'] > MAX_DURATION_SECONDS:
+            flags.append('long_clip')
+        row['flags'] = flags
+    return rows
+
+
+def estimate_workout_bytes(sizes: list, per_workout: int, samples: int = WORKOUT_SAMPLES, seed: int = 7) -> dict:
+    """Bytes downloaded by a workout of `per_workout` distinct exercises"""
+    sizes = [s for s in sizes if s]
+    if not sizes:
+        return {'exercisesPerWorkout': per_workout, 'mean': 0, 'p50': 0, 'p90': 0}
+    k = min(per_workout, len(sizes))
+    rng = random.Random(seed)
+    totals = [sum(rng.sample(sizes, k)) for _ in range(samples)]
+    return {
+        'exercisesPerWorkout': k,
+        'mean': int(sum(sizes) / len(sizes) * k),
+        'p50': int(percentile(totals, 50)),
+        'p90': int(percentile(totals, 90)),
+    }
+
+
+def probe_all(entries: list, jobs: int) -> tuple:
+    """Probe entries in parallel; ffprobe is a subprocess, so threads are enough"""
+    rows, failures = [], []
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        futures = {pool.submit(probe_video, e['path']): e for e in entries}
+        for future in as_completed(futures):
+            entry = futures[future]
+            try:
+                info = future.result()
+            except Exception as e:
+                failures.append({'slug': entry['slug'], 'path': entry['path'], 'error': str(e)})
+                continue
+            row = {'slug': entry['slug'], 'path': entry['path'], **info}
+            if 'id' in entry:
+                row['id'] = entry['id']
+            rows.append(row)
+    rows.sort(key=lambda r: r['slug'])
+    return rows, failures
+
+
+async def fetch_db_entries() -> list:
+    import asyncpg
+
+    conn = await asyncpg.connect(DATABASE_URL)
+    try:
+        rows = await conn.fetch("""
+            SELECT id, slug, video_url FROM exercises
+            WHERE video_url ILIKE '%cloudinary%'
+            ORDER BY id
+        """)
+    finally:
+        await conn.close()
+    return [{'id': r['id'], 'slug': r['slug'], 'path': r['video_url']} for r in rows]
+
+
+def _mb(n) -> str:
+    return f"{(n or 0) / (1024 * 1024):.2f} MB"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Audit exercise video size, bitrate and codecs')
+    parser.add_argument('source', nargs='?', help='Directory of <slug> videos or a JSON manifest')
+    parser.add_argument('--from-db', action='store_true', help='Probe the Cloudinary URLs in exercises.video_url')
+    parser.add_argument('--jobs', type=int, default=16)
+    parser.add_argument('--exercises-per-workout', type=int, default=DEFAULT_EXERCISES_PER_WORKOUT)
+    parser.add_argument('--out', default='video_audit.json')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("EXERCISE VIDEO PAYLOAD AUDIT")
+    print("=" * 60)
+    print()
+
+    if args.from_db:
+        if not DATABASE_URL:
+            print("❌ DATABASE_URL is not set")
+            sys.exit(1)
+        entries = asyncio.run(fetch_db_entries())
+    elif args.source:
+        entries = load_video_entries(args.source)
+    else:
+        parser.error('pass a video directory/manifest or --from-db')
+    print(f"Probing {len(entries)} videos with {args.jobs} workers...")
+
+    rows, failures = probe_all(entries, args.jobs)
+    flag_outliers(rows)
+
+    sizes = [r['size'] for r in rows if r.get('size')]
+    bitrates = [r['bitrate'] for r in rows if r.get('bitrate')]
+    workout = estimate_workout_bytes(sizes, args.exercises_per_workout)
+    flagged = [r for r in rows if r['flags']]
+
+    print(f"\n{'SLUG':40} {'DUR':>6} {'RES':>10} {'CODEC':>6} {'KBPS':>7} {'SIZE':>10}  FLAGS")
+    for r in sorted(rows, key=lambda r: -(r.get('size') or 0))[:40]:
+        res = f"{r['width']}x{r['height']}" if r.get('width') else '-'
+        kbps = f"{r['bitrate'] // 1000}" if r.get('bitrate') else '-'
+        dur = f"{r['duration']:.1f}" if r.get('duration') else '-'
+        print(f"{r['slug'][:40]:40} {dur:>6} {res:>10} {str(r.get('codec'))[:6]:>6} {kbps:>7} "
+              f"{_mb(r.get('size')):>10}  {','.join(r['flags'])}")
+    if len(rows) > 40:
+        print(f"  ... and {len(rows) - 40} more (largest first)")
+
+    print("\n=== SUMMARY ===")
+    print(f"  Videos probed:       {len(rows)} ({len(failures)} failed)")
+    print(f"  Catalog total:       {_mb(sum(sizes))}")
+    print(f"  Median size:         {_mb(median(sizes) if sizes else 0)}")
+    print(f"  Median bitrate:      {int(median(bitrates) // 1000) if bitrates else 0} kbps")
+    print(f"  Need re-encoding:    {len(flagged)} ({_mb(sum(r.get('size') or 0 for r in flagged))})")
+    print(f"  Workout download ({workout['exercisesPerWorkout']} exercises): "
+          f"mean {_mb(workout['mean'])}, p50 {_mb(workout['p50'])}, p90 {_mb(workout['p90'])}")
+
+    for failure in failures[:20]:
+        print(f"  ❌ {failure['slug']}: {failure['error']}")
+
+    report = {
+        'videos': rows,
+        'failures': failures,
+        'summary': {
+            'count': len(rows),
+            'totalBytes': sum(sizes),
+            'medianBytes': median(sizes) if sizes else 0,
+            'medianBitrate': median(bitrates) if bitrates else 0,
+            'flagged': len(flagged),
+            'flaggedBytes': sum(r.get('size') or 0 for r in flagged),
+            'workout': workout,
+        },
+    }
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Report written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+Badge Tracking Write Benchmark
+------------------------------
+The app posts one POST /api/badges/track per action (coachMessage,
+videoWatched, profileEdit, badgeShared, prBroken, ...) and every call is a
+write to the user's single user_badge_stats row, yet the tests only ever send
+them one at a time. This fires realistic bursts from many users at once and
+compares one request per event with a client that coalesces them.
+
+It will:
+1. Register --users synthetic users and give each --bursts bursts of
+   --burst-size events (weighted action mix, spread over --spread-ms) at
+   random points of a --duration second window
+2. Replay the schedule open-loop, --concurrency requests in flight, per mode:
+   - single: one { action, value } request per event (what the app does)
+   - batched: BatchedTrackClient, which holds each user's events for
+     --window-ms (or until --max-batch) and sends one { events: [...] }
+3. Reset the users' stats before each mode (POST /api/badges/reset) and read
+   them back after (GET /api/badges/stats) to count increments that were lost
+   or never landed
+4. With DATABASE_URL set, sample pg_stat_activity for user_badge_stats
+   statements waiting on a lock while the mode runs
+5. Report requests, events/s, request and event-to-ack p50/p95, errors,
+   lost increments and lock waits per mode, and append the run to --out
+
+Usage:
+    python scripts/bench_badge_track.py --url http://localhost:5000
+    python scripts/bench_badge_track.py --url http://localhost:5000 --users 500 --burst-size 12 --window-ms 500
+    python scripts/bench_badge_track.py --url http://localhost:5000 --modes single --label before-upsert
+"""
+
+import os
+import json
+import time
+import uuid
+import random
+import asyncio
+import argparse
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+
+from script_utils import latency_stats
+
+# Rough frequency of each action in the app: chat and videos dominate
+ACTION_WEIGHTS = {'coachMessage': 40, 'videoWatched': 25, 'workoutEdit': 10, 'prBroken': 8,
+                  'extraActivity': 6, 'badgeShared': 6, 'profileEdit': 3, 'appRated': 2}
+# GET /api/badges/stats field each action moves
+STATS_KEYS = {'coachMessage': 'totalCoachMessages', 'videoWatched': 'totalVideosWatched',
+              'workoutEdit': 'totalWorkoutEdits', 'prBroken': 'totalPRsBroken',
+              'extraActivity': 'totalExtraActivities', 'badgeShared': 'totalBadgesShared',
+              'profileEdit': 'hasEditedProfile', 'appRated': 'hasRatedApp'}
+FLAG_ACTIONS = ('profileEdit', 'appRated')
+MODES = ('single', 'batched')
+MAX_BATCH_EVENTS = 100   # server accepts up to 500 (MAX_BADGE_TRACK_EVENTS)
+PASSWORD = 'BenchPass123!'
+REQUEST_TIMEOUT = 30
+
+
+def burst_schedule(rng: random.Random, users: int, bursts: int, burst_size: int,
+                   duration_s: float, spread_ms: float) -> list:
+    """(t, user, action, value) sorted by t"""
+    actions, weights = zip(*ACTION_WEIGHTS.items())
+    schedule = []
+    for user in range(users):
+        for _ in range(bursts):
+            start = rng.uniform(0, duration_s)
+            for action in rng.choices(actions, weights, k=burst_size):
+                value = rng.randint(1, 3) if action == 'prBroken' else None
+                schedule.append((start + rng.uniform(0, spread_ms / 1000), user, action, value))
+    schedule.sort(key=lambda e: e[0])
+    return schedule
+
+
+def track_event(action: str, value=None) -> dict:
+    return {'action': action} if value is None else {'action': action, 'value': value}
+
+
+def expected_stats(schedule: list) -> dict:
+    """Stats each user should end with, keyed like GET /api/badges/stats"""
+    expected = {}
+    for _, user, action, value in schedule:
+        stats = expected.setdefault(user, {})
+        key = STATS_KEYS[action]
+        if action in FLAG_ACTIONS:
+            stats[key] = True
+        else:
+            stats[key] = stats.get(key, 0) + ((value or 1) if action == 'prBroken' else 1)
+    return expected
+
+
+def lost_updates(expected: dict, actual: dict) -> dict:
+    """Increments (and flags) missing from the stored stats, and how many users lost any"""
+    lost, users = 0, 0
+    for user, stats in expected.items():
+        stored = actual.get(user) or {}
+        missing = 0
+        for key, value in stats.items():
+            if value is True:
+                missing += 0 if stored.get(key) else 1
+            else:
+                missing += max(0, value - (stored.get(key) or 0))
+        lost += missing
+        users += 1 if missing else 0
+    return {'increments': lost, 'users': users}
+
+
+class TrackBatcher:
+    """Per-user buffers of (event, tracked_at); a buffer is due window_s after its first event"""
+
+    def __init__(self, window_s: float, max_events: int = MAX_BATCH_EVENTS, clock=time.monotonic):
+        self.window_s, self.max_events, self.clock = window_s, max_events, clock
+        self.pending = {}
+        self.lock = threading.Lock()
+
+    def add(self, key, event: dict):
+        """Queue an event; returns the user's items when the batch is full"""
+        now = self.clock()
+        with self.lock:
+            _, items = self.pending.setdefault(key, (now + self.window_s, []))
+            items.append((event, now))
+            if len(items) >= self.max_events:
+                del self.pending[key]
+                return items
+        return None
+
+    def take_due(self) -> list:
+        now = self.clock()
+        with self.lock:
+            due = [key for key, (deadline, _) in self.pending.items() if deadline <= now]
+            return [(key, self.pending.pop(key)[1]) for key in due]
+
+    def take_all(self) -> list:
+        with self.lock:
+            batches = [(key, items) for key, (_, items) in self.pending.items()]
+            self.pending.clear()
+        return batches
+
+
+class BatchedTrackClient:
+    """track() queues an event; a flusher thread sends each user's due batch
+    with send(token, items) on the pool. close() flushes the rest and returns
+    the send results."""
+
+    def __init__(self, send, pool, window_s: float, max_events: int = MAX_BATCH_EVENTS):
+        self.batcher = TrackBatcher(window_s, max_events)
+        self.send, self.pool = send, pool
+        self.futures = []
+        self.stopped = threading.Event()
+        self.flusher = threading.Thread(target=self._flush_loop, daemon=True)
+        self.flusher.start()
+
+    def track(self, token: str, event: dict):
+        items = self.batcher.add(token, event)
+        if items:
+            self.futures.append(self.pool.submit(self.send, token, items))
+
+    def _flush_loop(self):
+        tick = max(self.batcher.window_s / 4, 0.005)
+        while not self.stopped.wait(tick):
+            for token, items in self.batcher.take_due():
+                self.futures.append(self.pool.submit(self.send, token, items))
+
+    def close(self) -> list:
+        self.stopped.set()
+        self.flusher.join()
+        for token, items in self.batcher.take_all():
+            self.futures.append(self.pool.submit(self.send, token, items))
+        return [f.result() for f in self.futures]
+
+
+def post_track(session, url: str, token: str, items: list, batched: bool) -> dict:
+    """One track request for (event, tracked_at) items; latency per request and per event"""
+    events = [event for event, _ in items]
+    body = {'events': events} if batched else events[0]
+    started = time.perf_counter()
+    try:
+        response = session.post(f"{url}/api/badges/track", headers={'Authorization': f"Bearer {token}"},
+                                json=body, timeout=REQUEST_TIMEOUT)
+        error = None if response.status_code == 200 else f"HTTP {response.status_code}"
+    except Exception as e:
+        error = type(e).__name__
+    acked = time.monotonic()
+    return {'events': len(events), 'latency_ms': (time.perf_counter() - started) * 1000,
+            'eventLatencyMs': [(acked - tracked_at) * 1000 for _, tracked_at in items], 'error': error}
+
+
+def replay(schedule: list, tokens: list, dispatch):
+    """Call dispatch(token, event) at each event's offset from now"""
+    started = time.monotonic()
+    for t, user, action, value in schedule:
+        delay = started + t - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        dispatch(tokens[user], track_event(action, value))
+
+
+def summarize(records: list, wall_seconds: float) -> dict:
+    ok = [r for r in records if not r['error']]
+    events = sum(r['events'] for r in records)
+    return {
+        'requests': len(records),
+        'events': events,
+        'eventsPerRequest': round(events / len(records), 2) if records else 0,
+        'eventsPerSecond': round(sum(r['events'] for r in ok) / wall_seconds, 1) if wall_seconds else 0,
+        'errors': dict(Counter(r['error'] for r in records if r['error'])),
+        'request': latency_stats([r['latency_ms'] for r in ok]),
+        'eventAck': latency_stats([ms for r in ok for ms in r['eventLatencyMs']]),
+    }
+
+
+class LockSampler(threading.Thread):
+    """Samples user_badge_stats statements waiting on a lock"""
+
+    def __init__(self, interval: float = 0.2):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.samples = []
+        self.stopped = threading.Event()
+
+    def run(self):
+        asyncio.run(self._loop())
+
+    async def _loop(self):
+        from db_utils import connect
+
+        conn = await connect()
+        try:
+            while True:
+                row = await conn.fetchrow("""
+                    SELECT COUNT(*) FILTER (WHERE wait_event_type = 'Lock') AS waiting,
+                           COUNT(*) FILTER (WHERE state = 'active') AS active
+                    FROM pg_stat_activity
+                    WHERE query ILIKE '%user_badge_stats%' AND pid <> pg_backend_pid()
+                """)
+                self.samples.append((row['waiting'], row['active']))
+                if self.stopped.wait(self.interval):
+                    return
+        finally:
+            await conn.close()
+
+    def stop(self) -> dict:
+        self.stopped.set()
+        self.join(timeout=30)
+        waiting = [w for w, _ in self.samples]
+        return {'samples': len(waiting), 'maxWaiting': max(waiting, default=0),
+                'meanWaiting': round(sum(waiting) / len(waiting), 2) if waiting else 0,
+                'maxActive': max((a for _, a in self.samples), default=0)}
+
+
+def register(session, url: str, run_id: str, index: int):
+    """Bearer token of a new synthetic user, or None"""
+    response = session.post(f"{url}/api/auth/register", timeout=REQUEST_TIMEOUT, json={
+        'name': f"Badge Bench {index}",
+        'email': f"badge_bench_{run_id}_{index}@example.com",
+        'password': PASSWORD,
+        'experience': 'beginner',
+        'fitnessGoals': ['general_fitness'],
+        'trainingDays': 3,
+    })
+    return response.json().get('accessToken') if response.status_code == 201 else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Burst write benchmark for /api/badges/track')
+    parser.add_argument('--url', required=True, help='Backend base URL')
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--bursts', type=int, default=5, help='Bursts per user')
+    parser.add_argument('--burst-size', type=int, default=8, help='Events per burst')
+    parser.add_argument('--spread-ms', type=float, default=200, help='Time span of one burst')
+    parser.add_argument('--duration', type=float, default=20, help='Seconds the bursts are spread over')
+    parser.add_argument('--window-ms', type=float, default=250, help='Coalescing window of the batched client')
+    parser.add_argument('--max-batch', type=int, default=MAX_BATCH_EVENTS, help='Events per batch at most')
+    parser.add_argument('--concurrency', type=int, default=64, help='Requests in flight')
+    parser.add_argument('--modes', default=','.join(MODES), help=f"Comma-separated, from {', '.join(MODES)}")
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--label', default='run', help='Name of this run in the results file')
+    parser.add_argument('--out', default='bench_badge_track.json')
+    args = parser.parse_args()
+
+    import requests
+
+    url = args.url.rstrip('/')
+    modes = [m for m in args.modes.split(',') if m in MODES]
+    run_id = uuid.uuid4().hex[:8]
+
+    print("=" * 60)
+    print("BADGE TRACK WRITE BENCHMARK")
+    print("=" * 60)
+    print()
+
+    local = threading.local()
+
+    def session():
+        if not hasattr(local, 'session'):
+            local.session = requests.Session()
+        return local.session
+
+    with ThreadPoolExecutor(max_workers=min(32, args.users)) as pool:
+        tokens = [t for t in pool.map(lambda i: register(session(), url, run_id, i), range(args.users)) if t]
+    print(f"  Registered {len(tokens)}/{args.users} synthetic users")
+    if not tokens:
+        print("❌ Could not register any users")
+        return
+
+    schedule = burst_schedule(random.Random(args.seed), len(tokens), args.bursts, args.burst_size,
+                              args.duration, args.spread_ms)
+    expected = expected_stats(schedule)
+    print(f"  {len(schedule):,} events over {args.duration:.0f}s "
+          f"({args.bursts} bursts x {args.burst_size} per user)")
+    if not os.environ.get('DATABASE_URL'):
+        print("  DATABASE_URL not set - lock waits will not be sampled")
+
+    results = {}
+    for mode in modes:
+        with ThreadPoolExecutor(max_workers=min(32, len(tokens))) as pool:
+            list(pool.map(lambda t: session().post(f"{url}/api/badges/reset", timeout=REQUEST_TIMEOUT,
+                                                   headers={'Authorization': f"Bearer {t}"}), tokens))
+
+        sampler = LockSampler() if os.environ.get('DATABASE_URL') else None
+        if sampler:
+            sampler.start()
+        print(f"\n  [{mode}] replaying...")
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            if mode == 'single':
+                futures = []
+
+                def send_single(token, event):
+                    items = [(event, time.monotonic())]
+                    futures.append(pool.submit(lambda: post_track(session(), url, token, items, batched=False)))
+
+                replay(schedule, tokens, send_single)
+                records = [f.result() for f in futures]
+            else:
+                client = BatchedTrackClient(lambda token, items: post_track(session(), url, token, items, batched=True),
+                                            pool, args.window_ms / 1000, args.max_batch)
+                replay(schedule, tokens, client.track)
+                records = client.close()
+        wall = time.perf_counter() - started
+
+        with ThreadPoolExecutor(max_workers=min(32, len(tokens))) as pool:
+            stored = list(pool.map(lambda t: session().get(f"{url}/api/badges/stats", timeout=REQUEST_TIMEOUT,
+                                                           headers={'Authorization': f"Bearer {t}"}), tokens))
+        actual = {user: r.json() if r.status_code == 200 else None for user, r in enumerate(stored)}
+
+        summary = summarize(records, wall)
+        summary.update(wallSeconds=round(wall, 2), lost=lost_updates(expected, actual),
+                       locks=sampler.stop() if sampler else None)
+        results[mode] = summary
+
+        print(f"    {summary['requests']:,} requests for {summary['events']:,} events "
+              f"({summary['eventsPerRequest']} per request), {summary['eventsPerSecond']:,} events/s")
+        print(f"    request p50 {summary['request']['p50']:.0f} ms / p95 {summary['request']['p95']:.0f} ms, "
+              f"event-to-ack p95 {summary['eventAck']['p95']:.0f} ms")
+        print(f"    errors {summary['errors'] or 'none'}, lost increments {summary['lost']['increments']} "
+              f"({summary['lost']['users']} users)")
+        if summary['locks']:
+            print(f"    lock waits: max {summary['locks']['maxWaiting']}, mean {summary['locks']['meanWaiting']} "
+                  f"over {summary['locks']['samples']} samples")
+
+    if 'single' in results and 'batched' in results:
+        before, after = results['single'], results['batched']
+        ratio = before['requests'] / after['requests'] if after['requests'] else 0
+        print(f"\n  Requests {before['requests']:,} -> {after['requests']:,} ({ratio:.1f}x fewer), "
+              f"request p95 {before['request']['p95']:.0f} -> {after['request']['p95']:.0f} ms")
+
+    failed = [m for m, s in results.items() if s['errors'] or s['lost']['increments']]
+    status = '❌' if failed else '✅'
+    verdict = f"errors or lost increments in {', '.join(failed)}" if failed else 'every event landed'
+    print(f"\n{status} {verdict}")
+
+    runs = []
+    if os.path.exists(args.out):
+        with open(args.out, encoding='utf-8') as f:
+            runs = json.load(f)
+    runs.append({'label': args.label, 'at': datetime.now(timezone.utc).isoformat(), 'users': len(tokens),
+                 'bursts': args.bursts, 'burstSize': args.burst_size, 'spreadMs': args.spread_ms,
+                 'durationSeconds': args.duration, 'windowMs': args.window_ms, 'maxBatch': args.max_batch,
+                 'concurrency': args.concurrency, 'modes': results})
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(runs, f, indent=2)
+    print(f"✅ Results appended to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
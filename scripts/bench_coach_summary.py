@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Coach Summary Precompute Benchmark
+----------------------------------
+Measures what precomputed coach summaries (precompute_coach_summaries.py)
+save on the coach chat path.
+
+It will:
+1. DB mode (default): for a sample of users with a stored summary, time the
+   on-demand path of buildUserCoachSummary() (users row + 30 days of
+   user_workouts + adherence calculation) against reading the precomputed
+   coach_memory row, and report p50/p95 for both
+2. Chat mode (--chat-url): send --requests messages to /api/coach/chat and
+   report the end-to-end p50/p95. Run it once against a server started with
+   COACH_SUMMARY_PRECOMPUTE=false and once with precompute enabled, using a
+   different --label; results are appended to --out so the runs can be compared
+
+Usage:
+    python scripts/bench_coach_summary.py [--users 200]
+    python scripts/bench_coach_summary.py --chat-url https://host --token TOKEN --label precompute
+"""
+
+import os
+import json
+import time
+import asyncio
+import argparse
+from datetime import datetime, timedelta, timezone
+
+from db_utils import connect
+from precompute_coach_summaries import WORKOUT_WINDOW_DAYS, build_summary
+from script_utils import latency_stats
+
+
+async def bench_db(users: int) -> dict:
+    conn = await connect()
+    try:
+        user_ids = [r['user_id'] for r in await conn.fetch("""
+            SELECT DISTINCT user_id FROM coach_memory WHERE kind = 'summary' ORDER BY user_id LIMIT $1
+        """, users)]
+        if not user_ids:
+            print("❌ No precomputed summaries found - run precompute_coach_summaries.py first")
+            return {}
+
+        on_demand, precomputed = [], []
+        for user_id in user_ids:
+            started = time.perf_counter()
+            now = datetime.now(timezone.utc)
+            user = await conn.fetchrow("SELECT * FROM users WHERE id = $1", user_id)
+            workouts = await conn.fetch("""
+                SELECT * FROM user_workouts WHERE user_id = $1 AND completed_at >= $2
+                ORDER BY completed_at DESC
+            """, user_id, (now - timedelta(days=WORKOUT_WINDOW_DAYS)).replace(tzinfo=None))
+            build_summary(dict(user), [dict(w) for w in workouts], now)
+            on_demand.append((time.perf_counter() - started) * 1000)
+
+            started = time.perf_counter()
+            await conn.fetchrow("""
+                SELECT data, refreshed_at FROM coach_memory
+                WHERE user_id = $1 AND kind = 'summary' ORDER BY refreshed_at DESC LIMIT 1
+            """, user_id)
+            precomputed.append((time.perf_counter() - started) * 1000)
+    finally:
+        await conn.close()
+    return {'onDemand': latency_stats(on_demand), 'precomputed': latency_stats(precomputed)}
+
+
+def bench_chat(url: str, token: str, requests_count: int, message: str) -> dict:
+    import requests
+
+    samples, failures = [], 0
+    headers = {'Authorization': f"Bearer {token}"}
+    for _ in range(requests_count):
+        started = time.perf_counter()
+        response = requests.post(f"{url.rstrip('/')}/api/coach/chat", json={'message': message},
+                                 headers=headers, timeout=60)
+        elapsed = (time.perf_counter() - started) * 1000
+        if response.status_code == 200:
+            samples.append(elapsed)
+        else:
+            failures += 1
+    return {'chat': latency_stats(samples), 'failures': failures}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark coach summary precompute')
+    parser.add_argument('--users', type=int, default=200, help='Users sampled in DB mode')
+    parser.add_argument('--chat-url', help='Backend base URL for chat mode')
+    parser.add_argument('--token', default=os.environ.get('COACH_BENCH_TOKEN'), help='Bearer token for chat mode')
+    parser.add_argument('--requests', type=int, default=20, help='Chat requests in chat mode')
+    parser.add_argument('--message', default='How should I warm up for squats today?')
+    parser.add_argument('--label', default='run', help='Name of this run in the results file')
+    parser.add_argument('--out', default='coach_summary_bench.json')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("COACH SUMMARY PRECOMPUTE BENCHMARK")
+    print("=" * 60)
+    print()
+
+    if args.chat_url:
+        if not args.token:
+            parser.error('chat mode needs --token or COACH_BENCH_TOKEN')
+        result = bench_chat(args.chat_url, args.token, args.requests, args.message)
+        print(f"  /api/coach/chat [{args.label}]: p50 {result['chat']['p50']:.0f} ms, "
+              f"p95 {result['chat']['p95']:.0f} ms ({result['failures']} failed)")
+    else:
+        result = asyncio.run(bench_db(args.users))
+        if not result:
+            return
+        for name, stats in result.items():
+            print(f"  {name:12} p50 {stats['p50']:.2f} ms   p95 {stats['p95']:.2f} ms   (n={stats['count']})")
+        saved = result['onDemand']['p50'] - result['precomputed']['p50']
+        print(f"\n  Saved per chat request (p50): {saved:.2f} ms")
+
+    runs = []
+    if os.path.exists(args.out):
+        with open(args.out, encoding='utf-8') as f:
+            runs = json.load(f)
+    runs.append({'label': args.label, 'at': datetime.now(timezone.utc).isoformat(), **result})
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(runs, f, indent=2)
+    print(f"\n✅ Results appended to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
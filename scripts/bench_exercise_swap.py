@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Exercise Swap Latency Benchmark
+-------------------------------
+Mid-workout swaps go through POST /api/workouts/swap-exercise, and the user
+waits on it between sets. ai-exercise-swap.ts::getExerciseAlternatives makes
+one LLM call, retries once when the call throws or the reply fails the Zod
+schema, and otherwise falls back to canned alternatives
+(getFallbackAlternatives, or getSafeFallbackForInjury when the injury filter
+blocks every suggestion). Underneath, the openai SDK retries 5xx/timeouts on
+its own (maxRetries 2), which never shows up in our logs.
+
+It will:
+1. Build a corpus of swap requests: exercises (warmup, main, cooldown) x
+   injury notes x equipment notes, with the reason the app would send
+   (EditWorkoutModal.tsx SWAP_REASONS)
+2. For each scenario, reconfigure the LLM stand-in (POST /config) -
+   baseline, slow (10% of calls take --slow-ms), fail (20% HTTP 500) and
+   invalid (20% empty JSON) - and replay the corpus --concurrency at a time
+3. Read X-Swap-Attempts / X-Swap-Path from each response (sent with
+   BENCH_HEADERS=true; the path is inferred from the canned fallback ids
+   when the headers are missing) and the stand-in's call
+   count, to report per scenario:
+   - latency p50/p95/p99/max
+   - share of swaps that needed the retry, and fallback rate by path
+   - LLM calls per swap, and the SDK retries hidden inside them
+4. Append the run to --out
+
+Start the backend against the stand-in first, e.g.:
+    python scripts/llm_standin.py --latency-ms 1200 &
+    BENCH_HEADERS=true OPENAI_BASE_URL=http://localhost:8090/v1 OPENAI_API_KEY=standin npm run dev
+
+Usage:
+    python scripts/bench_exercise_swap.py --url http://localhost:5000 --standin-url http://localhost:8090
+    python scripts/bench_exercise_swap.py --url http://localhost:5000 --scenarios baseline,fail --concurrency 20
+    python scripts/bench_exercise_swap.py --url http://localhost:5000   # live model, one "live" scenario
+"""
+
+import os
+import json
+import time
+import argparse
+import itertools
+from collections import Counter
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+
+from script_utils import latency_stats, percentile
+
+EXERCISES = [
+    {'name': 'Jumping Jacks', 'category': 'warmup', 'sets': 1, 'reps': '30 sec', 'restTime': 15},
+    {'name': 'Barbell Back Squat', 'category': 'main', 'sets': 4, 'reps': '6-8', 'restTime': 120},
+    {'name': 'Barbell Bench Press', 'category': 'main', 'sets': 4, 'reps': '6-8', 'restTime': 120},
+    {'name': 'Romanian Deadlift', 'category': 'main', 'sets': 3, 'reps': '8-10', 'restTime': 90},
+    {'name': 'Overhead Press', 'category': 'main', 'sets': 3, 'reps': '8-10', 'restTime': 90},
+    {'name': 'Walking Lunge', 'category': 'main', 'sets': 3, 'reps': '10 each', 'restTime': 60},
+    {'name': 'Pull-Up', 'category': 'main', 'sets': 3, 'reps': '6-10', 'restTime': 90},
+    {'name': 'Dumbbell Bicep Curl', 'category': 'main', 'sets': 3, 'reps': '10-12', 'restTime': 60},
+    {'name': "Child's Pose", 'category': 'cooldown', 'sets': 1, 'reps': '45 sec', 'restTime': 15},
+]
+INJURIES = {
+    'none': '',
+    'knee': 'Left knee pain (meniscus)',
+    'lower_back': 'Lower back tightness, old L5 disc issue',
+    'shoulder': 'Right shoulder impingement',
+    'wrist': 'Sore wrist',
+}
+EQUIPMENT = {
+    'gym': '',
+    'dumbbells': 'Only have dumbbells right now',
+    'bodyweight': 'No equipment, bodyweight only',
+}
+OTHER_REASONS = ['too-hard', 'too-easy', 'prefer']
+
+SCENARIOS = {
+    'baseline': {'slowRate': 0.0, 'failRate': 0.0, 'invalidRate': 0.0},
+    'slow': {'slowRate': 0.1, 'failRate': 0.0, 'invalidRate': 0.0},
+    'fail': {'slowRate': 0.0, 'failRate': 0.2, 'invalidRate': 0.0},
+    'invalid': {'slowRate': 0.0, 'failRate': 0.0, 'invalidRate': 0.2},
+}
+PATHS = ['llm', 'fallback', 'injury_fallback']
+REQUEST_TIMEOUT = 120
+
+
+def build_corpus(repeat: int = 1) -> list:
+    """(cell, payload) per exercise x injury x equipment, like the native app sends it"""
+    corpus = []
+    reasons = itertools.cycle(OTHER_REASONS)
+    for _ in range(repeat):
+        for exercise, injury, equipment in itertools.product(EXERCISES, INJURIES, EQUIPMENT):
+            reason = 'injury' if injury != 'none' else 'equipment' if equipment != 'gym' else next(reasons)
+            notes = '. '.join(n for n in (INJURIES[injury], EQUIPMENT[equipment]) if n)
+            current = {'id': exercise['name'].lower().replace(' ', '-'), **exercise}
+            corpus.append((
+                {'exercise': exercise['name'], 'injury': injury, 'equipment': equipment, 'reason': reason},
+                {'currentExercise': current, 'reason': reason, 'additionalNotes': notes,
+                 'userProfile': {'experience': 'intermediate'}, 'exerciseCategory': exercise['category']},
+            ))
+    return corpus
+
+
+def infer_path(body: dict) -> str:
+    """Which branch answered, from the canned fallback shapes (when X-Swap-Path is missing)"""
+    recommended = (body or {}).get('recommended') or {}
+    if str(recommended.get('id', '')).startswith('safe-'):
+        return 'injury_fallback'
+    alternatives = (body or {}).get('alternatives') or []
+    if (recommended.get('id') == 'alt-0' and str(recommended.get('name', '')).startswith('Modified ')
+            and [a.get('name') for a in alternatives] == ['Bodyweight Alternative']):
+        return 'fallback'
+    return 'llm'
+
+
+def run_swap(session, url: str, cell: dict, payload: dict) -> dict:
+    started = time.perf_counter()
+    try:
+        response = session.post(f"{url}/api/workouts/swap-exercise", json=payload, timeout=REQUEST_TIMEOUT)
+    except Exception as e:
+        return {**cell, 'ok': False, 'latency_ms': (time.perf_counter() - started) * 1000,
+                'error': type(e).__name__, 'attempts': None, 'path': None}
+    latency = (time.perf_counter() - started) * 1000
+    if response.status_code != 200:
+        return {**cell, 'ok': False, 'latency_ms': latency, 'error': f"HTTP {response.status_code}",
+                'attempts': None, 'path': None}
+    attempts = response.headers.get('X-Swap-Attempts')
+    return {**cell, 'ok': True, 'latency_ms': latency, 'error': None,
+            'attempts': int(attempts) if attempts else None,
+            'path': response.headers.get('X-Swap-Path') or infer_path(response.json())}
+
+
+def replay(url: str, corpus: list, concurrency: int) -> list:
+    import threading
+    import requests
+
+    local = threading.local()
+
+    def session():
+        if not hasattr(local, 'session'):
+            local.session = requests.Session()
+        return local.session
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(lambda case: run_swap(session(), url, *case), corpus))
+
+
+def summarize(results: list, wall_seconds: float, llm_calls: int = None) -> dict:
+    ok = [r for r in results if r['ok']]
+    latencies = [r['latency_ms'] for r in ok]
+    paths = Counter(r['path'] for r in ok)
+    attempts = [r['attempts'] for r in ok if r['attempts'] is not None]
+    summary = {
+        'swaps': len(results),
+        'failed': len(results) - len(ok),
+        'wallSeconds': round(wall_seconds, 2),
+        'latency': {**latency_stats(latencies), 'p99': round(percentile(latencies, 99), 2),
+                    'max': round(max(latencies), 2) if latencies else 0},
+        'paths': {p: paths[p] for p in PATHS},
+        'fallbackRate': round((paths['fallback'] + paths['injury_fallback']) / len(ok), 4) if ok else 0,
+        'retryRate': round(sum(1 for a in attempts if a > 1) / len(attempts), 4) if attempts else None,
+        'errors': dict(Counter(r['error'] for r in results if r['error'])),
+    }
+    if llm_calls is not None and ok:
+        summary['llmCallsPerSwap'] = round(llm_calls / len(results), 2)
+        # every attempt is one SDK call; anything beyond that is the SDK retrying on its own
+        if len(attempts) == len(ok):
+            summary['sdkRetries'] = max(0, llm_calls - sum(attempts))
+    return summary
+
+
+def standin_request(standin_url: str, path: str, body: dict = None):
+    import requests
+    url = f"{standin_url.rstrip('/')}{path}"
+    try:
+        response = requests.post(url, json=body, timeout=5) if body is not None else requests.get(url, timeout=5)
+        return response.json()
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark exercise swap latency and fallback rate')
+    parser.add_argument('--url', required=True, help='Backend base URL (running against the LLM stand-in)')
+    parser.add_argument('--standin-url', help='LLM stand-in base URL; without it one "live" scenario runs')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help='Comma-separated: ' + ', '.join(SCENARIOS))
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=1, help='Replays of the corpus per scenario')
+    parser.add_argument('--latency-ms', type=float, default=1200, help='Stand-in median latency')
+    parser.add_argument('--slow-ms', type=float, default=15000, help='Stand-in latency of slow calls')
+    parser.add_argument('--label', default='run', help='Name of this run in the results file')
+    parser.add_argument('--out', default='exercise_swap_bench.json')
+    args = parser.parse_args()
+
+    url = args.url.rstrip('/')
+    corpus = build_corpus(args.repeat)
+    scenarios = args.scenarios.split(',') if args.standin_url else ['live']
+    unknown = [s for s in scenarios if s != 'live' and s not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+
+    print("=" * 60)
+    print("EXERCISE SWAP LATENCY BENCHMARK")
+    print("=" * 60)
+    print(f"\n  {len(corpus)} swaps per scenario, {args.concurrency} in flight\n")
+
+    results = {}
+    for name in scenarios:
+        llm_calls = None
+        if args.standin_url:
+            config = {'latencyMs': args.latency_ms, 'slowMs': args.slow_ms, **SCENARIOS[name]}
+            if standin_request(args.standin_url, '/config', config) is None:
+                print(f"❌ Could not configure the stand-in at {args.standin_url}")
+                return
+            before = standin_request(args.standin_url, '/stats')
+
+        started = time.perf_counter()
+        swaps = replay(url, corpus, args.concurrency)
+        wall = time.perf_counter() - started
+
+        if args.standin_url:
+            after = standin_request(args.standin_url, '/stats')
+            if before and after:
+                llm_calls = after['calls'] - before['calls']
+        result = results[name] = summarize(swaps, wall, llm_calls)
+
+        lat = result['latency']
+        print(f"  {name:9} p50 {lat['p50']:7.0f} ms  p95 {lat['p95']:7.0f} ms  p99 {lat['p99']:7.0f} ms  "
+              f"max {lat['max']:7.0f} ms")
+        retry = f"{result['retryRate']:.1%}" if result['retryRate'] is not None else 'n/a'
+        print(f"  {'':9} fallback {result['fallbackRate']:.1%} {result['paths']}  retried {retry}  "
+              f"failed {result['failed']}")
+        if 'llmCallsPerSwap' in result:
+            hidden = f", {result['sdkRetries']} SDK retries" if 'sdkRetries' in result else ''
+            print(f"  {'':9} {result['llmCallsPerSwap']} LLM calls per swap{hidden}")
+        print()
+
+    if args.standin_url:
+        standin_request(args.standin_url, '/config', {'latencyMs': args.latency_ms, **SCENARIOS['baseline']})
+
+    runs = []
+    if os.path.exists(args.out):
+        with open(args.out, encoding='utf-8') as f:
+            runs = json.load(f)
+    runs.append({'label': args.label, 'at': datetime.now(timezone.utc).isoformat(), 'swaps': len(corpus),
+                 'concurrency': args.concurrency, 'scenarios': results})
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(runs, f, indent=2)
+    print(f"✅ Results appended to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
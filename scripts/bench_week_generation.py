@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Week Generation Throughput Benchmark
+------------------------------------
+POST /api/v1/workouts/generate-week fans out into one generateAIWorkout()
+call per day (week-generator.ts::generateWeekWorkouts, Promise.allSettled).
+This drives that endpoint for N synthetic users at once - the Monday-morning
+regeneration spike - against a backend whose OPENAI_BASE_URL points at the
+local LLM stand-in (llm_standin.py), to size workers for it.
+
+It will:
+1. Register --users synthetic users (random experience, session length,
+   training days and selected days) through /api/register, which leaves a
+   logged-in session per user
+2. Fire generate-week for all of them, --concurrency at a time, and time each
+   week end to end; every response is checked against the plan schema
+3. Use the per-day spans the endpoint returns (timings: startedAt/finishedAt)
+   to measure the fan-out: how many days of a week actually overlapped
+   (parallelism = summed day time / covered time, peak overlap) and how many
+   day generations were in flight across all users at once
+4. Report p50/p95 week wall time and throughput in weeks per minute, plus the
+   stand-in's peak in-flight calls when --standin-url is given, and append
+   the run to --out
+
+Start the backend against the stand-in first, e.g.:
+    python scripts/llm_standin.py --latency-ms 1500 &
+    OPENAI_BASE_URL=http://localhost:8090/v1 OPENAI_API_KEY=standin npm run dev
+
+Usage:
+    python scripts/bench_week_generation.py --url http://localhost:5000 [--users 50] [--concurrency 50]
+    python scripts/bench_week_generation.py --url http://localhost:5000 --standin-url http://localhost:8090 --label 4-workers
+"""
+
+import os
+import json
+import time
+import uuid
+import random
+import argparse
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+
+from script_utils import latency_stats
+from workout_schema import validate_plan
+
+EXPERIENCES = ['beginner', 'intermediate', 'advanced']
+DURATIONS = [30, 45, 60]
+DAY_CODES = ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']
+EQUIPMENT = [['dumbbells', 'barbell', 'bench'], ['dumbbells'], ['bodyweight']]
+PASSWORD = 'BenchPass123!'
+REQUEST_TIMEOUT = 600
+
+
+def synthetic_profile(rng: random.Random, run_id: str, index: int) -> dict:
+    training_days = rng.randint(2, 6)
+    return {
+        'name': f"Week Bench {index}",
+        'email': f"bench_week_{run_id}_{index}@example.com",
+        'password': PASSWORD,
+        'experience': rng.choice(EXPERIENCES),
+        'sessionDuration': rng.choice(DURATIONS),
+        'trainingType': 'strength',
+        'goal': 'build-muscle',
+        'fitnessGoals': ['build-muscle'],
+        'equipment': rng.choice(EQUIPMENT),
+        'trainingDays': training_days,
+        'trainingSchedule': 'specific',
+        'selectedDays': sorted(rng.sample(DAY_CODES, training_days), key=DAY_CODES.index),
+    }
+
+
+def overlap_profile(spans: list) -> dict:
+    """Fan-out of (start, end) spans: covered time, summed time, parallelism and peak overlap"""
+    spans = [(s, e) for s, e in spans if e >= s]
+    if not spans:
+        return {'spans': 0, 'coveredMs': 0, 'busyMs': 0, 'parallelism': 0.0, 'peakOverlap': 0}
+
+    busy = sum(e - s for s, e in spans)
+    covered, current_start, current_end = 0, None, None
+    for s, e in sorted(spans):
+        if current_end is None or s > current_end:
+            if current_end is not None:
+                covered += current_end - current_start
+            current_start, current_end = s, e
+        else:
+            current_end = max(current_end, e)
+    covered += current_end - current_start
+
+    # Ends sort before starts at the same instant, so touching spans do not overlap
+    events = sorted([(s, 1) for s, _ in spans] + [(e, -1) for _, e in spans], key=lambda ev: (ev[0], ev[1]))
+    peak = active = 0
+    for _, delta in events:
+        active += delta
+        peak = max(peak, active)
+
+    return {
+        'spans': len(spans),
+        'coveredMs': covered,
+        'busyMs': busy,
+        'parallelism': round(busy / covered, 2) if covered else float(len(spans)),
+        'peakOverlap': peak,
+    }
+
+
+def week_spans(response: dict) -> list:
+    """(start, end) of the days the endpoint actually generated (skipped days excluded)"""
+    return [(t['startedAt'], t['finishedAt']) for t in response.get('timings') or []
+            if t.get('status') != 'skipped']
+
+
+def summarize(weeks: list, wall_seconds: float) -> dict:
+    ok = [w for w in weeks if w['ok']]
+    fanouts = [w['fanout'] for w in ok if w['fanout']['spans']]
+    all_spans = [span for w in ok for span in w['spans']]
+    return {
+        'weeks': len(weeks),
+        'failed': len(weeks) - len(ok),
+        'invalid': sum(1 for w in ok if w['schemaErrors']),
+        'wallSeconds': round(wall_seconds, 2),
+        'weeksPerMinute': round(len(ok) / wall_seconds * 60, 2) if wall_seconds else 0,
+        'weekLatency': latency_stats([w['latency_ms'] for w in ok]),
+        'daysPerWeek': round(sum(f['spans'] for f in fanouts) / len(fanouts), 2) if fanouts else 0,
+        'meanParallelism': round(sum(f['parallelism'] for f in fanouts) / len(fanouts), 2) if fanouts else 0,
+        'meanPeakOverlap': round(sum(f['peakOverlap'] for f in fanouts) / len(fanouts), 2) if fanouts else 0,
+        'dayLatency': latency_stats([e - s for s, e in all_spans]),
+        'serverPeakDays': overlap_profile(all_spans)['peakOverlap'],
+    }
+
+
+def register(session, url: str, profile: dict) -> bool:
+    response = session.post(f"{url}/api/register", json=profile, timeout=60)
+    return response.status_code in (200, 201)
+
+
+def generate_week(session, url: str) -> dict:
+    started = time.perf_counter()
+    try:
+        response = session.post(f"{url}/api/v1/workouts/generate-week", json={}, timeout=REQUEST_TIMEOUT)
+    except Exception as e:
+        return {'ok': False, 'latency_ms': None, 'error': type(e).__name__, 'spans': [], 'schemaErrors': []}
+    latency = (time.perf_counter() - started) * 1000
+    if response.status_code != 200:
+        return {'ok': False, 'latency_ms': latency, 'error': f"HTTP {response.status_code}",
+                'spans': [], 'schemaErrors': []}
+    data = response.json()
+    spans = week_spans(data)
+    return {'ok': True, 'latency_ms': latency, 'error': None, 'spans': spans,
+            'fanout': overlap_profile(spans), 'schemaErrors': validate_plan(data)[:5]}
+
+
+def standin_stats(standin_url: str):
+    if not standin_url:
+        return None
+    import requests
+    try:
+        return requests.get(f"{standin_url.rstrip('/')}/stats", timeout=5).json()
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark concurrent week generation')
+    parser.add_argument('--url', required=True, help='Backend base URL (running against the LLM stand-in)')
+    parser.add_argument('--users', type=int, default=50, help='Synthetic users, one week each')
+    parser.add_argument('--concurrency', type=int, help='Weeks in flight (default: all users at once)')
+    parser.add_argument('--standin-url', help='LLM stand-in base URL, to read its peak in-flight calls')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--label', default='run', help='Name of this run in the results file')
+    parser.add_argument('--out', default='week_generation_bench.json')
+    args = parser.parse_args()
+
+    import requests
+
+    url = args.url.rstrip('/')
+    concurrency = args.concurrency or args.users
+    rng = random.Random(args.seed)
+    run_id = uuid.uuid4().hex[:8]
+
+    print("=" * 60)
+    print("WEEK GENERATION THROUGHPUT BENCHMARK")
+    print("=" * 60)
+    print()
+
+    profiles = [synthetic_profile(rng, run_id, i) for i in range(args.users)]
+    sessions = [requests.Session() for _ in profiles]
+    with ThreadPoolExecutor(max_workers=min(16, len(profiles))) as pool:
+        registered = list(pool.map(lambda sp: register(sp[0], url, sp[1]), zip(sessions, profiles)))
+    sessions = [s for s, ok in zip(sessions, registered) if ok]
+    print(f"  Registered {len(sessions)}/{len(profiles)} synthetic users")
+    if not sessions:
+        print("❌ Could not register any users")
+        return
+
+    before = standin_stats(args.standin_url)
+    print(f"  Generating {len(sessions)} weeks, {concurrency} in flight...")
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        weeks = list(pool.map(lambda s: generate_week(s, url), sessions))
+    wall = time.perf_counter() - started
+    after = standin_stats(args.standin_url)
+
+    result = summarize(weeks, wall)
+    if before and after:
+        result['standin'] = {'calls': after['calls'] - before['calls'],
+                             'failures': after['failures'] - before['failures'],
+                             'peakInFlight': after['peakInFlight']}
+
+    print(f"\n  Weeks:            {result['weeks'] - result['failed']} ok, {result['failed']} failed, "
+          f"{result['invalid']} off-schema")
+    print(f"  Week wall time:   p50 {result['weekLatency']['p50']:.0f} ms   p95 {result['weekLatency']['p95']:.0f} ms")
+    print(f"  Day generation:   p50 {result['dayLatency']['p50']:.0f} ms   p95 {result['dayLatency']['p95']:.0f} ms "
+          f"({result['daysPerWeek']} days/week)")
+    print(f"  Fan-out:          parallelism {result['meanParallelism']}x, peak {result['meanPeakOverlap']} days "
+          f"overlapping per week")
+    print(f"  Server-wide:      {result['serverPeakDays']} day generations in flight at peak")
+    if 'standin' in result:
+        print(f"  LLM stand-in:     {result['standin']['calls']} calls, peak {result['standin']['peakInFlight']} "
+              f"in flight, {result['standin']['failures']} failed")
+    print(f"\n  Throughput:       {result['weeksPerMinute']} weeks/min ({wall:.1f}s wall)")
+
+    errors = {}
+    for w in weeks:
+        if w['error']:
+            errors[w['error']] = errors.get(w['error'], 0) + 1
+    for error, count in sorted(errors.items(), key=lambda kv: -kv[1]):
+        print(f"  {count:5}  {error}")
+
+    runs = []
+    if os.path.exists(args.out):
+        with open(args.out, encoding='utf-8') as f:
+            runs = json.load(f)
+    runs.append({'label': args.label, 'at': datetime.now(timezone.utc).isoformat(),
+                 'users': len(sessions), 'concurrency': concurrency, **result})
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(runs, f, indent=2)
+    print(f"\n✅ Results appended to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Workout Realism Sweep
+---------------------
+backend_test_workout_realism.py checks five hand-picked profiles one request
+at a time. This sweeps the whole profile grid (experience x session duration
+x equipment set x injuries x day of week) against POST /api/workouts/generate
+with bounded parallelism, and reports latency, token cost and realism per cell.
+
+It will:
+1. Build one request per grid cell (--repeat times each) and fire them from
+   --concurrency worker threads
+2. Validate every response against the workout schema (workout_schema.py)
+   and check it like the realism test does: exercise count inside the range
+   the generator prompt asks for, at least one warmup and one cooldown, and
+   duration equal to the requested session length. Rest and external
+   activity days from the split planner are counted, not checked
+3. Record token cost from the X-LLM-Prompt-Tokens / X-LLM-Completion-Tokens
+   headers (sent when the server runs with BENCH_HEADERS=true), or estimate
+   it from the response size (~4 chars per token) when they are missing
+4. Print heatmap tables of p95 latency and failure rate (experience/duration
+   rows x equipment/injury columns) and append the per-cell results to --out
+
+Usage:
+    python scripts/bench_workout_realism_sweep.py --url http://localhost:5000 [--concurrency 8]
+    python scripts/bench_workout_realism_sweep.py --url https://host --days 1,3,5 --repeat 2 --label gpt-4o
+"""
+
+import os
+import json
+import time
+import argparse
+import itertools
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from script_utils import latency_stats
+from workout_schema import validate_workout
+
+EXPERIENCES = ['beginner', 'intermediate', 'advanced']
+DURATIONS = [30, 45, 60]
+EQUIPMENT_SETS = {
+    'gym': ['barbell', 'dumbbells', 'bench', 'cable machine', 'machines'],
+    'dumbbells': ['dumbbells', 'bench'],
+    'bodyweight': ['bodyweight'],
+}
+INJURIES = {
+    'none': None,
+    'knee': ['knee'],
+    'lower_back': ['lower back'],
+    'shoulder': ['shoulder'],
+}
+DAYS = list(range(7))
+
+# Total exercise counts the generator prompt asks for (ai-workout-generator.ts
+# "REALISTIC EXERCISE COUNTS BY EXPERIENCE + DURATION"); longer sessions use the 60 min row
+COUNT_RANGES = {
+    'beginner': {30: (3, 4), 45: (4, 6), 60: (5, 7)},
+    'intermediate': {30: (4, 5), 45: (5, 7), 60: (7, 9)},
+    'advanced': {30: (5, 6), 45: (6, 8), 60: (8, 10)},
+}
+
+CHARS_PER_TOKEN = 4
+REQUEST_TIMEOUT = 120
+
+
+def expected_count_range(experience: str, duration: int) -> tuple:
+    rows = COUNT_RANGES[experience]
+    bucket = 30 if duration <= 30 else 45 if duration <= 45 else 60
+    return rows[bucket]
+
+
+def build_cases(experiences=EXPERIENCES, durations=DURATIONS, equipment=EQUIPMENT_SETS,
+                injuries=INJURIES, days=DAYS, repeat: int = 1) -> list:
+    cases = []
+    for exp, duration, equip, injury, day in itertools.product(experiences, durations, equipment, injuries, days):
+        cell = {'experience': exp, 'duration': duration, 'equipment': equip, 'injuries': injury, 'day': day}
+        payload = {
+            'userProfile': {
+                'goal': 'muscle gain',
+                'experience': exp,
+                'trainingType': 'strength',
+                'sessionDuration': duration,
+                'equipment': equipment[equip],
+                'injuries': injuries[injury],
+            },
+            'dayOfWeek': day,
+            'weekNumber': 1,
+            'recentExercises': [],
+        }
+        cases.extend([(cell, payload)] * repeat)
+    return cases
+
+
+def check_realism(workout: dict, experience: str, duration: int) -> list:
+    """Problems with a generated workout ([] when it is realistic)"""
+    shape = validate_workout(workout)
+    if shape:
+        return [f"schema {error}" for error in shape]
+    if workout.get('isRestDay') or workout.get('isActivityDay'):
+        return []
+
+    problems = []
+    exercises = workout['exercises']
+    low, high = expected_count_range(experience, duration)
+    if not low <= len(exercises) <= high:
+        problems.append(f"{len(exercises)} exercises (expected {low}-{high})")
+    categories = {ex['category'] for ex in exercises}
+    if 'warmup' not in categories:
+        problems.append('no warmup')
+    if 'cooldown' not in categories:
+        problems.append('no cooldown')
+    if workout.get('duration') != duration:
+        problems.append(f"duration {workout.get('duration')} != {duration}")
+    return problems
+
+
+def token_cost(headers, request_body: str, response_body: str) -> tuple:
+    """(prompt_tokens, completion_tokens, estimated)"""
+    prompt = headers.get('X-LLM-Prompt-Tokens')
+    completion = headers.get('X-LLM-Completion-Tokens')
+    if prompt is not None and completion is not None:
+        return int(prompt), int(completion), False
+    # The server prompt is much larger than the request; this is a lower bound
+    return len(request_body) // CHARS_PER_TOKEN, len(response_body) // CHARS_PER_TOKEN, True
+
+
+def run_case(session, url: str, cell: dict, payload: dict) -> dict:
+    body = json.dumps(payload)
+    result = {**cell, 'latency_ms': None, 'status': None, 'kind': 'workout', 'problems': [],
+              'prompt_tokens': 0, 'completion_tokens': 0, 'estimated_tokens': False}
+    started = time.perf_counter()
+    try:
+        response = session.post(f"{url.rstrip('/')}/api/workouts/generate", data=body,
+                                headers={'Content-Type': 'application/json'}, timeout=REQUEST_TIMEOUT)
+    except Exception as e:
+        result['problems'] = [f"request error: {type(e).__name__}"]
+        return result
+    result['latency_ms'] = (time.perf_counter() - started) * 1000
+    result['status'] = response.status_code
+    if response.status_code != 200:
+        result['problems'] = [f"HTTP {response.status_code}"]
+        return result
+
+    try:
+        workout = response.json()
+    except ValueError:
+        result['problems'] = ['invalid JSON']
+        return result
+    if isinstance(workout, dict) and (workout.get('isRestDay') or workout.get('isActivityDay')):
+        result['kind'] = 'rest' if workout.get('isRestDay') else 'activity'
+    result['problems'] = check_realism(workout, cell['experience'], cell['duration'])
+    result['prompt_tokens'], result['completion_tokens'], result['estimated_tokens'] = \
+        token_cost(response.headers, body, response.text)
+    return result
+
+
+def run_sweep(url: str, cases: list, concurrency: int, token: str = None, progress=None) -> list:
+    import threading
+    import requests
+
+    local = threading.local()
+
+    def session():
+        if not hasattr(local, 'session'):
+            local.session = requests.Session()
+            if token:
+                local.session.headers['Authorization'] = f"Bearer {token}"
+        return local.session
+
+    results = []
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [pool.submit(lambda c=cell, p=payload: run_case(session(), url, c, p)) for cell, payload in cases]
+        for done, future in enumerate(as_completed(futures), 1):
+            results.append(future.result())
+            if progress:
+                progress(done, len(futures))
+    return results
+
+
+def _cell_key(result: dict) -> tuple:
+    return (result['experience'], result['duration'], result['equipment'], result['injuries'])
+
+
+def aggregate(results: list) -> list:
+    """Per-cell stats over days and repeats"""
+    cells = {}
+    for r in results:
+        cells.setdefault(_cell_key(r), []).append(r)
+
+    summary = []
+    for (exp, duration, equip, injury), rows in cells.items():
+        checked = [r for r in rows if r['kind'] == 'workout' or r['problems']]
+        failed = [r for r in checked if r['problems']]
+        problems = {}
+        for r in failed:
+            for p in r['problems']:
+                # group "5 exercises (expected 3-4)" and "6 exercises ..." together
+                key = 'exercise count' if 'exercises (expected' in p else 'invalid shape' if p.startswith('schema ') else p
+                problems[key] = problems.get(key, 0) + 1
+        answered = [r for r in rows if r['status'] == 200]
+        summary.append({
+            'experience': exp, 'duration': duration, 'equipment': equip, 'injuries': injury,
+            'requests': len(rows),
+            'restDays': sum(1 for r in rows if r['kind'] != 'workout'),
+            'failures': len(failed),
+            'failureRate': round(len(failed) / len(checked), 3) if checked else 0.0,
+            'latency': latency_stats([r['latency_ms'] for r in rows if r['latency_ms'] is not None]),
+            'avgPromptTokens': round(sum(r['prompt_tokens'] for r in answered) / len(answered), 1) if answered else 0,
+            'avgCompletionTokens': round(sum(r['completion_tokens'] for r in answered) / len(answered), 1) if answered else 0,
+            'estimatedTokens': any(r['estimated_tokens'] for r in answered),
+            'problems': problems,
+        })
+    summary.sort(key=lambda c: (EXPERIENCES.index(c['experience']) if c['experience'] in EXPERIENCES else 99,
+                                c['duration'], c['equipment'], str(c['injuries'])))
+    return summary
+
+
+def heatmap(summary: list, value, fmt: str = '{:.0f}') -> str:
+    """Rows experience/duration, columns equipment/injury"""
+    rows = list(dict.fromkeys((c['experience'], c['duration']) for c in summary))
+    columns = list(dict.fromkeys((c['equipment'], c['injuries']) for c in summary))
+    grid = {((c['experience'], c['duration']), (c['equipment'], c['injuries'])): value(c) for c in summary}
+
+    labels = [f"{exp[:3]}/{duration}" for exp, duration in rows]
+    headers = [f"{equip[:5]}/{injury[:5]}" for equip, injury in columns]
+    first = max([len(l) for l in labels] + [len('exp/min')])
+    width = max([len(h) for h in headers] + [7])
+    lines = ['exp/min'.ljust(first) + ' ' + ' '.join(h.rjust(width) for h in headers)]
+    for label, row in zip(labels, rows):
+        cells = [grid.get((row, col)) for col in columns]
+        lines.append(label.ljust(first) + ' ' +
+                     ' '.join(('-' if v is None else fmt.format(v)).rjust(width) for v in cells))
+    return '\n'.join(lines)
+
+
+def _parse_list(value: str, allowed, cast=str) -> list:
+    items = [cast(v.strip()) for v in value.split(',') if v.strip()]
+    unknown = [v for v in items if v not in allowed]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown values {unknown}, choose from {list(allowed)}")
+    return items
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sweep workout generation over the profile grid')
+    parser.add_argument('--url', required=True, help='Backend base URL')
+    parser.add_argument('--token', default=os.environ.get('SWEEP_BENCH_TOKEN'),
+                        help='Optional bearer token (the server then enriches profiles from the DB)')
+    parser.add_argument('--concurrency', type=int, default=8, help='Requests in flight')
+    parser.add_argument('--repeat', type=int, default=1, help='Requests per cell and day')
+    parser.add_argument('--experience', default=','.join(EXPERIENCES))
+    parser.add_argument('--durations', default=','.join(map(str, DURATIONS)))
+    parser.add_argument('--equipment', default=','.join(EQUIPMENT_SETS))
+    parser.add_argument('--injuries', default=','.join(INJURIES))
+    parser.add_argument('--days', default=','.join(map(str, DAYS)), help='dayOfWeek values (0 = Sunday)')
+    parser.add_argument('--label', default='run', help='Name of this run in the results file')
+    parser.add_argument('--out', default='workout_realism_sweep.json')
+    args = parser.parse_args()
+
+    try:
+        experiences = _parse_list(args.experience, EXPERIENCES)
+        durations = [int(d) for d in args.durations.split(',') if d.strip()]
+        equipment = {k: EQUIPMENT_SETS[k] for k in _parse_list(args.equipment, EQUIPMENT_SETS)}
+        injuries = {k: INJURIES[k] for k in _parse_list(args.injuries, INJURIES)}
+        days = _parse_list(args.days, DAYS, int)
+    except (argparse.ArgumentTypeError, ValueError) as e:
+        parser.error(str(e))
+
+    print("=" * 60)
+    print("WORKOUT REALISM SWEEP")
+    print("=" * 60)
+    print()
+
+    cases = build_cases(experiences, durations, equipment, injuries, days, args.repeat)
+    print(f"  {len(cases)} requests, {args.concurrency} in flight -> {args.url}")
+
+    def progress(done, total):
+        if done % 25 == 0 or done == total:
+            print(f"  {done}/{total} done")
+
+    started = time.perf_counter()
+    results = run_sweep(args.url, cases, args.concurrency, args.token, progress)
+    wall = time.perf_counter() - started
+    summary = aggregate(results)
+
+    print(f"\nFinished in {wall:.1f}s ({len(results) / wall * 60:.0f} workouts/min)\n")
+    print("p95 latency (ms):")
+    print(heatmap(summary, lambda c: c['latency']['p95']))
+    print("\nFailure rate (%):")
+    print(heatmap(summary, lambda c: c['failureRate'] * 100))
+
+    problems = {}
+    for cell in summary:
+        for p, n in cell['problems'].items():
+            problems[p] = problems.get(p, 0) + n
+    if problems:
+        print("\nProblems:")
+        for p, n in sorted(problems.items(), key=lambda kv: -kv[1]):
+            print(f"  {n:5}  {p}")
+
+    prompt = sum(r['prompt_tokens'] for r in results)
+    completion = sum(r['completion_tokens'] for r in results)
+    estimated = any(r['estimated_tokens'] for r in results)
+    print(f"\nTokens: {prompt} prompt + {completion} completion"
+          f"{' (estimated from response size)' if estimated else ''}")
+
+    failed = sum(c['failures'] for c in summary)
+    print(f"\n{'✅' if failed == 0 else '❌'} {failed} unrealistic or failed workouts "
+          f"across {len(summary)} cells")
+
+    runs = []
+    if os.path.exists(args.out):
+        with open(args.out, encoding='utf-8') as f:
+            runs = json.load(f)
+    runs.append({
+        'label': args.label, 'at': datetime.now(timezone.utc).isoformat(), 'url': args.url,
+        'concurrency': args.concurrency, 'wallSeconds': round(wall, 2),
+        'latency': latency_stats([r['latency_ms'] for r in results if r['latency_ms'] is not None]),
+        'tokens': {'prompt': prompt, 'completion': completion, 'estimated': estimated},
+        'cells': summary,
+    })
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(runs, f, indent=2)
+    print(f"\n✅ Results appended to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Workout Summary Read Benchmark
+------------------------------
+Measures what frozen workout summaries (freeze_workout_summaries.py) save
+when the completed-workout page is opened.
+
+It will:
+1. DB mode (default): for a sample of frozen workouts, time the on-demand
+   path of GET /api/stats/workout-summary/:workoutId (the user's last 1000
+   performance_logs + building the summary) against reading the stored
+   workout_summaries row, and report p50/p95 for both
+2. HTTP mode (--url): request the endpoint for --workouts of the token
+   user's frozen workouts, --repeat times each. Run it once against a server
+   started with WORKOUT_SUMMARY_PRECOMPUTE=false and once with it enabled,
+   using a different --label; results are appended to --out
+
+Usage:
+    python scripts/bench_workout_summary.py [--workouts 200]
+    python scripts/bench_workout_summary.py --url https://host --token TOKEN --label frozen
+"""
+
+import os
+import json
+import time
+import asyncio
+import argparse
+from datetime import datetime, timezone
+
+from db_utils import connect
+from script_utils import latency_stats
+from freeze_workout_summaries import HISTORY_LIMIT, LOG_COLUMNS, build_workout_summary
+
+
+async def _sample(conn, workouts: int, user_id: int = None) -> list:
+    query = "SELECT user_id, workout_id FROM workout_summaries"
+    args = []
+    if user_id:
+        query += " WHERE user_id = $1"
+        args.append(user_id)
+    query += f" ORDER BY completed_at DESC LIMIT ${len(args) + 1}"
+    return [(r['user_id'], r['workout_id']) for r in await conn.fetch(query, *args, workouts)]
+
+
+async def bench_db(workouts: int) -> dict:
+    conn = await connect()
+    try:
+        sample = await _sample(conn, workouts)
+        if not sample:
+            print("❌ No frozen summaries found - run freeze_workout_summaries.py first")
+            return {}
+
+        on_demand, frozen = [], []
+        for user_id, workout_id in sample:
+            started = time.perf_counter()
+            rows = await conn.fetch(f"""
+                SELECT {', '.join(LOG_COLUMNS)} FROM performance_logs WHERE user_id = $1
+                ORDER BY logged_at DESC LIMIT $2
+            """, user_id, HISTORY_LIMIT)
+            build_workout_summary([dict(r) for r in rows], workout_id)
+            on_demand.append((time.perf_counter() - started) * 1000)
+
+            started = time.perf_counter()
+            await conn.fetchrow("""
+                SELECT summary FROM workout_summaries WHERE user_id = $1 AND workout_id = $2
+            """, user_id, workout_id)
+            frozen.append((time.perf_counter() - started) * 1000)
+    finally:
+        await conn.close()
+    return {'onDemand': latency_stats(on_demand), 'frozen': latency_stats(frozen)}
+
+
+def bench_http(url: str, token: str, workout_ids: list, repeat: int) -> dict:
+    import requests
+
+    samples, failures = [], 0
+    headers = {'Authorization': f"Bearer {token}"}
+    for workout_id in workout_ids:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            response = requests.get(f"{url.rstrip('/')}/api/stats/workout-summary/{workout_id}",
+                                    headers=headers, timeout=30)
+            elapsed = (time.perf_counter() - started) * 1000
+            if response.status_code == 200:
+                samples.append(elapsed)
+            else:
+                failures += 1
+    return {'summary': latency_stats(samples), 'failures': failures}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark frozen workout summary reads')
+    parser.add_argument('--workouts', type=int, default=200, help='Frozen workouts sampled')
+    parser.add_argument('--url', help='Backend base URL for HTTP mode')
+    parser.add_argument('--token', default=os.environ.get('SUMMARY_BENCH_TOKEN'), help='Bearer token for HTTP mode')
+    parser.add_argument('--user-id', type=int, help='Owner of the token (HTTP mode samples their workouts)')
+    parser.add_argument('--repeat', type=int, default=3, help='Views per workout in HTTP mode')
+    parser.add_argument('--label', default='run', help='Name of this run in the results file')
+    parser.add_argument('--out', default='workout_summary_bench.json')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("WORKOUT SUMMARY READ BENCHMARK")
+    print("=" * 60)
+    print()
+
+    if args.url:
+        if not args.token or not args.user_id:
+            parser.error('HTTP mode needs --token (or SUMMARY_BENCH_TOKEN) and --user-id')
+
+        async def workouts_of_user():
+            conn = await connect()
+            try:
+                return [w for _, w in await _sample(conn, args.workouts, args.user_id)]
+            finally:
+                await conn.close()
+
+        workout_ids = asyncio.run(workouts_of_user())
+        if not workout_ids:
+            print(f"❌ No frozen summaries for user {args.user_id}")
+            return
+        result = bench_http(args.url, args.token, workout_ids, args.repeat)
+        print(f"  workout-summary [{args.label}]: p50 {result['summary']['p50']:.0f} ms, "
+              f"p95 {result['summary']['p95']:.0f} ms ({result['failures']} failed)")
+    else:
+        result = asyncio.run(bench_db(args.workouts))
+        if not result:
+            return
+        for name, stats in result.items():
+            print(f"  {name:10} p50 {stats['p50']:.2f} ms   p95 {stats['p95']:.2f} ms   (n={stats['count']})")
+        saved = result['onDemand']['p50'] - result['frozen']['p50']
+        print(f"\n  Saved per summary view (p50): {saved:.2f} ms")
+
+    runs = []
+    if os.path.exists(args.out):
+        with open(args.out, encoding='utf-8') as f:
+            runs = json.load(f)
+    runs.append({'label': args.label, 'at': datetime.now(timezone.utc).isoformat(), **result})
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(runs, f, indent=2)
+    print(f"\n✅ Results appended to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Exercise Name Index Builder
+---------------------------
+This script compiles the exercise catalog into a lookup index used by
+GET /api/exercises?names=... so every requested name resolves with a
+single hash lookup instead of a scan over the whole table.
+
+It will:
+1. Fetch id, name and aliases for every exercise
+2. Normalize each name and alias into a lookup key (lower-cased, trimmed,
+   whitespace collapsed - the same rule as normalizeExerciseKey() on the server)
+3. Resolve collisions (canonical names win over aliases, ambiguous aliases
+   are dropped rather than guessed) and report them
+4. Write a compact JSON artifact the server loads at startup
+
+Matching stays EXACT: an alias only resolves if it was written down in the
+catalog, so "Incline Dumbbell Press" never lands on "Dumbbell Incline Bench Press".
+
+Usage:
+    python scripts/build_exercise_name_index.py [--out server/data/exercise-name-index.json]
+"""
+
+import os
+import re
+import sys
+import json
+import asyncio
+import argparse
+from collections import defaultdict
+from datetime import datetime, timezone
+
+DATABASE_URL = os.environ.get('DATABASE_URL')
+
+DEFAULT_OUTPUT = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'server', 'data', 'exercise-name-index.json'
+)
+
+INDEX_VERSION = 1
+
+
+def normalize_key(name: str) -> str:
+    """Normalize a name or alias into its lookup key.
+
+    Uses lower() rather than casefold() so keys agree with JavaScript's
+    toLowerCase() on the server side.
+    """
+    if not name:
+        return ''
+    return re.sub(r'\s+', ' ', name).strip().lower()
+
+
+def parse_aliases(raw) -> list:
+    """Aliases come back from asyncpg as a JSON string (jsonb column)"""
+    if raw is None:
+        return []
+    if isinstance(raw, str):
+        try:
+            raw = json.loads(raw)
+        except json.JSONDecodeError:
+            return []
+    if not isinstance(raw, list):
+        return []
+    return [a for a in raw if isinstance(a, str) and a.strip()]
+
+
+def build_index(exercises: list) -> dict:
+    """Build the key -> exercise id index from exercise rows.
+
+    Each row needs 'id', 'name' and optionally 'aliases'.
+
+    Collision rules:
+    - a canonical name always beats an alias for the same key
+    - two exercises with the same canonical name: the lowest id wins
+    - an alias claimed by several exercises (and by no canonical name) is
+      ambiguous and is left out of the index entirely
+
+    Returns {'keys': {key: id}, 'collisions': [...]}.
+    """
+    name_claims = defaultdict(set)   # key -> ids whose canonical name is key
+    alias_claims = defaultdict(set)  # key -> ids listing key as an alias
+
+    for ex in exercises:
+        key = normalize_key(ex.get('name') or '')
+        if key:
+            name_claims[key].add(ex['id'])
+        for alias in parse_aliases(ex.get('aliases')):
+            alias_key = normalize_key(alias)
+            if alias_key and alias_key != key:
+                alias_claims[alias_key].add(ex['id'])
+
+    keys = {}
+    collisions = []
+
+    for key, ids in name_claims.items():
+        winner = min(ids)
+        keys[key] = winner
+        if len(ids) > 1:
+            collisions.append({
+                'key': key,
+                'kind': 'duplicate_name',
+                'ids': sorted(ids),
+                'resolved_to': winner,
+            })
+
+    for key, ids in alias_claims.items():
+        if key in keys:
+            shadowed = sorted(ids - {keys[key]})
+            if shadowed:
+                collisions.append({
+                    'key': key,
+                    'kind': 'alias_shadowed_by_name',
+                    'ids': shadowed,
+                    'resolved_to': keys[key],
+                })
+            continue
+        if len(ids) > 1:
+            collisions.append({
+                'key': key,
+                'kind': 'ambiguous_alias',
+                'ids': sorted(ids),
+                'resolved_to': None,
+            })
+            continue
+        keys[key] = next(iter(ids))
+
+    collisions.sort(key=lambda c: (c['kind'], c['key']))
+    return {'keys': keys, 'collisions': collisions}
+
+
+def serialize_index(index: dict, exercise_count: int) -> str:
+    """Serialize the index as compact, deterministic JSON"""
+    artifact = {
+        'version': INDEX_VERSION,
+        'generatedAt': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'exerciseCount': exercise_count,
+        'keys': dict(sorted(index['keys'].items())),
+    }
+    return json.dumps(artifact, separators=(',', ':'), ensure_ascii=False)
+
+
+def resolve(keys: dict, names: list) -> list:
+    """Resolve requested names to exercise ids (None where there is no exact match)"""
+    return [keys.get(normalize_key(n)) for n in names]
+
+
+async def fetch_exercises() -> list:
+    import asyncpg
+
+    conn = await asyncpg.connect(DATABASE_URL)
+    try:
+        rows = await conn.fetch("SELECT id, name, aliases FROM exercises ORDER BY id")
+    finally:
+        await conn.close()
+    return [dict(r) for r in rows]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description='Build the exercise name/alias lookup index')
+    parser.add_argument('--out', default=DEFAULT_OUTPUT, help='Where to write the index artifact')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("EXERCISE NAME INDEX BUILDER")
+    print("=" * 60)
+    print()
+
+    if not DATABASE_URL:
+        print("❌ DATABASE_URL is not set")
+        sys.exit(1)
+
+    print("Fetching all exercises...")
+    exercises = await fetch_exercises()
+    print(f"Found {len(exercises)} exercises")
+
+    index = build_index(exercises)
+    alias_keys = len(index['keys']) - len({normalize_key(e['name']) for e in exercises if e['name']})
+    print(f"Indexed {len(index['keys'])} keys ({alias_keys} from aliases)")
+
+    if index['collisions']:
+        print(f"\n=== COLLISIONS ({len(index['collisions'])}) ===")
+        for c in index['collisions'][:50]:
+            target = c['resolved_to'] if c['resolved_to'] is not None else 'dropped'
+            print(f"  [{c['kind']}] \"{c['key']}\" ids={c['ids']} -> {target}")
+        if len(index['collisions']) > 50:
+            print(f"  ... and {len(index['collisions']) - 50} more")
+    else:
+        print("\n✅ No collisions")
+
+    out_path = os.path.abspath(args.out)
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    payload = serialize_index(index, len(exercises))
+    with open(out_path, 'w', encoding='utf-8') as f:
+        f.write(payload)
+
+    print(f"\n✅ Wrote {out_path} ({len(payload.encode('utf-8')) / 1024:.1f} KB)")
+    print("\nDone!")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Near-Duplicate Exercise Clustering Job
+--------------------------------------
+This script finds exercises that are the same movement under different
+names (e.g. "Dumbbell Incline Bench Press" vs "Incline Dumbbell Press").
+cleanup_exercise_names.py only catches exact case-insensitive duplicates.
+
+It will:
+1. Normalize every exercise name into a set of token shingles
+2. Compute a MinHash signature per name
+3. Bucket signatures with LSH banding so only likely pairs are compared
+   (sub-quadratic instead of all-pairs)
+4. Verify candidate pairs with exact Jaccard similarity and union them
+   into clusters, unless a modifier (incline, seated, single arm, ...) or an
+   implement (dumbbell, cable, ...) sets any two members of the merged
+   cluster apart
+5. Write a merge-candidate report (nothing in the database is changed)
+
+Usage:
+    python scripts/cluster_exercise_duplicates.py [--threshold 0.6] [--out exercise_merge_candidates.json]
+    python scripts/cluster_exercise_duplicates.py --from-json more_exercises.json
+"""
+
+import os
+import re
+import sys
+import json
+import random
+import asyncio
+import hashlib
+import argparse
+from collections import defaultdict
+
+from build_exercise_name_index import normalize_key
+
+DATABASE_URL = os.environ.get('DATABASE_URL')
+
+NUM_PERM = 128
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+
+# Words that never distinguish one movement from another
+STOPWORDS = {'with', 'on', 'to', 'and', 'of', 'the', 'from', 'for', 'a', 'an', 'exercise'}
+
+# Tokens that turn a movement into a different variant: names that differ in
+# one of these are never merged ("Incline Dumbbell Press" vs "Dumbbell Press")
+MODIFIER_TOKENS = {
+    'incline', 'decline', 'seated', 'standing', 'lying', 'kneeling', 'one', 'alternating',
+    'close', 'wide', 'narrow', 'reverse', 'front', 'overhead', 'sumo', 'romanian', 'bulgarian',
+    'hammer', 'goblet', 'jump', 'weighted', 'assisted', 'deficit', 'pause', 'tempo',
+}
+
+# Equipment tokens block merges the same way ("Cable Lat Pulldown" vs "Lat Pulldown")
+IMPLEMENT_TOKENS = {'dumbbell', 'barbell', 'cable', 'kettlebell', 'machine', 'smith', 'ezbar', 'band'}
+
+# Common abbreviations used across video filenames and imported catalogs
+TOKEN_SYNONYMS = {
+    'db': 'dumbbell',
+    'dumbell': 'dumbbell',
+    'bb': 'barbell',
+    'kb': 'kettlebell',
+    'ez': 'ezbar',
+    'single': 'one',
+    'pushup': 'push up',
+    'pullup': 'pull up',
+    'chinup': 'chin up',
+    'situp': 'sit up',
+}
+
+
+def tokenize(name: str) -> list:
+    """Split a normalized exercise name into comparable tokens"""
+    name = normalize_key(name)
+    name = re.sub(r'[^a-z0-9]+', ' ', name)
+    tokens = []
+    for raw in name.split():
+        # Light plural stripping ("rows" -> "row", "presses" -> "press")
+        if len(raw) > 4 and raw.endswith('es') and raw[:-2].endswith(('ss', 'sh', 'ch')):
+            raw = raw[:-2]
+        elif len(raw) > 2 and raw.endswith('s') and not raw.endswith('ss'):
+            raw = raw[:-1]
+        for tok in TOKEN_SYNONYMS.get(raw, raw).split():
+            if tok not in STOPWORDS:
+                tokens.append(tok)
+    return tokens
+
+
+def shingles(name: str, size: int = 1) -> set:
+    """Token shingles of a name.
+
+    Size 1 is a bag of words, which ignores word order ("Incline Dumbbell
+    Press" == "Dumbbell Incline Press"). Larger sizes add ordered k-grams.
+    """
+    tokens = tokenize(name)
+    result = set(tokens)
+    for k in range(2, size + 1):
+        for i in range(len(tokens) - k + 1):
+            result.add(' '.join(tokens[i:i + k]))
+    return result
+
+
+def _hash_shingle(shingle: str) -> int:
+    return int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=4).digest(), 'little')
+
+
+def make_permutations(num_perm: int = NUM_PERM, seed: int = 1) -> list:
+    """Random (a, b) pairs for universal hashing h(x) = (a*x + b) mod p"""
+    rng = random.Random(seed)
+    return [(rng.randint(1, MERSENNE_PRIME - 1), rng.randint(0, MERSENNE_PRIME - 1)) for _ in range(num_perm)]
+
+
+def minhash(shingle_set: set, permutations: list) -> tuple:
+    """MinHash signature of a shingle set"""
+    if not shingle_set:
+        return tuple([MAX_HASH] * len(permutations))
+    hashes = [_hash_shingle(s) for s in shingle_set]
+    return tuple(
+        min(((a * h + b) % MERSENNE_PRIME) & MAX_HASH for h in hashes)
+        for a, b in permutations
+    )
+
+
+def choose_bands(threshold: float, num_perm: int = NUM_PERM) -> tuple:
+    """Pick (bands, rows) with bands*rows == num_perm whose LSH threshold
+    (1/bands)^(1/rows) is closest to, but not above, the requested one."""
+    best = None
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        lsh_threshold = (1.0 / bands) ** (1.0 / rows)
+        if lsh_threshold > threshold:
+            continue
+        if best is None or lsh_threshold > best[2]:
+            best = (bands, rows, lsh_threshold)
+    if best is None:
+        return num_perm, 1
+    return best[0], best[1]
+
+
+def jaccard(a: set, b: set) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def modifier_conflict(a: set, b: set) -> bool:
+    """True when the names differ in a modifier or implement token"""
+    return bool((a ^ b) & (MODIFIER_TOKENS | IMPLEMENT_TOKENS))
+
+
+class UnionFind:
+    def __init__(self):
+        self.parent = {}
+
+    def find(self, x):
+        self.parent.setdefault(x, x)
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, a, b):
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+
+def find_near_duplicates(exercises: list, threshold: float = 0.6, shingle_size: int = 1) -> dict:
+    """Cluster exercises whose shingle sets have Jaccard >= threshold and
+    whose names do not differ in a modifier token.
+
+    Each exercise needs 'id' and 'name'. Returns {'clusters': [...],
+    'candidate_pairs': n, 'verified_pairs': n}.
+    """
+    permutations = make_permutations()
+    bands, rows = choose_bands(threshold)
+
+    by_id = {}
+    shingle_sets = {}
+    buckets = defaultdict(list)
+
+    for ex in exercises:
+        sset = shingles(ex.get('name') or '', shingle_size)
+        if not sset:
+            continue
+        by_id[ex['id']] = ex
+        shingle_sets[ex['id']] = sset
+        signature = minhash(sset, permutations)
+        for band in range(bands):
+            buckets[(band, signature[band * rows:(band + 1) * rows])].append(ex['id'])
+
+    candidates = set()
+    for ids in buckets.values():
+        if len(ids) < 2:
+            continue
+        for i in range(len(ids)):
+            for j in range(i + 1, len(ids)):
+                candidates.add((min(ids[i], ids[j]), max(ids[i], ids[j])))
+
+    # Union pairs in order of similarity; a merge is refused when any member of
+    # one cluster conflicts with any member of the other (no chaining a variant
+    # in through a shared neighbour)
+    uf = UnionFind()
+    members = {}
+    verified = []
+    scored = [(jaccard(shingle_sets[a], shingle_sets[b]), a, b) for a, b in candidates]
+    for score, a, b in sorted(scored, key=lambda t: (-t[0], t[1], t[2])):
+        if score < threshold:
+            continue
+        ra, rb = uf.find(a), uf.find(b)
+        left, right = members.get(ra, {a}), members.get(rb, {b})
+        if ra != rb and any(modifier_conflict(shingle_sets[x], shingle_sets[y]) for x in left for y in right):
+            continue
+        uf.union(a, b)
+        members[uf.find(a)] = left | right
+        verified.append((a, b, score))
+
+    groups = defaultdict(set)
+    pairs_by_root = defaultdict(list)
+    for a, b, score in verified:
+        root = uf.find(a)
+        groups[root].update((a, b))
+        pairs_by_root[root].append({'a': a, 'b': b, 'similarity': round(score, 3)})
+
+    clusters = []
+    for root, ids in groups.items():
+        members = [by_id[i] for i in sorted(ids)]
+        keeper = suggest_keeper(members)
+        clusters.append({
+            'keep': {'id': keeper['id'], 'name': keeper['name']},
+            'merge': [{'id': m['id'], 'name': m['name']} for m in members if m['id'] != keeper['id']],
+            'pairs': sorted(pairs_by_root[root], key=lambda p: -p['similarity']),
+        })
+
+    clusters.sort(key=lambda c: (-len(c['merge']), c['keep']['id']))
+    return {
+        'clusters': clusters,
+        'candidate_pairs': len(candidates),
+        'verified_pairs': len(verified),
+        'bands': bands,
+        'rows': rows,
+    }
+
+
+def suggest_keeper(members: list) -> dict:
+    """Prefer the exercise that already has a real video, then the oldest row"""
+    def rank(ex):
+        url = (ex.get('video_url') or '').lower()
+        has_video = 'cloudinary' in url
+        return (0 if has_video else 1, ex['id'])
+    return min(members, key=rank)
+
+
+async def fetch_exercises() -> list:
+    import asyncpg
+
+    conn = await asyncpg.connect(DATABASE_URL)
+    try:
+        rows = await conn.fetch("SELECT id, name, slug, video_url FROM exercises ORDER BY id")
+    finally:
+        await conn.close()
+    return [dict(r) for r in rows]
+
+
+def load_json_catalog(path: str) -> list:
+    """Load a seed catalog (like more_exercises.json); rows get positional ids"""
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    return [{'id': ex.get('id', i + 1), 'name': ex['name'], 'video_url': ex.get('video_url')}
+            for i, ex in enumerate(data)]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description='Find near-duplicate exercises with MinHash/LSH')
+    parser.add_argument('--threshold', type=float, default=0.6, help='Minimum Jaccard similarity (0-1)')
+    parser.add_argument('--shingle-size', type=int, default=1, help='Largest token k-gram to include')
+    parser.add_argument('--from-json', help='Read exercises from a JSON catalog instead of the database')
+    parser.add_argument('--out', default='exercise_merge_candidates.json', help='Report output path')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("NEAR-DUPLICATE EXERCISE CLUSTERING")
+    print("=" * 60)
+    print()
+
+    if args.from_json:
+        exercises = load_json_catalog(args.from_json)
+    else:
+        if not DATABASE_URL:
+            print("❌ DATABASE_URL is not set (or pass --from-json)")
+            sys.exit(1)
+        print("Fetching all exercises...")
+        exercises = await fetch_exercises()
+    print(f"Found {len(exercises)} exercises")
+
+    result = find_near_duplicates(exercises, args.threshold, args.shingle_size)
+    clusters = result['clusters']
+
+    all_pairs = len(exercises) * (len(exercises) - 1) // 2
+    print(f"LSH: {result['bands']} bands x {result['rows']} rows")
+    print(f"Compared {result['candidate_pairs']} candidate pairs (all-pairs would be {all_pairs})")
+    print(f"Verified {result['verified_pairs']} pairs >= {args.threshold}")
+
+    print(f"\n=== MERGE CANDIDATES ({len(clusters)} clusters) ===")
+    for c in clusters[:30]:
+        print(f"  KEEP [{c['keep']['id']}] {c['keep']['name']}")
+        for m in c['merge']:
+            print(f"    ↳ [{m['id']}] {m['name']}")
+    if len(clusters) > 30:
+        print(f"  ... and {len(clusters) - 30} more")
+
+    removable = sum(len(c['merge']) for c in clusters)
+    report = {
+        'threshold': args.threshold,
+        'exerciseCount': len(exercises),
+        'removable': removable,
+        'clusters': clusters,
+    }
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    print(f"\n✅ {removable} exercises could be merged into {len(clusters)} keepers")
+    print(f"✅ Report written to {args.out}")
+    print("\nDone!")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,125 @@
+"""
+Shared database helpers for the batch/precompute jobs in scripts/.
+
+All jobs read DATABASE_URL from the environment and talk to Postgres
+through asyncpg. Bulk writes go through COPY into a temp table followed by
+a single INSERT ... ON CONFLICT, which is far cheaper than row-by-row upserts.
+"""
+
+import os
+import sys
+import json
+
+DATABASE_URL = os.environ.get('DATABASE_URL')
+
+# Binary jsonb is a version byte followed by the JSON text
+JSONB_VERSION = b'\x01'
+
+
+def _jsonb_encode(value) -> bytes:
+    return JSONB_VERSION + json.dumps(value).encode('utf-8')
+
+
+def _jsonb_decode(data: bytes):
+    return json.loads(data[1:])
+
+
+def _json_encode(value) -> bytes:
+    return json.dumps(value).encode('utf-8')
+
+
+async def register_json_codecs(conn):
+    """Pass jsonb/json values in and out as Python objects.
+
+    The codecs are binary: copy_records_to_table uses binary COPY, and once a
+    type has a custom text codec asyncpg has no binary encoder for it.
+    """
+    await conn.set_type_codec('jsonb', encoder=_jsonb_encode, decoder=_jsonb_decode,
+                              schema='pg_catalog', format='binary')
+    await conn.set_type_codec('json', encoder=_json_encode, decoder=json.loads,
+                              schema='pg_catalog', format='binary')
+
+
+async def connect():
+    import asyncpg
+
+    if not DATABASE_URL:
+        print("❌ DATABASE_URL is not set")
+        sys.exit(1)
+    conn = await asyncpg.connect(DATABASE_URL)
+    await register_json_codecs(conn)
+    return conn
+
+
+async def create_pool(min_size: int = 1, max_size: int = 10):
+    import asyncpg
+
+    if not DATABASE_URL:
+        print("❌ DATABASE_URL is not set")
+        sys.exit(1)
+
+    return await asyncpg.create_pool(DATABASE_URL, min_size=min_size, max_size=max_size, init=register_json_codecs)
+
+
+async def fetch_dataframe(conn, query: str, *args):
+    """Run a query and return a pandas DataFrame (columns in select order)"""
+    import pandas as pd
+
+    stmt = await conn.prepare(query)
+    columns = [a.name for a in stmt.get_attributes()]
+    rows = await stmt.fetch(*args)
+    return pd.DataFrame([tuple(r) for r in rows], columns=columns)
+
+
+async def copy_upsert(conn, table: str, columns: list, records: list, conflict: list,
+                      update: list = None) -> int:
+    """Bulk upsert records (tuples in `columns` order) into `table`.
+
+    Rows are COPYed into a temp table shaped like the target, then merged
+    with INSERT ... ON CONFLICT (conflict) DO UPDATE SET update = EXCLUDED.update.
+    Returns the number of rows written.
+    """
+    if not records:
+        return 0
+    update = update if update is not None else [c for c in columns if c not in conflict]
+    staging = f"_staging_{table}"
+    col_list = ', '.join(columns)
+    set_list = ', '.join(f"{c} = EXCLUDED.{c}" for c in update)
+    action = f"DO UPDATE SET {set_list}" if update else "DO NOTHING"
+
+    async with conn.transaction():
+        # Only the written columns, with their types - no constraints or serial defaults
+        await conn.execute(
+            f"CREATE TEMP TABLE {staging} ON COMMIT DROP AS SELECT {col_list} FROM {table} WITH NO DATA"
+        )
+        await conn.copy_records_to_table(staging, records=records, columns=columns)
+        status = await conn.execute(f"""
+            INSERT INTO {table} ({col_list})
+            SELECT {col_list} FROM {staging}
+            ON CONFLICT ({', '.join(conflict)}) {action}
+        """)
+    return int(status.split()[-1])
+
+
+WATERMARKS_SQL = """
+    CREATE TABLE IF NOT EXISTS job_watermarks (
+        name TEXT PRIMARY KEY,
+        last_id INTEGER NOT NULL DEFAULT 0,
+        updated_at TIMESTAMP DEFAULT NOW() NOT NULL
+    )
+"""
+
+
+async def get_watermarks(conn, names: list) -> dict:
+    """Last processed id per watermark name (0 when a job has never run)"""
+    await conn.execute(WATERMARKS_SQL)
+    rows = await conn.fetch("SELECT name, last_id FROM job_watermarks WHERE name = ANY($1::text[])", names)
+    found = {r['name']: r['last_id'] for r in rows}
+    return {name: found.get(name, 0) for name in names}
+
+
+async def set_watermarks(conn, watermarks: dict):
+    await conn.executemany("""
+        INSERT INTO job_watermarks (name, last_id, updated_at) VALUES ($1, $2, NOW())
+        ON CONFLICT (name) DO UPDATE SET last_id = EXCLUDED.last_id, updated_at = NOW()
+    """, list(watermarks.items()))
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+Vectorized Exercise Stats Engine
+--------------------------------
+GET /api/stats/exercise/:exerciseId reloads up to 500 performance_logs rows
+and recomputes personal bests, Epley 1RM, per-day history, the last session
+and the trend on every request. This module computes the same aggregates
+for every (user, exercise) pair at once with pandas group-bys.
+
+It is used two ways:
+- as a reference oracle: exercise_stats_payload() returns exactly what the
+  endpoint returns for one user/exercise, so API tests can compare against it
+- as a batch precompute: main() fills the exercise_stats table
+
+The rules mirror routes.ts, including its ordering quirks:
+- logs are read newest first (loggedAt DESC) and capped at 500 per pair
+- best sets are the NEWEST set with the max weight/volume (strict '>' while
+  walking newest first)
+- per-day buckets use the UTC date of loggedAt
+- session sets are numbered in the order they are read (newest first)
+
+Usage:
+    python scripts/exercise_stats_engine.py [--user-id 42]
+"""
+
+import asyncio
+import argparse
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from db_utils import connect, copy_upsert, fetch_dataframe
+from script_utils import js_round
+
+HISTORY_LIMIT = 500
+HISTORY_SESSIONS = 5
+
+LOG_COLUMNS = ['id', 'user_id', 'workout_id', 'exercise_id', 'exercise_name',
+               'actual_weight', 'actual_reps', 'rpe', 'logged_at']
+
+STATS_COLUMNS = [
+    'user_id', 'exercise_id', 'exercise_name', 'max_weight', 'max_reps', 'max_volume',
+    'estimated_one_rm', 'best_weight_set', 'best_volume_set', 'history', 'last_session',
+    'trend', 'total_sessions', 'computed_at',
+]
+
+
+def epley_one_rm(weight, reps):
+    """Vectorized calculateOneRM(): reps == 1 -> weight, else weight * (1 + reps/30)"""
+    weight = np.asarray(weight, dtype=float)
+    reps = np.asarray(reps, dtype=float)
+    return np.where(
+        reps == 1, weight,
+        np.where((reps <= 0) | (weight <= 0), 0.0, weight * (1 + reps / 30)),
+    )
+
+
+def prepare_logs(logs: pd.DataFrame, history_limit: int = HISTORY_LIMIT) -> pd.DataFrame:
+    """Order newest-first per pair, apply the per-pair row cap and derive columns"""
+    df = logs.copy()
+    df['logged_at'] = pd.to_datetime(df['logged_at'], utc=True)
+    df = df.sort_values(['user_id', 'exercise_id', 'logged_at', 'id'],
+                        ascending=[True, True, False, False], kind='mergesort')
+    df['seq'] = df.groupby(['user_id', 'exercise_id'], sort=False).cumcount()
+    df = df[df['seq'] < history_limit].copy()
+
+    df['weight'] = df['actual_weight'].fillna(0).astype(float)
+    df['reps'] = df['actual_reps'].fillna(0).astype(float)
+    df['volume'] = df['weight'] * df['reps']
+    df['date'] = df['logged_at'].dt.strftime('%Y-%m-%d')
+    df['e1rm'] = np.where((df['weight'] > 0) & (df['reps'] > 0), epley_one_rm(df['weight'], df['reps']), 0.0)
+    workout = df['workout_id'].astype(object)
+    df['session_key'] = workout.where(workout.notna() & (workout != ''), df['date'])
+    return df
+
+
+def _best_rows(df: pd.DataFrame, column: str) -> pd.DataFrame:
+    """Newest row holding the group max of `column` (only when the max is > 0)"""
+    positive = df[df[column] > 0]
+    if positive.empty:
+        return positive
+    group_max = positive.groupby(['user_id', 'exercise_id'])[column].transform('max')
+    hits = positive[positive[column] == group_max]
+    # rows are newest first within each pair, so the first hit is the newest
+    return hits.groupby(['user_id', 'exercise_id'], sort=False).head(1)
+
+
+def compute_daily(df: pd.DataFrame) -> pd.DataFrame:
+    """Per (user, exercise, UTC date) aggregates used for history and trend"""
+    daily = df.groupby(['user_id', 'exercise_id', 'date'], sort=True).agg(
+        maxWeight=('weight', 'max'),
+        totalReps=('reps', 'sum'),
+        totalSets=('weight', 'size'),
+        totalVolume=('volume', 'sum'),
+        estimatedOneRM=('e1rm', 'max'),
+    ).reset_index()
+    return daily
+
+
+def compute_trend(daily: pd.DataFrame) -> pd.Series:
+    """'up'/'down'/'neutral' from the last 2 vs previous 2 days' max weight"""
+    d = daily.sort_values(['user_id', 'exercise_id', 'date'], ascending=[True, True, False])
+    d['pos'] = d.groupby(['user_id', 'exercise_id']).cumcount()
+    last4 = d[d['pos'] < 4].pivot_table(index=['user_id', 'exercise_id'], columns='pos',
+                                       values='maxWeight', aggfunc='first')
+    counts = daily.groupby(['user_id', 'exercise_id']).size()
+    trend = pd.Series('neutral', index=counts.index, dtype=object)
+    if last4.shape[1] == 4:
+        eligible = counts.reindex(last4.index) >= 4
+        recent = (last4[0] + last4[1]) / 2
+        older = (last4[2] + last4[3]) / 2
+        up = eligible & (recent > older * 1.05)
+        down = eligible & ~up & (recent < older * 0.95)
+        trend.loc[up[up].index] = 'up'
+        trend.loc[down[down].index] = 'down'
+    return trend
+
+
+def _iso(ts) -> str:
+    return ts.strftime('%Y-%m-%dT%H:%M:%S.') + f"{ts.microsecond // 1000:03d}Z"
+
+
+def _num(x):
+    """Emit integral floats as ints, like JSON numbers from the endpoint"""
+    x = float(x)
+    return int(x) if x.is_integer() else x
+
+
+def compute_exercise_stats(logs: pd.DataFrame, history_limit: int = HISTORY_LIMIT) -> pd.DataFrame:
+    """Compute endpoint-equivalent stats for every (user, exercise) pair.
+
+    `logs` needs the LOG_COLUMNS. Returns one row per pair with STATS_COLUMNS
+    (minus computed_at); set/history/session columns hold JSON-ready objects.
+    """
+    if logs.empty:
+        return pd.DataFrame(columns=STATS_COLUMNS[:-1])
+
+    df = prepare_logs(logs, history_limit)
+    keys = ['user_id', 'exercise_id']
+
+    stats = df.groupby(keys, sort=True).agg(
+        exercise_name=('exercise_name', 'first'),
+        max_weight=('weight', 'max'),
+        max_reps=('reps', 'max'),
+        max_volume=('volume', 'max'),
+    )
+
+    best_weight = _best_rows(df, 'weight').set_index(keys)
+    best_volume = _best_rows(df, 'volume').set_index(keys)
+
+    one_rm = pd.Series(0.0, index=stats.index)
+    bw = best_weight[(best_weight['actual_weight'].fillna(0) > 0) & (best_weight['actual_reps'].fillna(0) > 0)]
+    one_rm.loc[bw.index] = epley_one_rm(bw['weight'], bw['reps'])
+    stats['estimated_one_rm'] = one_rm
+
+    stats['best_weight_set'] = pd.Series(
+        [{'weight': _nullable(r.actual_weight), 'reps': _nullable(r.actual_reps), 'date': _iso(r.logged_at)}
+         for r in best_weight.itertuples()],
+        index=best_weight.index, dtype=object,
+    ).reindex(stats.index)
+    stats['best_volume_set'] = pd.Series(
+        [{'weight': _nullable(r.actual_weight), 'reps': _nullable(r.actual_reps), 'volume': _num(r.volume),
+          'date': _iso(r.logged_at)}
+         for r in best_volume.itertuples()],
+        index=best_volume.index, dtype=object,
+    ).reindex(stats.index)
+
+    daily = compute_daily(df)
+    stats['trend'] = compute_trend(daily)
+    stats['total_sessions'] = daily.groupby(keys).size()
+
+    # Per-day set lists, in read order (newest first), only for the days shown
+    recent_days = daily.groupby(keys, sort=False).tail(HISTORY_SESSIONS)
+    shown = df.merge(recent_days[keys + ['date']], on=keys + ['date']).sort_values(keys + ['seq'])
+    day_sets = {}
+    set_objs = [{'weight': _num(w), 'reps': _num(r), 'volume': _num(v)}
+                for w, r, v in zip(shown['weight'], shown['reps'], shown['volume'])]
+    users, exercises, dates = (shown[c].to_numpy() for c in keys + ['date'])
+    for start, end in _runs(shown, keys + ['date']):
+        day_sets[(users[start], exercises[start], dates[start])] = set_objs[start:end]
+
+    history = {}
+    for row in recent_days.itertuples(index=False):
+        history.setdefault((row.user_id, row.exercise_id), []).append({
+            'date': row.date,
+            'maxWeight': _num(row.maxWeight),
+            'totalReps': _num(row.totalReps),
+            'totalSets': int(row.totalSets),
+            'totalVolume': _num(row.totalVolume),
+            'estimatedOneRM': _num(row.estimatedOneRM),
+            'sets': day_sets[(row.user_id, row.exercise_id, row.date)],
+        })
+    stats['history'] = pd.Series(history.values(), index=pd.MultiIndex.from_tuples(history.keys(), names=keys),
+                                 dtype=object).reindex(stats.index)
+
+    stats['last_session'] = _last_sessions(df, keys)
+    return stats.reset_index()
+
+
+def _nullable(value):
+    if value is None or (isinstance(value, float) and np.isnan(value)) or pd.isna(value):
+        return None
+    return _num(value)
+
+
+def _last_sessions(df: pd.DataFrame, keys: list) -> pd.Series:
+    """Most recent session per pair.
+
+    routes.ts keys sessions by workoutId (falling back to the date), dates a
+    session by its first-read (newest) row, then stable-sorts by date DESC -
+    so the winner is the session containing the newest log.
+    """
+    first_rows = df[df['seq'] == 0][keys + ['session_key', 'date']]
+    sessions = df.merge(first_rows, on=keys + ['session_key'], suffixes=('', '_session'))
+    sessions = sessions.sort_values(keys + ['seq'])
+
+    set_objs = [
+        {'weight': _num(w), 'reps': _num(r), 'volume': _num(v), **({'rpe': int(e)} if pd.notna(e) and e else {})}
+        for w, r, v, e in zip(sessions['weight'], sessions['reps'], sessions['volume'], sessions['rpe'])
+    ]
+    users, exercises, session_keys, dates = (
+        sessions[c].to_numpy() for c in keys + ['session_key', 'date_session']
+    )
+    index, values = [], []
+    for start, end in _runs(sessions, keys):
+        index.append((users[start], exercises[start]))
+        values.append({
+            'workoutId': session_keys[start],
+            'date': dates[start],
+            'sets': [{'setNumber': i + 1, **obj} for i, obj in enumerate(set_objs[start:end])],
+        })
+    return pd.Series(values, index=pd.MultiIndex.from_tuples(index, names=keys), dtype=object)
+
+
+def _runs(frame: pd.DataFrame, columns: list):
+    """(start, end) positions of runs of equal `columns` values in row order"""
+    n = len(frame)
+    if n == 0:
+        return []
+    change = np.zeros(n, dtype=bool)
+    change[0] = True
+    for column in columns:
+        values = frame[column].to_numpy()
+        change[1:] |= values[1:] != values[:-1]
+    starts = np.flatnonzero(change)
+    ends = np.append(starts[1:], n)
+    return zip(starts.tolist(), ends.tolist())
+
+
+def exercise_stats_payload(stats: pd.DataFrame, user_id: int, exercise_id: str) -> dict:
+    """The JSON body GET /api/stats/exercise/:exerciseId returns for one user"""
+    row = stats[(stats['user_id'] == user_id) & (stats['exercise_id'] == exercise_id)]
+    if row.empty:
+        return {'ok': True, 'exerciseId': exercise_id, 'name': 'Unknown', 'history': [],
+                'pbs': None, 'lastSession': None, 'trend': 'neutral'}
+    r = row.iloc[0]
+    one_rm = r['estimated_one_rm']
+    return {
+        'ok': True,
+        'exerciseId': exercise_id,
+        'name': r['exercise_name'],
+        'history': r['history'],
+        'pbs': {
+            'maxWeight': _num(r['max_weight']),
+            'maxReps': _num(r['max_reps']),
+            'maxVolume': _num(r['max_volume']),
+            'estimatedOneRM': int(js_round(one_rm)),
+            'estimated3RM': int(js_round(one_rm * 0.93)),
+            'estimated5RM': int(js_round(one_rm * 0.87)),
+            'estimated10RM': int(js_round(one_rm * 0.75)),
+            'bestWeightSet': _none_if_nan(r['best_weight_set']),
+            'bestVolumeSet': _none_if_nan(r['best_volume_set']),
+        },
+        'lastSession': r['last_session'],
+        'trend': r['trend'],
+        'totalSessions': int(r['total_sessions']),
+    }
+
+
+def _none_if_nan(value):
+    return value if isinstance(value, dict) else None
+
+
+CREATE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS exercise_stats (
+        id SERIAL PRIMARY KEY,
+        user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+        exercise_id TEXT NOT NULL,
+        exercise_name TEXT NOT NULL,
+        max_weight REAL DEFAULT 0,
+        max_reps REAL DEFAULT 0,
+        max_volume REAL DEFAULT 0,
+        estimated_one_rm REAL DEFAULT 0,
+        best_weight_set JSONB,
+        best_volume_set JSONB,
+        history JSONB,
+        last_session JSONB,
+        trend TEXT DEFAULT 'neutral',
+        total_sessions INTEGER DEFAULT 0,
+        computed_at TIMESTAMP DEFAULT NOW() NOT NULL,
+        UNIQUE (user_id, exercise_id)
+    )
+"""
+
+
+def stats_records(stats: pd.DataFrame, computed_at: datetime) -> list:
+    records = []
+    for r in stats.itertuples(index=False):
+        records.append((
+            int(r.user_id), str(r.exercise_id), r.exercise_name,
+            float(r.max_weight), float(r.max_reps), float(r.max_volume), float(r.estimated_one_rm),
+            _none_if_nan(r.best_weight_set), _none_if_nan(r.best_volume_set),
+            r.history, r.last_session, r.trend, int(r.total_sessions), computed_at,
+        ))
+    return records
+
+
+async def main():
+    parser = argparse.ArgumentParser(description='Precompute per-exercise stats for all users')
+    parser.add_argument('--user-id', type=int, help='Only recompute one user')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("EXERCISE STATS ENGINE")
+    print("=" * 60)
+    print()
+
+    conn = await connect()
+    try:
+        await conn.execute(CREATE_TABLE_SQL)
+
+        query = f"SELECT {', '.join(LOG_COLUMNS)} FROM performance_logs"
+        params = []
+        if args.user_id:
+            query += " WHERE user_id = $1"
+            params.append(args.user_id)
+
+        started = datetime.now(timezone.utc)
+        logs = await fetch_dataframe(conn, query, *params)
+        print(f"Loaded {len(logs)} performance logs in {(datetime.now(timezone.utc) - started).total_seconds():.2f}s")
+
+        started = datetime.now(timezone.utc)
+        stats = compute_exercise_stats(logs)
+        elapsed = (datetime.now(timezone.utc) - started).total_seconds()
+        print(f"Computed stats for {len(stats)} user/exercise pairs in {elapsed:.2f}s")
+
+        computed_at = datetime.now(timezone.utc).replace(tzinfo=None)
+        written = await copy_upsert(
+            conn, 'exercise_stats', STATS_COLUMNS, stats_records(stats, computed_at),
+            conflict=['user_id', 'exercise_id'],
+        )
+        print(f"\n✅ Upserted {written} rows into exercise_stats")
+    finally:
+        await conn.close()
+    print("\nDone!")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
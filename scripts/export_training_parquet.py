@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Training History Parquet Export
+-------------------------------
+Exports the training history tables to a local, partitioned Parquet dataset
+so analysis and backfills can run with pandas / DuckDB / pyarrow instead of
+ad-hoc queries against the production database.
+
+It will:
+1. Read the per-table id watermarks from OUT_DIR/_watermarks.json
+2. Stream new rows of performance_logs, workout_sets, user_workouts and
+   workout_events in id order, --chunk-size rows at a time
+3. Write each chunk as Parquet under a hive layout partitioned by month and
+   user bucket:
+       OUT_DIR/<table>/month=2025-06/bucket=7/part-<first id>-0.parquet
+   Exercise names, event types and other low-cardinality text columns are
+   dictionary encoded
+4. Advance the watermark after every chunk, so an interrupted export resumes
+   where it stopped (a re-run of the same chunk overwrites the same files)
+
+Free-text columns (user notes) are not exported.
+
+Reading it back with predicate pushdown:
+    import pyarrow.dataset as ds
+    logs = ds.dataset('exports/performance_logs', format='parquet', partitioning='hive')
+    logs.to_table(filter=(ds.field('month') >= '2025-01') & (ds.field('bucket') == int(user_bucket(42)))
+                  & (ds.field('user_id') == 42))
+
+Usage:
+    python scripts/export_training_parquet.py [--out exports] [--tables performance_logs workout_events]
+    python scripts/export_training_parquet.py --full        # discard the export and start over
+"""
+
+import os
+import json
+import shutil
+import asyncio
+import argparse
+from datetime import datetime, timezone
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from db_utils import connect
+
+DEFAULT_OUT_DIR = 'exports'
+DEFAULT_CHUNK_SIZE = 50000
+USER_BUCKETS = 16
+WATERMARK_FILE = '_watermarks.json'
+
+DICT_STRING = pa.dictionary(pa.int32(), pa.string())
+
+# table -> query for the next chunk after an id, the partition timestamp column and the arrow schema
+TABLES = {
+    'performance_logs': {
+        'query': """
+            SELECT id, user_id, workout_id, exercise_id, exercise_name,
+                   planned_sets, actual_sets, planned_reps, actual_reps, planned_weight, actual_weight,
+                   planned_duration, actual_duration, rpe, form_quality, completed, skipped, modified,
+                   muscle_groups, difficulty_feedback, start_time, end_time, logged_at
+            FROM performance_logs WHERE id > $1 ORDER BY id LIMIT $2
+        """,
+        'time_column': 'logged_at',
+        'schema': pa.schema([
+            ('id', pa.int64()), ('user_id', pa.int64()), ('workout_id', pa.string()),
+            ('exercise_id', DICT_STRING), ('exercise_name', DICT_STRING),
+            ('planned_sets', pa.int32()), ('actual_sets', pa.int32()),
+            ('planned_reps', pa.int32()), ('actual_reps', pa.int32()),
+            ('planned_weight', pa.int32()), ('actual_weight', pa.int32()),
+            ('planned_duration', pa.int32()), ('actual_duration', pa.int32()),
+            ('rpe', pa.int32()), ('form_quality', pa.int32()),
+            ('completed', pa.bool_()), ('skipped', pa.bool_()), ('modified', pa.bool_()),
+            ('muscle_groups', pa.list_(pa.string())), ('difficulty_feedback', DICT_STRING),
+            ('start_time', pa.timestamp('ms')), ('end_time', pa.timestamp('ms')),
+            ('logged_at', pa.timestamp('ms')),
+        ]),
+    },
+    'workout_sets': {
+        'query': """
+            SELECT s.id, uw.user_id, s.user_workout_id, s.exercise_id, e.name AS exercise_name,
+                   s.set_number, s.target_reps, s.actual_reps, s.target_weight, s.actual_weight,
+                   s.target_duration, s.actual_duration, s.rest_time, s.rpe, s.is_completed,
+                   COALESCE(s.completed_at, uw.completed_at) AS completed_at
+            FROM workout_sets s
+            JOIN user_workouts uw ON uw.id = s.user_workout_id
+            LEFT JOIN exercises e ON e.id = s.exercise_id
+            WHERE s.id > $1 ORDER BY s.id LIMIT $2
+        """,
+        'time_column': 'completed_at',
+        'schema': pa.schema([
+            ('id', pa.int64()), ('user_id', pa.int64()), ('user_workout_id', pa.int64()),
+            ('exercise_id', pa.int64()), ('exercise_name', DICT_STRING),
+            ('set_number', pa.int32()), ('target_reps', pa.int32()), ('actual_reps', pa.int32()),
+            ('target_weight', pa.int32()), ('actual_weight', pa.int32()),
+            ('target_duration', pa.int32()), ('actual_duration', pa.int32()),
+            ('rest_time', pa.int32()), ('rpe', pa.int32()), ('is_completed', pa.bool_()),
+            ('completed_at', pa.timestamp('ms')),
+        ]),
+    },
+    'user_workouts': {
+        'query': """
+            SELECT id, user_id, workout_id, duration, completed_at
+            FROM user_workouts WHERE id > $1 ORDER BY id LIMIT $2
+        """,
+        'time_column': 'completed_at',
+        'schema': pa.schema([
+            ('id', pa.int64()), ('user_id', pa.int64()), ('workout_id', pa.int64()),
+            ('duration', pa.int32()), ('completed_at', pa.timestamp('ms')),
+        ]),
+    },
+    'workout_events': {
+        'query': """
+            SELECT id, user_id, user_workout_id, event_type, exercise_id, set_id, event_data, achieved_at
+            FROM workout_events WHERE id > $1 ORDER BY id LIMIT $2
+        """,
+        'time_column': 'achieved_at',
+        'schema': pa.schema([
+            ('id', pa.int64()), ('user_id', pa.int64()), ('user_workout_id', pa.int64()),
+            ('event_type', DICT_STRING), ('exercise_id', pa.int64()), ('set_id', pa.int64()),
+            ('event_data', pa.string()), ('achieved_at', pa.timestamp('ms')),
+        ]),
+    },
+}
+
+PARTITIONING = ds.partitioning(pa.schema([('month', pa.string()), ('bucket', pa.int32())]), flavor='hive')
+
+
+def user_bucket(user_ids, buckets: int = USER_BUCKETS):
+    """Knuth multiplicative hash of user_id, so consecutive ids spread across buckets"""
+    ids = np.asarray(user_ids, dtype=np.uint64)
+    hashed = (ids * np.uint64(2654435761)) & np.uint64(0xFFFFFFFF)
+    return (hashed % np.uint64(buckets)).astype(np.int64)
+
+
+def to_arrow(rows: list, spec: dict, buckets: int = USER_BUCKETS) -> pa.Table:
+    """Build the chunk table plus its month/bucket partition columns"""
+    schema = spec['schema']
+    columns = {}
+    for field in schema:
+        values = [row[field.name] for row in rows]
+        if pa.types.is_dictionary(field.type):
+            columns[field.name] = pa.array([None if v is None else str(v) for v in values],
+                                           type=pa.string()).dictionary_encode()
+        else:
+            columns[field.name] = pa.array(values, type=field.type)
+    table = pa.table(columns, schema=schema)
+
+    months = [t.strftime('%Y-%m') if t is not None else 'unknown' for t in (row[spec['time_column']] for row in rows)]
+    bucket = pa.array(user_bucket([row['user_id'] for row in rows], buckets), type=pa.int32())
+    return table.append_column('month', pa.array(months)).append_column('bucket', bucket)
+
+
+def write_chunk(table: pa.Table, table_dir: str, first_id: int):
+    ds.write_dataset(
+        table, table_dir, format='parquet', partitioning=PARTITIONING,
+        basename_template=f"part-{first_id:012d}-{{i}}.parquet",
+        existing_data_behavior='overwrite_or_ignore',
+        file_options=ds.ParquetFileFormat().make_write_options(compression='zstd'),
+    )
+
+
+def load_watermarks(out_dir: str) -> dict:
+    path = os.path.join(out_dir, WATERMARK_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_watermarks(out_dir: str, watermarks: dict):
+    path = os.path.join(out_dir, WATERMARK_FILE)
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(watermarks, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+async def export_table(conn, name: str, out_dir: str, watermarks: dict, chunk_size: int, buckets: int) -> int:
+    spec = TABLES[name]
+    table_dir = os.path.join(out_dir, name)
+    exported = 0
+    while True:
+        rows = await conn.fetch(spec['query'], watermarks.get(name, 0), chunk_size)
+        if not rows:
+            return exported
+        write_chunk(to_arrow(rows, spec, buckets), table_dir, rows[0]['id'])
+        watermarks[name] = rows[-1]['id']
+        save_watermarks(out_dir, watermarks)
+        exported += len(rows)
+        print(f"  {name}: {exported} rows (through id {watermarks[name]})")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description='Export training history to partitioned Parquet')
+    parser.add_argument('--out', default=DEFAULT_OUT_DIR, help='Dataset directory')
+    parser.add_argument('--tables', nargs='+', choices=list(TABLES), default=list(TABLES))
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--buckets', type=int, default=USER_BUCKETS, help='User hash buckets per month')
+    parser.add_argument('--full', action='store_true', help='Delete the exported tables and start over')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("TRAINING HISTORY PARQUET EXPORT")
+    print("=" * 60)
+    print()
+
+    os.makedirs(args.out, exist_ok=True)
+    watermarks = load_watermarks(args.out)
+    if args.full:
+        for name in args.tables:
+            shutil.rmtree(os.path.join(args.out, name), ignore_errors=True)
+            watermarks.pop(name, None)
+        save_watermarks(args.out, watermarks)
+
+    conn = await connect()
+    try:
+        started = datetime.now(timezone.utc)
+        totals = {}
+        for name in args.tables:
+            print(f"Exporting {name} after id {watermarks.get(name, 0)}...")
+            totals[name] = await export_table(conn, name, args.out, watermarks, args.chunk_size, args.buckets)
+        elapsed = (datetime.now(timezone.utc) - started).total_seconds()
+    finally:
+        await conn.close()
+
+    print("\n=== SUMMARY ===")
+    for name, count in totals.items():
+        print(f"  {name:18} {count:>10} new rows")
+    print(f"\n✅ Exported {sum(totals.values())} rows to {args.out} in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
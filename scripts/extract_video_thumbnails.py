@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Exercise Video Thumbnail Extraction
+-----------------------------------
+Most exercises have no thumbnail_url, so the app loads the full video just
+to show a preview. This script extracts a poster frame from each catalog
+video and writes small WebP thumbnails.
+
+It will:
+1. Read the video catalog (a directory of <slug>.mp4 files or a JSON manifest,
+   see video_catalog.py)
+2. Hash each video's content; videos whose thumbnails already exist for that
+   hash are skipped, so reruns only process new or changed videos
+3. Grab a representative frame with ffmpeg (past the first second, to avoid
+   black fade-in frames) and downscale it to every requested width
+4. Encode WebP thumbnails in a process pool
+5. Write a mapping file (slug/id -> thumbnail URL) and optionally apply it
+   to exercises.thumbnail_url in one bulk UPDATE
+
+Requires ffmpeg on PATH and Pillow.
+
+Usage:
+    python scripts/extract_video_thumbnails.py VIDEO_DIR_OR_MANIFEST \\
+        --out thumbnails --base-url https://cdn.thryvin.app/thumbnails [--sizes 160,320,640] [--apply]
+"""
+
+import os
+import io
+import sys
+import json
+import asyncio
+import argparse
+import subprocess
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from video_catalog import HashCache, load_video_entries
+
+DATABASE_URL = os.environ.get('DATABASE_URL')
+
+DEFAULT_SIZES = (160, 320, 640)
+# Which size goes into exercises.thumbnail_url
+DEFAULT_PRIMARY_SIZE = 320
+WEBP_QUALITY = 80
+POSTER_SEEK_SECONDS = 1.0
+
+
+def thumbnail_relpath(content_hash: str, width: int) -> str:
+    """Thumbnails are keyed by video content, not by exercise name"""
+    return f"{content_hash[:2]}/{content_hash[:16]}/w{width}.webp"
+
+
+def grab_poster_frame(video_path: str, seek: float = POSTER_SEEK_SECONDS) -> bytes:
+    """Return one representative frame as PNG bytes.
+
+    The thumbnail filter picks the most representative frame out of the
+    next batch, which avoids motion blur and transition frames.
+    """
+    for offset in (seek, 0):
+        result = subprocess.run(
+            ['ffmpeg', '-v', 'error', '-ss', str(offset), '-i', video_path,
+             '-vf', 'thumbnail=60', '-frames:v', '1',
+             '-f', 'image2pipe', '-vcodec', 'png', '-'],
+            capture_output=True,
+        )
+        if result.returncode == 0 and result.stdout:
+            return result.stdout
+    raise RuntimeError(f"ffmpeg could not extract a frame: {result.stderr.decode(errors='replace').strip()}")
+
+
+def render_thumbnails(video_path: str, content_hash: str, sizes: list, out_dir: str) -> dict:
+    """Extract the poster frame and write one WebP per width. Runs in a worker process."""
+    from PIL import Image
+
+    frame = Image.open(io.BytesIO(grab_poster_frame(video_path))).convert('RGB')
+    written = {}
+    for width in sizes:
+        height = max(1, round(frame.height * width / frame.width))
+        img = frame if width >= frame.width else frame.resize((width, height), Image.LANCZOS)
+        rel = thumbnail_relpath(content_hash, width)
+        path = os.path.join(out_dir, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        img.save(path, 'WEBP', quality=WEBP_QUALITY, method=6)
+        written[width] = rel
+    return written
+
+
+def missing_sizes(content_hash: str, sizes: list, out_dir: str) -> list:
+    return [w for w in sizes if not os.path.exists(os.path.join(out_dir, thumbnail_relpath(content_hash, w)))]
+
+
+def build_mapping(entries: list, hashes: dict, sizes: list, primary: int, base_url: str) -> list:
+    """One row per exercise with every thumbnail URL and the one to store"""
+    base_url = base_url.rstrip('/')
+    mapping = []
+    for entry in entries:
+        content_hash = hashes.get(entry['path'])
+        if not content_hash:
+            continue
+        urls = {str(w): f"{base_url}/{thumbnail_relpath(content_hash, w)}" for w in sizes}
+        row = {
+            'slug': entry['slug'],
+            'contentHash': content_hash,
+            'thumbnails': urls,
+            'thumbnail_url': urls[str(primary)],
+        }
+        if 'id' in entry:
+            row['id'] = entry['id']
+        mapping.append(row)
+    return mapping
+
+
+async def apply_mapping(mapping: list) -> int:
+    """Bulk-update exercises.thumbnail_url from the mapping in one statement"""
+    import asyncpg
+
+    by_id = [row for row in mapping if 'id' in row]
+    by_slug = [row for row in mapping if 'id' not in row]
+
+    conn = await asyncpg.connect(DATABASE_URL)
+    try:
+        updated = 0
+        if by_id:
+            status = await conn.execute("""
+                UPDATE exercises e SET thumbnail_url = v.url
+                FROM unnest($1::int[], $2::text[]) AS v(id, url)
+                WHERE e.id = v.id
+            """, [r['id'] for r in by_id], [r['thumbnail_url'] for r in by_id])
+            updated += int(status.split()[-1])
+        if by_slug:
+            status = await conn.execute("""
+                UPDATE exercises e SET thumbnail_url = v.url
+                FROM unnest($1::text[], $2::text[]) AS v(slug, url)
+                WHERE e.slug = v.slug
+            """, [r['slug'] for r in by_slug], [r['thumbnail_url'] for r in by_slug])
+            updated += int(status.split()[-1])
+    finally:
+        await conn.close()
+    return updated
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Extract poster-frame thumbnails for exercise videos')
+    parser.add_argument('source', help='Directory of <slug> videos or a JSON manifest')
+    parser.add_argument('--out', default='thumbnails', help='Thumbnail output directory')
+    parser.add_argument('--base-url', default='/thumbnails', help='URL prefix the out directory is served from')
+    parser.add_argument('--sizes', default=','.join(str(s) for s in DEFAULT_SIZES), help='Comma-separated widths')
+    parser.add_argument('--primary-size', type=int, default=DEFAULT_PRIMARY_SIZE, help='Width stored in thumbnail_url')
+    parser.add_argument('--mapping', default=None, help='Mapping file path (default: <out>/thumbnail-mapping.json)')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 2)
+    parser.add_argument('--apply', action='store_true', help='Bulk-update exercises.thumbnail_url')
+    args = parser.parse_args()
+
+    sizes = sorted({int(s) for s in args.sizes.split(',') if s.strip()})
+    if args.primary_size not in sizes:
+        sizes.append(args.primary_size)
+        sizes.sort()
+
+    print("=" * 60)
+    print("EXERCISE VIDEO THUMBNAIL EXTRACTION")
+    print("=" * 60)
+    print()
+
+    entries = load_video_entries(args.source)
+    print(f"Found {len(entries)} videos")
+
+    os.makedirs(args.out, exist_ok=True)
+    hash_cache = HashCache(os.path.join(args.out, '.video-hashes.json'))
+    hashes = {}
+    for entry in entries:
+        try:
+            hashes[entry['path']] = hash_cache.hash(entry['path'])
+        except OSError as e:
+            print(f"  ❌ {entry['slug']}: {e}")
+    hash_cache.save()
+
+    # Identical videos shared by several exercises are only rendered once
+    todo = {}
+    for path, content_hash in hashes.items():
+        if content_hash not in todo and missing_sizes(content_hash, sizes, args.out):
+            todo[content_hash] = path
+    print(f"{len(todo)} videos to extract, {len(hashes) - len(todo)} skipped (unchanged or duplicate)")
+
+    failed = set()
+    if todo:
+        with ProcessPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+            futures = {
+                pool.submit(render_thumbnails, path, content_hash, sizes, args.out): (content_hash, path)
+                for content_hash, path in todo.items()
+            }
+            for future in as_completed(futures):
+                content_hash, path = futures[future]
+                try:
+                    future.result()
+                    print(f"  ✅ {os.path.basename(path)}")
+                except Exception as e:
+                    failed.add(content_hash)
+                    print(f"  ❌ {os.path.basename(path)}: {e}")
+
+    hashes = {path: h for path, h in hashes.items() if h not in failed}
+    mapping = build_mapping(entries, hashes, sizes, args.primary_size, args.base_url)
+
+    mapping_path = args.mapping or os.path.join(args.out, 'thumbnail-mapping.json')
+    with open(mapping_path, 'w', encoding='utf-8') as f:
+        json.dump(mapping, f, indent=2)
+    print(f"\n✅ Mapping for {len(mapping)} exercises written to {mapping_path}")
+
+    if args.apply:
+        if not DATABASE_URL:
+            print("❌ DATABASE_URL is not set, cannot --apply")
+            sys.exit(1)
+        updated = asyncio.run(apply_mapping(mapping))
+        print(f"✅ Updated thumbnail_url on {updated} exercises")
+
+    if failed:
+        print(f"❌ {len(failed)} videos failed")
+        sys.exit(1)
+    print("\nDone!")
+
+
+if __name__ == "__main__":
+    main()
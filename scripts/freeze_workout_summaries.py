@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Workout Summary Freezer
+-----------------------
+GET /api/stats/workout-summary/:workoutId loads the user's last 1000
+performance_logs and rebuilds the summary (per-exercise sets, volume, bests,
+PR flags) every time the completed-workout page is opened. This worker builds
+that response once per finished workout and stores it in workout_summaries;
+the endpoint serves the stored row while its last_log_id and total_sets
+still match the workout's newest performance_logs id and log count, and
+rebuilds live otherwise
+(WORKOUT_SUMMARY_PRECOMPUTE=false turns the stored rows off).
+
+A summary is frozen as the endpoint would have returned it right after the
+workout: previousMax and isPR only look at logs up to the workout's last set
+(the live endpoint also counts later sessions, so a PR could later flip to
+"not a PR" on a repeat view).
+
+It will:
+1. Find workouts (user_id + performance_logs.workout_id) with logs after the
+   job watermark, up to the last log older than --settle-minutes, so a
+   workout still in progress is left for the next run
+2. Load the logs of those users and build each summary with the endpoint's
+   rules (newest-first set order, Math.max bests, toFixed(1) improvement)
+3. Upsert workout_summaries on (user_id, workout_id) and advance the
+   watermark in one transaction (a workout that gets more sets later is
+   simply rebuilt)
+
+--backfill ignores the watermark and freezes every workout in history.
+See bench_workout_summary.py for the read latency comparison.
+
+Usage:
+    python scripts/freeze_workout_summaries.py [--settle-minutes 30]
+    python scripts/freeze_workout_summaries.py --backfill
+"""
+
+import asyncio
+import argparse
+from bisect import bisect_right
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal, ROUND_HALF_UP
+
+from db_utils import connect, copy_upsert, get_watermarks, set_watermarks
+
+JOB_NAME = 'workout_summaries:performance_logs'
+HISTORY_LIMIT = 1000
+DEFAULT_SETTLE_MINUTES = 30
+
+LOG_COLUMNS = ['id', 'user_id', 'workout_id', 'exercise_id', 'exercise_name',
+               'actual_weight', 'actual_reps', 'rpe', 'start_time', 'logged_at']
+
+SUMMARY_COLUMNS = [
+    'user_id', 'workout_id', 'summary', 'total_volume', 'total_sets', 'exercise_count', 'prs_hit',
+    'duration_seconds', 'started_at', 'completed_at', 'last_log_id', 'computed_at',
+]
+
+CREATE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS workout_summaries (
+        id SERIAL PRIMARY KEY,
+        user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+        workout_id TEXT NOT NULL,
+        summary JSONB NOT NULL,
+        total_volume REAL DEFAULT 0,
+        total_sets INTEGER DEFAULT 0,
+        exercise_count INTEGER DEFAULT 0,
+        prs_hit INTEGER DEFAULT 0,
+        duration_seconds INTEGER DEFAULT 0,
+        started_at TIMESTAMP,
+        completed_at TIMESTAMP,
+        last_log_id INTEGER NOT NULL DEFAULT 0,
+        computed_at TIMESTAMP DEFAULT NOW() NOT NULL,
+        UNIQUE (user_id, workout_id)
+    )
+"""
+
+
+def js_to_fixed(x: float, digits: int = 1) -> str:
+    """Number.prototype.toFixed(): exact binary value, halves away from zero"""
+    return str(Decimal(x).quantize(Decimal(1).scaleb(-digits), rounding=ROUND_HALF_UP))
+
+
+def _num(x):
+    """Emit integral floats as ints, like JSON numbers from the endpoint"""
+    if isinstance(x, float) and x.is_integer():
+        return int(x)
+    return x
+
+
+def _order_key(log: dict):
+    return (log['logged_at'], log['id'])
+
+
+def build_workout_summary(history: list, workout_id: str) -> dict:
+    """The endpoint response from allHistory (the user's logs, newest first)"""
+    workout_logs = [log for log in history if log['workout_id'] == workout_id]
+    if not workout_logs:
+        return {'exercises': [], 'stats': None}
+
+    exercise_map = {}
+    for log in workout_logs:
+        entry = exercise_map.get(log['exercise_id'])
+        volume = (log['actual_weight'] or 0) * (log['actual_reps'] or 0)
+        if entry is None:
+            entry = exercise_map[log['exercise_id']] = {
+                'exerciseId': log['exercise_id'],
+                'exerciseName': log['exercise_name'],
+                'sets': [],
+                'totalVolume': 0,
+            }
+        entry['sets'].append({
+            'setNumber': len(entry['sets']) + 1,
+            'weight': log['actual_weight'],
+            'reps': log['actual_reps'],
+            'rpe': log['rpe'],
+        })
+        entry['totalVolume'] += volume
+
+    exercises = []
+    for exercise_id, data in exercise_map.items():
+        previous = [h['actual_weight'] or 0 for h in history
+                    if h['exercise_id'] == exercise_id and h['workout_id'] != workout_id]
+        previous_max = max(previous) if previous else 0
+        today_max = max(s['weight'] or 0 for s in data['sets'])
+        max_weight_set = next((s for s in data['sets'] if s['weight'] == today_max), None)
+        exercises.append({
+            **data,
+            'todayMax': _num(today_max),
+            'repsAtMax': (max_weight_set or {}).get('reps') or 0,
+            'previousMax': _num(previous_max),
+            'isPR': today_max > previous_max and previous_max > 0,
+            'improvement': js_to_fixed((today_max - previous_max) / previous_max * 100) if previous_max > 0 else None,
+        })
+
+    return {
+        'exercises': exercises,
+        'stats': {
+            'totalVolume': sum(e['totalVolume'] for e in exercises),
+            'totalSets': sum(len(e['sets']) for e in exercises),
+            'exerciseCount': len(exercises),
+            'prsHit': sum(1 for e in exercises if e['isPR']),
+        },
+    }
+
+
+def freeze_user_workouts(logs: list, workout_ids=None, history_limit: int = HISTORY_LIMIT) -> list:
+    """(workout_id, summary, started_at, completed_at, last_log_id) for one user's workouts.
+
+    Each summary sees the user's newest `history_limit` logs as of the
+    workout's last set, like a view of the endpoint right after the workout.
+    """
+    ordered = sorted(logs, key=_order_key)
+    keys = [_order_key(log) for log in ordered]
+    by_workout = {}
+    for log in ordered:
+        by_workout.setdefault(log['workout_id'], []).append(log)
+
+    frozen = []
+    for workout_id, rows in by_workout.items():
+        if workout_ids is not None and workout_id not in workout_ids:
+            continue
+        end = bisect_right(keys, _order_key(rows[-1]))
+        history = ordered[max(0, end - history_limit):end][::-1]
+        started_at = min((r['start_time'] or r['logged_at']) for r in rows)
+        frozen.append((workout_id, build_workout_summary(history, workout_id), started_at,
+                       rows[-1]['logged_at'], max(r['id'] for r in rows)))
+    return frozen
+
+
+def summary_records(user_id: int, frozen: list, computed_at: datetime) -> list:
+    records = []
+    for workout_id, summary, started_at, completed_at, last_log_id in frozen:
+        stats = summary['stats']
+        if stats is None:
+            continue
+        duration = max(0, int((completed_at - started_at).total_seconds()))
+        records.append((
+            user_id, workout_id, summary, float(stats['totalVolume']), stats['totalSets'],
+            stats['exerciseCount'], stats['prsHit'], duration, started_at, completed_at, last_log_id, computed_at,
+        ))
+    return records
+
+
+async def store_summaries(conn, records: list, until: int) -> int:
+    """Upsert the summaries (summary is jsonb, written through binary COPY) and
+    advance the watermark in one transaction"""
+    async with conn.transaction():
+        written = await copy_upsert(conn, 'workout_summaries', SUMMARY_COLUMNS, records,
+                                    conflict=['user_id', 'workout_id'])
+        await set_watermarks(conn, {JOB_NAME: until})
+    return written
+
+
+async def main():
+    parser = argparse.ArgumentParser(description='Freeze completed workout summaries')
+    parser.add_argument('--backfill', action='store_true', help='Freeze every workout in history')
+    parser.add_argument('--settle-minutes', type=int, default=DEFAULT_SETTLE_MINUTES,
+                        help='Only freeze logs at least this old (workout finished)')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("WORKOUT SUMMARY FREEZER")
+    print("=" * 60)
+    print()
+
+    conn = await connect()
+    try:
+        await conn.execute(CREATE_TABLE_SQL)
+        since = 0 if args.backfill else (await get_watermarks(conn, [JOB_NAME]))[JOB_NAME]
+        settled_before = (datetime.now(timezone.utc) - timedelta(minutes=args.settle_minutes)).replace(tzinfo=None)
+        until = await conn.fetchval("""
+            SELECT COALESCE(MAX(id), 0) FROM performance_logs WHERE id > $1 AND logged_at < $2
+        """, since, settled_before)
+        print(f"  performance_logs ids {since} -> {until}")
+        if until <= since:
+            print("\n✅ workout_summaries is up to date")
+            return
+
+        started = datetime.now(timezone.utc)
+        touched = await conn.fetch("""
+            SELECT DISTINCT user_id, workout_id FROM performance_logs WHERE id > $1 AND id <= $2
+        """, since, until)
+        targets = {}
+        for r in touched:
+            targets.setdefault(r['user_id'], set()).add(r['workout_id'])
+        print(f"{len(touched)} workouts from {len(targets)} users to freeze")
+
+        rows = await conn.fetch(f"""
+            SELECT {', '.join(LOG_COLUMNS)} FROM performance_logs
+            WHERE user_id = ANY($1::integer[]) AND id <= $2
+        """, list(targets), until)
+        by_user = {}
+        for r in rows:
+            by_user.setdefault(r['user_id'], []).append(dict(r))
+
+        computed_at = datetime.now(timezone.utc).replace(tzinfo=None)
+        records = []
+        for user_id, workout_ids in targets.items():
+            frozen = freeze_user_workouts(by_user.get(user_id, []), workout_ids)
+            records.extend(summary_records(user_id, frozen, computed_at))
+        elapsed = (datetime.now(timezone.utc) - started).total_seconds()
+        print(f"Built {len(records)} summaries from {len(rows)} logs in {elapsed:.2f}s")
+
+        written = await store_summaries(conn, records, until)
+        print(f"\n✅ Upserted {written} rows into workout_summaries")
+    finally:
+        await conn.close()
+    print("\nDone!")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Local LLM Stand-in
+------------------
+An OpenAI-compatible /v1/chat/completions server for load tests, so the
+generation benchmarks measure our own fan-out, DB and queueing cost instead
+of (and without paying for) the real model. Point the backend at it with
+
+    OPENAI_BASE_URL=http://localhost:8090/v1 OPENAI_API_KEY=standin npm run dev
+
+(the openai SDK reads OPENAI_BASE_URL).
+
+It will:
+1. Answer workout generation prompts (ai-workout-generator.ts) with a workout
+   JSON whose exercise count fits the prompt's experience/duration, exercise
+   swap prompts (ai-exercise-swap.ts) with four alternatives, and any other
+   prompt with a short coach-style text
+2. Sleep a log-normal latency around --latency-ms per call; --slow-rate,
+   --fail-rate and --invalid-rate inject slow calls (--slow-ms), HTTP 500s
+   and replies whose JSON is empty ({})
+3. Report usage (prompt/completion tokens, ~4 chars per token) like the API
+4. Serve GET /stats: calls, failures, slow calls and peak in-flight calls,
+   so benchmarks can see the concurrency that reached the model
+5. Accept POST /config ({"latencyMs", "slowRate", "slowMs", "failRate",
+   "invalidRate"}) so a benchmark can switch injection scenarios between runs
+
+Usage:
+    python scripts/llm_standin.py [--port 8090] [--latency-ms 1500] [--fail-rate 0.02]
+"""
+
+import re
+import json
+import math
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from bench_workout_realism_sweep import expected_count_range
+
+DEFAULT_PORT = 8090
+CHARS_PER_TOKEN = 4
+
+WARMUPS = ['Jumping Jacks', 'Arm Circles', 'Leg Swings', 'High Knees']
+MAINS = ['Goblet Squat', 'Dumbbell Bench Press', 'Romanian Deadlift', 'Bent Over Row', 'Walking Lunge',
+         'Overhead Press', 'Lat Pulldown', 'Hip Thrust', 'Cable Row', 'Leg Press', 'Plank']
+COOLDOWNS = ['Standing Quad Stretch', "Child's Pose", 'Hip Flexor Stretch', 'Standing Forward Bend']
+
+# "FOR THIS 45-MIN BEGINNER WORKOUT:" in the ai-workout-generator.ts user prompt
+_WORKOUT_RE = re.compile(r'FOR THIS (\d+)-MIN (BEGINNER|INTERMEDIATE|ADVANCED) WORKOUT')
+# "Current Exercise: Barbell Squat" in the ai-exercise-swap.ts prompt
+_SWAP_RE = re.compile(r'wants to swap an exercise.*?Current Exercise: ([^\n]+)', re.S)
+
+
+def workout_reply(duration: int, experience: str, rng: random.Random) -> str:
+    """Workout JSON sized like the generator prompt asks"""
+    low, high = expected_count_range(experience, duration)
+    total = rng.randint(low, high)
+    warmups = 1 if total < 6 else 2
+    cooldowns = 1
+    mains = total - warmups - cooldowns
+
+    def exercise(name, category, sets, reps, rest):
+        return {'name': name, 'sets': sets, 'reps': reps, 'restTime': rest, 'category': category}
+
+    exercises = (
+        [exercise(n, 'warmup', 1, '30 sec', 15) for n in rng.sample(WARMUPS, warmups)]
+        + [exercise(n, 'main', 3, '8-12', 90 if experience == 'beginner' else 60) for n in rng.sample(MAINS, mains)]
+        + [exercise(n, 'cooldown', 1, '30 sec', 15) for n in rng.sample(COOLDOWNS, cooldowns)]
+    )
+    return json.dumps({
+        'title': 'Full Body Strength',
+        'type': 'Full Body',
+        'difficulty': experience,
+        'duration': duration,
+        'exercises': exercises,
+        'targetMuscles': 'Full Body',
+    })
+
+
+def swap_reply(current: str, rng: random.Random) -> str:
+    """Four ranked alternatives in the shape AlternativesResponseSchema expects"""
+    names = rng.sample([n for n in MAINS if n.lower() != current.strip().lower()], 4)
+    return json.dumps({'alternatives': [
+        {'name': name, 'reason': f"Targets the same muscles as {current.strip()}", 'sets': 3, 'reps': '8-12'}
+        for name in names
+    ]})
+
+
+def text_reply(prompt: str, rng: random.Random) -> str:
+    return rng.choice([
+        "Great question! Keep your rest at 60-90 seconds and add a rep each session before adding weight.",
+        "Nice work staying consistent. Prioritise sleep tonight and keep tomorrow's session light.",
+        "Try 3 sets of 8-10 with a controlled tempo, and stop each set with 1-2 reps in reserve.",
+    ])
+
+
+def completion(body: dict, rng: random.Random, invalid: bool = False) -> dict:
+    messages = body.get('messages') or []
+    prompt = '\n'.join(str(m.get('content') or '') for m in messages)
+    workout, swap = _WORKOUT_RE.search(prompt), _SWAP_RE.search(prompt)
+    if workout:
+        content = workout_reply(int(workout.group(1)), workout.group(2).lower(), rng)
+    elif swap:
+        content = swap_reply(swap.group(1), rng)
+    else:
+        content = text_reply(prompt, rng)
+    if invalid:
+        content = '{}'
+    prompt_tokens = len(prompt) // CHARS_PER_TOKEN
+    completion_tokens = len(content) // CHARS_PER_TOKEN
+    return {
+        'id': f"chatcmpl-standin-{rng.getrandbits(48):x}",
+        'object': 'chat.completion',
+        'created': int(time.time()),
+        'model': body.get('model', 'standin'),
+        'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content}, 'finish_reason': 'stop'}],
+        'usage': {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+                  'total_tokens': prompt_tokens + completion_tokens},
+    }
+
+
+class StandinStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = self.failures = self.invalid = self.slow = self.in_flight = self.peak_in_flight = 0
+
+    def enter(self):
+        with self.lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def leave(self, failed: bool, slow: bool, invalid: bool = False):
+        with self.lock:
+            self.in_flight -= 1
+            self.failures += failed
+            self.invalid += invalid
+            self.slow += slow
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {'calls': self.calls, 'failures': self.failures, 'invalid': self.invalid, 'slow': self.slow,
+                    'inFlight': self.in_flight, 'peakInFlight': self.peak_in_flight}
+
+
+def make_server(port: int = DEFAULT_PORT, latency_ms: float = 1500, sigma: float = 0.35,
+                slow_rate: float = 0.0, slow_ms: float = 20000, fail_rate: float = 0.0,
+                seed: int = None, invalid_rate: float = 0.0) -> ThreadingHTTPServer:
+    rng = random.Random(seed)
+    rng_lock = threading.Lock()
+    stats = StandinStats()
+    config = {'latencyMs': latency_ms, 'slowRate': slow_rate, 'slowMs': slow_ms, 'failRate': fail_rate,
+              'invalidRate': invalid_rate}
+
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status: int, payload: dict):
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path.rstrip('/') == '/stats':
+                self._send(200, stats.snapshot())
+            else:
+                self._send(404, {'error': {'message': 'not found'}})
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            body = json.loads(self.rfile.read(length) or b'{}')
+            if self.path.rstrip('/') == '/config':
+                with rng_lock:
+                    config.update({k: float(v) for k, v in body.items() if k in config})
+                    self._send(200, dict(config))
+                return
+            if not self.path.rstrip('/').endswith('/chat/completions'):
+                self._send(404, {'error': {'message': 'not found'}})
+                return
+
+            with rng_lock:
+                slow = rng.random() < config['slowRate']
+                failed = rng.random() < config['failRate']
+                invalid = not failed and rng.random() < config['invalidRate']
+                median = config['latencyMs']
+                delay = config['slowMs'] if slow else median * math.exp(rng.gauss(0, sigma)) if median else 0
+                reply = None if failed else completion(body, random.Random(rng.getrandbits(32)), invalid)
+
+            stats.enter()
+            try:
+                time.sleep(delay / 1000)
+            finally:
+                stats.leave(failed, slow, invalid)
+            if failed:
+                self._send(500, {'error': {'message': 'stand-in injected failure', 'type': 'server_error'}})
+            else:
+                self._send(200, reply)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('0.0.0.0', port), Handler)
+    server.daemon_threads = True
+    server.stats = stats
+    server.config = config
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='OpenAI-compatible stand-in for load tests')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--latency-ms', type=float, default=1500, help='Median completion latency')
+    parser.add_argument('--sigma', type=float, default=0.35, help='Log-normal spread of the latency')
+    parser.add_argument('--slow-rate', type=float, default=0.0, help='Share of calls that take --slow-ms')
+    parser.add_argument('--slow-ms', type=float, default=20000)
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='Share of calls answered with HTTP 500')
+    parser.add_argument('--invalid-rate', type=float, default=0.0, help='Share of calls answered with {}')
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("LLM STAND-IN")
+    print("=" * 60)
+    print(f"\n  http://localhost:{args.port}/v1  (median {args.latency_ms:.0f} ms, "
+          f"slow {args.slow_rate:.0%}, fail {args.fail_rate:.0%}, invalid {args.invalid_rate:.0%})")
+    print(f"  OPENAI_BASE_URL=http://localhost:{args.port}/v1\n")
+
+    server = make_server(args.port, args.latency_ms, args.sigma, args.slow_rate, args.slow_ms,
+                         args.fail_rate, args.seed, args.invalid_rate)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n✅ Stopped after {server.stats.snapshot()['calls']} calls")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Nightly metrics_daily Rollup
+----------------------------
+/api/stats/summary, /api/stats/weekly-trend and /api/stats/focus-breakdown
+rescan a user's raw workout rows on every call. This job keeps the
+metrics_daily table (one row per user per day) up to date so those numbers
+can be read from a handful of pre-aggregated rows instead.
+
+It will:
+1. Read the job watermarks (last processed id per source table) from
+   job_watermarks - see db_utils.get_watermarks()
+2. Collect the (user, day) buckets touched by user_workouts,
+   performance_logs and workout_events rows inserted since the watermark
+3. Recompute only those buckets from their source rows with pandas
+   group-bys (a day is always recomputed whole, so late rows are safe)
+4. COPY the results into metrics_daily with ON CONFLICT (user_id, date)
+   and advance the watermarks in the same transaction
+
+The numbers follow the stats endpoints in routes.ts:
+- a completed workout counts its stored duration, or 45 minutes when it has none
+- calories are estimated at 8 per active minute
+- volume is the sum of actual_weight * actual_reps over performance_logs
+- average RPE ignores sets logged without an RPE
+- personal records count pr_complete / pb_hit workout_events
+- days are UTC dates (the server runs in UTC)
+
+summary_view(), weekly_trend_view() and focus_breakdown_view() rebuild the
+endpoint responses from metrics_daily rows; the parity tests compare them
+against the live endpoints.
+
+Usage:
+    python scripts/metrics_daily_rollup.py            # incremental (nightly)
+    python scripts/metrics_daily_rollup.py --full     # rebuild every bucket
+"""
+
+import asyncio
+import argparse
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+from db_utils import connect, copy_upsert, fetch_dataframe, get_watermarks, set_watermarks
+from script_utils import js_round
+
+JOB_NAME = 'metrics_daily'
+DEFAULT_WORKOUT_MINUTES = 45
+CALORIES_PER_MINUTE = 8
+PR_EVENT_TYPES = ('pr_complete', 'pb_hit')
+TREND_WEEKS = 12
+# weekly-trend volume placeholder: 15 sets x 10 reps x 50 lbs per workout
+ESTIMATED_WORKOUT_VOLUME = 15 * 10 * 50
+
+# source table -> (timestamp column, columns loaded for aggregation)
+SOURCES = {
+    'user_workouts': ('completed_at', ['user_id', 'duration', 'completed_at']),
+    'performance_logs': ('logged_at', ['user_id', 'actual_weight', 'actual_reps', 'rpe', 'logged_at']),
+    'workout_events': ('achieved_at', ['user_id', 'event_type', 'achieved_at']),
+}
+
+METRIC_COLUMNS = [
+    'user_id', 'date', 'workouts_completed', 'total_volume', 'total_duration',
+    'average_rpe', 'personal_records', 'calories_burned',
+]
+
+
+def _day(values) -> pd.Series:
+    return pd.to_datetime(values, utc=True).dt.strftime('%Y-%m-%d')
+
+
+def aggregate_daily(workouts: pd.DataFrame, logs: pd.DataFrame, events: pd.DataFrame) -> pd.DataFrame:
+    """Roll source rows up to one metrics row per (user_id, date)"""
+    keys = ['user_id', 'date']
+    parts = []
+
+    if len(workouts):
+        w = pd.DataFrame({'user_id': workouts['user_id'], 'date': _day(workouts['completed_at'])})
+        duration = pd.to_numeric(workouts['duration'], errors='coerce').fillna(0)
+        w['minutes'] = duration.where(duration > 0, DEFAULT_WORKOUT_MINUTES)
+        parts.append(w.groupby(keys).agg(workouts_completed=('minutes', 'size'), total_duration=('minutes', 'sum')))
+
+    if len(logs):
+        l = pd.DataFrame({'user_id': logs['user_id'], 'date': _day(logs['logged_at'])})
+        weight = pd.to_numeric(logs['actual_weight'], errors='coerce').fillna(0)
+        reps = pd.to_numeric(logs['actual_reps'], errors='coerce').fillna(0)
+        l['volume'] = weight * reps
+        rpe = pd.to_numeric(logs['rpe'], errors='coerce')
+        l['rpe'] = rpe.where(rpe > 0)
+        parts.append(l.groupby(keys).agg(total_volume=('volume', 'sum'), average_rpe=('rpe', 'mean')))
+
+    if len(events):
+        e = events[events['event_type'].isin(PR_EVENT_TYPES)]
+        e = pd.DataFrame({'user_id': e['user_id'], 'date': _day(e['achieved_at'])})
+        parts.append(e.groupby(keys).size().rename('personal_records').to_frame())
+
+    if not parts:
+        return pd.DataFrame(columns=METRIC_COLUMNS)
+
+    daily = pd.concat(parts, axis=1).reset_index()
+    for column in ('workouts_completed', 'total_duration', 'total_volume', 'personal_records'):
+        daily[column] = daily[column].fillna(0).round().astype(int) if column in daily else 0
+    if 'average_rpe' not in daily:
+        daily['average_rpe'] = np.nan
+    # object dtype keeps None (NULL) instead of NaN for days without an RPE
+    daily['average_rpe'] = pd.Series(
+        [None if pd.isna(v) else int(js_round(v)) for v in daily['average_rpe']], index=daily.index, dtype=object)
+    daily['calories_burned'] = daily['total_duration'] * CALORIES_PER_MINUTE
+    daily['user_id'] = daily['user_id'].astype(int)
+    return daily[METRIC_COLUMNS].sort_values(keys, kind='mergesort').reset_index(drop=True)
+
+
+def metric_records(daily: pd.DataFrame, updated_at: datetime) -> list:
+    return [
+        (int(r.user_id), r.date, int(r.workouts_completed), int(r.total_volume), int(r.total_duration),
+         r.average_rpe, int(r.personal_records), int(r.calories_burned), updated_at)
+        for r in daily.itertuples(index=False)
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Endpoint views over metrics_daily rows (dicts or a DataFrame for one user)
+# ---------------------------------------------------------------------------
+
+def week_start(day: date) -> date:
+    """Sunday on or before `day` (JS getDay() is 0 for Sunday)"""
+    return day - timedelta(days=(day.weekday() + 1) % 7)
+
+
+def _rows(daily) -> list:
+    if isinstance(daily, pd.DataFrame):
+        daily = daily.to_dict('records')
+    return [(date.fromisoformat(r['date']), r) for r in daily]
+
+
+def _sum(rows, column, lo=None, hi=None) -> int:
+    return sum(int(r[column] or 0) for d, r in rows if (lo is None or d >= lo) and (hi is None or d < hi))
+
+
+def summary_view(daily, today: date, weekly_goal: int) -> dict:
+    """thisWeek/allTime blocks of GET /api/stats/summary (streaks come from calculateWorkoutStreak)"""
+    rows = _rows(daily)
+    this_week = week_start(today)
+    last_week = this_week - timedelta(days=7)
+    workouts = _sum(rows, 'workouts_completed', this_week)
+    last_workouts = _sum(rows, 'workouts_completed', last_week, this_week)
+    minutes = _sum(rows, 'total_duration', this_week)
+    last_minutes = _sum(rows, 'total_duration', last_week, this_week)
+    calories = _sum(rows, 'calories_burned', this_week)
+    last_calories = _sum(rows, 'calories_burned', last_week, this_week)
+    return {
+        'thisWeek': {
+            'workoutsCompleted': workouts,
+            'workoutsChange': workouts - last_workouts,
+            'activeMinutes': minutes,
+            'minutesChange': minutes - last_minutes,
+            'caloriesBurned': calories,
+            'caloriesChange': calories - last_calories,
+            'weeklyGoal': weekly_goal,
+            'goalProgress': int(js_round(workouts / weekly_goal * 100)),
+        },
+        'allTime': {
+            'totalWorkouts': _sum(rows, 'workouts_completed'),
+            'totalMinutes': _sum(rows, 'total_duration'),
+            'totalCalories': _sum(rows, 'calories_burned'),
+        },
+    }
+
+
+def weekly_trend_view(daily, today: date, weeks: int = TREND_WEEKS) -> dict:
+    """GET /api/stats/weekly-trend"""
+    rows = _rows(daily)
+    current = week_start(today)
+    result = []
+    for i in range(weeks - 1, -1, -1):
+        start = current - timedelta(days=7 * i)
+        end = start + timedelta(days=7)
+        count = _sum(rows, 'workouts_completed', start, end)
+        result.append({
+            'weekStart': start.isoformat(),
+            'weekLabel': f"{start.month}/{start.day}",
+            'workouts': count,
+            'minutes': _sum(rows, 'total_duration', start, end),
+            'volume': count * ESTIMATED_WORKOUT_VOLUME,
+        })
+    return {'weeks': result}
+
+
+def focus_breakdown_view(daily) -> list:
+    """`breakdown` of GET /api/stats/focus-breakdown.
+
+    user_workouts rows carry no workout type, so the endpoint files every
+    session under 'Full Body'.
+    """
+    total = _sum(_rows(daily), 'workouts_completed')
+    if not total:
+        return [{'category': c, 'sessions': 0, 'percentage': 25}
+                for c in ('Upper Body', 'Lower Body', 'Full Body', 'Cardio')]
+    return [{'category': 'Full Body', 'sessions': total, 'percentage': 100}]
+
+
+# ---------------------------------------------------------------------------
+# Database job
+# ---------------------------------------------------------------------------
+
+async def _max_ids(conn) -> dict:
+    return {
+        table: await conn.fetchval(f"SELECT COALESCE(MAX(id), 0) FROM {table}")
+        for table in SOURCES
+    }
+
+
+async def _touched_buckets(conn, since: dict, until: dict) -> set:
+    """(user_id, 'YYYY-MM-DD') buckets with rows in (since, until] for any source"""
+    buckets = set()
+    for table, (ts_column, _) in SOURCES.items():
+        if until[table] <= since[table]:
+            continue
+        rows = await conn.fetch(f"""
+            SELECT DISTINCT user_id, to_char({ts_column}, 'YYYY-MM-DD') AS day
+            FROM {table} WHERE id > $1 AND id <= $2
+        """, since[table], until[table])
+        buckets.update((r['user_id'], r['day']) for r in rows)
+    return buckets
+
+
+async def _load_sources(conn, buckets) -> dict:
+    """Source rows for the given buckets, or every row when buckets is None"""
+    frames = {}
+    if buckets is not None:
+        users = [b[0] for b in buckets]
+        days = [b[1] for b in buckets]
+    for table, (ts_column, columns) in SOURCES.items():
+        query = f"SELECT {', '.join(columns)} FROM {table}"
+        args = []
+        if buckets is not None:
+            query += f"""
+                WHERE (user_id, to_char({ts_column}, 'YYYY-MM-DD')) IN (
+                    SELECT * FROM unnest($1::integer[], $2::text[])
+                )
+            """
+            args = [users, days]
+        frames[table] = await fetch_dataframe(conn, query, *args)
+    return frames
+
+
+async def main():
+    parser = argparse.ArgumentParser(description='Roll workouts, logs and PR events up into metrics_daily')
+    parser.add_argument('--full', action='store_true', help='Ignore watermarks and rebuild every bucket')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("METRICS DAILY ROLLUP")
+    print("=" * 60)
+    print()
+
+    conn = await connect()
+    try:
+        names = {table: f"{JOB_NAME}:{table}" for table in SOURCES}
+        stored = await get_watermarks(conn, list(names.values()))
+        since = {table: 0 if args.full else stored[name] for table, name in names.items()}
+        # Fix the upper bound first so rows inserted while we run wait for the next run
+        until = await _max_ids(conn)
+        for table in SOURCES:
+            print(f"  {table:18} ids {since[table]} -> {until[table]}")
+
+        started = datetime.now(timezone.utc)
+        if args.full:
+            buckets = None
+        else:
+            buckets = await _touched_buckets(conn, since, until)
+            print(f"\n{len(buckets)} user/day buckets touched since the last run")
+            if not buckets:
+                print("\n✅ metrics_daily is up to date")
+                return
+
+        frames = await _load_sources(conn, buckets)
+        daily = aggregate_daily(frames['user_workouts'], frames['performance_logs'], frames['workout_events'])
+        elapsed = (datetime.now(timezone.utc) - started).total_seconds()
+        print(f"Aggregated {sum(len(f) for f in frames.values())} source rows "
+              f"into {len(daily)} daily rows in {elapsed:.2f}s")
+
+        updated_at = datetime.now(timezone.utc).replace(tzinfo=None)
+        async with conn.transaction():
+            written = await copy_upsert(
+                conn, 'metrics_daily', METRIC_COLUMNS + ['updated_at'], metric_records(daily, updated_at),
+                conflict=['user_id', 'date'],
+            )
+            await set_watermarks(conn, {names[table]: until[table] for table in SOURCES})
+        print(f"\n✅ Upserted {written} rows into metrics_daily")
+    finally:
+        await conn.close()
+    print("\nDone!")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
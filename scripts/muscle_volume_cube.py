@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Muscle Volume Cube
+------------------
+/api/stats/focus-breakdown re-reads every user_workouts row on each call, and
+any muscle-group breakdown, trend or heatmap would have to join sets to
+exercises the same way. This job keeps muscle_volume_weekly, a pre-aggregated
+cube of sets, reps, volume and time by user, ISO week, muscle group and body
+part, so those queries become a small read on (user_id, week).
+
+It will:
+1. Read the job watermarks for workout_sets and performance_logs from
+   job_watermarks - see db_utils.get_watermarks()
+2. Collect the (user, ISO week) buckets touched by rows inserted since then
+3. Recompute those weeks whole from their source rows with pandas:
+   - workout_sets count when completed (or with reps logged); body part and
+     muscle groups come from exercises
+   - performance_logs count actual_sets (1 when missing) unless skipped; the
+     log's own muscle_groups win over the exercise's
+4. Replace the cube rows of those buckets and advance the watermarks in one
+   transaction (a week can lose cells, so rows are deleted and re-COPYed)
+
+Cube cells:
+- a set is credited in full to every muscle group it lists ('unknown' when
+  none), so muscle-group rows overlap
+- each set is also counted once under muscle_group = '*' for its body part;
+  body-part and weekly totals must be read from the '*' rows
+- weeks are ISO weeks ('2025-W03', Monday start) of the UTC timestamp
+
+Usage:
+    python scripts/muscle_volume_cube.py            # incremental
+    python scripts/muscle_volume_cube.py --full     # rebuild every week
+"""
+
+import asyncio
+import argparse
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from db_utils import connect, fetch_dataframe, get_watermarks, set_watermarks
+
+JOB_NAME = 'muscle_cube'
+ALL_MUSCLES = '*'
+UNKNOWN = 'unknown'
+
+# source table -> query (with a {where} slot) returning user_id, performed_at, body_part,
+# muscle_groups, sets, reps, weight, duration; and the timestamp expression used for buckets
+SOURCES = {
+    'workout_sets': {
+        'query': """
+            SELECT uw.user_id, COALESCE(s.completed_at, uw.completed_at) AS performed_at,
+                   e.body_part, e.muscle_groups, 1 AS sets, s.actual_reps AS reps,
+                   s.actual_weight AS weight, s.actual_duration AS duration
+            FROM workout_sets s
+            JOIN user_workouts uw ON uw.id = s.user_workout_id
+            LEFT JOIN exercises e ON e.id = s.exercise_id
+            WHERE (s.is_completed OR s.actual_reps > 0) {where}
+        """,
+        'id': 's.id',
+        'user': 'uw.user_id',
+        'time': 'COALESCE(s.completed_at, uw.completed_at)',
+    },
+    'performance_logs': {
+        'query': """
+            SELECT pl.user_id, pl.logged_at AS performed_at,
+                   COALESCE(ei.body_part, es.body_part) AS body_part,
+                   CASE WHEN cardinality(pl.muscle_groups) > 0 THEN pl.muscle_groups
+                        ELSE COALESCE(ei.muscle_groups, es.muscle_groups) END AS muscle_groups,
+                   COALESCE(NULLIF(pl.actual_sets, 0), 1) AS sets, pl.actual_reps AS reps,
+                   pl.actual_weight AS weight, pl.actual_duration AS duration
+            FROM performance_logs pl
+            LEFT JOIN exercises ei ON ei.id::text = pl.exercise_id
+            LEFT JOIN exercises es ON es.slug = pl.exercise_id
+            WHERE NOT COALESCE(pl.skipped, false) {where}
+        """,
+        'id': 'pl.id',
+        'user': 'pl.user_id',
+        'time': 'pl.logged_at',
+    },
+}
+
+CUBE_COLUMNS = [
+    'user_id', 'week', 'week_start', 'muscle_group', 'body_part',
+    'sets', 'reps', 'volume', 'duration_seconds', 'updated_at',
+]
+
+CREATE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS muscle_volume_weekly (
+        id SERIAL PRIMARY KEY,
+        user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+        week TEXT NOT NULL,
+        week_start TEXT NOT NULL,
+        muscle_group TEXT NOT NULL,
+        body_part TEXT NOT NULL,
+        sets INTEGER DEFAULT 0,
+        reps INTEGER DEFAULT 0,
+        volume REAL DEFAULT 0,
+        duration_seconds INTEGER DEFAULT 0,
+        updated_at TIMESTAMP DEFAULT NOW() NOT NULL,
+        UNIQUE (user_id, week, muscle_group, body_part)
+    );
+    CREATE INDEX IF NOT EXISTS muscle_volume_weekly_user_id_week_idx ON muscle_volume_weekly (user_id, week);
+"""
+
+ISO_WEEK_SQL = "to_char({time}, 'IYYY-\"W\"IW')"
+
+
+def iso_week(values) -> pd.DataFrame:
+    """'YYYY-Www' ISO week and its Monday ('YYYY-MM-DD') for UTC timestamps"""
+    ts = pd.to_datetime(pd.Series(values), utc=True)
+    iso = ts.dt.isocalendar()
+    week = iso['year'].astype(str) + '-W' + iso['week'].astype(int).map('{:02d}'.format)
+    monday = (ts.dt.normalize() - pd.to_timedelta(ts.dt.weekday, unit='D')).dt.strftime('%Y-%m-%d')
+    return pd.DataFrame({'week': week.to_numpy(), 'week_start': monday.to_numpy()})
+
+
+def _label(value) -> str:
+    value = (value or '').strip().lower() if isinstance(value, str) else ''
+    return value or UNKNOWN
+
+
+def _muscles(value) -> list:
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return [UNKNOWN]
+    labels = sorted({_label(m) for m in value})
+    return labels or [UNKNOWN]
+
+
+def build_cube(sets: pd.DataFrame) -> pd.DataFrame:
+    """Aggregate set rows (the SOURCES columns) into cube cells"""
+    if sets.empty:
+        return pd.DataFrame(columns=CUBE_COLUMNS[:-1])
+    df = sets.reset_index(drop=True)
+    weeks = iso_week(df['performed_at'])
+    count = pd.to_numeric(df['sets'], errors='coerce').fillna(1)
+    reps = pd.to_numeric(df['reps'], errors='coerce').fillna(0)
+    weight = pd.to_numeric(df['weight'], errors='coerce').fillna(0)
+    facts = pd.DataFrame({
+        'user_id': df['user_id'].astype(int),
+        'week': weeks['week'],
+        'week_start': weeks['week_start'],
+        'body_part': df['body_part'].map(_label),
+        'muscle_group': df['muscle_groups'].map(_muscles),
+        'sets': count,
+        'reps': reps * count,
+        'volume': weight * reps * count,
+        'duration_seconds': pd.to_numeric(df['duration'], errors='coerce').fillna(0),
+    })
+    per_muscle = facts.explode('muscle_group')
+    totals = facts.assign(muscle_group=ALL_MUSCLES)
+    cube = pd.concat([per_muscle, totals], ignore_index=True).groupby(
+        ['user_id', 'week', 'week_start', 'muscle_group', 'body_part'], sort=True,
+    )[['sets', 'reps', 'volume', 'duration_seconds']].sum().reset_index()
+    for column in ('sets', 'reps', 'duration_seconds'):
+        cube[column] = cube[column].round().astype(int)
+    return cube
+
+
+def cube_records(cube: pd.DataFrame, updated_at: datetime) -> list:
+    return [
+        (int(r.user_id), r.week, r.week_start, r.muscle_group, r.body_part,
+         int(r.sets), int(r.reps), float(r.volume), int(r.duration_seconds), updated_at)
+        for r in cube.itertuples(index=False)
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Reads over cube rows (dicts or a DataFrame for one user)
+# ---------------------------------------------------------------------------
+
+def _scalar(value):
+    return value.item() if hasattr(value, 'item') else value
+
+
+def breakdown_view(cube, by: str = 'body_part', metric: str = 'sets') -> list:
+    """Share of `metric` per body part or muscle group, largest first.
+
+    Body parts read the '*' rows; muscle groups read the per-muscle rows, so a
+    set hitting two muscles counts towards both.
+    """
+    df = pd.DataFrame(cube)
+    if df.empty:
+        return []
+    rows = df[df['muscle_group'] == ALL_MUSCLES] if by == 'body_part' else df[df['muscle_group'] != ALL_MUSCLES]
+    totals = rows.groupby(by)[metric].sum().sort_values(ascending=False, kind='mergesort')
+    grand = df.loc[df['muscle_group'] == ALL_MUSCLES, metric].sum()
+    return [
+        {by: key, metric: _scalar(value),
+         'percentage': int(np.floor(value / grand * 100 + 0.5)) if grand else 0}
+        for key, value in totals.items()
+    ]
+
+
+def weekly_heatmap(cube, metric: str = 'sets') -> dict:
+    """{week: {muscle_group: metric}} from the per-muscle rows"""
+    df = pd.DataFrame(cube)
+    if df.empty:
+        return {}
+    rows = df[df['muscle_group'] != ALL_MUSCLES]
+    table = rows.pivot_table(index='week', columns='muscle_group', values=metric, aggfunc='sum', fill_value=0)
+    return {week: {m: _scalar(v) for m, v in row.items() if v} for week, row in table.iterrows()}
+
+
+# ---------------------------------------------------------------------------
+# Database job
+# ---------------------------------------------------------------------------
+
+async def _max_ids(conn) -> dict:
+    return {table: await conn.fetchval(f"SELECT COALESCE(MAX(id), 0) FROM {table}") for table in SOURCES}
+
+
+async def _touched_buckets(conn, since: dict, until: dict) -> set:
+    """(user_id, 'YYYY-Www') buckets with new rows in (since, until] for any source"""
+    buckets = set()
+    for table, spec in SOURCES.items():
+        if until[table] <= since[table]:
+            continue
+        query = spec['query'].format(where=f"AND {spec['id']} > $1 AND {spec['id']} <= $2")
+        rows = await conn.fetch(f"""
+            SELECT DISTINCT user_id, {ISO_WEEK_SQL.format(time='performed_at')} AS week FROM ({query}) src
+            WHERE performed_at IS NOT NULL
+        """, since[table], until[table])
+        buckets.update((r['user_id'], r['week']) for r in rows)
+    return buckets
+
+
+async def _load_sets(conn, buckets) -> pd.DataFrame:
+    """Set rows of every source for the given buckets, or all rows when buckets is None"""
+    frames = []
+    for spec in SOURCES.values():
+        if buckets is None:
+            query, args = spec['query'].format(where=f"AND {spec['time']} IS NOT NULL"), []
+        else:
+            week = ISO_WEEK_SQL.format(time=spec['time'])
+            query = spec['query'].format(where=f"""
+                AND ({spec['user']}, {week}) IN (SELECT * FROM unnest($1::integer[], $2::text[]))
+            """)
+            args = [[b[0] for b in buckets], [b[1] for b in buckets]]
+        frames.append(await fetch_dataframe(conn, query, *args))
+    frames = [f for f in frames if len(f)]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description='Maintain the weekly muscle group / body part volume cube')
+    parser.add_argument('--full', action='store_true', help='Ignore watermarks and rebuild every week')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("MUSCLE VOLUME CUBE")
+    print("=" * 60)
+    print()
+
+    conn = await connect()
+    try:
+        await conn.execute(CREATE_TABLE_SQL)
+        names = {table: f"{JOB_NAME}:{table}" for table in SOURCES}
+        stored = await get_watermarks(conn, list(names.values()))
+        since = {table: 0 if args.full else stored[name] for table, name in names.items()}
+        # Fix the upper bound first so rows inserted while we run wait for the next run
+        until = await _max_ids(conn)
+        for table in SOURCES:
+            print(f"  {table:18} ids {since[table]} -> {until[table]}")
+
+        started = datetime.now(timezone.utc)
+        if args.full:
+            buckets = None
+        else:
+            buckets = await _touched_buckets(conn, since, until)
+            print(f"\n{len(buckets)} user/week buckets touched since the last run")
+            if not buckets:
+                print("\n✅ muscle_volume_weekly is up to date")
+                return
+
+        sets = await _load_sets(conn, buckets)
+        cube = build_cube(sets)
+        elapsed = (datetime.now(timezone.utc) - started).total_seconds()
+        print(f"Aggregated {len(sets)} set rows into {len(cube)} cube cells in {elapsed:.2f}s")
+
+        updated_at = datetime.now(timezone.utc).replace(tzinfo=None)
+        async with conn.transaction():
+            if buckets is None:
+                await conn.execute("TRUNCATE muscle_volume_weekly")
+            else:
+                await conn.execute("""
+                    DELETE FROM muscle_volume_weekly
+                    WHERE (user_id, week) IN (SELECT * FROM unnest($1::integer[], $2::text[]))
+                """, [b[0] for b in buckets], [b[1] for b in buckets])
+            await conn.copy_records_to_table(
+                'muscle_volume_weekly', records=cube_records(cube, updated_at), columns=CUBE_COLUMNS)
+            await set_watermarks(conn, {names[table]: until[table] for table in SOURCES})
+        print(f"\n✅ Wrote {len(cube)} rows into muscle_volume_weekly")
+    finally:
+        await conn.close()
+    print("\nDone!")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
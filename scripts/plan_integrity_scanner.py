@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Plan Integrity Scanner
+----------------------
+backend_test.py checks the plan invariants - no REST-ONLY plans and
+workoutsCount >= trainingDaysPerWeek - for three QA profiles through
+/api/qa/login-as. This scanner checks them for every user straight from
+workout_days, so a regression shows up across the whole population.
+
+It will:
+1. Walk users in id order in chunks of --chunk-size (keyset pagination, one
+   users query and one workout_days query per chunk, --concurrency chunks in
+   flight through an asyncpg pool)
+2. Evaluate each chunk in a process pool: group the user's days into
+   Monday-Sunday weeks inside the window (default: this week and next) and
+   count real workouts with the rules of workout-validation.ts isRealWorkout()
+   against the effective training days of plan-service.ts
+   getEffectiveTrainingDays(); days still pending/generating count as
+   workouts, as in getPlanStatus()
+3. Flag per user-week:
+   - rest_only: days exist but none is a real workout
+   - under_filled: fewer real workouts than training days
+   - stuck: days in status error, or pending/generating for over --stuck-minutes
+4. For users with a rest_only or under_filled week, load all of their
+   workout_days rows and check them the way ensurePlan() does - it validates
+   the whole plan at once, not week by week
+5. Write a compact JSON report (counts, timings and one row per violation)
+   to --out, and the ids of the users ensurePlan() would regenerate, one per
+   line, to --ids-out to feed to POST /api/workouts/plan/ensure. Users whose
+   bad week is covered by the rest of their plan are only in the report.
+
+Usage:
+    python scripts/plan_integrity_scanner.py [--chunk-size 2000] [--concurrency 4] [--workers 4]
+    python scripts/plan_integrity_scanner.py --from 2025-01-06 --to 2025-01-19 --out report.json
+"""
+
+import os
+import json
+import time
+import asyncio
+import argparse
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+
+from db_utils import create_pool
+
+DEFAULT_CHUNK_SIZE = 2000
+DEFAULT_CONCURRENCY = 4
+DEFAULT_STUCK_MINUTES = 30
+SAMPLE_LIMIT = 10
+
+IN_PROGRESS = ('pending', 'generating')
+REST_TYPES = ('rest', 'recovery', 'active_recovery', 'external_activity', 'off', 'none', 'skip', 'skipped')
+VIOLATION_COLUMNS = ['user_id', 'week_start', 'kind', 'real_workouts', 'training_days', 'days']
+
+
+def is_real_workout(day: dict) -> bool:
+    """workout-validation.ts isRealWorkout() on the fields ensurePlan() maps from payloadJson"""
+    if day.get('isRestDay') or day.get('isActivityDay') or day.get('isSkipped'):
+        return False
+    kind = str(day.get('type') or day.get('workoutType') or day.get('focus') or '').lower()
+    if any(rt in kind for rt in REST_TYPES):
+        return False
+    exercises = day.get('exercises')
+    if exercises is not None and len(exercises) == 0 and kind not in ('pending', 'generating'):
+        return False
+    title = str(day.get('title') or '').lower()
+    return not any(rt in title for rt in REST_TYPES)
+
+
+def validation_day(payload) -> dict:
+    """The WorkoutDay ensurePlan() builds from a workout_days row"""
+    payload = payload if isinstance(payload, dict) else {}
+    return {
+        'focus': payload.get('focus') or payload.get('type'),
+        'type': payload.get('type') or payload.get('workoutType'),
+        'workoutType': payload.get('workoutType'),
+        'isRestDay': payload.get('isRestDay'),
+        'isActivityDay': payload.get('isActivityDay'),
+        'isSkipped': payload.get('isSkipped'),
+        'exercises': payload.get('exercises') or [],
+        'title': payload.get('title'),
+    }
+
+
+def plan_status_counts(payload) -> bool:
+    """plan-service.ts getPlanStatus(): whether a row counts toward an existing plan"""
+    if not isinstance(payload, dict) or payload.get('isRestDay') or payload.get('isActivityDay') \
+            or payload.get('type') == 'rest':
+        return False
+    return bool(payload.get('exercises')) or payload.get('type') == 'generating' or payload.get('status') == 'pending'
+
+
+def in_progress(status, payload) -> bool:
+    """A day still being generated - its payload may be null until it is written"""
+    payload = payload if isinstance(payload, dict) else {}
+    return status in IN_PROGRESS or payload.get('type') == 'generating' or payload.get('status') == 'pending'
+
+
+def effective_training_days(training_days_per_week, preferred_training_days) -> int:
+    """plan-service.ts getEffectiveTrainingDays() (users has no training_days column)"""
+    requested = training_days_per_week or 3
+    preferred = []
+    if preferred_training_days:
+        try:
+            parsed = json.loads(preferred_training_days) if isinstance(preferred_training_days, str) \
+                else preferred_training_days
+            preferred = parsed if isinstance(parsed, list) else []
+        except ValueError:
+            preferred = []
+    return min(requested, len(preferred)) if preferred else requested
+
+
+def _week_start(day: str) -> str:
+    d = date.fromisoformat(day)
+    return (d - timedelta(days=d.weekday())).isoformat()
+
+
+def evaluate_chunk(users: list, days: list, stuck_before: datetime) -> tuple:
+    """(stats, violations) for users (id, training_days_per_week, preferred_training_days)
+    and their days (user_id, date, status, payload_json, updated_at) in the window"""
+    weeks = {}
+    for user_id, day, status, payload, updated_at in days:
+        weeks.setdefault(user_id, {}).setdefault(_week_start(day), []).append((status, payload, updated_at))
+
+    stats = Counter(users=len(users), days=len(days))
+    violations = []
+    for user_id, per_week, preferred in users:
+        user_weeks = weeks.get(user_id)
+        if not user_weeks:
+            stats['users_without_plan'] += 1
+            continue
+        frequency = effective_training_days(per_week, preferred)
+        for week, rows in sorted(user_weeks.items()):
+            stats['weeks'] += 1
+            real = sum(1 for status, payload, _ in rows
+                       if in_progress(status, payload) or is_real_workout(validation_day(payload)))
+            found = []
+            if real == 0:
+                found.append('rest_only')
+            elif real < frequency:
+                found.append('under_filled')
+            if any(status == 'error' or (status in IN_PROGRESS and updated_at < stuck_before)
+                   for status, _, updated_at in rows):
+                found.append('stuck')
+            for kind in found:
+                stats[kind] += 1
+                violations.append((user_id, week, kind, real, frequency, len(rows)))
+    return stats, violations
+
+
+def ensure_regenerates(rows: list, frequency: int) -> bool:
+    """ensurePlan() on all of a user's (status, payload_json) rows: it generates when
+    getPlanStatus() finds no plan, else regenerates when validatePlan() finds fewer
+    real workouts than training days across the whole plan"""
+    if not any(plan_status_counts(payload) for _, payload in rows):
+        return True
+    real = sum(1 for _, payload in rows if is_real_workout(validation_day(payload)))
+    return real < frequency
+
+
+def ensure_ids(violations: list, plans: dict) -> list:
+    """Users with a rest_only or under_filled week that /api/workouts/plan/ensure would
+    regenerate; plans maps user_id to all of the user's (status, payload_json) rows.
+    A week that is merely stuck is reported but not listed."""
+    frequency = {row[0]: row[4] for row in violations if row[2] in ('rest_only', 'under_filled')}
+    return sorted(user_id for user_id, days in frequency.items()
+                  if ensure_regenerates(plans.get(user_id, []), days))
+
+
+async def scan(pool, executor, window: tuple, chunk_size: int, concurrency: int, stuck_before: datetime,
+               progress=None) -> tuple:
+    """Stream users in id order, chunk by chunk; evaluation runs in the executor"""
+    loop = asyncio.get_running_loop()
+    totals, violations, ids = Counter(), [], []
+    cursor = {'last_id': 0, 'done': False}
+    cursor_lock = asyncio.Lock()
+
+    async def next_chunk():
+        async with cursor_lock:
+            if cursor['done']:
+                return None
+            async with pool.acquire() as conn:
+                users = await conn.fetch("""
+                    SELECT id, training_days_per_week, preferred_training_days FROM users
+                    WHERE id > $1 ORDER BY id LIMIT $2
+                """, cursor['last_id'], chunk_size)
+            if len(users) < chunk_size:
+                cursor['done'] = True
+            if not users:
+                return None
+            cursor['last_id'] = users[-1]['id']
+            return [tuple(u) for u in users]
+
+    async def worker():
+        while True:
+            users = await next_chunk()
+            if users is None:
+                return
+            async with pool.acquire() as conn:
+                days = await conn.fetch("""
+                    SELECT user_id, date, status, payload_json, updated_at FROM workout_days
+                    WHERE user_id = ANY($1::integer[]) AND date >= $2 AND date <= $3
+                """, [u[0] for u in users], window[0], window[1])
+            stats, found = await loop.run_in_executor(
+                executor, evaluate_chunk, users, [tuple(d) for d in days], stuck_before)
+            candidates = sorted({row[0] for row in found if row[2] in ('rest_only', 'under_filled')})
+            plans = {}
+            if candidates:
+                async with pool.acquire() as conn:
+                    rows = await conn.fetch(
+                        "SELECT user_id, status, payload_json FROM workout_days WHERE user_id = ANY($1::integer[])",
+                        candidates)
+                for row in rows:
+                    plans.setdefault(row['user_id'], []).append((row['status'], row['payload_json']))
+            totals.update(stats)
+            violations.extend(found)
+            ids.extend(ensure_ids(found, plans))
+            if progress:
+                progress(totals)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return totals, violations, sorted(ids)
+
+
+def build_report(totals: Counter, violations: list, window: tuple, elapsed: float) -> dict:
+    violations = sorted(violations)
+    samples = {}
+    for row in violations:
+        kind_rows = samples.setdefault(row[2], [])
+        if len(kind_rows) < SAMPLE_LIMIT:
+            kind_rows.append(row[0])
+    return {
+        'scannedAt': datetime.now(timezone.utc).isoformat(),
+        'window': {'from': window[0], 'to': window[1]},
+        'users': totals['users'],
+        'usersWithoutPlan': totals['users_without_plan'],
+        'weeks': totals['weeks'],
+        'days': totals['days'],
+        'elapsedSeconds': round(elapsed, 2),
+        'violations': {kind: totals[kind] for kind in ('rest_only', 'under_filled', 'stuck')},
+        'affectedUsers': len({row[0] for row in violations}),
+        'sampleUserIds': samples,
+        'columns': VIOLATION_COLUMNS,
+        'rows': [list(row) for row in violations],
+    }
+
+
+async def main():
+    today = datetime.now(timezone.utc).date()
+    monday = today - timedelta(days=today.weekday())
+
+    parser = argparse.ArgumentParser(description='Check plan invariants for every user')
+    parser.add_argument('--from', dest='start', default=monday.isoformat(), help='First date (YYYY-MM-DD)')
+    parser.add_argument('--to', dest='end', default=(monday + timedelta(days=13)).isoformat(),
+                        help='Last date (YYYY-MM-DD)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help='Chunks in flight')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2, help='Evaluation processes')
+    parser.add_argument('--stuck-minutes', type=int, default=DEFAULT_STUCK_MINUTES)
+    parser.add_argument('--out', default='plan_integrity_report.json')
+    parser.add_argument('--ids-out', default='plan_ensure_user_ids.txt')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("PLAN INTEGRITY SCANNER")
+    print("=" * 60)
+    print()
+
+    window = (args.start, args.end)
+    stuck_before = (datetime.now(timezone.utc) - timedelta(minutes=args.stuck_minutes)).replace(tzinfo=None)
+    print(f"  Window {window[0]} -> {window[1]}, chunks of {args.chunk_size}, "
+          f"{args.concurrency} in flight, {args.workers} workers")
+
+    last_report = [0]
+
+    def progress(totals):
+        if totals['users'] - last_report[0] >= 50000:
+            last_report[0] = totals['users']
+            print(f"  {totals['users']:,} users scanned")
+
+    pool = await create_pool(max_size=args.concurrency)
+    started = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            totals, violations, ids = await scan(pool, executor, window, args.chunk_size, args.concurrency,
+                                            stuck_before, progress)
+    finally:
+        await pool.close()
+    elapsed = time.perf_counter() - started
+
+    report = build_report(totals, violations, window, elapsed)
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(report, f)
+    with open(args.ids_out, 'w', encoding='utf-8') as f:
+        f.writelines(f"{user_id}\n" for user_id in ids)
+
+    print(f"\n  {report['users']:,} users, {report['weeks']:,} plan weeks, {report['days']:,} days "
+          f"in {elapsed:.1f}s ({report['users'] / elapsed if elapsed else 0:,.0f} users/s)")
+    print(f"  {report['usersWithoutPlan']:,} users have no days in the window")
+    for kind, count in report['violations'].items():
+        print(f"  {kind:13} {count:6}   e.g. users {report['sampleUserIds'].get(kind, [])[:5]}")
+
+    invalid_weeks = {row[0] for row in violations if row[2] in ('rest_only', 'under_filled')}
+    print(f"  {len(invalid_weeks) - len(ids):,} users with a bad week have a plan ensure would keep as is")
+
+    status = '✅' if not violations else '❌'
+    print(f"\n{status} {len(ids)} users need a plan ensure - report in {args.out}, ids in {args.ids_out}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Plan Pre-generation Scheduler
+-----------------------------
+Next week's workouts are generated when the client calls
+/api/workouts/rolling-regeneration, so everyone whose plan runs out on Sunday
+hits the generator at the same time and waits on their first app open. This
+scheduler generates the upcoming week ahead of time instead, through
+POST /api/workouts/plan/pregenerate (X-Scheduler-Key = PLAN_SCHEDULER_KEY).
+
+It will:
+1. Find active users (a workout or a planned day in the last --active-days)
+   whose plan window - their last workout_days date - ends within
+   --lead-hours, and queue the week after it in plan_pregeneration_queue
+2. Estimate each user's next app open from when they usually train (their
+   most common hour on the weekdays they train, from user_workouts and
+   completed workout_days) and work through the queue in that order
+3. Start at most --rate weeks per minute with --concurrency in flight, so the
+   spike is spread over the lead time instead of hitting the LLM at once
+4. Track every job in the queue table (pending -> running -> done/failed,
+   with attempts and the last error), so a crashed run is simply started
+   again: running jobs older than --lease-minutes are picked up again, and
+   the endpoint skips days that are already generated
+
+Run it from cron every 15-30 minutes.
+
+Usage:
+    python scripts/plan_pregeneration_scheduler.py --url http://localhost:5000 [--lead-hours 48] [--rate 30]
+    python scripts/plan_pregeneration_scheduler.py --url http://localhost:5000 --dry-run
+"""
+
+import os
+import time
+import heapq
+import asyncio
+import argparse
+from collections import Counter
+from datetime import date, datetime, time as dtime, timedelta, timezone
+
+from db_utils import connect
+
+DEFAULT_ACTIVE_DAYS = 28
+DEFAULT_LEAD_HOURS = 48
+DEFAULT_RATE = 30
+DEFAULT_CONCURRENCY = 4
+DEFAULT_LEASE_MINUTES = 15
+HISTORY_DAYS = 56
+MAX_ATTEMPTS = 3
+REQUEST_TIMEOUT = 600
+
+CREATE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS plan_pregeneration_queue (
+        id SERIAL PRIMARY KEY,
+        user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+        week_start TEXT NOT NULL,
+        week_number INTEGER NOT NULL DEFAULT 1,
+        expected_open TIMESTAMP NOT NULL,
+        status TEXT NOT NULL DEFAULT 'pending',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        last_error TEXT,
+        created_at TIMESTAMP DEFAULT NOW() NOT NULL,
+        updated_at TIMESTAMP DEFAULT NOW() NOT NULL,
+        UNIQUE (user_id, week_start)
+    );
+    CREATE INDEX IF NOT EXISTS plan_pregeneration_queue_status_idx
+        ON plan_pregeneration_queue (status, expected_open);
+"""
+
+
+def week_start(day: date) -> date:
+    """Monday of the week (week-generator.ts weeks run Monday-Sunday)"""
+    return day - timedelta(days=day.weekday())
+
+
+def expected_next_open(events: list, now: datetime, fallback: datetime) -> datetime:
+    """Next time the user is likely to open the app: their usual training hour
+    on the next of their usual weekdays (fallback when there is no history)"""
+    if not events:
+        return fallback
+    usual_hour = Counter(e.hour for e in events).most_common(1)[0][0]
+    weekdays = {e.weekday() for e in events}
+    for offset in range(8):
+        day = now.date() + timedelta(days=offset)
+        candidate = datetime.combine(day, dtime(usual_hour))
+        if day.weekday() in weekdays and candidate > now:
+            return candidate
+    return fallback
+
+
+def plan_jobs(users: list, events: dict, now: datetime, lead: timedelta) -> list:
+    """Queue entries (user_id, week_start, week_number, expected_open) for users
+    whose plan ends within `lead`. users: (user_id, first_day, plan_end) rows"""
+    jobs = []
+    for user_id, first_day, plan_end in users:
+        if plan_end is None:
+            continue  # no plan yet: onboarding / plan ensure creates the first week
+        expires = datetime.combine(plan_end + timedelta(days=1), dtime())
+        if expires - now > lead:
+            continue
+        target = week_start(plan_end + timedelta(days=1))
+        week_number = (target - week_start(first_day)).days // 7 + 1
+        # Users without history are expected when the plan runs out
+        expected = expected_next_open(events.get(user_id, []), now, max(expires, now))
+        jobs.append((user_id, target.isoformat(), week_number, expected))
+    return jobs
+
+
+class RateLimiter:
+    """Token bucket: `per_minute` starts per minute, at most `burst` at once"""
+
+    def __init__(self, per_minute: float, burst: int = 1, clock=time.monotonic):
+        self.interval = 60.0 / per_minute
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.clock = clock
+        self.updated = clock()
+
+    def reserve(self) -> float:
+        """Take a token; seconds to wait before using it"""
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) / self.interval)
+        self.updated = now
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens * self.interval
+
+    async def acquire(self):
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+async def find_candidates(conn, now: datetime, active_days: int) -> tuple:
+    """(users, events): plan window per active user and their recent activity times"""
+    since = now - timedelta(days=active_days)
+    users = await conn.fetch("""
+        WITH active AS (
+            SELECT user_id FROM user_workouts WHERE completed_at >= $1
+            UNION
+            SELECT user_id FROM workout_days WHERE date >= $2 OR completed_at >= $1
+        )
+        SELECT a.user_id, MIN(d.date) AS first_day, MAX(d.date) AS plan_end
+        FROM active a LEFT JOIN workout_days d ON d.user_id = a.user_id
+        GROUP BY a.user_id
+    """, since, since.date().isoformat())
+    users = [(r['user_id'],
+              date.fromisoformat(r['first_day']) if r['first_day'] else None,
+              date.fromisoformat(r['plan_end']) if r['plan_end'] else None) for r in users]
+
+    ids = [u[0] for u in users if u[2] is not None]
+    rows = await conn.fetch("""
+        SELECT user_id, completed_at AS at FROM user_workouts
+        WHERE user_id = ANY($1::integer[]) AND completed_at >= $2
+        UNION ALL
+        SELECT user_id, completed_at FROM workout_days
+        WHERE user_id = ANY($1::integer[]) AND completed_at >= $2
+    """, ids, now - timedelta(days=HISTORY_DAYS))
+    events = {}
+    for r in rows:
+        events.setdefault(r['user_id'], []).append(r['at'])
+    return users, events
+
+
+async def enqueue(conn, jobs: list) -> int:
+    """Add jobs; a pending job for the same week only gets its priority refreshed"""
+    if not jobs:
+        return 0
+    before = await conn.fetchval("SELECT COUNT(*) FROM plan_pregeneration_queue")
+    await conn.executemany("""
+        INSERT INTO plan_pregeneration_queue (user_id, week_start, week_number, expected_open)
+        VALUES ($1, $2, $3, $4)
+        ON CONFLICT (user_id, week_start) DO UPDATE SET expected_open = EXCLUDED.expected_open, updated_at = NOW()
+        WHERE plan_pregeneration_queue.status = 'pending'
+    """, jobs)
+    return await conn.fetchval("SELECT COUNT(*) FROM plan_pregeneration_queue") - before
+
+
+async def claim(conn, job_id: int, lease: timedelta) -> bool:
+    """Mark a job running; False when another scheduler holds it"""
+    claimed = await conn.fetchval("""
+        UPDATE plan_pregeneration_queue
+        SET status = 'running', attempts = attempts + 1, updated_at = NOW()
+        WHERE id = $1 AND (status = 'pending' OR (status = 'running' AND updated_at < NOW() - $2::interval))
+        RETURNING id
+    """, job_id, lease)
+    return claimed is not None
+
+
+async def finish(conn, job_id: int, error: str = None):
+    if error is None:
+        await conn.execute("""
+            UPDATE plan_pregeneration_queue SET status = 'done', last_error = NULL, updated_at = NOW() WHERE id = $1
+        """, job_id)
+    else:
+        await conn.execute("""
+            UPDATE plan_pregeneration_queue
+            SET status = CASE WHEN attempts >= $2 THEN 'failed' ELSE 'pending' END,
+                last_error = $3, updated_at = NOW()
+            WHERE id = $1
+        """, job_id, MAX_ATTEMPTS, error[:500])
+
+
+def pregenerate(url: str, key: str, user_id: int, week: str, week_number: int) -> str:
+    """Call the endpoint; None on success, else the error"""
+    import requests
+
+    try:
+        response = requests.post(f"{url.rstrip('/')}/api/workouts/plan/pregenerate",
+                                 json={'userId': user_id, 'weekStart': week, 'weekNumber': week_number},
+                                 headers={'X-Scheduler-Key': key}, timeout=REQUEST_TIMEOUT)
+    except Exception as e:
+        return f"{type(e).__name__}: {e}"
+    if response.status_code == 200:
+        return None
+    try:
+        return f"HTTP {response.status_code}: {response.json().get('error')}"
+    except ValueError:
+        return f"HTTP {response.status_code}"
+
+
+async def run_queue(conn, url: str, key: str, rate: float, concurrency: int, lease: timedelta) -> Counter:
+    rows = await conn.fetch("""
+        SELECT id, user_id, week_start, week_number, expected_open FROM plan_pregeneration_queue
+        WHERE (status = 'pending' OR (status = 'running' AND updated_at < NOW() - $1::interval))
+          AND attempts < $2
+    """, lease, MAX_ATTEMPTS)
+    heap = [(r['expected_open'], r['id'], r['user_id'], r['week_start'], r['week_number']) for r in rows]
+    heapq.heapify(heap)
+    print(f"  {len(heap)} jobs ready to run")
+
+    limiter = RateLimiter(rate, burst=concurrency)
+    slots = asyncio.Semaphore(concurrency)
+    db_lock = asyncio.Lock()  # one connection: serialise the queue updates
+    outcome = Counter()
+
+    async def run(job):
+        expected, job_id, user_id, week, week_number = job
+        try:
+            async with db_lock:
+                if not await claim(conn, job_id, lease):
+                    outcome['taken'] += 1
+                    return
+            started = time.perf_counter()
+            error = await asyncio.to_thread(pregenerate, url, key, user_id, week, week_number)
+            async with db_lock:
+                await finish(conn, job_id, error)
+            outcome['failed' if error else 'done'] += 1
+            status = f"❌ {error}" if error else '✅'
+            print(f"  user {user_id} week {week} (open ~{expected:%a %H:00}) "
+                  f"{time.perf_counter() - started:.1f}s {status}")
+        finally:
+            slots.release()
+
+    tasks = []
+    while heap:
+        job = heapq.heappop(heap)
+        await slots.acquire()
+        await limiter.acquire()
+        tasks.append(asyncio.create_task(run(job)))
+    await asyncio.gather(*tasks)
+    return outcome
+
+
+async def main():
+    parser = argparse.ArgumentParser(description='Pre-generate upcoming workout weeks for active users')
+    parser.add_argument('--url', required=True, help='Backend base URL')
+    parser.add_argument('--key', default=os.environ.get('PLAN_SCHEDULER_KEY'), help='Scheduler key')
+    parser.add_argument('--active-days', type=int, default=DEFAULT_ACTIVE_DAYS)
+    parser.add_argument('--lead-hours', type=float, default=DEFAULT_LEAD_HOURS,
+                        help='Queue users whose plan ends within this many hours')
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE, help='Weeks started per minute')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help='Weeks in flight')
+    parser.add_argument('--lease-minutes', type=int, default=DEFAULT_LEASE_MINUTES,
+                        help='Running jobs older than this are treated as crashed')
+    parser.add_argument('--dry-run', action='store_true', help='Queue jobs but do not run them')
+    args = parser.parse_args()
+
+    if not args.key and not args.dry_run:
+        parser.error('--key (or PLAN_SCHEDULER_KEY) is required')
+
+    print("=" * 60)
+    print("PLAN PRE-GENERATION SCHEDULER")
+    print("=" * 60)
+    print()
+
+    conn = await connect()
+    try:
+        await conn.execute(CREATE_TABLE_SQL)
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        users, events = await find_candidates(conn, now, args.active_days)
+        jobs = plan_jobs(users, events, now, timedelta(hours=args.lead_hours))
+        added = await enqueue(conn, jobs)
+        print(f"  {len(users)} active users, {len(jobs)} plans ending within {args.lead_hours:g}h "
+              f"({added} newly queued)")
+
+        if args.dry_run:
+            for user_id, week, _, expected in sorted(jobs, key=lambda j: j[3])[:20]:
+                print(f"  user {user_id}: week of {week}, expected open {expected:%Y-%m-%d %H:00}")
+            print("\n✅ Dry run - nothing generated")
+            return
+
+        lease = timedelta(minutes=args.lease_minutes)
+        started = time.perf_counter()
+        outcome = await run_queue(conn, args.url, args.key, args.rate, args.concurrency, lease)
+        elapsed = time.perf_counter() - started
+        print(f"\n✅ {outcome['done']} weeks generated, {outcome['failed']} failed, "
+              f"{outcome['taken']} held by another run ({elapsed:.0f}s)")
+    finally:
+        await conn.close()
+    print("\nDone!")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
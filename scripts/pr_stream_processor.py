@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Personal Record Stream Processor
+--------------------------------
+PR badges and the coach's "recent PRs" used to be worked out by rescanning a
+user's whole history. This processor consumes new performance_logs and
+workout_sets rows in order and keeps the running bests for every
+(user, exercise) pair, so deciding whether a set is a PR is a single lookup.
+
+It will:
+1. Resume from the job watermarks (last consumed id per source table)
+2. Read the next batch of completed sets from both sources, ordered by the
+   time they were performed
+3. Load the bests for any (user, exercise) pair not yet in memory from
+   pr_state
+4. Compare each set against best weight, best reps and best estimated 1RM
+   (Epley, as calculateOneRM in routes.ts) and update the bests
+5. COPY one pb_hit event per record-breaking set into workout_events, upsert
+   the changed pr_state rows and advance the watermarks in one transaction
+
+The first set ever seen for an exercise only sets the baseline; a PR is a
+set that beats an earlier best. Exercises are keyed by their id as text, so
+performance_logs.exercise_id and workout_sets.exercise_id share state when
+they refer to the same exercise.
+
+Usage:
+    python scripts/pr_stream_processor.py                 # drain the backlog and exit
+    python scripts/pr_stream_processor.py --follow        # keep polling for new sets
+    python scripts/pr_stream_processor.py --batch-size 5000 --poll-interval 10
+"""
+
+import json
+import asyncio
+import argparse
+from array import array
+from datetime import datetime, timezone
+
+from db_utils import connect, copy_upsert, get_watermarks, set_watermarks
+
+JOB_NAME = 'pr_stream'
+PR_EVENT_TYPE = 'pb_hit'
+RECORD_KINDS = ('weight', 'reps', 'e1rm')
+DEFAULT_BATCH_SIZE = 2000
+
+# source table -> query for the next batch of completed sets after a watermark
+SOURCE_QUERIES = {
+    'performance_logs': """
+        SELECT id, user_id, exercise_id::text AS exercise_key, exercise_name,
+               NULL::integer AS exercise_id, NULL::integer AS user_workout_id, NULL::integer AS set_id,
+               actual_weight, actual_reps, logged_at AS performed_at
+        FROM performance_logs
+        WHERE id > $1 AND NOT COALESCE(skipped, false)
+        ORDER BY id LIMIT $2
+    """,
+    'workout_sets': """
+        SELECT s.id, uw.user_id, s.exercise_id::text AS exercise_key, e.name AS exercise_name,
+               s.exercise_id, s.user_workout_id, s.id AS set_id,
+               s.actual_weight, s.actual_reps, s.completed_at AS performed_at
+        FROM workout_sets s
+        JOIN user_workouts uw ON uw.id = s.user_workout_id
+        JOIN exercises e ON e.id = s.exercise_id
+        WHERE s.id > $1 AND s.completed_at IS NOT NULL
+        ORDER BY s.id LIMIT $2
+    """,
+}
+
+STATE_COLUMNS = ['user_id', 'exercise_key', 'best_weight', 'best_reps', 'best_e1rm', 'updated_at']
+EVENT_COLUMNS = ['user_id', 'user_workout_id', 'event_type', 'exercise_id', 'set_id', 'event_data', 'achieved_at']
+
+
+def one_rm(weight: float, reps: float) -> float:
+    """calculateOneRM(): reps == 1 -> weight, else Epley weight * (1 + reps/30)"""
+    if weight <= 0 or reps <= 0:
+        return 0.0
+    if reps == 1:
+        return float(weight)
+    return weight * (1 + reps / 30)
+
+
+class PRStore:
+    """Best weight / reps / e1RM per (user_id, exercise_key).
+
+    Keys map to a slot in three flat double arrays, so lookups and updates
+    are O(1) and a pair costs 24 bytes of state plus its dict entry.
+    """
+
+    def __init__(self):
+        self.slots = {}
+        self.best = {kind: array('d') for kind in RECORD_KINDS}
+        self.dirty = set()
+
+    def __len__(self):
+        return len(self.slots)
+
+    def __contains__(self, key):
+        return key in self.slots
+
+    def _slot(self, key) -> int:
+        slot = self.slots.get(key)
+        if slot is None:
+            slot = self.slots[key] = len(self.slots)
+            for column in self.best.values():
+                column.append(0.0)
+        return slot
+
+    def load(self, key, weight: float, reps: float, e1rm: float):
+        slot = self._slot(key)
+        self.best['weight'][slot] = weight
+        self.best['reps'][slot] = reps
+        self.best['e1rm'][slot] = e1rm
+
+    def get(self, key) -> dict:
+        slot = self.slots.get(key)
+        if slot is None:
+            return None
+        return {kind: self.best[kind][slot] for kind in RECORD_KINDS}
+
+    def observe(self, key, weight: float, reps: float) -> dict:
+        """Record a set; return {kind: previous best} for each record it breaks"""
+        values = {'weight': weight, 'reps': reps, 'e1rm': one_rm(weight, reps)}
+        slot = self._slot(key)
+        broken = {}
+        for kind, value in values.items():
+            previous = self.best[kind][slot]
+            if value > previous:
+                if previous > 0:
+                    broken[kind] = previous
+                self.best[kind][slot] = value
+                self.dirty.add(key)
+        return broken
+
+    def state_records(self, updated_at: datetime) -> list:
+        records = []
+        for key in sorted(self.dirty):
+            slot = self.slots[key]
+            records.append((key[0], key[1], self.best['weight'][slot], self.best['reps'][slot],
+                            self.best['e1rm'][slot], updated_at))
+        return records
+
+
+def order_sets(batches: dict) -> list:
+    """Interleave source batches by when each set was performed"""
+    rows = []
+    for source, batch in batches.items():
+        rows.extend(dict(row, source=source) for row in batch)
+    far_past = datetime.min
+    rows.sort(key=lambda r: (r['performed_at'] or far_past, r['source'], r['id']))
+    return rows
+
+
+def detect_prs(store: PRStore, sets: list) -> list:
+    """Feed ordered sets through the store; return workout_events records"""
+    events = []
+    for s in sets:
+        weight = float(s['actual_weight'] or 0)
+        reps = float(s['actual_reps'] or 0)
+        if weight <= 0 and reps <= 0:
+            continue
+        broken = store.observe((s['user_id'], s['exercise_key']), weight, reps)
+        if not broken:
+            continue
+        data = {
+            'exerciseId': s['exercise_key'],
+            'exerciseName': s['exercise_name'],
+            'records': [kind for kind in RECORD_KINDS if kind in broken],
+            'weight': weight,
+            'reps': reps,
+            'estimatedOneRM': round(one_rm(weight, reps), 1),
+            'previous': broken,
+            'source': s['source'],
+            'sourceId': s['id'],
+        }
+        events.append((s['user_id'], s['user_workout_id'], PR_EVENT_TYPE, s['exercise_id'], s['set_id'],
+                       json.dumps(data), s['performed_at']))
+    return events
+
+
+CREATE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS pr_state (
+        id SERIAL PRIMARY KEY,
+        user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+        exercise_key TEXT NOT NULL,
+        best_weight REAL DEFAULT 0,
+        best_reps REAL DEFAULT 0,
+        best_e1rm REAL DEFAULT 0,
+        updated_at TIMESTAMP DEFAULT NOW() NOT NULL,
+        UNIQUE (user_id, exercise_key)
+    )
+"""
+
+
+async def load_missing_state(conn, store: PRStore, sets: list) -> int:
+    """Pull pr_state rows for pairs in this batch that are not in memory yet"""
+    missing = {(s['user_id'], s['exercise_key']) for s in sets} - set(store.slots)
+    if not missing:
+        return 0
+    users, keys = zip(*missing)
+    rows = await conn.fetch("""
+        SELECT user_id, exercise_key, best_weight, best_reps, best_e1rm FROM pr_state
+        WHERE (user_id, exercise_key) IN (SELECT * FROM unnest($1::integer[], $2::text[]))
+    """, list(users), list(keys))
+    for r in rows:
+        store.load((r['user_id'], r['exercise_key']), r['best_weight'], r['best_reps'], r['best_e1rm'])
+    return len(rows)
+
+
+async def process_batch(conn, store: PRStore, watermarks: dict, batch_size: int) -> tuple:
+    """Consume one batch from every source; return (sets read, events written)"""
+    batches = {
+        source: await conn.fetch(query, watermarks[source], batch_size)
+        for source, query in SOURCE_QUERIES.items()
+    }
+    sets = order_sets(batches)
+    if not sets:
+        return 0, 0
+
+    await load_missing_state(conn, store, sets)
+    events = detect_prs(store, sets)
+    updated_at = datetime.now(timezone.utc).replace(tzinfo=None)
+
+    async with conn.transaction():
+        if events:
+            await conn.copy_records_to_table('workout_events', records=events, columns=EVENT_COLUMNS)
+        await copy_upsert(conn, 'pr_state', STATE_COLUMNS, store.state_records(updated_at),
+                          conflict=['user_id', 'exercise_key'])
+        for source, batch in batches.items():
+            if batch:
+                watermarks[source] = batch[-1]['id']
+        await set_watermarks(conn, {f"{JOB_NAME}:{source}": last for source, last in watermarks.items()})
+    store.dirty.clear()
+    return len(sets), len(events)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description='Detect personal records from new sets and emit workout_events')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Rows per source per batch')
+    parser.add_argument('--follow', action='store_true', help='Keep polling for new sets')
+    parser.add_argument('--poll-interval', type=float, default=5.0, help='Seconds between polls with --follow')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("PERSONAL RECORD STREAM PROCESSOR")
+    print("=" * 60)
+    print()
+
+    conn = await connect()
+    try:
+        await conn.execute(CREATE_TABLE_SQL)
+        stored = await get_watermarks(conn, [f"{JOB_NAME}:{source}" for source in SOURCE_QUERIES])
+        watermarks = {source: stored[f"{JOB_NAME}:{source}"] for source in SOURCE_QUERIES}
+        print(f"Resuming from {watermarks}")
+
+        store = PRStore()
+        total_sets = total_events = 0
+        started = datetime.now(timezone.utc)
+        while True:
+            read, emitted = await process_batch(conn, store, watermarks, args.batch_size)
+            total_sets += read
+            total_events += emitted
+            if read:
+                print(f"  {read} sets -> {emitted} PR events (tracking {len(store)} user/exercise pairs)")
+                continue
+            if not args.follow:
+                break
+            await asyncio.sleep(args.poll_interval)
+
+        elapsed = (datetime.now(timezone.utc) - started).total_seconds()
+        print(f"\n✅ Processed {total_sets} sets, emitted {total_events} PR events in {elapsed:.2f}s")
+    finally:
+        await conn.close()
+    print("\nDone!")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
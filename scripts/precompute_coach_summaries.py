@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Coach Summary Precompute Worker
+-------------------------------
+/api/coach/chat calls coach-memory.ts::buildUserCoachSummary() before every
+LLM request, which costs two extra queries and the adherence calculation on
+an already slow request. This worker builds the same UserCoachSummary ahead
+of time for every recently active user and stores it in coach_memory
+(kind = 'summary', data = summary JSON, refreshed_at = freshness timestamp).
+buildUserCoachSummary() serves a stored summary while it is less than six
+hours old and from the same day; storing a completed workout deletes the
+user's row, so the chat falls back to building it until the next run.
+
+It will:
+1. Find users active in the last --active-days days (completed a workout or
+   chatted with the coach)
+2. Read them in batches of --batch-size through an asyncpg pool, --concurrency
+   batches at a time (users, user_workouts and user_adherence queries per batch)
+3. Build each summary with the rules of buildUserCoachSummary() and
+   calculateAdherencePatterns(), including their quirks (days and streaks
+   count in server time, which is UTC; user_workouts has no `completed`
+   column, so the completion rate is 0). currentStreak, strongDays and
+   weakDays come from the user_adherence state plus newer workouts, read by
+   the same rules as server/adherence.ts getAdherencePatterns()
+4. Replace each user's summary row in one transaction per batch (COPY)
+
+Run it every few hours (e.g. cron `0 */4 * * *`). See bench_coach_summary.py
+for the latency comparison.
+
+Usage:
+    python scripts/precompute_coach_summaries.py [--active-days 14] [--batch-size 500] [--concurrency 4]
+"""
+
+import asyncio
+import argparse
+from datetime import datetime, timedelta, timezone
+
+from adherence_service import day_number, load_snapshots
+from db_utils import create_pool
+from script_utils import js_iso, to_utc
+
+WORKOUT_WINDOW_DAYS = 30
+DEFAULT_ACTIVE_DAYS = 14
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_CONCURRENCY = 4
+
+PERSONALITY_MAP = {
+    'direct-challenging': 'aggressive',
+    'strict-structured': 'disciplined',
+    'encouraging-positive': 'friendly',
+    'calm-patient': 'calm',
+    'supportive': 'friendly',
+    'direct': 'aggressive',
+    'analytical': 'disciplined',
+}
+
+SUMMARY_COLUMNS = ['user_id', 'kind', 'summary', 'data', 'refreshed_at', 'created_at']
+
+ALTER_TABLE_SQL = """
+    ALTER TABLE coach_memory ADD COLUMN IF NOT EXISTS kind TEXT NOT NULL DEFAULT 'conversation';
+    ALTER TABLE coach_memory ADD COLUMN IF NOT EXISTS data JSONB;
+    ALTER TABLE coach_memory ADD COLUMN IF NOT EXISTS refreshed_at TIMESTAMP;
+    CREATE INDEX IF NOT EXISTS coach_memory_user_id_kind_idx ON coach_memory (user_id, kind);
+"""
+
+ACTIVE_USERS_SQL = """
+    SELECT user_id FROM user_workouts WHERE completed_at >= $1
+    UNION
+    SELECT user_id FROM coach_memory WHERE kind = 'conversation' AND created_at >= $1
+"""
+
+
+def js_day(ts: datetime) -> int:
+    """Date.getDay(): 0 = Sunday"""
+    return (to_utc(ts).weekday() + 1) % 7
+
+
+def calculate_adherence_patterns(workouts: list, now: datetime) -> dict:
+    """calculateAdherencePatterns() for one user's user_workouts rows"""
+    if not workouts:
+        return {
+            'averageCompletionRate': 0,
+            'strongDays': [],
+            'weakDays': [],
+            'lastWorkoutDate': None,
+            'currentStreak': 0,
+            'longestStreak': 0,
+        }
+
+    completed_count = sum(1 for w in workouts if w.get('completed'))
+    average_completion_rate = completed_count / len(workouts)
+
+    day_count = [0] * 7
+    for w in workouts:
+        if w.get('completed_at'):
+            day_count[js_day(w['completed_at'])] += 1
+    avg = sum(day_count) / 7
+    strong_days = [day for day, count in enumerate(day_count) if count > avg * 1.2]
+    weak_days = [day for day, count in enumerate(day_count) if count < avg * 0.5 and count > 0]
+
+    current_streak = longest_streak = temp_streak = 0
+    today = to_utc(now).date()
+    ordered = sorted(workouts, key=lambda w: to_utc(w['completed_at']), reverse=True)
+    for w in ordered:
+        if not w.get('completed_at'):
+            continue
+        days_diff = (today - to_utc(w['completed_at']).date()).days
+        if days_diff == current_streak:
+            current_streak += 1
+            temp_streak += 1
+        else:
+            longest_streak = max(longest_streak, temp_streak)
+            temp_streak = 1
+    longest_streak = max(longest_streak, temp_streak)
+
+    return {
+        'averageCompletionRate': average_completion_rate,
+        'strongDays': strong_days,
+        'weakDays': weak_days,
+        'lastWorkoutDate': js_iso(ordered[0]['completed_at']),
+        'currentStreak': current_streak,
+        'longestStreak': longest_streak,
+    }
+
+
+def build_summary(user: dict, workouts: list, now: datetime, adherence=None) -> dict:
+    """buildUserCoachSummary() from a users row, the last 30 days of user_workouts and the
+    user's adherence snapshot (load_snapshots()), if there is one"""
+    refreshed = js_iso(now)
+    injuries = user.get('injuries')
+    adherence_patterns = calculate_adherence_patterns(workouts, now)
+    if adherence is not None:
+        precomputed = adherence.patterns(day_number(now))
+        for key in ('currentStreak', 'strongDays', 'weakDays'):
+            adherence_patterns[key] = precomputed[key]
+    return {
+        'userId': user['id'],
+        'goalSummary': user.get('goal') or 'General fitness',
+        'experienceLevel': user.get('fitness_level') or 'beginner',
+        'coachPersonality': PERSONALITY_MAP.get(user.get('coaching_style') or '', 'friendly'),
+        'preferredSplit': 'auto',
+        'trainingFrequency': user.get('training_days_per_week') or 3,
+        'sessionDuration': 45,
+        'scheduleConstraints': [],
+        'injuries': injuries if isinstance(injuries, list) else [],
+        'exerciseLikes': [],
+        'exerciseDislikes': [],
+        'keyLiftBaselines': [],
+        'adherencePatterns': adherence_patterns,
+        'recentInsightIds': [],
+        'lastMentalHealthInsight': None,
+        'mentalCheckInPreferences': {
+            'enabled': True,
+            'snoozedUntil': None,
+            'dismissCount': 0,
+            'reducedFrequency': False,
+            'lastCheckInDate': None,
+            'lastCheckInDismissed': False,
+        },
+        'lastUpdated': refreshed,
+        'lastFullRefresh': refreshed,
+    }
+
+
+def summary_text(summary: dict) -> str:
+    """Human-readable line for the NOT NULL summary column"""
+    ap = summary['adherencePatterns']
+    return (f"Precomputed coach summary: {summary['experienceLevel']}, {summary['trainingFrequency']}x/week, "
+            f"streak {ap['currentStreak']}, last workout {ap['lastWorkoutDate'] or 'never'}")
+
+
+def batches(items: list, size: int) -> list:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+async def store_summaries(conn, user_ids: list, records: list):
+    """Replace the batch's summary rows; data is jsonb, written through binary COPY"""
+    async with conn.transaction():
+        await conn.execute(
+            "DELETE FROM coach_memory WHERE kind = 'summary' AND user_id = ANY($1::integer[])", user_ids)
+        await conn.copy_records_to_table('coach_memory', records=records, columns=SUMMARY_COLUMNS)
+
+
+async def refresh_batch(pool, user_ids: list, now: datetime) -> int:
+    window_start = (now - timedelta(days=WORKOUT_WINDOW_DAYS)).replace(tzinfo=None)
+    async with pool.acquire() as conn:
+        users = await conn.fetch("""
+            SELECT id, goal, fitness_level, coaching_style, training_days_per_week, injuries
+            FROM users WHERE id = ANY($1::integer[])
+        """, user_ids)
+        workouts = await conn.fetch("""
+            SELECT user_id, completed_at FROM user_workouts
+            WHERE user_id = ANY($1::integer[]) AND completed_at >= $2
+        """, user_ids, window_start)
+        snapshots = await load_snapshots(conn, user_ids)
+
+        by_user = {}
+        for w in workouts:
+            by_user.setdefault(w['user_id'], []).append(dict(w))
+        refreshed_at = now.replace(tzinfo=None)
+        records = []
+        for user in users:
+            summary = build_summary(dict(user), by_user.get(user['id'], []), now, snapshots.get(user['id']))
+            records.append((user['id'], 'summary', summary_text(summary), summary, refreshed_at, refreshed_at))
+
+        await store_summaries(conn, user_ids, records)
+    return len(records)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description='Precompute coach summaries for recently active users')
+    parser.add_argument('--active-days', type=int, default=DEFAULT_ACTIVE_DAYS)
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help='Batches in flight')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("COACH SUMMARY PRECOMPUTE")
+    print("=" * 60)
+    print()
+
+    pool = await create_pool(min_size=1, max_size=args.concurrency)
+    try:
+        async with pool.acquire() as conn:
+            await conn.execute(ALTER_TABLE_SQL)
+            now = datetime.now(timezone.utc)
+            active_since = (now - timedelta(days=args.active_days)).replace(tzinfo=None)
+            user_ids = sorted(r['user_id'] for r in await conn.fetch(ACTIVE_USERS_SQL, active_since))
+        print(f"{len(user_ids)} users active in the last {args.active_days} days")
+
+        started = datetime.now(timezone.utc)
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def run(batch):
+            async with semaphore:
+                return await refresh_batch(pool, batch, now)
+
+        written = sum(await asyncio.gather(*(run(b) for b in batches(user_ids, args.batch_size))))
+        elapsed = (datetime.now(timezone.utc) - started).total_seconds()
+        print(f"\n✅ Refreshed {written} coach summaries in {elapsed:.2f}s")
+    finally:
+        await pool.close()
+    print("\nDone!")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
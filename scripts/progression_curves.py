@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Progression Curve Fitting
+-------------------------
+GET /api/stats/exercise/:exerciseId shows a per-day estimatedOneRM but no
+trend line, and ai-user-context.ts::getSuggestedWeight() regex-parses weights
+out of learning insights. This module fits a progression curve to every
+(user, exercise) e1RM history at once and stores the fitted parameters in
+progression_curves, so a suggested-weight lookup is a single indexed row read.
+
+Each series is the daily best Epley e1RM (same rules as exercise_stats_engine)
+over the last MAX_POINTS training days, with t in days since its first day.
+All series are packed into padded (series x points) matrices and fitted
+together; every fit is closed-form 2x2 weighted least squares per row:
+
+- robust linear:   e1rm = intercept + slope * t
+  Huber IRLS (MAD scale), so one mis-logged set does not tilt the line
+- saturation:      e1rm = plateau - gap * exp(-rate * t)
+  linear in (plateau, gap) for a fixed rate, so it is solved for every rate
+  of RATE_GRID and the best rate is kept per series; it reuses the robust
+  weights of the linear fit
+
+The saturation model is chosen when it has MIN_SATURATION_POINTS points and
+a lower BIC than the line. The suggested weight is the curve's e1RM at the
+next session (last day + median gap between sessions), kept within
+[0.9, 1.05] x the last observed e1RM, converted back to a working weight for
+the reps of the last top set and rounded to WEIGHT_INCREMENT.
+
+Usage:
+    python scripts/progression_curves.py [--user-id 42]
+"""
+
+import asyncio
+import argparse
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from db_utils import connect, copy_upsert, fetch_dataframe
+from exercise_stats_engine import LOG_COLUMNS, prepare_logs
+
+MAX_POINTS = 120
+MAX_LOG_ROWS = 5000
+MIN_SATURATION_POINTS = 6
+HUBER_K = 1.345
+IRLS_ITERATIONS = 8
+RATE_GRID = np.geomspace(1 / 720, 1 / 3, 32)  # per day: half-life of ~500 days down to ~2 days
+WEIGHT_INCREMENT = 2.5
+PROJECTION_DAYS = 28
+
+CURVE_COLUMNS = [
+    'user_id', 'exercise_id', 'exercise_name', 'name_key', 'model', 'points', 'first_date', 'last_date',
+    'intercept', 'slope_per_week', 'plateau', 'rate', 'residual_scale', 'r2', 'current_e1rm',
+    'projected_e1rm', 'suggested_weight', 'suggested_reps', 'confidence', 'fitted_at',
+]
+
+CREATE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS progression_curves (
+        id SERIAL PRIMARY KEY,
+        user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+        exercise_id TEXT NOT NULL,
+        exercise_name TEXT NOT NULL,
+        name_key TEXT NOT NULL,
+        model TEXT NOT NULL DEFAULT 'linear',
+        points INTEGER NOT NULL DEFAULT 0,
+        first_date TEXT NOT NULL,
+        last_date TEXT NOT NULL,
+        intercept REAL DEFAULT 0,
+        slope_per_week REAL DEFAULT 0,
+        plateau REAL,
+        rate REAL,
+        residual_scale REAL DEFAULT 0,
+        r2 REAL DEFAULT 0,
+        current_e1rm REAL DEFAULT 0,
+        projected_e1rm REAL DEFAULT 0,
+        suggested_weight REAL DEFAULT 0,
+        suggested_reps INTEGER DEFAULT 0,
+        confidence TEXT DEFAULT 'low',
+        fitted_at TIMESTAMP DEFAULT NOW() NOT NULL,
+        UNIQUE (user_id, exercise_id)
+    );
+    CREATE INDEX IF NOT EXISTS progression_curves_user_id_name_key_idx ON progression_curves (user_id, name_key);
+"""
+
+
+def daily_series(logs: pd.DataFrame, max_points: int = MAX_POINTS) -> pd.DataFrame:
+    """Best e1RM per (user, exercise, UTC day), plus the reps of that top set, last max_points days"""
+    df = prepare_logs(logs, history_limit=MAX_LOG_ROWS)
+    df = df[df['e1rm'] > 0]
+    # newest first within a pair, so the first row per day is the newest set with the day's max
+    top = df.sort_values('e1rm', ascending=False, kind='mergesort')
+    daily = top.groupby(['user_id', 'exercise_id', 'date'], sort=True).agg(
+        exercise_name=('exercise_name', 'first'),
+        e1rm=('e1rm', 'first'),
+        reps=('reps', 'first'),
+    ).reset_index()
+    daily = daily.groupby(['user_id', 'exercise_id'], sort=False).tail(max_points)
+    return daily.reset_index(drop=True)
+
+
+def pack_series(daily: pd.DataFrame):
+    """Padded (series x points) t / e1rm / mask matrices and one key row per series"""
+    codes = daily.groupby(['user_id', 'exercise_id'], sort=False).ngroup().to_numpy()
+    pos = daily.groupby(['user_id', 'exercise_id'], sort=False).cumcount().to_numpy()
+    n_series = int(codes.max()) + 1 if len(codes) else 0
+    width = int(pos.max()) + 1 if len(pos) else 0
+
+    day = pd.to_datetime(daily['date']).to_numpy().astype('datetime64[D]').astype(np.int64)
+    first = np.full(n_series, np.iinfo(np.int64).max)
+    np.minimum.at(first, codes, day)
+
+    t = np.zeros((n_series, width))
+    y = np.zeros((n_series, width))
+    mask = np.zeros((n_series, width), dtype=bool)
+    t[codes, pos] = day - first[codes]
+    y[codes, pos] = daily['e1rm'].to_numpy(dtype=float)
+    mask[codes, pos] = True
+
+    last = daily.groupby(['user_id', 'exercise_id'], sort=False).tail(1)
+    keys = pd.DataFrame({
+        'user_id': last['user_id'].to_numpy(),
+        'exercise_id': last['exercise_id'].to_numpy(),
+        'exercise_name': last['exercise_name'].to_numpy(),
+        'first_date': daily.groupby(['user_id', 'exercise_id'], sort=False)['date'].first().to_numpy(),
+        'last_date': last['date'].to_numpy(),
+        'last_e1rm': last['e1rm'].to_numpy(dtype=float),
+        'last_reps': last['reps'].to_numpy(dtype=float),
+    })
+    return keys, t, y, mask
+
+
+def weighted_linear_fit(t: np.ndarray, y: np.ndarray, w: np.ndarray):
+    """Row-wise weighted least squares of y on [1, t]; a flat line when t has no spread"""
+    sw = w.sum(axis=1)
+    st = (w * t).sum(axis=1)
+    sy = (w * y).sum(axis=1)
+    stt = (w * t * t).sum(axis=1)
+    sty = (w * t * y).sum(axis=1)
+    den = sw * stt - st * st
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = np.where(den > 1e-9 * np.maximum(sw * stt, 1), (sw * sty - st * sy) / den, 0.0)
+        intercept = np.where(sw > 0, (sy - slope * st) / sw, 0.0)
+    return intercept, slope
+
+
+def _mad_scale(residuals: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """1.4826 x median absolute residual per row (masked entries ignored)"""
+    masked = np.where(mask, np.abs(residuals), np.nan)
+    with np.errstate(all='ignore'):
+        scale = 1.4826 * np.nanmedian(masked, axis=1) if masked.shape[1] else np.zeros(len(masked))
+    return np.nan_to_num(scale)
+
+
+def robust_linear_fit(t: np.ndarray, y: np.ndarray, mask: np.ndarray, iterations: int = IRLS_ITERATIONS):
+    """Huber IRLS line per row. Returns intercept, slope, residual scale and the final weights"""
+    w = mask.astype(float)
+    intercept, slope = weighted_linear_fit(t, y, w)
+    scale = np.zeros(len(t))
+    for _ in range(iterations):
+        residuals = y - (intercept[:, None] + slope[:, None] * t)
+        scale = _mad_scale(residuals, mask)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            u = np.abs(residuals) / (HUBER_K * scale[:, None])
+            huber = np.where((scale[:, None] > 0) & (u > 1), 1 / u, 1.0)
+        w = np.where(mask, huber, 0.0)
+        intercept, slope = weighted_linear_fit(t, y, w)
+    return intercept, slope, scale, w
+
+
+def saturation_fit(t: np.ndarray, y: np.ndarray, w: np.ndarray, rates: np.ndarray = RATE_GRID):
+    """plateau - gap * exp(-rate * t) per row, best rate of the grid by weighted SSE.
+
+    Only rising curves (gap >= 0) are accepted; rows without one get sse = inf.
+    """
+    n = len(t)
+    best = {'plateau': np.full(n, np.nan), 'gap': np.full(n, np.nan),
+            'rate': np.full(n, np.nan), 'sse': np.full(n, np.inf)}
+    for rate in rates:
+        x = np.exp(-rate * t)
+        plateau, coef = weighted_linear_fit(x, y, w)
+        gap = -coef
+        sse = (w * (y - (plateau[:, None] - gap[:, None] * x)) ** 2).sum(axis=1)
+        better = (gap >= 0) & (coef != 0) & (sse < best['sse'])
+        best['plateau'] = np.where(better, plateau, best['plateau'])
+        best['gap'] = np.where(better, gap, best['gap'])
+        best['rate'] = np.where(better, rate, best['rate'])
+        best['sse'] = np.where(better, sse, best['sse'])
+    return best
+
+
+def _bic(sse: np.ndarray, n: np.ndarray, params: int) -> np.ndarray:
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return n * np.log(np.maximum(sse, 1e-9) / np.maximum(n, 1)) + params * np.log(np.maximum(n, 1))
+
+
+def _median_gap(t: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Median days between consecutive sessions (7 when there is only one)"""
+    if t.shape[1] < 2:
+        return np.full(len(t), 7.0)
+    gaps = np.where(mask[:, 1:], np.diff(t, axis=1), np.nan)
+    with np.errstate(all='ignore'):
+        gap = np.nanmedian(gaps, axis=1)
+    return np.clip(np.nan_to_num(gap, nan=7.0), 1, 14)
+
+
+def working_weight(e1rm, reps, increment: float = WEIGHT_INCREMENT):
+    """Inverse Epley for the given reps, rounded to the nearest plate increment"""
+    e1rm = np.asarray(e1rm, dtype=float)
+    reps = np.asarray(reps, dtype=float)
+    weight = np.where(reps <= 1, e1rm, e1rm / (1 + reps / 30))
+    return np.floor(weight / increment + 0.5) * increment
+
+
+def fit_curves(daily: pd.DataFrame) -> pd.DataFrame:
+    """Fit every series of daily_series() and derive the stored parameters"""
+    if daily.empty:
+        return pd.DataFrame(columns=[c for c in CURVE_COLUMNS if c != 'fitted_at'])
+    keys, t, y, mask = pack_series(daily)
+    n = mask.sum(axis=1)
+
+    intercept, slope, scale, w = robust_linear_fit(t, y, mask)
+    linear_sse = (w * (y - (intercept[:, None] + slope[:, None] * t)) ** 2).sum(axis=1)
+    sat = saturation_fit(t, y, w)
+    use_sat = (n >= MIN_SATURATION_POINTS) & np.isfinite(sat['sse']) & \
+        (_bic(sat['sse'], n, 3) < _bic(linear_sse, n, 2))
+
+    def predict(at):
+        line = intercept + slope * at
+        curve = sat['plateau'] - sat['gap'] * np.exp(-sat['rate'] * at)
+        return np.where(use_sat, curve, line)
+
+    last_t = np.where(mask, t, 0).max(axis=1)
+    weighted_mean = (w * y).sum(axis=1) / np.maximum(w.sum(axis=1), 1e-9)
+    total_ss = (w * (y - weighted_mean[:, None]) ** 2).sum(axis=1)
+    fit_sse = np.where(use_sat, sat['sse'], linear_sse)
+    r2 = np.where(total_ss > 0, 1 - fit_sse / np.where(total_ss > 0, total_ss, 1), 0.0)
+
+    next_e1rm = np.clip(predict(last_t + _median_gap(t, mask)), 0.9 * keys['last_e1rm'], 1.05 * keys['last_e1rm'])
+    reps = np.maximum(keys['last_reps'].to_numpy(), 1)
+
+    curves = keys[['user_id', 'exercise_id', 'exercise_name', 'first_date', 'last_date']].copy()
+    curves['name_key'] = curves['exercise_name'].fillna('').str.strip().str.lower()
+    curves['model'] = np.where(use_sat, 'saturation', 'linear')
+    curves['points'] = n
+    curves['intercept'] = intercept
+    curves['slope_per_week'] = slope * 7
+    curves['plateau'] = np.where(use_sat, sat['plateau'], np.nan)
+    curves['rate'] = np.where(use_sat, sat['rate'], np.nan)
+    curves['residual_scale'] = scale
+    curves['r2'] = np.clip(r2, 0, 1)
+    curves['current_e1rm'] = np.maximum(predict(last_t), 0)
+    curves['projected_e1rm'] = np.maximum(predict(last_t + PROJECTION_DAYS), 0)
+    curves['suggested_weight'] = working_weight(next_e1rm, reps)
+    curves['suggested_reps'] = reps.astype(int)
+    curves['confidence'] = np.select([(n >= 8) & (r2 >= 0.5), n >= 4], ['high', 'medium'], 'low')
+    return curves
+
+
+def _real(value):
+    return None if value is None or not np.isfinite(value) else float(value)
+
+
+def curve_records(curves: pd.DataFrame, fitted_at: datetime) -> list:
+    records = []
+    for r in curves.itertuples(index=False):
+        records.append((
+            int(r.user_id), str(r.exercise_id), r.exercise_name or '', r.name_key, r.model, int(r.points),
+            r.first_date, r.last_date, float(r.intercept), float(r.slope_per_week), _real(r.plateau),
+            _real(r.rate), float(r.residual_scale), float(r.r2), float(r.current_e1rm),
+            float(r.projected_e1rm), float(r.suggested_weight), int(r.suggested_reps), r.confidence, fitted_at,
+        ))
+    return records
+
+
+async def main():
+    parser = argparse.ArgumentParser(description='Fit per-user, per-exercise e1RM progression curves')
+    parser.add_argument('--user-id', type=int, help='Only refit one user')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("PROGRESSION CURVE FITTING")
+    print("=" * 60)
+    print()
+
+    conn = await connect()
+    try:
+        await conn.execute(CREATE_TABLE_SQL)
+
+        query = f"SELECT {', '.join(LOG_COLUMNS)} FROM performance_logs WHERE actual_weight > 0 AND actual_reps > 0"
+        params = []
+        if args.user_id:
+            query += " AND user_id = $1"
+            params.append(args.user_id)
+
+        started = datetime.now(timezone.utc)
+        logs = await fetch_dataframe(conn, query, *params)
+        print(f"Loaded {len(logs)} performance logs in {(datetime.now(timezone.utc) - started).total_seconds():.2f}s")
+        if logs.empty:
+            print("\n✅ Nothing to fit")
+            return
+
+        started = datetime.now(timezone.utc)
+        daily = daily_series(logs)
+        curves = fit_curves(daily)
+        elapsed = (datetime.now(timezone.utc) - started).total_seconds()
+        print(f"Fitted {len(curves)} series ({len(daily)} training days) in {elapsed:.2f}s "
+              f"({len(curves) / max(elapsed, 1e-9):.0f} series/s)")
+        print(f"  saturation: {(curves['model'] == 'saturation').sum()}, linear: {(curves['model'] == 'linear').sum()}")
+
+        fitted_at = datetime.now(timezone.utc).replace(tzinfo=None)
+        written = await copy_upsert(
+            conn, 'progression_curves', CURVE_COLUMNS, curve_records(curves, fitted_at),
+            conflict=['user_id', 'exercise_id'],
+        )
+        print(f"\n✅ Upserted {written} rows into progression_curves")
+    finally:
+        await conn.close()
+    print("\nDone!")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,61 @@
+#!/usr/bin/env tsx
+
+// CLI bridge for scripts/prompt_token_report.py: reads one JSON object per
+// line from stdin ({ id, input: { userId } }) and writes the user-derived
+// prompt sections the server would build right now, one line per user
+// ({ id, sections } or { id, error }). Uses the real formatters, so the
+// report tracks whatever they currently emit. Console output is silenced.
+
+import { createInterface } from "readline";
+import { eq } from "drizzle-orm";
+import { users } from "@shared/schema";
+import { db } from "../server/db";
+import { getComprehensiveUserContext, formatUserContextForAI } from "../server/ai-user-context";
+import { buildUserCoachSummary, formatSummaryForPrompt, buildCoachPrompt } from "../server/coach-memory";
+import { generateWeeklyTemplate, getPromptConstraints } from "../server/split-planner";
+import { buildSplitPlannerInput } from "../server/ai-workout-generator";
+import { buildWeekProfile } from "../server/plan-service";
+import { COACH_PERSONALITIES } from "../server/ai-coach-service";
+
+console.log = () => {};
+console.error = () => {};
+
+async function buildSections(userId: number) {
+  const [user] = await db.select().from(users).where(eq(users.id, userId));
+  if (!user) throw new Error(`user ${userId} not found`);
+
+  // Workout generator: same profile plan-service hands to generateAIWorkout
+  const profile = buildWeekProfile(user);
+  const comprehensive = await getComprehensiveUserContext(userId, profile.advancedQuestionnaire);
+  const userContext = formatUserContextForAI(comprehensive);
+  const template = generateWeeklyTemplate(buildSplitPlannerInput(profile, 1));
+  const splitConstraints = template.days
+    .filter(day => day.isGymTraining)
+    .map(day => getPromptConstraints(template, day.dayIndex));
+
+  // Coach chat: personality-aware prompt for the default coach in chat mode
+  const summary = await buildUserCoachSummary(userId);
+  const coachSummary = formatSummaryForPrompt(summary);
+  const coachPrompt = buildCoachPrompt(summary, "chat", COACH_PERSONALITIES["default"].systemPrompt);
+
+  return { userContext, splitConstraints, coachSummary, coachPrompt };
+}
+
+async function main() {
+  const lines = createInterface({ input: process.stdin, crlfDelay: Infinity });
+
+  for await (const line of lines) {
+    if (!line.trim()) continue;
+    const { id, input } = JSON.parse(line);
+    try {
+      const sections = await buildSections(Number(input.userId));
+      process.stdout.write(JSON.stringify({ id, sections }) + "\n");
+    } catch (error: any) {
+      process.stdout.write(JSON.stringify({ id, error: error?.message || String(error) }) + "\n");
+    }
+  }
+  // The DB pool would keep the process alive
+  process.exit(0);
+}
+
+main();
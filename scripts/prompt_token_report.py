@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Prompt Token Report
+-------------------
+Every workout generation embeds formatUserContextForAI() and the split
+planner's getPromptConstraints(), and every coach chat embeds
+formatSummaryForPrompt() through buildCoachPrompt(). They grow with the
+user's history and we pay for them per token, but the only measurement is
+the per-request X-LLM-Prompt-Tokens / X-Coach-Prompt-Chars headers. This
+rebuilds those prompts offline for a sample of users and shows which
+sections the tokens go to.
+
+It will:
+1. Sample users from the DB: the --heavy users with the most user_workouts
+   and ai_learning_context rows plus --random others
+2. Build their prompt sections with the server's own code through the CLI
+   bridge (prompt_sections_bridge.ts, run with tsx): the same users row,
+   buildWeekProfile() profile and split planner input plan-service hands to
+   the generator, and the default coach in chat mode
+3. Split the user context on its === SECTION === headers and add the
+   generator's exercise database list (SELECT name FROM exercises LIMIT 2000);
+   split constraints count the longest gym day of the user's week, the coach
+   prompt is split into the user summary and the fixed instructions around it
+4. Count tokens with tiktoken's o200k_base (the gpt-4o / gpt-4o-mini
+   encoding) when it is installed, else with a rough word-piece estimate
+5. Report p50/p95/max tokens per section and its share of each call's
+   budget, flag sections above --dominant-share, list the heaviest users,
+   and append the run to --out
+
+The generator's fixed rules text and per-request extras (workout context,
+tendencies, coach memories) are not rebuilt; they do not depend on DB state.
+
+Usage:
+    python scripts/prompt_token_report.py [--heavy 50] [--random 50] [--dominant-share 0.3]
+    python scripts/prompt_token_report.py --bridge "node --import tsx scripts/prompt_sections_bridge.ts" --out prompt_tokens.json
+"""
+
+import os
+import re
+import json
+import math
+import asyncio
+import argparse
+from datetime import datetime, timezone
+
+from db_utils import connect
+from script_utils import percentile
+from split_planner_harness import run_bridge
+
+DEFAULT_BRIDGE = "npx tsx scripts/prompt_sections_bridge.ts"
+DEFAULT_ENCODING = 'o200k_base'
+DEFAULT_DOMINANT_SHARE = 0.3
+EXERCISE_LIMIT = 2000
+HEAVIEST = 5
+
+SECTION_HEADER = re.compile(r'^=== (.+?) ===[ \t]*$', re.MULTILINE)
+WORD_PIECE = re.compile(r'[A-Za-z]+|\d{1,3}|[^\sA-Za-z\d]')
+
+
+def section_key(header: str) -> str:
+    """'ADVANCED PREFERENCES (User shared ...)' -> 'advanced_preferences'"""
+    name = re.sub(r'\(.*?\)', '', header).strip().lower()
+    return re.sub(r'[^a-z0-9]+', '_', name).strip('_')
+
+
+def split_sections(text: str) -> list:
+    """(key, text) per === HEADER === block; text before the first header is 'preamble'"""
+    matches = list(SECTION_HEADER.finditer(text))
+    sections = []
+    head = text[:matches[0].start()] if matches else text
+    if head.strip():
+        sections.append(('preamble', head))
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        sections.append((section_key(match.group(1)), text[match.start():end]))
+    return sections
+
+
+def approximate_tokens(text: str) -> int:
+    """Word-piece estimate: ~4 letters per token, short digit runs, one per symbol"""
+    return sum(math.ceil(len(piece) / 4) if piece.isalpha() else 1 for piece in WORD_PIECE.findall(text))
+
+
+def load_counter(encoding: str):
+    """(count function, label) - tiktoken when installed, else the estimate"""
+    try:
+        import tiktoken
+    except ImportError:
+        return approximate_tokens, 'approximate (tiktoken not installed)'
+    enc = tiktoken.get_encoding(encoding)
+    return (lambda text: len(enc.encode(text, disallowed_special=()))), f"tiktoken {encoding}"
+
+
+def prompt_sections(sections: dict, exercise_list: str) -> dict:
+    """{call: {section: text}} for one user's bridge output"""
+    generator = {f"context:{key}": text for key, text in split_sections(sections['userContext'])}
+    generator['exercise_database'] = exercise_list
+    constraints = sections.get('splitConstraints') or []
+    if constraints:
+        generator['split_constraints'] = max(constraints, key=len)
+
+    summary, prompt = sections['coachSummary'], sections['coachPrompt']
+    coach = {'summary': summary, 'instructions': prompt.replace(summary, '', 1)}
+    return {'generator': generator, 'coach': coach}
+
+
+def aggregate(counts: list, dominant_share: float) -> dict:
+    """Per call: total distribution, per-section stats and budget share, heaviest users.
+    counts holds {'userId', 'calls': {call: {section: tokens}}} per user."""
+    report = {}
+    for call in sorted({call for row in counts for call in row['calls']}):
+        rows = [(row['userId'], row['calls'][call]) for row in counts if call in row['calls']]
+        totals = [(user_id, sum(sections.values())) for user_id, sections in rows]
+        budget = sum(total for _, total in totals) or 1
+        sections = {}
+        for name in sorted({name for _, s in rows for name in s}):
+            values = [s[name] for _, s in rows if name in s]
+            share = sum(values) / budget
+            sections[name] = {
+                'users': len(values),
+                'p50': round(percentile(values, 50)),
+                'p95': round(percentile(values, 95)),
+                'max': max(values),
+                'share': round(share, 4),
+                'dominant': share >= dominant_share,
+            }
+        values = [total for _, total in totals]
+        report[call] = {
+            'users': len(rows),
+            'total': {'p50': round(percentile(values, 50)), 'p95': round(percentile(values, 95)), 'max': max(values)},
+            'sections': dict(sorted(sections.items(), key=lambda item: -item[1]['share'])),
+            'heaviestUsers': [user_id for user_id, _ in sorted(totals, key=lambda t: -t[1])[:HEAVIEST]],
+        }
+    return report
+
+
+async def sample_users(conn, heavy: int, random_count: int) -> list:
+    """Heaviest users by history rows, then random others"""
+    rows = await conn.fetch("""
+        SELECT u.id
+        FROM users u
+        LEFT JOIN (SELECT user_id, COUNT(*) AS n FROM user_workouts GROUP BY user_id) w ON w.user_id = u.id
+        LEFT JOIN (SELECT user_id, COUNT(*) AS n FROM ai_learning_context GROUP BY user_id) c ON c.user_id = u.id
+        ORDER BY COALESCE(w.n, 0) + COALESCE(c.n, 0) DESC, u.id
+        LIMIT $1
+    """, heavy)
+    heavy_ids = [r['id'] for r in rows]
+    rows = await conn.fetch(
+        "SELECT id FROM users WHERE NOT (id = ANY($1::int[])) ORDER BY random() LIMIT $2",
+        heavy_ids, random_count)
+    return heavy_ids + [r['id'] for r in rows]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description='Token accounting for the generator and coach prompts')
+    parser.add_argument('--heavy', type=int, default=50, help='Users with the most history')
+    parser.add_argument('--random', type=int, default=50, help='Additional random users')
+    parser.add_argument('--encoding', default=DEFAULT_ENCODING, help='tiktoken encoding')
+    parser.add_argument('--dominant-share', type=float, default=DEFAULT_DOMINANT_SHARE,
+                        help='Flag sections taking at least this share of a call')
+    parser.add_argument('--bridge', default=DEFAULT_BRIDGE, help='Command running prompt_sections_bridge.ts')
+    parser.add_argument('--out', default='prompt_token_report.json', help='JSON file to append the run to')
+    parser.add_argument('--label', default='', help='Label for this run in the output file')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("PROMPT TOKEN REPORT")
+    print("=" * 60)
+    print()
+
+    count_tokens, tokenizer = load_counter(args.encoding)
+    print(f"  Tokenizer: {tokenizer}")
+
+    conn = await connect()
+    try:
+        user_ids = await sample_users(conn, args.heavy, args.random)
+        names = await conn.fetch("SELECT name FROM exercises LIMIT $1", EXERCISE_LIMIT)
+    finally:
+        await conn.close()
+    exercise_list = '\n'.join(r['name'] for r in names)
+    print(f"  {len(user_ids)} users sampled, {len(names)} exercises in the generator list")
+
+    counts, errors = [], {}
+    for result in run_bridge(args.bridge, [(user_id, {'userId': user_id}) for user_id in user_ids]):
+        if 'error' in result:
+            errors[result['id']] = result['error']
+            continue
+        calls = prompt_sections(result['sections'], exercise_list)
+        counts.append({
+            'userId': result['id'],
+            'calls': {call: {name: count_tokens(text) for name, text in sections.items()}
+                      for call, sections in calls.items()},
+        })
+    if not counts:
+        print(f"❌ No prompts built ({len(errors)} errors, e.g. {next(iter(errors.values()), None)})")
+        return
+
+    report = aggregate(counts, args.dominant_share)
+    for call, stats in report.items():
+        total = stats['total']
+        print(f"\n  {call} ({stats['users']} users) - total p50 {total['p50']:,} / p95 {total['p95']:,} "
+              f"/ max {total['max']:,} tokens")
+        print(f"    {'section':32} {'users':>5} {'p50':>7} {'p95':>7} {'max':>7} {'share':>6}")
+        for name, s in stats['sections'].items():
+            flag = '  ⚠️ dominant' if s['dominant'] else ''
+            print(f"    {name:32} {s['users']:5} {s['p50']:7,} {s['p95']:7,} {s['max']:7,} "
+                  f"{s['share']:6.1%}{flag}")
+        print(f"    heaviest users: {stats['heaviestUsers']}")
+    if errors:
+        print(f"\n  {len(errors)} users failed, e.g. {next(iter(errors.items()))}")
+
+    results = []
+    if os.path.exists(args.out):
+        with open(args.out, encoding='utf-8') as f:
+            results = json.load(f)
+    results.append({
+        'label': args.label,
+        'at': datetime.now(timezone.utc).isoformat(),
+        'tokenizer': tokenizer,
+        'users': len(counts),
+        'errors': len(errors),
+        'dominantShare': args.dominant_share,
+        'calls': report,
+    })
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+
+    dominant = [f"{call}/{name}" for call, stats in report.items()
+                for name, s in stats['sections'].items() if s['dominant']]
+    status = '⚠️' if dominant else '✅'
+    print(f"\n{status} {len(dominant)} dominant sections {dominant} - results in {args.out}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+Batch User Tendencies Recompute
+-------------------------------
+learning-engine.ts::updateUserTendencies() replays one user's learning
+events inside the request that logged them. This job applies the same rules
+to every user with recent ai_learning_events in one pass, so tendencies can
+be backfilled after a rule change without triggering N refreshes.
+
+It will:
+1. Load every ai_learning_events row from the rolling window (30 days) and
+   the stored user_tendencies rows
+2. Replay the events exactly like updateUserTendencies(): newest first, each
+   shifting confidences by 0.05 * 0.85^(age in weeks), clamped to [0.1, 0.9]
+   after every step. Replay is vectorized across users: step k applies the
+   k-th newest event of every user at once with numpy
+3. Derive progressionPace and update the decline tracking
+4. Write a diff report against the stored values (--report)
+5. With --apply, COPY-upsert the results into user_tendencies
+
+By default replay starts from each user's stored tendencies, which is what
+one refresh per user would do. --from-defaults starts every user from the
+default tendencies instead (a clean rebuild after a rule change). Unlike the
+TypeScript version, users never share the nested default objects.
+
+Usage:
+    python scripts/recompute_user_tendencies.py [--report tendency_diff.json]
+    python scripts/recompute_user_tendencies.py --from-defaults --apply
+"""
+
+import json
+import asyncio
+import argparse
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+from db_utils import connect, copy_upsert, fetch_dataframe
+from script_utils import js_iso, to_utc
+
+# LEARNING_CONFIG in learning-engine.ts
+ROLLING_WINDOW_DAYS = 30
+WEEKLY_DECAY = 0.85
+EVENT_SHIFT_AMOUNT = 0.05
+MIN_CONFIDENCE = 0.1
+MAX_CONFIDENCE = 0.9
+DECLINE_COOLDOWN_DAYS = 7
+
+MOVEMENT_PATTERNS = ['squat', 'hinge', 'push', 'pull', 'carry']
+
+DEFAULT_TENDENCIES = {
+    'progressionPace': 'moderate',
+    'prefersConfirmation': 0.5,
+    'confidenceWithLoad': 0.5,
+    'movementConfidence': {p: 0.5 for p in MOVEMENT_PATTERNS},
+    'swapFrequency': 0.5,
+    'adherencePattern': {'weekdayBias': 0, 'weekendDrop': 0.3, 'consistencyScore': 0.5},
+    'preferredRepStyle': {'strength': 0.33, 'hypertrophy': 0.34, 'endurance': 0.33},
+    'recoveryNeed': 0.5,
+    'recentDeclines': [],
+}
+
+# Scalar state columns shifted by events; movement patterns are appended as 'move:<pattern>'
+SCALAR_COLUMNS = ['prefersConfirmation', 'confidenceWithLoad', 'swapFrequency', 'consistencyScore', 'recoveryNeed']
+
+# eventType -> {column: multiple of shiftAmount} (applyEventToTendencies)
+EVENT_RULES = {
+    'suggestion_accepted': {'prefersConfirmation': -1, 'confidenceWithLoad': 1, 'move': 1},
+    'suggestion_rejected': {'prefersConfirmation': 1, 'confidenceWithLoad': -0.5, 'move': -0.5},
+    'exercise_swapped': {'swapFrequency': 1},
+    'workout_completed': {'consistencyScore': 0.5},
+    'workout_skipped': {'consistencyScore': -1, 'recoveryNeed': 0.3},
+    'nudge_accepted': {'prefersConfirmation': -0.5},
+    'nudge_rejected': {'prefersConfirmation': 0.3},
+    'nudge_dismissed': {'prefersConfirmation': 0.3},
+}
+WEIGHT_DOWN = {'confidenceWithLoad': -1, 'recoveryNeed': 0.5}
+WEIGHT_UP = {'confidenceWithLoad': 1}
+FEEDBACK_RULES = {
+    'too_hard': {'recoveryNeed': 1, 'confidenceWithLoad': -0.5},
+    'tired': {'recoveryNeed': 1, 'confidenceWithLoad': -0.5},
+    'too_easy': {'recoveryNeed': -1, 'confidenceWithLoad': 1},
+    'great': {'recoveryNeed': -1, 'confidenceWithLoad': 1},
+    'pain': {'recoveryNeed': 2},
+}
+
+NUMERIC_FIELDS = ['prefersConfirmation', 'confidenceWithLoad', 'swapFrequency', 'recoveryNeed']
+
+
+def _payload(value) -> dict:
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return {}
+    return value if isinstance(value, dict) else {}
+
+
+def _number(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def parse_stored(record: dict) -> dict:
+    """getUserTendencies(): rebuild tendencies from a user_tendencies row"""
+    def num(key, column):
+        value = record.get(column)
+        return float(value) if value not in (None, '') else DEFAULT_TENDENCIES[key]
+
+    return {
+        'progressionPace': record.get('progression_pace') or 'moderate',
+        'prefersConfirmation': num('prefersConfirmation', 'prefers_confirmation'),
+        'confidenceWithLoad': num('confidenceWithLoad', 'confidence_with_load'),
+        'movementConfidence': dict(record.get('movement_confidence') or DEFAULT_TENDENCIES['movementConfidence']),
+        'swapFrequency': num('swapFrequency', 'swap_frequency'),
+        'adherencePattern': dict(record.get('adherence_pattern') or DEFAULT_TENDENCIES['adherencePattern']),
+        'preferredRepStyle': dict(record.get('preferred_rep_style') or DEFAULT_TENDENCIES['preferredRepStyle']),
+        'recoveryNeed': num('recoveryNeed', 'recovery_need'),
+        'recentDeclines': [dict(d) for d in (record.get('recent_declines') or [])],
+    }
+
+
+def default_tendencies() -> dict:
+    return json.loads(json.dumps(DEFAULT_TENDENCIES))
+
+
+def derive_progression_pace(t: dict) -> str:
+    pace_score = t['confidenceWithLoad'] * 0.6 + (1 - t['recoveryNeed']) * 0.4
+    if pace_score < 0.35:
+        return 'slow'
+    if pace_score > 0.65:
+        return 'fast'
+    return 'moderate'
+
+
+def _topic(value) -> str:
+    return value if isinstance(value, str) and value else 'general'
+
+
+def update_decline_tracking(events: pd.DataFrame, current: list, now: datetime) -> list:
+    """updateDeclineTracking() for one user's events (newest first)"""
+    cutoff = DECLINE_COOLDOWN_DAYS * 2 * 86400
+    active = [dict(d) for d in current
+              if (now - to_utc(d['lastDeclined'])).total_seconds() < cutoff]
+
+    for event in events.itertuples(index=False):
+        if event.event_type not in ('suggestion_rejected', 'nudge_rejected'):
+            continue
+        topic = _topic(event.topic)
+        existing = next((d for d in active if d['topic'] == topic), None)
+        if existing:
+            existing['count'] += 1
+            existing['lastDeclined'] = js_iso(event.created_at)
+        else:
+            active.append({'topic': topic, 'count': 1, 'lastDeclined': js_iso(event.created_at)})
+
+    for event in events.itertuples(index=False):
+        if event.event_type not in ('suggestion_accepted', 'nudge_accepted'):
+            continue
+        existing = next((d for d in active if d['topic'] == _topic(event.topic)), None)
+        if existing:
+            existing['count'] = max(0, existing['count'] - 2)
+    return active
+
+
+def event_coefficients(events: pd.DataFrame, columns: list) -> np.ndarray:
+    """Matrix of shiftAmount multiples: one row per event, one column per state column"""
+    index = {c: i for i, c in enumerate(columns)}
+    coef = np.zeros((len(events), len(columns)))
+    payloads = [_payload(p) for p in events['payload']]
+
+    for row, (event_type, payload) in enumerate(zip(events['event_type'], payloads)):
+        if event_type in EVENT_RULES:
+            rules = EVENT_RULES[event_type]
+        elif event_type == 'weight_adjusted':
+            delta = _number(payload.get('delta'))
+            rules = WEIGHT_DOWN if delta < 0 else WEIGHT_UP if delta > 0 else {}
+        elif event_type == 'user_feedback':
+            rules = FEEDBACK_RULES.get(payload.get('feedbackType'), {})
+        else:
+            continue
+        for column, multiple in rules.items():
+            if column == 'move':
+                pattern = payload.get('movementPattern')
+                if pattern and f"move:{pattern}" in index:
+                    coef[row, index[f"move:{pattern}"]] = multiple
+            else:
+                coef[row, index[column]] = multiple
+    return coef
+
+
+def recompute_tendencies(events: pd.DataFrame, stored: dict, now: datetime, from_defaults: bool = False) -> dict:
+    """Replay windowed events for every user; return {user_id: tendencies}.
+
+    `events` holds id, user_id, event_type, topic, payload, created_at rows;
+    `stored` maps user_id -> user_tendencies row (dict). Users without
+    events in the window are left out, as updateUserTendencies() does not
+    save them.
+    """
+    now = to_utc(now)
+    df = events.copy()
+    df['created_at'] = pd.to_datetime(df['created_at'], utc=True)
+    df = df[df['created_at'] >= now - timedelta(days=ROLLING_WINDOW_DAYS)]
+    if df.empty:
+        return {}
+    # Newest first, as the query orders by createdAt DESC
+    df = df.sort_values(['user_id', 'created_at', 'id'], ascending=[True, False, False], kind='mergesort')
+    df['rank'] = df.groupby('user_id', sort=False).cumcount()
+
+    users = df['user_id'].unique()
+    start = {
+        int(u): default_tendencies() if from_defaults or u not in stored else parse_stored(stored[u])
+        for u in users
+    }
+    patterns = list(MOVEMENT_PATTERNS)
+    for t in start.values():
+        patterns += [p for p in t['movementConfidence'] if p not in patterns]
+    columns = SCALAR_COLUMNS + [f"move:{p}" for p in patterns]
+
+    # Missing movement keys are NaN, so they stay untouched (`!== undefined` check)
+    state = np.array([
+        [t['prefersConfirmation'], t['confidenceWithLoad'], t['swapFrequency'],
+         t['adherencePattern'].get('consistencyScore', np.nan), t['recoveryNeed']]
+        + [_number(t['movementConfidence'][p]) if p in t['movementConfidence'] else np.nan for p in patterns]
+        for t in (start[int(u)] for u in users)
+    ], dtype=float)
+    user_row = {u: i for i, u in enumerate(users)}
+
+    age_weeks = (now - df['created_at']).dt.total_seconds().to_numpy() / (86400 * 7)
+    shift = EVENT_SHIFT_AMOUNT * np.power(WEEKLY_DECAY, age_weeks)
+    coef = event_coefficients(df, columns)
+    rows = df['user_id'].map(user_row).to_numpy()
+    ranks = df['rank'].to_numpy()
+
+    for k in range(int(ranks.max()) + 1):
+        step = ranks == k
+        targets = rows[step]
+        c = coef[step]
+        current = state[targets]
+        shifted = np.clip(current + c * shift[step][:, None], MIN_CONFIDENCE, MAX_CONFIDENCE)
+        state[targets] = np.where(c != 0, shifted, current)
+
+    results = {}
+    for user_id, group in df.groupby('user_id', sort=False):
+        t = start[int(user_id)]
+        values = dict(zip(columns, state[user_row[user_id]]))
+        for column in ('prefersConfirmation', 'confidenceWithLoad', 'swapFrequency', 'recoveryNeed'):
+            t[column] = float(values[column])
+        if not np.isnan(values['consistencyScore']):
+            t['adherencePattern']['consistencyScore'] = float(values['consistencyScore'])
+        for p in patterns:
+            if p in t['movementConfidence']:
+                t['movementConfidence'][p] = float(values[f"move:{p}"])
+        t['progressionPace'] = derive_progression_pace(t)
+        t['recentDeclines'] = update_decline_tracking(group, t['recentDeclines'], now)
+        results[int(user_id)] = t
+    return results
+
+
+def js_number(value: float) -> str:
+    """Number.prototype.toString() for the values we store"""
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def diff_report(results: dict, stored: dict, tolerance: float = 1e-9) -> dict:
+    changes = []
+    for user_id, new in sorted(results.items()):
+        old = parse_stored(stored[user_id]) if user_id in stored else default_tendencies()
+        fields = {}
+        for key in NUMERIC_FIELDS:
+            if abs(new[key] - old[key]) > tolerance:
+                fields[key] = {'old': old[key], 'new': new[key]}
+        if new['progressionPace'] != old['progressionPace']:
+            fields['progressionPace'] = {'old': old['progressionPace'], 'new': new['progressionPace']}
+        for key in ('movementConfidence', 'adherencePattern'):
+            for sub, value in new[key].items():
+                before = old[key].get(sub)
+                if before is None or abs(_number(value) - _number(before)) > tolerance:
+                    fields[f"{key}.{sub}"] = {'old': before, 'new': value}
+        if new['recentDeclines'] != old['recentDeclines']:
+            fields['recentDeclines'] = {'old': old['recentDeclines'], 'new': new['recentDeclines']}
+        if fields:
+            changes.append({'userId': user_id, 'isNew': user_id not in stored, 'changes': fields})
+
+    pace_moves = {}
+    for change in changes:
+        pace = change['changes'].get('progressionPace')
+        if pace:
+            key = f"{pace['old']}->{pace['new']}"
+            pace_moves[key] = pace_moves.get(key, 0) + 1
+    return {
+        'summary': {
+            'usersRecomputed': len(results),
+            'usersChanged': len(changes),
+            'usersNew': sum(1 for c in changes if c['isNew']),
+            'paceChanges': pace_moves,
+        },
+        'users': changes,
+    }
+
+
+TENDENCY_COLUMNS = [
+    'user_id', 'progression_pace', 'prefers_confirmation', 'confidence_with_load', 'movement_confidence',
+    'swap_frequency', 'adherence_pattern', 'preferred_rep_style', 'recovery_need', 'recent_declines',
+    'last_updated',
+]
+
+
+def tendency_records(results: dict, updated_at: datetime) -> list:
+    return [
+        (user_id, t['progressionPace'], js_number(t['prefersConfirmation']), js_number(t['confidenceWithLoad']),
+         t['movementConfidence'], js_number(t['swapFrequency']), t['adherencePattern'], t['preferredRepStyle'],
+         js_number(t['recoveryNeed']), t['recentDeclines'], updated_at)
+        for user_id, t in sorted(results.items())
+    ]
+
+
+async def write_tendencies(conn, results: dict, updated_at: datetime) -> int:
+    """Upsert the recomputed rows; the jsonb columns go through binary COPY"""
+    return await copy_upsert(conn, 'user_tendencies', TENDENCY_COLUMNS,
+                             tendency_records(results, updated_at), conflict=['user_id'])
+
+
+async def main():
+    parser = argparse.ArgumentParser(description='Recompute user_tendencies for every user from learning events')
+    parser.add_argument('--from-defaults', action='store_true', help='Replay from default tendencies')
+    parser.add_argument('--report', default='tendency_diff.json', help='Diff report path')
+    parser.add_argument('--apply', action='store_true', help='Write the recomputed tendencies')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("USER TENDENCIES RECOMPUTE")
+    print("=" * 60)
+    print()
+
+    conn = await connect()
+    try:
+        now = datetime.now(timezone.utc)
+        window_start = (now - timedelta(days=ROLLING_WINDOW_DAYS)).replace(tzinfo=None)
+        events = await fetch_dataframe(conn, """
+            SELECT id, user_id, event_type, topic, payload, created_at
+            FROM ai_learning_events WHERE created_at >= $1
+        """, window_start)
+        stored = {r['user_id']: dict(r) for r in await conn.fetch("SELECT * FROM user_tendencies")}
+        print(f"Loaded {len(events)} learning events and {len(stored)} stored tendency rows")
+
+        started = datetime.now(timezone.utc)
+        results = recompute_tendencies(events, stored, now, from_defaults=args.from_defaults)
+        elapsed = (datetime.now(timezone.utc) - started).total_seconds()
+        print(f"Recomputed tendencies for {len(results)} users in {elapsed:.2f}s")
+
+        report = diff_report(results, stored)
+        summary = report['summary']
+        print("\n=== DIFF ===")
+        print(f"  Users changed: {summary['usersChanged']} ({summary['usersNew']} new)")
+        for move, count in sorted(summary['paceChanges'].items()):
+            print(f"  Pace {move}: {count}")
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, default=str)
+        print(f"  Report written to {args.report}")
+
+        if args.apply:
+            written = await write_tendencies(conn, results, now.replace(tzinfo=None))
+            print(f"\n✅ Upserted {written} user_tendencies rows")
+        else:
+            print("\nDry run - pass --apply to write user_tendencies")
+    finally:
+        await conn.close()
+    print("\nDone!")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,50 @@
+"""
+Shared helpers for the scripts in scripts/ that do not touch the database.
+
+Latency statistics for the benchmarks, and ports of the JavaScript number
+and date formatting the server uses, so precomputed rows match what the
+endpoints would have returned byte for byte.
+"""
+
+from statistics import mean
+from datetime import datetime, timezone
+
+
+def percentile(values: list, pct: float) -> float:
+    """Linear interpolation between closest ranks; 0 for no values"""
+    if not values:
+        return 0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def latency_stats(samples_ms: list) -> dict:
+    return {
+        'count': len(samples_ms),
+        'mean': round(mean(samples_ms), 2) if samples_ms else 0,
+        'p50': round(percentile(samples_ms, 50), 2),
+        'p95': round(percentile(samples_ms, 95), 2),
+    }
+
+
+def js_round(x):
+    """Math.round(): halves round up, unlike Python's banker's rounding. Works on arrays."""
+    import numpy as np
+
+    return np.floor(np.asarray(x, dtype=float) + 0.5).astype(int)
+
+
+def to_utc(ts) -> datetime:
+    """Timestamps without a zone are UTC (timestamp columns are written in UTC);
+    ISO strings such as a stored toISOString() value are parsed first"""
+    if isinstance(ts, str):
+        ts = datetime.fromisoformat(ts.replace('Z', '+00:00'))
+    return ts.replace(tzinfo=timezone.utc) if ts.tzinfo is None else ts.astimezone(timezone.utc)
+
+
+def js_iso(ts) -> str:
+    """Date.toISOString()"""
+    ts = to_utc(ts)
+    return ts.strftime('%Y-%m-%dT%H:%M:%S.') + f"{ts.microsecond // 1000:03d}Z"
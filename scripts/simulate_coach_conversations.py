@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Coach Conversation Load Simulator
+---------------------------------
+test_ai_coach_helpfulness.py and test_coach_refactor.py send one message per
+user to /api/coach/chat. Real chats are multi-turn: every turn the client
+resends the growing conversationHistory, the server rebuilds the prompt
+(buildCoachPrompt + memories + last 6 messages) and saveCoachMemory adds a
+coach_memory row in the background, which getCoachMemories then sorts on
+every later turn. This drives many such conversations at once to see whether
+long conversations slow down faster than linearly.
+
+It will:
+1. Register --conversations synthetic users (/api/auth/register, Bearer token)
+2. Run one conversation per user, --concurrency at a time, of --turns
+   messages drawn from the categories those tests cover (greetings, stats,
+   programming, form, nutrition, recovery, plan changes, settings, off-topic,
+   emotional), with --think-ms between turns and the tests' 45 s timeout
+3. Record per turn: latency, and the prompt size the server reports in
+   X-Coach-Prompt-Chars / X-Coach-System-Chars / X-LLM-Prompt-Tokens
+   (start the server with BENCH_HEADERS=true, or these stay empty)
+4. With DATABASE_URL set, sample the run's coach_memory rows every
+   --sample-seconds (total, and the largest per user)
+5. Report latency and prompt size by turn index, and the growth exponent of
+   each over the first turn (log-log slope: ~1 linear, >1 super-linear),
+   then append the run to --out
+
+Usage:
+    python scripts/simulate_coach_conversations.py --url http://localhost:5000 [--conversations 1000] [--turns 20]
+    python scripts/simulate_coach_conversations.py --url http://localhost:5000 --concurrency 500 --think-ms 3000 --label memory-index
+"""
+
+import os
+import json
+import math
+import time
+import uuid
+import random
+import asyncio
+import argparse
+import threading
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+
+from script_utils import latency_stats
+
+# Messages from tests/test_ai_coach_helpfulness.py and tests/test_coach_refactor.py
+CATEGORIES = {
+    'greeting': ["Hello coach!"],
+    'stats': ["What is my max bench press?", "What's my heaviest squat?"],
+    'programming': ["How should I structure my chest workout today?",
+                    "How much weight should I add to my bench press next week?",
+                    "How do I get stronger?", "How do I get better at pull-ups?"],
+    'form': ["What are the key form tips for deadlift?", "How do I improve my squat form?"],
+    'nutrition': ["How much protein should I eat to build muscle?", "How many calories should I eat to gain muscle?"],
+    'recovery': ["How can I recover better after workouts?"],
+    'plan_change': ["Can you swap my Monday and Wednesday workouts?", "I want to skip today's workout",
+                    "Can you add an extra workout for me today?",
+                    "I'm feeling energetic today, can you make my workout harder?",
+                    "I want to modify my workout schedule"],
+    'settings': ["I want to change my coach style", "I want to update my profile settings"],
+    'off_topic': ["What is the capital of France?", "Can squirrels fly?", "What's the weather like today?",
+                  "What is the meaning of life?"],
+    'emotional': ["Give me some workout motivation!", "This workout is terrible, I hate it!",
+                  "I'm so frustrated with my progress!"],
+}
+# Rough mix of a real chat: mostly training questions, some chit-chat
+CATEGORY_WEIGHTS = {'greeting': 1, 'stats': 2, 'programming': 4, 'form': 3, 'nutrition': 2, 'recovery': 2,
+                    'plan_change': 2, 'settings': 1, 'off_topic': 1, 'emotional': 2}
+PASSWORD = 'SimPass123!'
+REQUEST_TIMEOUT = 45
+SUPERLINEAR_EXPONENT = 1.2
+
+
+def conversation_script(rng: random.Random, turns: int) -> list:
+    """(category, message) per turn; every conversation opens with a greeting"""
+    names = list(CATEGORY_WEIGHTS)
+    weights = [CATEGORY_WEIGHTS[n] for n in names]
+    script = [('greeting', rng.choice(CATEGORIES['greeting']))]
+    for _ in range(turns - 1):
+        category = rng.choices(names, weights)[0]
+        script.append((category, rng.choice(CATEGORIES[category])))
+    return script[:turns]
+
+
+def _int_header(response, name):
+    value = response.headers.get(name)
+    return int(value) if value and value.isdigit() else None
+
+
+def run_conversation(session, url: str, token: str, script: list, think_ms: float = 0) -> list:
+    """Send the turns in order with the client's growing history; one record per turn"""
+    headers = {'Authorization': f"Bearer {token}"}
+    history, records = [], []
+    for turn, (category, message) in enumerate(script, 1):
+        if turn > 1 and think_ms:
+            time.sleep(think_ms / 1000)
+        record = {'turn': turn, 'category': category, 'historySent': len(history), 'ok': False, 'error': None,
+                  'promptChars': None, 'systemChars': None, 'promptTokens': None}
+        started = time.perf_counter()
+        try:
+            response = session.post(f"{url}/api/coach/chat", headers=headers, timeout=REQUEST_TIMEOUT,
+                                    json={'message': message, 'coach': 'default', 'conversationHistory': history})
+        except Exception as e:
+            record.update(latency_ms=(time.perf_counter() - started) * 1000, error=type(e).__name__)
+            records.append(record)
+            continue
+        record['latency_ms'] = (time.perf_counter() - started) * 1000
+        if response.status_code != 200:
+            record['error'] = f"HTTP {response.status_code}"
+            records.append(record)
+            continue
+        reply = response.json().get('response') or ''
+        record.update(ok=True, promptChars=_int_header(response, 'X-Coach-Prompt-Chars'),
+                      systemChars=_int_header(response, 'X-Coach-System-Chars'),
+                      promptTokens=_int_header(response, 'X-LLM-Prompt-Tokens'))
+        records.append(record)
+        history = history + [{'role': 'user', 'content': message}, {'role': 'coach', 'content': reply}]
+    return records
+
+
+def _mean(values: list):
+    values = [v for v in values if v is not None]
+    return round(sum(values) / len(values), 1) if values else None
+
+
+def per_turn(records: list) -> list:
+    """Latency and prompt size by turn index"""
+    by_turn = {}
+    for r in records:
+        by_turn.setdefault(r['turn'], []).append(r)
+    rows = []
+    for turn in sorted(by_turn):
+        ok = [r for r in by_turn[turn] if r['ok']]
+        stats = latency_stats([r['latency_ms'] for r in ok])
+        rows.append({
+            'turn': turn,
+            'count': len(by_turn[turn]),
+            'errors': len(by_turn[turn]) - len(ok),
+            'p50': stats['p50'],
+            'p95': stats['p95'],
+            'promptChars': _mean([r['promptChars'] for r in ok]),
+            'systemChars': _mean([r['systemChars'] for r in ok]),
+            'promptTokens': _mean([r['promptTokens'] for r in ok]),
+            'historySent': _mean([r['historySent'] for r in ok]),
+        })
+    return rows
+
+
+def growth_exponent(values: list):
+    """Log-log slope of the increase over the first value against the distance from it:
+    ~1 grows linearly, >1 super-linearly; None when it does not grow (or too few points)"""
+    if not values or values[0] is None:
+        return None
+    base = values[0]
+    points = [(math.log(i), math.log(v - base)) for i, v in enumerate(values[1:], 1) if v is not None and v > base]
+    if len(points) < 3:
+        return None
+    mx = sum(x for x, _ in points) / len(points)
+    my = sum(y for _, y in points) / len(points)
+    sxx = sum((x - mx) ** 2 for x, _ in points)
+    return round(sum((x - mx) * (y - my) for x, y in points) / sxx, 2) if sxx else None
+
+
+class MemorySampler(threading.Thread):
+    """Samples the run's coach_memory conversation rows every few seconds"""
+
+    def __init__(self, user_ids: list, interval: float):
+        super().__init__(daemon=True)
+        self.user_ids, self.interval = user_ids, interval
+        self.samples = []
+        self.stopped = threading.Event()
+
+    def run(self):
+        asyncio.run(self._loop())
+
+    async def _loop(self):
+        from db_utils import connect
+
+        conn = await connect()
+        started = time.perf_counter()
+        try:
+            while True:
+                row = await conn.fetchrow("""
+                    SELECT COUNT(*) AS users, COALESCE(SUM(n), 0) AS rows, COALESCE(MAX(n), 0) AS max_per_user
+                    FROM (SELECT COUNT(*) AS n FROM coach_memory
+                          WHERE user_id = ANY($1::integer[]) AND kind = 'conversation' GROUP BY user_id) per_user
+                """, self.user_ids)
+                self.samples.append({'t': round(time.perf_counter() - started, 1), 'rows': row['rows'],
+                                     'usersWithMemory': row['users'], 'maxPerUser': row['max_per_user']})
+                if self.stopped.wait(self.interval):
+                    return
+        finally:
+            await conn.close()
+
+    def stop(self):
+        self.stopped.set()
+        self.join(timeout=30)
+
+
+def register(session, url: str, run_id: str, index: int):
+    """(user id, token) of a new synthetic user, or None"""
+    response = session.post(f"{url}/api/auth/register", timeout=30, json={
+        'name': f"Coach Sim {index}",
+        'email': f"coach_sim_{run_id}_{index}@example.com",
+        'password': PASSWORD,
+        'experience': 'intermediate',
+        'fitnessGoals': ['build_muscle', 'get_stronger'],
+        'equipment': ['barbell', 'dumbbells', 'bench'],
+        'trainingDays': 4,
+    })
+    if response.status_code != 201:
+        return None
+    data = response.json()
+    return data.get('user', {}).get('id'), data.get('accessToken')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Simulate concurrent multi-turn coach conversations')
+    parser.add_argument('--url', required=True, help='Backend base URL')
+    parser.add_argument('--conversations', type=int, default=1000)
+    parser.add_argument('--turns', type=int, default=20)
+    parser.add_argument('--concurrency', type=int, default=200, help='Conversations in flight')
+    parser.add_argument('--think-ms', type=float, default=0, help='Pause between a reply and the next message')
+    parser.add_argument('--sample-seconds', type=float, default=5, help='coach_memory sampling interval')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--label', default='run', help='Name of this run in the results file')
+    parser.add_argument('--out', default='coach_conversation_sim.json')
+    args = parser.parse_args()
+
+    import requests
+
+    url = args.url.rstrip('/')
+    rng = random.Random(args.seed)
+    run_id = uuid.uuid4().hex[:8]
+
+    print("=" * 60)
+    print("COACH CONVERSATION LOAD SIMULATOR")
+    print("=" * 60)
+    print()
+
+    local = threading.local()
+
+    def session():
+        if not hasattr(local, 'session'):
+            local.session = requests.Session()
+        return local.session
+
+    with ThreadPoolExecutor(max_workers=min(32, args.conversations)) as pool:
+        users = [u for u in pool.map(lambda i: register(session(), url, run_id, i), range(args.conversations)) if u]
+    print(f"  Registered {len(users)}/{args.conversations} synthetic users")
+    if not users:
+        print("❌ Could not register any users")
+        return
+
+    sampler = None
+    if os.environ.get('DATABASE_URL'):
+        sampler = MemorySampler([user_id for user_id, _ in users], args.sample_seconds)
+        sampler.start()
+    else:
+        print("  DATABASE_URL not set - coach_memory growth will not be sampled")
+
+    scripts = [conversation_script(rng, args.turns) for _ in users]
+    print(f"  Running {len(users)} conversations x {args.turns} turns, {args.concurrency} at a time...")
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        conversations = list(pool.map(lambda us: run_conversation(session(), url, us[0][1], us[1], args.think_ms),
+                                      zip(users, scripts)))
+    wall = time.perf_counter() - started
+    if sampler:
+        time.sleep(min(args.sample_seconds, 10))   # let background memory saves land
+        sampler.stop()
+
+    records = [r for conversation in conversations for r in conversation]
+    turns = per_turn(records)
+    exponents = {key: growth_exponent([t[key] for t in turns]) for key in ('p50', 'p95', 'promptChars')}
+
+    print(f"\n  {'turn':>4} {'p50 ms':>8} {'p95 ms':>8} {'prompt chars':>13} {'system chars':>13} {'errors':>7}")
+    for t in turns:
+        print(f"  {t['turn']:>4} {t['p50']:>8.0f} {t['p95']:>8.0f} {t['promptChars'] or 0:>13.0f} "
+              f"{t['systemChars'] or 0:>13.0f} {t['errors']:>7}")
+
+    memory = None
+    if sampler and sampler.samples:
+        last = sampler.samples[-1]
+        memory = {'samples': sampler.samples, 'rows': last['rows'], 'maxPerUser': last['maxPerUser'],
+                  'rowsPerTurn': round(last['rows'] / len(records), 2) if records else 0}
+        print(f"\n  coach_memory: {last['rows']:,} rows for {last['usersWithMemory']:,} users "
+              f"(max {last['maxPerUser']} per user, {memory['rowsPerTurn']} per turn)")
+
+    ok = sum(1 for r in records if r['ok'])
+    print(f"\n  {ok:,}/{len(records):,} turns ok in {wall:.1f}s ({ok / wall:.1f} turns/s)")
+    for key, exponent in exponents.items():
+        shown = 'flat' if exponent is None else f"{exponent}"
+        print(f"  Growth exponent {key:12} {shown}")
+
+    superlinear = [k for k, e in exponents.items() if e is not None and e > SUPERLINEAR_EXPONENT]
+    status = '❌' if superlinear else '✅'
+    verdict = f"super-linear growth in {', '.join(superlinear)}" if superlinear else 'no super-linear growth'
+    print(f"\n{status} {verdict}")
+
+    runs = []
+    if os.path.exists(args.out):
+        with open(args.out, encoding='utf-8') as f:
+            runs = json.load(f)
+    runs.append({'label': args.label, 'at': datetime.now(timezone.utc).isoformat(),
+                 'conversations': len(users), 'turnsPerConversation': args.turns, 'concurrency': args.concurrency,
+                 'thinkMs': args.think_ms, 'wallSeconds': round(wall, 2), 'turnsOk': ok, 'turns': turns,
+                 'growthExponents': exponents, 'coachMemory': memory})
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(runs, f, indent=2)
+    print(f"✅ Results appended to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+#!/usr/bin/env tsx
+
+// CLI bridge for scripts/split_planner_harness.py: reads one JSON object per
+// line from stdin ({ id, input: SplitPlannerInput }) and writes one line per
+// case to stdout ({ id, elapsedUs, template } or { id, error }).
+// generateWeeklyTemplate() logs every step, so console output is silenced.
+
+import { createInterface } from "readline";
+import { generateWeeklyTemplate } from "../server/split-planner";
+
+const WRITE_BATCH = 500;
+
+console.log = () => {};
+console.error = () => {};
+
+async function main() {
+  const lines = createInterface({ input: process.stdin, crlfDelay: Infinity });
+  let batch: string[] = [];
+
+  for await (const line of lines) {
+    if (!line.trim()) continue;
+    const { id, input } = JSON.parse(line);
+    const started = process.hrtime.bigint();
+    try {
+      const template = generateWeeklyTemplate(input);
+      const elapsedUs = Number(process.hrtime.bigint() - started) / 1000;
+      batch.push(JSON.stringify({ id, elapsedUs, template }));
+    } catch (error: any) {
+      batch.push(JSON.stringify({ id, error: error?.message || String(error) }));
+    }
+    if (batch.length >= WRITE_BATCH) {
+      process.stdout.write(batch.join("\n") + "\n");
+      batch = [];
+    }
+  }
+  if (batch.length) {
+    process.stdout.write(batch.join("\n") + "\n");
+  }
+}
+
+main();
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Split Planner Property Harness
+------------------------------
+split-planner.ts::generateWeeklyTemplate decides every user's week - which
+days train, which split, how many exercises - from frequency, experience,
+session length, preferred split, available days and weekly activities
+(getDayConflicts, rotateSplitForVariety), and only server/test-split-planner.ts
+prints a handful of hand-picked cases. This runs it over the whole input space.
+
+It will:
+1. Enumerate the grid frequency x experience x duration x preferred split x
+   week number x schedule flexibility, with --draws random available-day /
+   weekly-activity combinations per cell (the first draw of each cell uses
+   neither), ~28k inputs by default; --sample N takes a random subset
+2. Skip inputs whose hash is already in the --cache file for the current
+   planner source, so reruns only evaluate new or changed cases
+3. Send the rest as JSON lines through the CLI bridge
+   (split_planner_bridge.ts, run with tsx), which times each call in-process
+4. Check every template:
+   - 7 days, one per dayIndex; frequency sessions when enough days are free
+   - no gym session on a hard-activity day or outside the available days
+   - no back-to-back hard days: the longest run of gym / hard-activity days
+     (wrapping into next week) stays within maxConsecutiveHeavyDays unless
+     no placement of the sessions on the free days could
+   - no same focus on consecutive gym days when the split has more than one
+   - exercise counts inside the generator prompt's range
+     (bench_workout_realism_sweep.COUNT_RANGES), warmup + main + cooldown
+     adding up, rest days at zero
+   - all five major muscle groups covered from two sessions up
+5. Report violations per kind with an example input, and per-call latency
+   (p50/p95/p99 in microseconds)
+
+Usage:
+    python scripts/split_planner_harness.py [--draws 4] [--sample 5000] [--no-cache]
+    python scripts/split_planner_harness.py --bridge "node --import tsx scripts/split_planner_bridge.ts"
+"""
+
+import os
+import json
+import time
+import random
+import shlex
+import hashlib
+import argparse
+import itertools
+import threading
+import subprocess
+from collections import Counter
+
+from script_utils import latency_stats, percentile
+from bench_workout_realism_sweep import expected_count_range
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+PLANNER_SOURCE = os.path.join(ROOT, 'server', 'split-planner.ts')
+DEFAULT_BRIDGE = 'npx tsx scripts/split_planner_bridge.ts'
+DEFAULT_CACHE = 'split_planner_cache.json'
+
+FREQUENCIES = [1, 2, 3, 4, 5, 6, 7]
+EXPERIENCES = ['beginner', 'intermediate', 'advanced']
+DURATIONS = [20, 30, 45, 60, 75, 90]
+SPLITS = [None, 'coach_choice', 'upper_lower', 'upper_lower_full', 'full_body', 'push_pull_legs', 'bro_split']
+WEEK_NUMBERS = [1, 2, 3, 4]
+FLEXIBILITY = [True, False]
+ACTIVITIES = [('Football', 'hard'), ('Running', 'hard'), ('Boxing', 'hard'), ('Swimming', 'moderate'),
+              ('Cycling', 'moderate'), ('Yoga', 'low')]
+TIME_WINDOWS = ['morning', 'afternoon', 'evening']
+MAJOR_MUSCLE_GROUPS = 5
+
+
+def random_constraints(rng: random.Random) -> dict:
+    """gymDaysAvailable and weeklyActivities for one draw"""
+    extra = {}
+    if rng.random() < 0.7:
+        extra['gymDaysAvailable'] = sorted(rng.sample(range(7), rng.randint(1, 7)))
+    activities = []
+    for _ in range(rng.choice([0, 1, 1, 2])):
+        name, intensity = rng.choice(ACTIVITIES)
+        activities.append({'name': name, 'dayOfWeek': rng.randrange(7),
+                           'timeWindow': rng.choice(TIME_WINDOWS), 'intensity': intensity})
+    if activities:
+        extra['weeklyActivities'] = activities
+    return extra
+
+
+def build_inputs(draws: int = 4, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    inputs = []
+    for freq, exp, duration, split, week, flexible in itertools.product(
+            FREQUENCIES, EXPERIENCES, DURATIONS, SPLITS, WEEK_NUMBERS, FLEXIBILITY):
+        base = {'frequency': freq, 'experience': exp, 'goals': ['muscle_gain'],
+                'equipment': ['barbell', 'dumbbells'], 'sessionDuration': duration,
+                'weekNumber': week, 'scheduleFlexibility': flexible}
+        if split:
+            base['preferredSplit'] = split
+        inputs.append(base)
+        inputs.extend({**base, **random_constraints(rng)} for _ in range(draws - 1))
+    return inputs
+
+
+def input_hash(planner_input: dict) -> str:
+    return hashlib.sha1(json.dumps(planner_input, sort_keys=True, separators=(',', ':')).encode()).hexdigest()
+
+
+def planner_fingerprint() -> str:
+    """Cached results are only valid for the planner source and checks that produced them"""
+    digest = hashlib.sha1()
+    for path in (PLANNER_SOURCE, os.path.abspath(__file__)):
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def free_days(planner_input: dict) -> list:
+    """Days the planner may use: available days (all when empty) without a hard activity"""
+    hard = hard_activity_days(planner_input)
+    allowed = planner_input.get('gymDaysAvailable') or list(range(7))
+    days = [d for d in range(7) if d in allowed and d not in hard]
+    return days or [d for d in range(7) if d not in hard]
+
+
+def hard_activity_days(planner_input: dict) -> set:
+    return {a['dayOfWeek'] for a in planner_input.get('weeklyActivities') or [] if a['intensity'] == 'hard'}
+
+
+def longest_run(days: set) -> int:
+    """Longest run of consecutive days, wrapping Saturday into Sunday"""
+    if len(days) >= 7:
+        return 7
+    longest = current = 0
+    for d in list(range(7)) * 2:
+        current = current + 1 if d in days else 0
+        longest = max(longest, current)
+    return longest
+
+
+def best_possible_run(free: list, fixed_hard: set, sessions: int) -> int:
+    return min((longest_run(set(combo) | fixed_hard) for combo in itertools.combinations(free, sessions)),
+               default=longest_run(fixed_hard))
+
+
+def check_template(planner_input: dict, template: dict) -> list:
+    """Violation kinds for one template (empty when every invariant holds)"""
+    days = template.get('days') or []
+    if sorted(d['dayIndex'] for d in days) != list(range(7)):
+        return ['day_shape']
+
+    violations = []
+    frequency = planner_input['frequency']
+    hard = hard_activity_days(planner_input)
+    free = free_days(planner_input)
+    gym = sorted((d for d in days if d['isGymTraining']), key=lambda d: d['dayIndex'])
+    gym_days = {d['dayIndex'] for d in gym}
+
+    if len(gym) < min(frequency, len(free)):
+        violations.append('sessions_short')
+    if len(gym) > frequency:
+        violations.append('sessions_over')
+    if gym_days & hard:
+        violations.append('gym_on_hard_activity')
+    if gym_days - set(free) - hard:
+        violations.append('gym_outside_available')
+
+    limit = template['constraints']['maxConsecutiveHeavyDays']
+    if longest_run(gym_days | hard) > limit and best_possible_run(free, hard, len(gym)) <= limit:
+        violations.append('back_to_back_hard')
+    if len({d['focus'] for d in gym}) > 1 and any(
+            a['dayIndex'] + 1 == b['dayIndex'] and a['focus'] == b['focus'] for a, b in zip(gym, gym[1:])):
+        violations.append('same_focus_back_to_back')
+
+    low, high = expected_count_range(planner_input['experience'], planner_input['sessionDuration'])
+    for d in gym:
+        count, main = d['exerciseCount'], d['mainCount']
+        if count['min'] < low or count['max'] > high:
+            violations.append('exercise_count_range')
+        if (d['warmupCount'] + main['min'] + d['cooldownCount'] != count['min']
+                or d['warmupCount'] + main['max'] + d['cooldownCount'] != count['max'] or main['min'] < 1):
+            violations.append('count_breakdown')
+    if any(d['exerciseCount']['max'] for d in days if not d['isGymTraining']):
+        violations.append('rest_day_counts')
+
+    if len(gym) >= 2 and len(template.get('muscleGroupCoverage') or []) < MAJOR_MUSCLE_GROUPS:
+        violations.append('muscle_coverage')
+    if template['timeBudget']['mainWorkMinutes'] <= 0:
+        violations.append('time_budget')
+    return sorted(set(violations))
+
+
+def run_bridge(command: str, cases: list):
+    """Yield one bridge result per (id, input) case, streaming both ways"""
+    process = subprocess.Popen(shlex.split(command), cwd=ROOT, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                               text=True, bufsize=1 << 16)
+
+    def feed():
+        try:
+            for case_id, planner_input in cases:
+                process.stdin.write(json.dumps({'id': case_id, 'input': planner_input}) + '\n')
+        finally:
+            process.stdin.close()
+
+    writer = threading.Thread(target=feed, daemon=True)
+    writer.start()
+    for line in process.stdout:
+        if line.strip():
+            yield json.loads(line)
+    writer.join()
+    if process.wait() != 0:
+        raise RuntimeError(f"bridge exited with {process.returncode}")
+
+
+def load_cache(path: str, fingerprint: str) -> dict:
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        cache = json.load(f)
+    return cache['results'] if cache.get('planner') == fingerprint else {}
+
+
+def save_cache(path: str, fingerprint: str, results: dict):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'planner': fingerprint, 'results': results}, f, separators=(',', ':'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Property and latency harness for generateWeeklyTemplate')
+    parser.add_argument('--draws', type=int, default=4, help='Inputs per grid cell (first without constraints)')
+    parser.add_argument('--sample', type=int, help='Random subset of the inputs')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--bridge', default=DEFAULT_BRIDGE, help='Command running split_planner_bridge.ts')
+    parser.add_argument('--cache', default=DEFAULT_CACHE)
+    parser.add_argument('--no-cache', action='store_true')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("SPLIT PLANNER PROPERTY HARNESS")
+    print("=" * 60)
+    print()
+
+    inputs = build_inputs(args.draws, args.seed)
+    if args.sample and args.sample < len(inputs):
+        inputs = random.Random(args.seed).sample(inputs, args.sample)
+    by_hash = {input_hash(i): i for i in inputs}
+
+    fingerprint = planner_fingerprint()
+    results = {} if args.no_cache else load_cache(args.cache, fingerprint)
+    pending = [(h, i) for h, i in by_hash.items() if h not in results]
+    print(f"  {len(by_hash):,} distinct inputs, {len(by_hash) - len(pending):,} cached, "
+          f"{len(pending):,} to evaluate")
+
+    elapsed_us = []
+    started = time.perf_counter()
+    for result in run_bridge(args.bridge, pending) if pending else []:
+        if 'error' in result:
+            results[result['id']] = {'violations': ['exception'], 'error': result['error']}
+            continue
+        elapsed_us.append(result['elapsedUs'])
+        results[result['id']] = {'violations': check_template(by_hash[result['id']], result['template']),
+                                 'elapsedUs': result['elapsedUs']}
+    wall = time.perf_counter() - started
+    if not args.no_cache:
+        save_cache(args.cache, fingerprint, results)
+
+    kinds, examples = Counter(), {}
+    for h in by_hash:
+        for kind in results[h]['violations']:
+            kinds[kind] += 1
+            examples.setdefault(kind, by_hash[h])
+
+    if elapsed_us:
+        stats = latency_stats(elapsed_us)
+        print(f"\n  Latency (us):  mean {stats['mean']:.1f}   p50 {stats['p50']:.1f}   p95 {stats['p95']:.1f}   "
+              f"p99 {percentile(elapsed_us, 99):.1f}   max {max(elapsed_us):.1f}")
+        print(f"  Bridge:        {len(elapsed_us):,} calls in {wall:.1f}s ({len(elapsed_us) / wall:,.0f}/s incl. startup)")
+
+    print()
+    for kind, count in kinds.most_common():
+        print(f"  {kind:24} {count:7,} ({count / len(by_hash):.1%})")
+        print(f"    e.g. {json.dumps(examples[kind], sort_keys=True)}")
+
+    failing = sum(1 for h in by_hash if results[h]['violations'])
+    status = '✅' if not failing else '❌'
+    print(f"\n{status} {failing:,} of {len(by_hash):,} inputs violate an invariant")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Shared helpers for the exercise video batch jobs
+(extract_video_thumbnails.py, audit_exercise_videos.py).
+
+A video catalog is either:
+- a directory of video files, where each filename (without extension) is
+  the exercise slug, e.g. videos/barbell-bench-press.mp4
+- a JSON manifest: [{"slug": "barbell-bench-press", "path": "videos/bb.mp4", "id": 12}, ...]
+  Relative paths are resolved against the manifest's directory; http(s)
+  URLs are kept as-is (only tools that go through ffprobe accept them).
+"""
+
+import os
+import json
+import hashlib
+import subprocess
+
+VIDEO_EXTENSIONS = ('.mp4', '.mov', '.webm', '.m4v', '.mkv')
+
+
+def load_video_entries(source: str) -> list:
+    """Return [{'slug', 'path', 'id'?}] for a directory or manifest file"""
+    if os.path.isdir(source):
+        entries = []
+        for root, _, files in os.walk(source):
+            for filename in sorted(files):
+                stem, ext = os.path.splitext(filename)
+                if ext.lower() in VIDEO_EXTENSIONS:
+                    entries.append({'slug': stem, 'path': os.path.join(root, filename)})
+        return sorted(entries, key=lambda e: e['slug'])
+
+    with open(source, encoding='utf-8') as f:
+        data = json.load(f)
+    base = os.path.dirname(os.path.abspath(source))
+    entries = []
+    for item in data:
+        path = item['path']
+        if not os.path.isabs(path) and not is_url(path):
+            path = os.path.join(base, path)
+        entry = {'slug': item.get('slug') or os.path.splitext(os.path.basename(path))[0], 'path': path}
+        if item.get('id') is not None:
+            entry['id'] = item['id']
+        entries.append(entry)
+    return entries
+
+
+def is_url(path: str) -> bool:
+    return path.startswith(('http://', 'https://'))
+
+
+def parse_ffprobe(data: dict) -> dict:
+    """Reduce `ffprobe -show_format -show_streams` JSON to the fields we report"""
+    fmt = data.get('format', {})
+    video = next((s for s in data.get('streams', []) if s.get('codec_type') == 'video'), {})
+    audio = next((s for s in data.get('streams', []) if s.get('codec_type') == 'audio'), None)
+
+    def _float(value):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+
+    def _int(value):
+        number = _float(value)
+        return int(number) if number is not None else None
+
+    duration = _float(fmt.get('duration')) or _float(video.get('duration'))
+    size = _int(fmt.get('size'))
+    bitrate = _int(fmt.get('bit_rate'))
+    if bitrate is None and size and duration:
+        bitrate = int(size * 8 / duration)
+
+    fps = None
+    rate = video.get('avg_frame_rate') or video.get('r_frame_rate')
+    if rate and '/' in rate:
+        num, den = rate.split('/', 1)
+        if _float(den):
+            fps = round(float(num) / float(den), 2)
+
+    return {
+        'duration': duration,
+        'width': _int(video.get('width')),
+        'height': _int(video.get('height')),
+        'fps': fps,
+        'codec': video.get('codec_name'),
+        'audioCodec': audio.get('codec_name') if audio else None,
+        'bitrate': bitrate,
+        'size': size,
+    }
+
+
+def probe_video(path: str, timeout: float = 60) -> dict:
+    """Probe a local file or URL with ffprobe"""
+    result = subprocess.run(
+        ['ffprobe', '-v', 'error', '-print_format', 'json', '-show_format', '-show_streams', path],
+        capture_output=True, timeout=timeout,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.decode(errors='replace').strip() or 'ffprobe failed')
+    info = parse_ffprobe(json.loads(result.stdout))
+    if info['size'] is None and not is_url(path):
+        info['size'] = os.path.getsize(path)
+    return info
+
+
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class HashCache:
+    """Remembers content hashes by (path, size, mtime) so unchanged videos
+    are not re-read on every run."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self.entries = json.load(f)
+
+    def hash(self, video_path: str) -> str:
+        stat = os.stat(video_path)
+        key = os.path.abspath(video_path)
+        cached = self.entries.get(key)
+        if cached and cached['size'] == stat.st_size and cached['mtime'] == stat.st_mtime:
+            return cached['sha256']
+        digest = file_sha256(video_path)
+        self.entries[key] = {'size': stat.st_size, 'mtime': stat.st_mtime, 'sha256': digest}
+        return digest
+
+    def save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, indent=2, sort_keys=True)
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Generated Workout Schema Validator
+----------------------------------
+The realism scripts check generated workouts with hand-written if chains
+('exercises' not in data, category checks, ...) repeated in every test. This
+module holds JSON Schemas for the three response shapes and compiles them
+once into nested closures, so validating a response is a walk over
+precomputed checks instead of interpreting the schema each time (well over ten
+thousand workouts per second, see --bench).
+
+Shapes:
+- workout: POST /api/workouts/generate (training, rest and external activity
+  days; mirrors WorkoutSchema/ExerciseSchema in ai-workout-generator.ts)
+- day: a workout_days row as returned by /api/v1/workouts/day and
+  /api/v1/workouts/week
+- plan: the POST /api/v1/workouts/generate-week response
+
+Only the JSON Schema keywords used here are compiled: type, enum, const,
+properties, required, items, minItems/maxItems, minLength, pattern,
+minimum/maximum and if/then/else.
+
+It will (when run directly):
+1. Validate every JSON document in a .json (one document or a list) or
+   .jsonl file against --shape and print the first errors
+2. With --bench, time validation of the file's documents --repeat times
+
+Usage:
+    from workout_schema import validate_workout, validate_plan
+    errors = validate_workout(response.json())   # [] when valid
+
+    python scripts/workout_schema.py responses.jsonl --shape workout [--bench]
+"""
+
+import re
+import sys
+import json
+import time
+import argparse
+
+_TYPE_CHECKS = {
+    'object': lambda v: isinstance(v, dict),
+    'array': lambda v: isinstance(v, list),
+    'string': lambda v: isinstance(v, str),
+    'integer': lambda v: isinstance(v, int) and not isinstance(v, bool)
+                         or isinstance(v, float) and v.is_integer(),
+    'number': lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    'boolean': lambda v: isinstance(v, bool),
+    'null': lambda v: v is None,
+}
+
+
+def _render(path) -> str:
+    """Paths are built as (parent, key) pairs and only rendered for errors"""
+    keys = []
+    while isinstance(path, tuple):
+        path, key = path
+        keys.append(f"[{key}]" if isinstance(key, int) else f".{key}")
+    return path + ''.join(reversed(keys))
+
+
+def _compile(schema: dict):
+    """Check function (value, path, errors) for a schema"""
+    checks = []
+
+    if 'type' in schema:
+        types = schema['type'] if isinstance(schema['type'], list) else [schema['type']]
+        type_checks = [_TYPE_CHECKS[t] for t in types]
+        expected = ' or '.join(types)
+
+        if len(type_checks) == 1:
+            (type_check,) = type_checks
+
+            def check_type(value, path, errors):
+                if not type_check(value):
+                    errors.append(f"{_render(path)}: expected {expected}, got {type(value).__name__}")
+                    return False
+                return True
+        else:
+            def check_type(value, path, errors):
+                for type_check in type_checks:
+                    if type_check(value):
+                        return True
+                errors.append(f"{_render(path)}: expected {expected}, got {type(value).__name__}")
+                return False
+    else:
+        check_type = None
+
+    if 'const' in schema:
+        const = schema['const']
+        checks.append(lambda v, p, e: v == const or e.append(f"{_render(p)}: expected {const!r}"))
+    if 'enum' in schema:
+        allowed = frozenset(schema['enum'])
+        listed = sorted(allowed, key=str)
+        checks.append(lambda v, p, e: (not isinstance(v, (dict, list)) and v in allowed)
+                      or e.append(f"{_render(p)}: {v!r} is not one of {listed}"))
+    if 'minLength' in schema:
+        n = schema['minLength']
+        checks.append(lambda v, p, e: not isinstance(v, str) or len(v) >= n
+                      or e.append(f"{_render(p)}: shorter than {n} characters"))
+    if 'pattern' in schema:
+        match = re.compile(schema['pattern']).search
+        pattern = schema['pattern']
+        checks.append(lambda v, p, e: not isinstance(v, str) or match(v)
+                      or e.append(f"{_render(p)}: {v!r} does not match {pattern}"))
+    if 'minimum' in schema:
+        lo = schema['minimum']
+        checks.append(lambda v, p, e: not _TYPE_CHECKS['number'](v) or v >= lo
+                      or e.append(f"{_render(p)}: {v} is below {lo}"))
+    if 'maximum' in schema:
+        hi = schema['maximum']
+        checks.append(lambda v, p, e: not _TYPE_CHECKS['number'](v) or v <= hi
+                      or e.append(f"{_render(p)}: {v} is above {hi}"))
+
+    required = tuple(schema.get('required', ()))
+    properties = tuple((name, _compile(sub)) for name, sub in schema.get('properties', {}).items())
+    if required or properties:
+        def check_object(value, path, errors):
+            if not isinstance(value, dict):
+                return
+            for name in required:
+                if name not in value:
+                    errors.append(f"{_render(path)}: missing '{name}'")
+            for name, check in properties:
+                if name in value:
+                    check(value[name], (path, name), errors)
+        checks.append(check_object)
+
+    if 'items' in schema or 'minItems' in schema or 'maxItems' in schema:
+        item_check = _compile(schema['items']) if 'items' in schema else None
+        min_items = schema.get('minItems', 0)
+        max_items = schema.get('maxItems')
+
+        def check_array(value, path, errors):
+            if not isinstance(value, list):
+                return
+            if len(value) < min_items:
+                errors.append(f"{_render(path)}: {len(value)} items, expected at least {min_items}")
+            if max_items is not None and len(value) > max_items:
+                errors.append(f"{_render(path)}: {len(value)} items, expected at most {max_items}")
+            if item_check is not None:
+                for i, item in enumerate(value):
+                    item_check(item, (path, i), errors)
+        checks.append(check_array)
+
+    if 'if' in schema:
+        condition = _compile(schema['if'])
+        then = _compile(schema['then']) if 'then' in schema else None
+        otherwise = _compile(schema['else']) if 'else' in schema else None
+
+        def check_conditional(value, path, errors):
+            probe = []
+            condition(value, path, probe)
+            branch = then if not probe else otherwise
+            if branch is not None:
+                branch(value, path, errors)
+        checks.append(check_conditional)
+
+    checks = tuple(checks)
+
+    def check(value, path, errors):
+        if check_type is not None and not check_type(value, path, errors):
+            return
+        for c in checks:
+            c(value, path, errors)
+    return check
+
+
+def compile_validator(schema: dict):
+    """validate(instance) -> list of error messages ([] when valid)"""
+    check = _compile(schema)
+
+    def validate(instance) -> list:
+        errors = []
+        check(instance, '$', errors)
+        return errors
+    return validate
+
+
+EXERCISE_SCHEMA = {
+    'type': 'object',
+    'required': ['id', 'name', 'sets', 'reps', 'category'],
+    'properties': {
+        'id': {'type': 'string', 'minLength': 1},
+        'name': {'type': 'string', 'minLength': 1},
+        'sets': {'type': 'integer', 'minimum': 1, 'maximum': 10},
+        'reps': {'type': ['string', 'number']},
+        'restTime': {'type': 'number', 'minimum': 15, 'maximum': 300},
+        'category': {'enum': ['warmup', 'main', 'cooldown']},
+        'setType': {'enum': ['normal', 'drop', 'super', 'giant']},
+        'videoUrl': {'type': ['string', 'null']},
+        'thumbnailUrl': {'type': ['string', 'null']},
+        'suggestedWeight': {'type': ['number', 'null']},
+        'suggestedReps': {'type': ['number', 'null']},
+        'aiNote': {'type': ['string', 'null']},
+    },
+}
+
+TRAINING_WORKOUT_SCHEMA = {
+    'required': ['title', 'type', 'duration', 'exercises'],
+    'properties': {
+        'title': {'type': 'string', 'minLength': 1},
+        'type': {'type': 'string'},
+        'difficulty': {'type': 'string'},
+        'duration': {'type': 'number', 'minimum': 15, 'maximum': 120},
+        'exercises': {'type': 'array', 'minItems': 3, 'maxItems': 12, 'items': EXERCISE_SCHEMA},
+        'overview': {'type': 'string'},
+        'targetMuscles': {'type': 'string'},
+        'caloriesBurn': {'type': 'number', 'minimum': 0},
+    },
+}
+
+# Rest and external activity days (split planner) come back with no exercises
+NON_TRAINING_DAY_SCHEMA = {
+    'required': ['title', 'type', 'exercises'],
+    'properties': {
+        'title': {'type': 'string', 'minLength': 1},
+        'type': {'enum': ['rest', 'external_activity']},
+        'exercises': {'type': 'array', 'maxItems': 0},
+    },
+}
+
+WORKOUT_SCHEMA = {
+    'type': 'object',
+    'if': {'required': ['isRestDay'], 'properties': {'isRestDay': {'const': True}}},
+    'then': NON_TRAINING_DAY_SCHEMA,
+    'else': {
+        'if': {'required': ['isActivityDay'], 'properties': {'isActivityDay': {'const': True}}},
+        'then': NON_TRAINING_DAY_SCHEMA,
+        'else': TRAINING_WORKOUT_SCHEMA,
+    },
+}
+
+DATE_PATTERN = r'^\d{4}-\d{2}-\d{2}$'
+DAY_STATUSES = ['pending', 'generating', 'ready', 'error']
+
+# A ready day carries a workout; others may carry nothing or {error}
+_DAY_PAYLOAD = {
+    'if': {'required': ['status'], 'properties': {'status': {'const': 'ready'}}},
+    'then': {'required': ['payloadJson'], 'properties': {'payloadJson': WORKOUT_SCHEMA}},
+}
+
+DAY_SCHEMA = {
+    'type': 'object',
+    'required': ['userId', 'date', 'status'],
+    'properties': {
+        'id': {'type': 'integer'},
+        'userId': {'type': 'integer'},
+        'date': {'type': 'string', 'pattern': DATE_PATTERN},
+        'status': {'enum': DAY_STATUSES},
+        'completedAt': {'type': ['string', 'null']},
+    },
+    **_DAY_PAYLOAD,
+}
+
+PLAN_SCHEMA = {
+    'type': 'object',
+    'required': ['success', 'weekDates', 'workouts'],
+    'properties': {
+        'success': {'const': True},
+        'weekDates': {'type': 'array', 'minItems': 7, 'maxItems': 7,
+                      'items': {'type': 'string', 'pattern': DATE_PATTERN}},
+        # every workout_days row of the user, not only this week's
+        'workouts': {'type': 'array', 'items': {
+            'type': 'object',
+            'required': ['date', 'status'],
+            'properties': {
+                'date': {'type': 'string', 'pattern': DATE_PATTERN},
+                'status': {'enum': DAY_STATUSES},
+            },
+            'if': {'required': ['status'], 'properties': {'status': {'const': 'ready'}}},
+            'then': {'required': ['workout'], 'properties': {'workout': WORKOUT_SCHEMA}},
+        }},
+    },
+}
+
+SCHEMAS = {'workout': WORKOUT_SCHEMA, 'day': DAY_SCHEMA, 'plan': PLAN_SCHEMA}
+
+validate_workout = compile_validator(WORKOUT_SCHEMA)
+validate_day = compile_validator(DAY_SCHEMA)
+validate_plan = compile_validator(PLAN_SCHEMA)
+VALIDATORS = {'workout': validate_workout, 'day': validate_day, 'plan': validate_plan}
+
+
+def iter_errors(documents, validate=validate_workout):
+    """(index, errors) for each invalid document of an iterable (e.g. a response stream)"""
+    for i, doc in enumerate(documents):
+        errors = validate(doc)
+        if errors:
+            yield i, errors
+
+
+def load_documents(path: str) -> list:
+    with open(path, encoding='utf-8') as f:
+        if path.endswith('.jsonl'):
+            return [json.loads(line) for line in f if line.strip()]
+        data = json.load(f)
+    return data if isinstance(data, list) else [data]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Validate generated workout JSON')
+    parser.add_argument('path', help='.json or .jsonl file of responses')
+    parser.add_argument('--shape', choices=sorted(VALIDATORS), default='workout')
+    parser.add_argument('--bench', action='store_true', help='Time validation throughput')
+    parser.add_argument('--repeat', type=int, default=20, help='Passes over the file with --bench')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"WORKOUT SCHEMA VALIDATION ({args.shape})")
+    print("=" * 60)
+    print()
+
+    validate = VALIDATORS[args.shape]
+    documents = load_documents(args.path)
+    invalid = list(iter_errors(documents, validate))
+    for i, errors in invalid[:10]:
+        print(f"  #{i}: {'; '.join(errors[:5])}")
+
+    if args.bench and documents:
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            for doc in documents:
+                validate(doc)
+        elapsed = time.perf_counter() - started
+        print(f"\n  {len(documents) * args.repeat / elapsed:,.0f} documents/s")
+
+    print(f"\n{'✅' if not invalid else '❌'} {len(documents) - len(invalid)}/{len(documents)} valid")
+    sys.exit(1 if invalid else 0)
+
+
+if __name__ == "__main__":
+    main()
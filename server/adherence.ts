@@ -0,0 +1,132 @@
+/**
+ * Precomputed Streak Reads
+ *
+ * scripts/adherence_service.py keeps a run-length encoded training-day state
+ * per user in user_adherence. A streak read is that row plus the user's
+ * user_workouts rows logged after it was written (usually none), instead of
+ * re-walking the whole workout history.
+ *
+ * Days are UTC day numbers, matching the server's setHours(0, 0, 0, 0) in UTC.
+ */
+
+import { db } from './db';
+import { userAdherence, userWorkouts } from '@shared/schema';
+import { eq, and, gt } from 'drizzle-orm';
+
+const DAY_MS = 1000 * 60 * 60 * 24;
+
+// Must match day_number() in scripts/adherence_service.py
+export function utcDayNumber(date: Date): number {
+  return Math.floor(date.getTime() / DAY_MS);
+}
+
+// Sunday-first week number and getDay() bit of a day number (1970-01-01 was a
+// Thursday). Must match week_and_bit() in scripts/adherence_service.py
+function weekAndBit(day: number): [number, number] {
+  return [Math.floor((day + 4) / 7), (day + 4) % 7];
+}
+
+interface AdherenceSnapshot {
+  lastDay: number | null;
+  lastRunLength: number;
+  bitmapWeek: number;
+  weekBitmaps: number[];
+}
+
+/**
+ * The stored state with the user's user_workouts rows logged after it was
+ * written applied on top. Returns null when no precomputed state exists yet.
+ */
+async function loadAdherenceSnapshot(userId: number): Promise<AdherenceSnapshot | null> {
+  const [state] = await db
+    .select({
+      lastDay: userAdherence.lastDay,
+      lastRunLength: userAdherence.lastRunLength,
+      bitmapWeek: userAdherence.bitmapWeek,
+      weekBitmaps: userAdherence.weekBitmaps,
+      lastWorkoutId: userAdherence.lastWorkoutId,
+    })
+    .from(userAdherence)
+    .where(eq(userAdherence.userId, userId));
+
+  if (!state) return null;
+
+  const newer = await db
+    .select({ completedAt: userWorkouts.completedAt })
+    .from(userWorkouts)
+    .where(and(eq(userWorkouts.userId, userId), gt(userWorkouts.id, state.lastWorkoutId)));
+
+  // Extend the last run with days logged since the state was written; older
+  // days are folded in by the next adherence_service.py run
+  const snapshot: AdherenceSnapshot = {
+    lastDay: state.lastDay,
+    lastRunLength: state.lastRunLength,
+    bitmapWeek: state.bitmapWeek,
+    weekBitmaps: [...(state.weekBitmaps || [])],
+  };
+  const days = Array.from(new Set(newer.map(w => utcDayNumber(new Date(w.completedAt))))).sort((a, b) => a - b);
+  for (const day of days) {
+    const [week, bit] = weekAndBit(day);
+    if (snapshot.weekBitmaps.length === 0) snapshot.bitmapWeek = week;
+    const offset = week - snapshot.bitmapWeek;
+    if (offset >= 0) {
+      while (snapshot.weekBitmaps.length <= offset) snapshot.weekBitmaps.push(0);
+      snapshot.weekBitmaps[offset] |= 1 << bit;
+    }
+    if (snapshot.lastDay !== null && day <= snapshot.lastDay) continue;
+    snapshot.lastRunLength = snapshot.lastDay !== null && day === snapshot.lastDay + 1 ? snapshot.lastRunLength + 1 : 1;
+    snapshot.lastDay = day;
+  }
+  return snapshot;
+}
+
+/**
+ * Consecutive training days ending today (0 when the user has not trained
+ * today). Returns null when no precomputed state exists yet, so callers can
+ * fall back to walking the workout list.
+ */
+export async function getCurrentWorkoutStreak(userId: number, now: Date = new Date()): Promise<number | null> {
+  const snapshot = await loadAdherenceSnapshot(userId);
+  if (!snapshot) return null;
+  return snapshot.lastDay === utcDayNumber(now) ? snapshot.lastRunLength : 0;
+}
+
+/**
+ * Adherence reads for the AI context and coach summary, or null without a
+ * precomputed state:
+ * - recentStreak: ai-user-context calculateStreak() - the run ending today or
+ *   yesterday, counted over the last 30 days
+ * - currentStreak: the run ending today, else 0
+ * - strongDays / weakDays: calculateAdherencePatterns() thresholds (> 1.2x /
+ *   < 0.5x the average weekday, and trained) over the last `weeks` weeks
+ * Must match AdherenceState.snapshot() / patterns() in scripts/adherence_service.py,
+ * which precompute_coach_summaries.py stores in the coach summary
+ */
+export async function getAdherencePatterns(
+  userId: number,
+  now: Date = new Date(),
+  weeks: number = 4
+): Promise<{ currentStreak: number; recentStreak: number; strongDays: number[]; weakDays: number[] } | null> {
+  const snapshot = await loadAdherenceSnapshot(userId);
+  if (!snapshot) return null;
+
+  const today = utcDayNumber(now);
+  const last = snapshot.lastDay;
+  const currentStreak = last === today ? snapshot.lastRunLength : 0;
+  const recentStreak = last !== null && last >= today - 1 && last <= today
+    ? Math.min(snapshot.lastRunLength, 30 - (today - last))
+    : 0;
+
+  const [currentWeek] = weekAndBit(today);
+  const counts = [0, 0, 0, 0, 0, 0, 0];
+  for (let week = currentWeek - weeks + 1; week <= currentWeek; week++) {
+    const mask = snapshot.weekBitmaps[week - snapshot.bitmapWeek];
+    if (week < snapshot.bitmapWeek || !mask) continue;
+    for (let bit = 0; bit < 7; bit++) counts[bit] += (mask >> bit) & 1;
+  }
+  const avg = counts.reduce((a, b) => a + b, 0) / 7;
+  const strongDays = counts.map((count, day) => count > avg * 1.2 ? day : -1).filter(d => d >= 0);
+  const weakDays = counts.map((count, day) => count < avg * 0.5 && count > 0 ? day : -1).filter(d => d >= 0);
+
+  return { currentStreak, recentStreak, strongDays, weakDays };
+}
@@ -11,7 +11,7 @@
 import OpenAI from 'openai';
 import { db } from './db';
 import { coachMemory } from '@shared/schema';
-import { eq, desc, sql } from 'drizzle-orm';
+import { eq, desc, sql, and } from 'drizzle-orm';
 import { buildAiContext } from './ai-user-context';
 import { 
   buildUserCoachSummary, 
@@ -148,6 +148,16 @@ export interface CoachChatResponse {
   response: string;
   coach: string;
   contextUsed: boolean;
+  promptStats?: CoachPromptStats;
+}
+
+// Size of the prompt sent to the model (read by scripts/simulate_coach_conversations.py)
+export interface CoachPromptStats {
+  systemChars: number;
+  promptChars: number; // system prompt + history + message
+  historyMessages: number;
+  promptTokens?: number;
+  completionTokens?: number;
 }
 
 /**
@@ -411,7 +421,7 @@ async function getCoachMemories(userId: number, limit = 5): Promise<string> {
     const memories = await db
       .select({ summary: coachMemory.summary, topics: coachMemory.topics, mood: coachMemory.mood, createdAt: coachMemory.createdAt })
       .from(coachMemory)
-      .where(eq(coachMemory.userId, userId))
+      .where(and(eq(coachMemory.userId, userId), eq(coachMemory.kind, 'conversation')))
       .orderBy(desc(coachMemory.createdAt))
       .limit(limit);
 
@@ -748,6 +758,13 @@ FOR APP MODIFICATIONS (redirect WITH value):
       response: aiResponse,
       coach: coachCharacter.name,
       contextUsed,
+      promptStats: {
+        systemChars: systemPrompt.length,
+        promptChars: messages.reduce((sum, m) => sum + m.content.length, 0),
+        historyMessages: messages.length - 2,
+        promptTokens: response.usage?.prompt_tokens,
+        completionTokens: response.usage?.completion_tokens,
+      },
     };
     
   } catch (error) {
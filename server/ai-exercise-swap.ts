@@ -217,7 +217,17 @@ interface AlternativesResponse {
   alternatives: Exercise[];
 }
 
-export async function getExerciseAlternatives(request: SwapRequest, retryCount: number = 0): Promise<AlternativesResponse> {
+// How a swap was answered (for latency/fallback benchmarks)
+export interface SwapOutcome {
+  attempts: number; // getExerciseAlternatives attempts, including the retry
+  path: 'llm' | 'injury_fallback' | 'fallback';
+}
+
+export async function getExerciseAlternatives(
+  request: SwapRequest,
+  retryCount: number = 0,
+  onOutcome?: (outcome: SwapOutcome) => void
+): Promise<AlternativesResponse> {
   try {
     const { currentExercise, reason, additionalNotes, userProfile, userId, exerciseCategory } = request;
     
@@ -343,10 +353,11 @@ Respond with JSON ONLY:
         if (process.env.NODE_ENV !== 'production' || process.env.DEBUG) {
           console.log('🔄 [SWAP] Retrying...');
         }
-        return getExerciseAlternatives(request, retryCount + 1);
+        return getExerciseAlternatives(request, retryCount + 1, onOutcome);
       }
       
       // Return fallback after retry fails
+      onOutcome?.({ attempts: retryCount + 1, path: 'fallback' });
       return getFallbackAlternatives(currentExercise);
     }
     
@@ -368,6 +379,7 @@ Respond with JSON ONLY:
     // If all alternatives were blocked, return fallback
     if (filteredAlternatives.length === 0) {
       console.log('   ⚠️ [SAFETY] All AI suggestions blocked - using safe fallback');
+      onOutcome?.({ attempts: retryCount + 1, path: 'injury_fallback' });
       return getSafeFallbackForInjury(currentExercise, userContext);
     }
     
@@ -414,6 +426,7 @@ Respond with JSON ONLY:
     });
     
     // First is recommended, rest are alternatives
+    onOutcome?.({ attempts: retryCount + 1, path: 'llm' });
     return {
       recommended: enrichedAlternatives[0],
       alternatives: enrichedAlternatives.slice(1),
@@ -426,9 +439,10 @@ Respond with JSON ONLY:
       if (process.env.NODE_ENV !== 'production' || process.env.DEBUG) {
         console.log('🔄 [SWAP] Retrying after error...');
       }
-      return getExerciseAlternatives(request, retryCount + 1);
+      return getExerciseAlternatives(request, retryCount + 1, onOutcome);
     }
     
+    onOutcome?.({ attempts: retryCount + 1, path: 'fallback' });
     return getFallbackAlternatives(currentExercise);
   }
 }
@@ -2,8 +2,9 @@
 // This service aggregates ALL user data to create a fully personalized AI experience
 
 import { db } from './db';
-import { users, aiLearningContext, workoutSets, workoutEvents, userWorkouts, workoutNotes, exercises } from '@shared/schema';
+import { users, aiLearningContext, workoutSets, workoutEvents, userWorkouts, workoutNotes, exercises, progressionCurves } from '@shared/schema';
 import { eq, desc, and, gte } from 'drizzle-orm';
+import { getAdherencePatterns } from './adherence';
 
 export interface ComprehensiveUserProfile {
   // Basic info
@@ -135,6 +136,7 @@ export async function getComprehensiveUserContext(
     .where(eq(userWorkouts.userId, userId))
     .orderBy(desc(userWorkouts.completedAt))
     .limit(30);
+  const adherence = await getAdherencePatterns(userId).catch(() => null);
   
   // 5. Get performance data (weights/reps used)
   const performanceData = await getPerformanceHistory(userId);
@@ -187,7 +189,7 @@ export async function getComprehensiveUserContext(
       favoriteExercises: extractFavoriteExercises(learningContext),
       avoidedExercises: extractAvoidedExercises(learningContext),
       lastWorkoutDate: recentWorkouts[0]?.completedAt?.toISOString(),
-      currentStreak: calculateStreak(recentWorkouts),
+      currentStreak: adherence ? adherence.recentStreak : calculateStreak(recentWorkouts),
     },
     
     recentFeedback,
@@ -608,11 +610,41 @@ export async function saveChatForLearning(
   }
 }
 
-// Get suggested weight for an exercise based on user history
+// Get suggested weight for an exercise based on user history.
+// source 'curve': weight is already the next-session target from the fitted
+// progression curve; source 'history': weight is the last logged weight.
 export async function getSuggestedWeight(
   userId: number,
   exerciseName: string
-): Promise<{ weight: number; reps: number; confidence: string } | null> {
+): Promise<{ weight: number; reps: number; confidence: string; source: 'curve' | 'history' } | null> {
+  // Fitted progression curve (scripts/progression_curves.py) - single indexed row
+  try {
+    const [curve] = await db
+      .select({
+        weight: progressionCurves.suggestedWeight,
+        reps: progressionCurves.suggestedReps,
+        confidence: progressionCurves.confidence,
+      })
+      .from(progressionCurves)
+      .where(and(
+        eq(progressionCurves.userId, userId),
+        eq(progressionCurves.nameKey, exerciseName.trim().toLowerCase())
+      ))
+      .orderBy(desc(progressionCurves.lastDate))
+      .limit(1);
+
+    if (curve?.weight && curve.weight > 0) {
+      return {
+        weight: curve.weight,
+        reps: curve.reps || 10,
+        confidence: curve.confidence || 'low',
+        source: 'curve',
+      };
+    }
+  } catch {
+    // Table missing or unreadable - fall back to the learned insights
+  }
+
   // Look for strength insights for this exercise
   const insights = await db
     .select()
@@ -640,6 +672,7 @@ export async function getSuggestedWeight(
         weight: parseInt(weightMatch[1]),
         reps: repsMatch ? parseInt(repsMatch[1]) : 10,
         confidence: matchingInsight.confidence,
+        source: 'history',
       };
     }
   }
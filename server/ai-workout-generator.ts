@@ -120,6 +120,39 @@ function convertDayNamesToIndices(days: (string | number)[]): number[] {
   }).filter(d => !isNaN(d) && d >= 0 && d <= 6);
 }
 
+// Build the split planner input the generator uses for a profile.
+// Exported so offline tools (scripts/prompt_sections_bridge.ts) plan the same week.
+export function buildSplitPlannerInput(userProfile: UserProfile, weekNumber: number = 1): SplitPlannerInput {
+  const requestedFrequency = Number(userProfile.trainingDays || 3);
+  const experience = (userProfile.experience || 'intermediate') as 'beginner' | 'intermediate' | 'advanced';
+  const sessionDuration = Number(userProfile.sessionDuration || 45);
+  const resolvedGymDaysAvailable = (userProfile.advancedQuestionnaire?.gymDaysAvailable?.length > 0)
+    ? userProfile.advancedQuestionnaire.gymDaysAvailable
+    : (userProfile.preferredTrainingDays && userProfile.preferredTrainingDays.length > 0)
+      ? convertDayNamesToIndices(userProfile.preferredTrainingDays)
+      : [0, 1, 2, 3, 4, 5, 6];
+  const effectiveFrequency = resolvedGymDaysAvailable.length > 0
+    ? Math.min(requestedFrequency, resolvedGymDaysAvailable.length)
+    : requestedFrequency;
+  
+  return {
+    frequency: effectiveFrequency,
+    experience,
+    goals: userProfile.fitnessGoals || [userProfile.goal || 'general'],
+    equipment: userProfile.equipment || [],
+    injuries: userProfile.injuries?.join(', ') || null,
+    sessionDuration,
+    weeklyActivities: userProfile.advancedQuestionnaire?.weeklyActivities || [],
+    // CRITICAL FIX: Convert day names to indices and default to all days if empty
+    // preferredTrainingDays from onboarding could be ['mon', 'tue', 'wed'] or [1, 2, 3]
+    gymDaysAvailable: resolvedGymDaysAvailable,
+    scheduleFlexibility: userProfile.advancedQuestionnaire?.scheduleFlexibility ?? true,
+    preferredSplit: userProfile.advancedQuestionnaire?.preferredSplit,
+    preferredSplitOther: userProfile.advancedQuestionnaire?.preferredSplitOther,
+    weekNumber, // For weekly variety rotation
+  };
+}
+
 interface GeneratedWorkout {
   title: string;
   type: string;
@@ -144,11 +177,18 @@ interface GeneratedWorkout {
   caloriesBurn: number;
 }
 
+export interface LLMUsage {
+  promptTokens: number;
+  completionTokens: number;
+  totalTokens: number;
+}
+
 export async function generateAIWorkout(
   userProfile: UserProfile,
   dayOfWeek: number = 0,
   weekNumber: number = 1, // Week number for variation
-  recentExercises: string[] = [] // Exercises from previous days to avoid repetition
+  recentExercises: string[] = [], // Exercises from previous days to avoid repetition
+  onUsage?: (usage: LLMUsage) => void // Token usage of the completion (for cost benchmarks)
 ): Promise<GeneratedWorkout> {
   console.log('🤖 Generating AI workout for user profile:', userProfile, 'Week:', weekNumber);
   
@@ -184,33 +224,7 @@ export async function generateAIWorkout(
   
   // Step 1.6: Generate weekly split plan (Phase 8.5 - IMPROVED)
   const requestedFrequency = Number(userProfile.trainingDays || 3);
-  const experience = (userProfile.experience || 'intermediate') as 'beginner' | 'intermediate' | 'advanced';
-  const sessionDuration = Number(userProfile.sessionDuration || 45);
-  const resolvedGymDaysAvailable = (userProfile.advancedQuestionnaire?.gymDaysAvailable?.length > 0)
-    ? userProfile.advancedQuestionnaire.gymDaysAvailable
-    : (userProfile.preferredTrainingDays && userProfile.preferredTrainingDays.length > 0)
-      ? convertDayNamesToIndices(userProfile.preferredTrainingDays)
-      : [0, 1, 2, 3, 4, 5, 6];
-  const effectiveFrequency = resolvedGymDaysAvailable.length > 0
-    ? Math.min(requestedFrequency, resolvedGymDaysAvailable.length)
-    : requestedFrequency;
-  
-  const splitPlannerInput: SplitPlannerInput = {
-    frequency: effectiveFrequency,
-    experience,
-    goals: userProfile.fitnessGoals || [userProfile.goal || 'general'],
-    equipment: userProfile.equipment || [],
-    injuries: userProfile.injuries?.join(', ') || null,
-    sessionDuration,
-    weeklyActivities: userProfile.advancedQuestionnaire?.weeklyActivities || [],
-    // CRITICAL FIX: Convert day names to indices and default to all days if empty
-    // preferredTrainingDays from onboarding could be ['mon', 'tue', 'wed'] or [1, 2, 3]
-    gymDaysAvailable: resolvedGymDaysAvailable,
-    scheduleFlexibility: userProfile.advancedQuestionnaire?.scheduleFlexibility ?? true,
-    preferredSplit: userProfile.advancedQuestionnaire?.preferredSplit,
-    preferredSplitOther: userProfile.advancedQuestionnaire?.preferredSplitOther,
-    weekNumber, // For weekly variety rotation
-  };
+  const splitPlannerInput = buildSplitPlannerInput(userProfile, weekNumber);
   
   console.log(`  🗓️ Gym days available: ${splitPlannerInput.gymDaysAvailable.join(', ')} (${splitPlannerInput.gymDaysAvailable.length} days)`);
   console.log(`  📊 Effective training days: ${splitPlannerInput.frequency} (requested ${requestedFrequency})`);
@@ -581,6 +595,13 @@ Create a balanced workout respecting these limits and the DAY FOCUS above.`;
   
   const aiResponse = completion.choices[0].message.content || '';
   console.log('  📄 AI response length:', aiResponse.length, 'chars');
+  if (onUsage && completion.usage) {
+    onUsage({
+      promptTokens: completion.usage.prompt_tokens,
+      completionTokens: completion.usage.completion_tokens,
+      totalTokens: completion.usage.total_tokens,
+    });
+  }
   
   if (!aiResponse || aiResponse.length < 50) {
     console.error('  ❌ AI returned empty or very short response');
@@ -3,9 +3,10 @@
 // Generates contextual, personalized insights that rotate throughout the day
 
 import { db } from './db';
-import { users, userWorkouts } from '@shared/schema';
+import { users, userWorkouts, workoutEvents } from '@shared/schema';
 import { eq, desc, and, gte } from 'drizzle-orm';
 import { getComprehensiveUserContext } from './ai-user-context';
+import { getCurrentWorkoutStreak } from './adherence';
 import { 
   shouldShowInsight, 
   PERSONALITY_STYLES, 
@@ -86,10 +87,36 @@ async function getStrugglingDays(userId: number): Promise<number[]> {
 }
 
 // Get recent personal records
+// PR events are emitted into workout_events by scripts/pr_stream_processor.py
 async function getRecentPRs(userId: number): Promise<string[]> {
-  // This would query workout sets for recent PRs
-  // For now, return empty - can be enhanced later
-  return [];
+  try {
+    const twoWeeksAgo = new Date();
+    twoWeeksAgo.setDate(twoWeeksAgo.getDate() - 14);
+    
+    const events = await db
+      .select()
+      .from(workoutEvents)
+      .where(and(
+        eq(workoutEvents.userId, userId),
+        eq(workoutEvents.eventType, 'pb_hit'),
+        gte(workoutEvents.achievedAt, twoWeeksAgo)
+      ))
+      .orderBy(desc(workoutEvents.achievedAt))
+      .limit(20);
+    
+    // Newest PR per exercise, e.g. "Bench Press: 185 x 5"
+    const seen = new Set<string>();
+    const prs: string[] = [];
+    for (const event of events) {
+      const data = event.eventData ? JSON.parse(event.eventData) : null;
+      if (!data?.exerciseName || seen.has(data.exerciseName)) continue;
+      seen.add(data.exerciseName);
+      prs.push(`${data.exerciseName}: ${data.weight} x ${data.reps}`);
+    }
+    return prs.slice(0, 5);
+  } catch {
+    return [];
+  }
 }
 
 // Build context for insight generation
@@ -108,9 +135,10 @@ async function buildInsightContext(userId: number): Promise<InsightContext> {
     .orderBy(desc(userWorkouts.completedAt))
     .limit(30);
   
-  // Calculate streak
-  let streak = 0;
-  if (recentWorkouts.length > 0) {
+  // Calculate streak (precomputed adherence state when available)
+  const precomputedStreak = await getCurrentWorkoutStreak(userId);
+  let streak = precomputedStreak ?? 0;
+  if (precomputedStreak === null && recentWorkouts.length > 0) {
     const today = new Date();
     today.setHours(0, 0, 0, 0);
     
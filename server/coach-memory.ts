@@ -11,8 +11,9 @@
  */
 
 import { db } from './db';
-import { users, userWorkouts, aiLearningContext } from '@shared/schema';
+import { users, userWorkouts, aiLearningContext, coachMemory } from '@shared/schema';
 import { eq, desc, and, gte } from 'drizzle-orm';
+import { getAdherencePatterns } from './adherence';
 
 // =============================================================================
 // COACH PERSONALITY DEFINITIONS
@@ -207,7 +208,51 @@ export interface UserCoachSummary {
 // BUILD USER COACH SUMMARY
 // =============================================================================
 
+// Summaries precomputed by scripts/precompute_coach_summaries.py (coach_memory rows
+// with kind = 'summary') are served while fresh; a completed workout deletes the row
+// (see invalidatePrecomputedSummary). Set COACH_SUMMARY_PRECOMPUTE=false to always
+// build on demand.
+const PRECOMPUTED_SUMMARY_MAX_AGE_MS = 6 * 60 * 60 * 1000;
+
+async function getPrecomputedSummary(userId: number): Promise<UserCoachSummary | null> {
+  if (process.env.COACH_SUMMARY_PRECOMPUTE === 'false') return null;
+  
+  try {
+    const [row] = await db
+      .select({ data: coachMemory.data, refreshedAt: coachMemory.refreshedAt })
+      .from(coachMemory)
+      .where(and(eq(coachMemory.userId, userId), eq(coachMemory.kind, 'summary')))
+      .orderBy(desc(coachMemory.refreshedAt))
+      .limit(1);
+    
+    if (!row?.data || !row.refreshedAt) return null;
+    
+    // Streaks count back from today, so a summary from an earlier day is stale
+    const refreshedAt = new Date(row.refreshedAt);
+    if (Date.now() - refreshedAt.getTime() > PRECOMPUTED_SUMMARY_MAX_AGE_MS) return null;
+    if (refreshedAt.toDateString() !== new Date().toDateString()) return null;
+    
+    return row.data as UserCoachSummary;
+  } catch {
+    return null;
+  }
+}
+
+// A completed workout changes the streak, adherence and recent-workout lines, so the
+// precomputed summary is dropped and the next chat builds it on demand until the job
+// runs again
+export async function invalidatePrecomputedSummary(userId: number): Promise<void> {
+  await db
+    .delete(coachMemory)
+    .where(and(eq(coachMemory.userId, userId), eq(coachMemory.kind, 'summary')));
+}
+
 export async function buildUserCoachSummary(userId: number): Promise<UserCoachSummary> {
+  const precomputed = await getPrecomputedSummary(userId);
+  if (precomputed) {
+    return precomputed;
+  }
+  
   console.log(`🧠 [COACH-MEMORY] Building summary for user ${userId}`);
   
   // Fetch user data
@@ -230,8 +275,15 @@ export async function buildUserCoachSummary(userId: number): Promise<UserCoachSu
     ))
     .orderBy(desc(userWorkouts.completedAt));
   
-  // Calculate adherence patterns
+  // Calculate adherence patterns; streak and weekday patterns come from the
+  // precomputed adherence state when available
   const adherencePatterns = calculateAdherencePatterns(recentWorkouts);
+  const precomputed = await getAdherencePatterns(userId).catch(() => null);
+  if (precomputed) {
+    adherencePatterns.currentStreak = precomputed.currentStreak;
+    adherencePatterns.strongDays = precomputed.strongDays;
+    adherencePatterns.weakDays = precomputed.weakDays;
+  }
   
   // Map coaching style to personality
   const personalityMap: Record<string, CoachPersonality> = {
@@ -533,8 +585,8 @@ export async function updateSummaryAfterWorkout(
 ): Promise<void> {
   console.log(`📝 [COACH-MEMORY] Light update after workout for user ${userId}`);
   
-  // In a real implementation, this would update the stored summary
-  // For now, we log and the next buildUserCoachSummary will pick up the changes
+  // The next buildUserCoachSummary rebuilds from the new workout
+  await invalidatePrecomputedSummary(userId);
 }
 
 export async function updateSummaryFromQuestionnaire(
@@ -568,4 +620,5 @@ export default {
   getRotatedCategory,
   updateSummaryAfterWorkout,
   updateSummaryFromQuestionnaire,
+  invalidatePrecomputedSummary,
 };
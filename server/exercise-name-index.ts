@@ -0,0 +1,76 @@
+/**
+ * Exercise Name Index
+ *
+ * Exact name/alias -> exercise id lookup used by GET /api/exercises?names=...
+ *
+ * The index is compiled offline by scripts/build_exercise_name_index.py into
+ * server/data/exercise-name-index.json. Names the artifact does not resolve to
+ * one of the candidates (missing artifact, exercises added since the build,
+ * duplicates filtered out) fall back to the candidates' canonical names, so
+ * lookups stay exact either way.
+ */
+
+import fs from 'fs';
+import path from 'path';
+
+const INDEX_PATH = path.resolve(process.cwd(), 'server/data/exercise-name-index.json');
+
+// Must match normalize_key() in scripts/build_exercise_name_index.py
+export function normalizeExerciseKey(name: string): string {
+  return name.replace(/\s+/g, ' ').trim().toLowerCase();
+}
+
+let cachedIndex: Map<string, number> | null | undefined;
+
+/**
+ * Load the compiled index once per process. Returns null if the artifact
+ * does not exist or cannot be parsed.
+ */
+export function loadExerciseNameIndex(): Map<string, number> | null {
+  if (cachedIndex !== undefined) return cachedIndex;
+
+  try {
+    const artifact = JSON.parse(fs.readFileSync(INDEX_PATH, 'utf8'));
+    cachedIndex = new Map(Object.entries(artifact.keys as Record<string, number>));
+    console.log(`📇 Loaded exercise name index: ${cachedIndex.size} keys`);
+  } catch {
+    cachedIndex = null;
+  }
+  return cachedIndex;
+}
+
+/**
+ * Resolve requested names against a list of exercises, preserving request
+ * order. Unknown names are returned in `missing`.
+ */
+export function resolveExerciseNames<T extends { id: number; name: string | null }>(
+  requestedNames: string[],
+  candidates: T[],
+): { matched: T[]; missing: string[] } {
+  const byId = new Map<number, T>();
+  // Canonical names of the candidates themselves: covers exercises added since
+  // the last index build, and same-name duplicates whose indexed (lowest) id
+  // was filtered out of the candidates
+  const byName = new Map<string, T>();
+  for (const ex of candidates) {
+    byId.set(ex.id, ex);
+    const key = ex.name ? normalizeExerciseKey(ex.name) : '';
+    if (key && !byName.has(key)) byName.set(key, ex);
+  }
+
+  const index = loadExerciseNameIndex();
+
+  const matched: T[] = [];
+  const missing: string[] = [];
+  for (const reqName of requestedNames) {
+    const key = normalizeExerciseKey(reqName);
+    const id = index?.get(key);
+    const exercise = (id !== undefined ? byId.get(id) : undefined) ?? byName.get(key);
+    if (exercise) {
+      matched.push(exercise);
+    } else {
+      missing.push(reqName);
+    }
+  }
+  return { matched, missing };
+}
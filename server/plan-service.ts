@@ -54,6 +54,37 @@ const getEffectiveTrainingDays = (user: any): number => {
   return requested;
 };
 
+const parseJsonField = (value: any, fallback: any) => {
+  if (!value) return fallback;
+  if (typeof value !== 'string') return value;
+  try {
+    return JSON.parse(value);
+  } catch {
+    return fallback;
+  }
+};
+
+/**
+ * Profile for generateWeekWorkouts, built from the users row the same way
+ * /api/v1/workouts/generate-week and rolling regeneration do
+ */
+export const buildWeekProfile = (user: any) => {
+  const onboardingResponses = parseJsonField(user.onboardingResponses, {});
+  return {
+    fitnessGoals: parseJsonField(user.focusAreas, [user.goal || 'general']),
+    goal: user.goal || 'general',
+    experience: user.experience || 'intermediate',
+    trainingType: user.trainingType || 'strength',
+    sessionDuration: user.sessionDurationPreference || 45,
+    trainingDays: getEffectiveTrainingDays(user),
+    equipment: parseJsonField(user.equipmentAccess, ['bodyweight']),
+    injuries: parseJsonField(user.injuries, []),
+    userId: user.id,
+    preferredTrainingDays: getPreferredTrainingDays(user),
+    advancedQuestionnaire: onboardingResponses?.advancedQuestionnaire || {},
+  };
+};
+
 /**
  * Get plan status for a user
  * FIXED: Now counts REAL workouts only (not rest days)
@@ -471,4 +502,64 @@ export function setupPlanRoutes(app: Express) {
       });
     }
   });
+  
+  // B4: POST /api/workouts/plan/pregenerate - Generate a user's upcoming week ahead of time
+  // Called by scripts/plan_pregeneration_scheduler.py (X-Scheduler-Key must equal PLAN_SCHEDULER_KEY).
+  // Idempotent: days that are already ready are skipped by generateWeekWorkouts
+  app.post('/api/workouts/plan/pregenerate', async (req: any, res: Response) => {
+    const requestId = (req as ApiRequest).requestId || 'unknown';
+    const expectedKey = process.env.PLAN_SCHEDULER_KEY;
+    
+    if (!expectedKey || req.get('X-Scheduler-Key') !== expectedKey) {
+      return res.status(401).json({
+        ok: false,
+        error: 'Scheduler key required',
+        code: 'AUTH_REQUIRED',
+        requestId,
+      });
+    }
+    
+    const { userId, weekStart, weekNumber } = req.body || {};
+    if (!Number.isInteger(userId) || typeof weekStart !== 'string' || !/^\d{4}-\d{2}-\d{2}$/.test(weekStart)) {
+      return res.status(400).json({
+        ok: false,
+        error: 'userId (integer) and weekStart (YYYY-MM-DD) are required',
+        code: 'INVALID_REQUEST',
+        requestId,
+      });
+    }
+    
+    try {
+      const user = await storage.getUser(userId);
+      if (!user) {
+        return res.status(404).json({ ok: false, error: 'User not found', code: 'NOT_FOUND', requestId });
+      }
+      
+      console.log(`[API] ${requestId} | POST /api/workouts/plan/pregenerate | userId=${userId} weekStart=${weekStart}`);
+      
+      const result = await generateWeekWorkouts(
+        userId,
+        buildWeekProfile(user),
+        weekNumber || 1,
+        new Date(`${weekStart}T00:00:00Z`)
+      );
+      
+      res.json({
+        ok: true,
+        userId,
+        weekDates: result.weekDates,
+        generated: result.dayTimings.filter(t => t.status === 'ready').length,
+        skipped: result.dayTimings.filter(t => t.status === 'skipped').length,
+        requestId,
+      });
+    } catch (error: any) {
+      console.error(`[API] ${requestId} | Pre-generation failed for user ${userId}:`, error);
+      res.status(500).json({
+        ok: false,
+        error: error.message || 'Failed to pre-generate week',
+        code: 'PLAN_ERROR',
+        requestId,
+      });
+    }
+  });
 }
@@ -1,4 +1,4 @@
-import type { Express, Request } from "express";
+import type { Express, Request, Response } from "express";
 import { type User as SchemaUser } from "@shared/schema";
 
 // Add Express session augmentation
@@ -39,6 +39,7 @@ import {
 // AI Workout Generator - imported dynamically in endpoint
 import { generateExerciseAlternative } from "./ai-exercise-swap";
 import { generateWeekWorkouts } from "./week-generator";
+import { resolveExerciseNames } from "./exercise-name-index";
 import { db } from "./db";
 import { eq, count, sql, inArray, ilike, and, like, gte, lte } from "drizzle-orm";
 import {
@@ -57,6 +58,7 @@ import {
   userBadgeStats,
   performanceLogs,
   workouts,
+  workoutSummaries,
 } from "@shared/schema";
 import { sendPasswordResetEmail } from "./email-service-resend";
 import { generateSecureToken, hashPassword } from "./crypto-utils";
@@ -95,6 +97,20 @@ const openai = new OpenAI({ apiKey: process.env.OPENAI_API_KEY || "" });
 // STABILIZATION: AI Feature Flag for backend
 const AI_ENABLED = true;
 
+// Most events one POST /api/badges/track batch may carry
+const MAX_BADGE_TRACK_EVENTS = 500;
+
+// Diagnostic response headers read by the bench/sweep scripts; only sent when the
+// server runs with BENCH_HEADERS=true
+const BENCH_HEADERS = process.env.BENCH_HEADERS === "true";
+
+function setBenchHeaders(res: Response, headers: Record<string, string | number>) {
+  if (!BENCH_HEADERS) return;
+  for (const [name, value] of Object.entries(headers)) {
+    res.set(name, String(value));
+  }
+}
+
 // =============================================================================
 // MISSING FUNCTION: generatePersonalizedWorkout
 // This was being called but never defined, causing runtime errors
@@ -2049,7 +2065,14 @@ Respond with JSON ONLY:
         enrichedProfile, 
         dayOfWeek || 0, 
         weekNumber || 1,
-        recentExercises || []
+        recentExercises || [],
+        (usage) => {
+          // Lets load/sweep tools (scripts/bench_workout_realism_sweep.py) report token cost
+          setBenchHeaders(res, {
+            'X-LLM-Prompt-Tokens': usage.promptTokens,
+            'X-LLM-Completion-Tokens': usage.completionTokens,
+          });
+        }
       );
       
       console.log('✅ AI Workout generated:', workout.title, `(${workout.exercises.length} exercises)`);
@@ -2414,6 +2437,9 @@ Respond with ONLY a JSON object (no markdown, no explanation):
         reason,
         additionalNotes,
         userProfile,
+      }, 0, (outcome) => {
+        // Lets scripts/bench_exercise_swap.py report retries and fallback rate
+        setBenchHeaders(res, { 'X-Swap-Attempts': outcome.attempts, 'X-Swap-Path': outcome.path });
       });
       
       console.log('✅ [API] Alternatives generated');
@@ -2946,6 +2972,34 @@ Respond with ONLY a JSON object (no markdown, no explanation):
       const { workoutId } = req.params;
       console.log(`📊 [SUMMARY] Getting summary for workout ${workoutId}, user ${userId}`);
 
+      // Summary frozen after the workout by scripts/freeze_workout_summaries.py; only served
+      // while no set has been logged to or removed from the workout since it was frozen
+      // (newest log id and log count both unchanged - each log is one set)
+      if (process.env.WORKOUT_SUMMARY_PRECOMPUTE !== 'false') {
+        const [frozen] = await db
+          .select({
+            summary: workoutSummaries.summary,
+            lastLogId: workoutSummaries.lastLogId,
+            totalSets: workoutSummaries.totalSets,
+          })
+          .from(workoutSummaries)
+          .where(and(eq(workoutSummaries.userId, userId), eq(workoutSummaries.workoutId, workoutId)))
+          .limit(1);
+        if (frozen?.summary) {
+          const [latest] = await db
+            .select({
+              lastLogId: sql<number>`COALESCE(MAX(${performanceLogs.id}), 0)`,
+              logCount: sql<number>`COUNT(*)`,
+            })
+            .from(performanceLogs)
+            .where(and(eq(performanceLogs.userId, userId), eq(performanceLogs.workoutId, workoutId)));
+          if (Number(latest?.lastLogId ?? 0) === frozen.lastLogId
+              && Number(latest?.logCount ?? 0) === frozen.totalSets) {
+            return res.json(frozen.summary);
+          }
+        }
+      }
+
       // Get all performance logs for this workout
       const allHistory = await storage.getPerformanceHistory(userId, undefined, 1000);
       const workoutLogs = allHistory.filter(log => log.workoutId === workoutId);
@@ -3392,6 +3446,18 @@ Respond with ONLY a JSON object (no markdown, no explanation):
         });
       }
       
+      if (result.promptStats) {
+        // Lets scripts/simulate_coach_conversations.py track prompt growth per turn
+        setBenchHeaders(res, {
+          'X-Coach-System-Chars': result.promptStats.systemChars,
+          'X-Coach-Prompt-Chars': result.promptStats.promptChars,
+          ...(result.promptStats.promptTokens !== undefined ? {
+            'X-LLM-Prompt-Tokens': result.promptStats.promptTokens,
+            'X-LLM-Completion-Tokens': result.promptStats.completionTokens ?? 0,
+          } : {}),
+        });
+      }
+      
       res.json({ 
         response: result.response,
         coach: result.coach,
@@ -4554,7 +4620,13 @@ Respond with ONLY a JSON object (no markdown, no explanation):
           const { getSuggestedWeight } = await import('./ai-user-context');
           const suggestion = await getSuggestedWeight(userId, exerciseName);
           
-          if (suggestion && suggestion.weight > 0) {
+          if (suggestion && suggestion.weight > 0 && suggestion.source === 'curve') {
+            // The fitted progression curve already targets the next session
+            suggestedWeight = suggestion.weight;
+            confidence = (suggestion.confidence as 'high' | 'medium' | 'low') || 'medium';
+            reason = `Based on your progression trend, try ${suggestedWeight}kg today.`;
+            basedOn = 'your progression curve';
+          } else if (suggestion && suggestion.weight > 0) {
             const lastWeight = suggestion.weight;
             confidence = (suggestion.confidence as 'high' | 'medium' | 'low') || 'medium';
             
@@ -7228,6 +7300,7 @@ Respond with a complete workout in JSON format:
           status: day.status,
           workout: day.payloadJson,
         })),
+        timings: result.dayTimings,
       });
       
     } catch (error: any) {
@@ -8856,20 +8929,16 @@ Respond with a complete workout in JSON format:
       }
 
       // Exact name matching: when frontend sends specific exercise names,
-      // find exact matches only (no fuzzy/approximate matching)
+      // find exact matches only (no fuzzy/approximate matching).
+      // Names and catalog aliases resolve through the prebuilt name index.
       if (names) {
         const requestedNames = String(names).split(',').map(n => n.trim()).filter(Boolean);
-        const matchedExercises: typeof filteredExercises = [];
-        
-        for (const reqName of requestedNames) {
-          const exact = filteredExercises.find(ex => ex.name?.toLowerCase() === reqName.toLowerCase());
-          if (exact) {
-            matchedExercises.push(exact);
-          } else {
-            console.log(`⚠️ No exact match for exercise: "${reqName}"`);
-          }
+        const { matched: matchedExercises, missing } = resolveExerciseNames(requestedNames, filteredExercises);
+
+        for (const reqName of missing) {
+          console.log(`⚠️ No exact match for exercise: "${reqName}"`);
         }
-        
+
         filteredExercises = matchedExercises;
         console.log(`🔍 Exact matched ${matchedExercises.length}/${requestedNames.length} exercise names`);
       }
@@ -9339,7 +9408,7 @@ Respond with a complete workout in JSON format:
       }
       const userId = decoded.userId;
       
-      const { action, value } = req.body;
+      const { action, value, events } = req.body;
       
       // Valid actions
       const validActions = [
@@ -9347,103 +9416,56 @@ Respond with a complete workout in JSON format:
         'appRated', 'workoutEdit', 'extraActivity', 'prBroken'
       ];
       
-      if (!action || !validActions.includes(action)) {
+      // Either one { action, value } or a batch { events: [{ action, value }, ...] } from
+      // clients that coalesce a user's events (see scripts/bench_badge_track.py)
+      const tracked: { action: string; value?: number }[] = Array.isArray(events) ? events : [{ action, value }];
+      if (tracked.length === 0 || tracked.length > MAX_BADGE_TRACK_EVENTS) {
+        return res.status(400).json({ error: `events must hold 1-${MAX_BADGE_TRACK_EVENTS} entries` });
+      }
+      if (tracked.some(e => !e?.action || !validActions.includes(e.action))) {
         return res.status(400).json({ error: `Invalid action. Valid: ${validActions.join(', ')}` });
       }
       
-      console.log(`📊 [BADGE-TRACK] Tracking ${action} for user ${userId}`);
-      
-      // Create or update the stats row
-      let existing: any[] = [];
-      try {
-        existing = await db
-          .select()
-          .from(userBadgeStats)
-          .where(eq(userBadgeStats.userId, userId))
-          .limit(1);
-        console.log(`📊 [BADGE-TRACK] Existing stats found: ${existing.length}`);
-      } catch (dbError: any) {
-        console.error(`📊 [BADGE-TRACK] Error querying existing stats:`, dbError?.message);
-        throw new Error(`DB query failed: ${dbError?.message}`);
-      }
-      
-      if (existing.length === 0) {
-        // Create new row with defaults and the initial tracked value
-        const insertValues: any = { userId, updatedAt: new Date() };
-        switch (action) {
-          case 'coachMessage':
-            insertValues.totalCoachMessages = 1;
-            break;
-          case 'badgeShared':
-            insertValues.totalBadgesShared = 1;
-            break;
-          case 'videoWatched':
-            insertValues.totalVideosWatched = 1;
-            break;
-          case 'profileEdit':
-            insertValues.hasEditedProfile = true;
-            break;
-          case 'appRated':
-            insertValues.hasRatedApp = true;
-            break;
-          case 'workoutEdit':
-            insertValues.totalWorkoutEdits = 1;
-            break;
-          case 'extraActivity':
-            insertValues.totalExtraActivities = 1;
-            break;
-          case 'prBroken':
-            insertValues.totalPRsBroken = value || 1;
-            break;
-        }
-        console.log(`📊 [BADGE-TRACK] Inserting new row:`, insertValues);
-        try {
-          await db.insert(userBadgeStats).values(insertValues);
-          console.log(`📊 [BADGE-TRACK] Insert successful`);
-        } catch (insertError: any) {
-          console.error(`📊 [BADGE-TRACK] Insert error:`, insertError?.message);
-          throw new Error(`DB insert failed: ${insertError?.message}`);
-        }
-      } else {
-        // Update existing row - use drizzle-orm's SQL template
-        const currentStats = existing[0];
-        const updateValues: Partial<typeof userBadgeStats.$inferInsert> = { updatedAt: new Date() };
-        
-        switch (action) {
-          case 'coachMessage':
-            updateValues.totalCoachMessages = (currentStats.totalCoachMessages || 0) + 1;
-            break;
-          case 'badgeShared':
-            updateValues.totalBadgesShared = (currentStats.totalBadgesShared || 0) + 1;
-            break;
-          case 'videoWatched':
-            updateValues.totalVideosWatched = (currentStats.totalVideosWatched || 0) + 1;
-            break;
-          case 'profileEdit':
-            updateValues.hasEditedProfile = true;
-            break;
-          case 'appRated':
-            updateValues.hasRatedApp = true;
-            break;
-          case 'workoutEdit':
-            updateValues.totalWorkoutEdits = (currentStats.totalWorkoutEdits || 0) + 1;
-            break;
-          case 'extraActivity':
-            updateValues.totalExtraActivities = (currentStats.totalExtraActivities || 0) + 1;
-            break;
-          case 'prBroken':
-            updateValues.totalPRsBroken = (currentStats.totalPRsBroken || 0) + (value || 1);
-            break;
+      // Fold the events into counter increments and flags
+      const counterColumns: Record<string, string> = {
+        coachMessage: 'totalCoachMessages',
+        badgeShared: 'totalBadgesShared',
+        videoWatched: 'totalVideosWatched',
+        workoutEdit: 'totalWorkoutEdits',
+        extraActivity: 'totalExtraActivities',
+        prBroken: 'totalPRsBroken',
+      };
+      const increments: Record<string, number> = {};
+      const insertValues: any = { userId, updatedAt: new Date() };
+      const updateValues: any = { updatedAt: new Date() };
+      for (const e of tracked) {
+        if (e.action === 'profileEdit') {
+          insertValues.hasEditedProfile = updateValues.hasEditedProfile = true;
+        } else if (e.action === 'appRated') {
+          insertValues.hasRatedApp = updateValues.hasRatedApp = true;
+        } else {
+          const column = counterColumns[e.action];
+          const amount = e.action === 'prBroken' ? (Number(e.value) || 1) : 1;
+          increments[column] = (increments[column] || 0) + amount;
         }
-        
-        await db
-          .update(userBadgeStats)
-          .set(updateValues)
-          .where(eq(userBadgeStats.userId, userId));
       }
+      for (const [column, amount] of Object.entries(increments)) {
+        insertValues[column] = amount;
+        updateValues[column] = sql`${(userBadgeStats as any)[column]} + ${amount}`;
+      }
+      
+      // One atomic upsert: concurrent tracks for the same user add up instead of
+      // overwriting each other's read-modify-write, and the first insert can't collide
+      await db
+        .insert(userBadgeStats)
+        .values(insertValues)
+        .onConflictDoUpdate({
+          target: userBadgeStats.userId,
+          set: updateValues,
+        });
       
-      console.log(`📊 Tracked ${action} for user ${userId}`);
-      res.json({ success: true, action });
+      console.log(`📊 Tracked ${Array.isArray(events) ? `${tracked.length} events` : action} for user ${userId}`);
+      res.json(Array.isArray(events) ? { success: true, tracked: tracked.length } : { success: true, action });
     } catch (error: any) {
       console.error("Error tracking badge action:", error?.message || error);
       res.status(500).json({ error: "Failed to track badge action", details: error?.message });
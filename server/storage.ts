@@ -43,6 +43,8 @@ import {
   type InsertWorkoutDay
 } from "@shared/schema";
 import { db } from "./db";
+import { getCurrentWorkoutStreak } from "./adherence";
+import { invalidatePrecomputedSummary } from "./coach-memory";
 import { eq, gte, and, desc, count, sql, not, isNull, or } from "drizzle-orm";
 import { 
   users, messages, workouts, userWorkouts, performanceLogs,
@@ -279,6 +281,11 @@ export class DatabaseStorage implements IStorage {
       .insert(userWorkouts)
       .values(insertUserWorkout)
       .returning();
+    
+    // The precomputed coach summary no longer reflects this user's streak and history
+    await invalidatePrecomputedSummary(insertUserWorkout.userId).catch((error) => {
+      console.error(`Failed to invalidate coach summary for user ${insertUserWorkout.userId}:`, error);
+    });
       
     return result[0];
   }
@@ -578,6 +585,9 @@ export class DatabaseStorage implements IStorage {
   }
 
   async calculateWorkoutStreak(userId: number): Promise<number> {
+    const precomputed = await getCurrentWorkoutStreak(userId);
+    if (precomputed !== null) return precomputed;
+
     const workouts = await db
       .select()
       .from(userWorkouts)
@@ -586,19 +596,20 @@ export class DatabaseStorage implements IStorage {
 
     if (workouts.length === 0) return 0;
 
+    // Walk back from today: each day with a workout extends the streak, the
+    // first gap ends it (several workouts on one day count once)
     let streak = 0;
-    let currentDate = new Date();
-    currentDate.setHours(0, 0, 0, 0);
+    const today = new Date();
+    today.setHours(0, 0, 0, 0);
 
     for (const workout of workouts) {
       const workoutDate = new Date(workout.completedAt);
       workoutDate.setHours(0, 0, 0, 0);
       
-      const daysDiff = Math.floor((currentDate.getTime() - workoutDate.getTime()) / (1000 * 60 * 60 * 24));
+      const daysDiff = Math.floor((today.getTime() - workoutDate.getTime()) / (1000 * 60 * 60 * 24));
       
       if (daysDiff === streak) {
         streak++;
-        currentDate = new Date(workoutDate);
       } else if (daysDiff > streak) {
         break;
       }
@@ -1,6 +1,6 @@
 import { db } from './db';
 import { workoutDays } from '../shared/schema';
-import { eq, and } from 'drizzle-orm';
+import { eq, and, inArray } from 'drizzle-orm';
 import { generateAIWorkout } from './ai-workout-generator';
 
 interface UserProfile {
@@ -55,8 +55,7 @@ export async function generateWeekWorkouts(
       .where(
         and(
           eq(workoutDays.userId, userId),
-          // @ts-ignore - date is in the array
-          eq(workoutDays.date, weekDates as any)
+          inArray(workoutDays.date, weekDates)
         )
       );
     
@@ -78,8 +77,12 @@ export async function generateWeekWorkouts(
       console.log('✅ [WEEK-GEN] Created pending entries');
     }
     
+    // Per-day generation spans (epoch ms), returned so benchmarks can see the fan-out overlap
+    const dayTimings: Array<{ date: string; status: string; startedAt: number; finishedAt: number }> = [];
+    
     // Generate workouts for each day
     const generatePromises = weekDates.map(async (date, index) => {
+      const startedAt = Date.now();
       try {
         // Check if this day already has a workout
         const [existingDay] = await db
@@ -94,6 +97,7 @@ export async function generateWeekWorkouts(
         
         if (existingDay && existingDay.status === 'ready') {
           console.log(`⏭️  [WEEK-GEN] Day ${index} (${date}) already ready, skipping`);
+          dayTimings.push({ date, status: 'skipped', startedAt, finishedAt: Date.now() });
           return existingDay;
         }
         
@@ -138,10 +142,12 @@ export async function generateWeekWorkouts(
           );
         
         console.log(`✅ [WEEK-GEN] Day ${index} (${date}) completed`);
+        dayTimings.push({ date, status: 'ready', startedAt, finishedAt: Date.now() });
         
         return { date, workout };
       } catch (error: any) {
         console.error(`❌ [WEEK-GEN] Error generating day ${index} (${date}):`, error);
+        dayTimings.push({ date, status: 'error', startedAt, finishedAt: Date.now() });
         
         // Store error in DB
         await db
@@ -189,6 +195,7 @@ export async function generateWeekWorkouts(
       success: true,
       weekDates,
       workouts: allDays,
+      dayTimings,
     };
     
   } catch (error: any) {
@@ -1,5 +1,5 @@
 import { relations } from "drizzle-orm";
-import { pgTable, text, serial, integer, boolean, timestamp, unique, index, jsonb } from "drizzle-orm/pg-core";
+import { pgTable, text, serial, integer, boolean, timestamp, unique, index, jsonb, real } from "drizzle-orm/pg-core";
 import { createInsertSchema } from "drizzle-zod";
 import { z } from "zod";
 
@@ -7,11 +7,16 @@ import { z } from "zod";
 export const coachMemory = pgTable("coach_memory", {
   id: serial("id").primaryKey(),
   userId: integer("user_id").notNull(),
+  kind: text("kind").default("conversation").notNull(), // conversation, summary (precomputed UserCoachSummary)
   summary: text("summary").notNull(), // AI-generated summary of the conversation
   topics: text("topics"), // Comma-separated topics discussed
   mood: text("mood"), // User's mood detected in conversation
+  data: jsonb("data"), // UserCoachSummary for kind = summary (scripts/precompute_coach_summaries.py)
+  refreshedAt: timestamp("refreshed_at"), // When a summary row was computed
   createdAt: timestamp("created_at").defaultNow().notNull(),
-});
+}, (table) => ({
+  userKindIdx: index("coach_memory_user_id_kind_idx").on(table.userId, table.kind),
+}));
 
 
 // User model
@@ -343,6 +348,157 @@ export const metricsDaily = pgTable("metrics_daily", {
   dateIdx: index("metrics_daily_date_idx").on(table.date),
 }));
 
+// Precomputed per-exercise stats (filled by scripts/exercise_stats_engine.py)
+// Mirrors the response of GET /api/stats/exercise/:exerciseId
+export const exerciseStats = pgTable("exercise_stats", {
+  id: serial("id").primaryKey(),
+  userId: integer("user_id").notNull().references(() => users.id, { onDelete: "cascade" }),
+  exerciseId: text("exercise_id").notNull(),
+  exerciseName: text("exercise_name").notNull(),
+  maxWeight: real("max_weight").default(0),
+  maxReps: real("max_reps").default(0),
+  maxVolume: real("max_volume").default(0),
+  estimatedOneRm: real("estimated_one_rm").default(0), // Epley 1RM of the best weight set
+  bestWeightSet: jsonb("best_weight_set"), // { weight, reps, date }
+  bestVolumeSet: jsonb("best_volume_set"), // { weight, reps, volume, date }
+  history: jsonb("history"), // Last 5 days: [{ date, maxWeight, totalReps, totalSets, totalVolume, estimatedOneRM, sets }]
+  lastSession: jsonb("last_session"), // { workoutId, date, sets }
+  trend: text("trend").default("neutral"), // up, down, neutral
+  totalSessions: integer("total_sessions").default(0),
+  computedAt: timestamp("computed_at").defaultNow().notNull(),
+}, (table) => ({
+  uniqueUserExercise: unique().on(table.userId, table.exerciseId),
+  userIdIdx: index("exercise_stats_user_id_idx").on(table.userId),
+}));
+
+// Running personal bests per user/exercise (maintained by scripts/pr_stream_processor.py)
+// exerciseKey is the exercise id as text, shared by performance_logs and workout_sets
+export const prState = pgTable("pr_state", {
+  id: serial("id").primaryKey(),
+  userId: integer("user_id").notNull().references(() => users.id, { onDelete: "cascade" }),
+  exerciseKey: text("exercise_key").notNull(),
+  bestWeight: real("best_weight").default(0),
+  bestReps: real("best_reps").default(0),
+  bestE1rm: real("best_e1rm").default(0), // Epley estimated 1RM
+  updatedAt: timestamp("updated_at").defaultNow().notNull(),
+}, (table) => ({
+  uniqueUserExercise: unique().on(table.userId, table.exerciseKey),
+}));
+
+// Fitted e1RM progression curve per user/exercise (maintained by scripts/progression_curves.py)
+// nameKey is the trimmed, lower-cased exercise name used by getSuggestedWeight()
+export const progressionCurves = pgTable("progression_curves", {
+  id: serial("id").primaryKey(),
+  userId: integer("user_id").notNull().references(() => users.id, { onDelete: "cascade" }),
+  exerciseId: text("exercise_id").notNull(),
+  exerciseName: text("exercise_name").notNull(),
+  nameKey: text("name_key").notNull(),
+  model: text("model").notNull().default("linear"), // linear, saturation
+  points: integer("points").notNull().default(0), // Training days in the fit
+  firstDate: text("first_date").notNull(), // YYYY-MM-DD (UTC)
+  lastDate: text("last_date").notNull(),
+  intercept: real("intercept").default(0), // Robust linear fit: e1rm = intercept + slope * days
+  slopePerWeek: real("slope_per_week").default(0),
+  plateau: real("plateau"), // Saturation fit: e1rm = plateau - gap * exp(-rate * days)
+  rate: real("rate"),
+  residualScale: real("residual_scale").default(0),
+  r2: real("r2").default(0),
+  currentE1rm: real("current_e1rm").default(0),
+  projectedE1rm: real("projected_e1rm").default(0), // 4 weeks after the last session
+  suggestedWeight: real("suggested_weight").default(0),
+  suggestedReps: integer("suggested_reps").default(0),
+  confidence: text("confidence").default("low"), // low, medium, high
+  fittedAt: timestamp("fitted_at").defaultNow().notNull(),
+}, (table) => ({
+  uniqueUserExercise: unique().on(table.userId, table.exerciseId),
+  userIdNameKeyIdx: index("progression_curves_user_id_name_key_idx").on(table.userId, table.nameKey),
+}));
+
+// Weekly sets/volume cube per user, ISO week, muscle group and body part
+// (maintained by scripts/muscle_volume_cube.py). A set counts towards every muscle group
+// it targets; muscleGroup "*" holds the per-body-part totals (each set counted once)
+export const muscleVolumeWeekly = pgTable("muscle_volume_weekly", {
+  id: serial("id").primaryKey(),
+  userId: integer("user_id").notNull().references(() => users.id, { onDelete: "cascade" }),
+  week: text("week").notNull(), // ISO week, e.g. 2025-W03
+  weekStart: text("week_start").notNull(), // Monday, YYYY-MM-DD
+  muscleGroup: text("muscle_group").notNull(),
+  bodyPart: text("body_part").notNull(),
+  sets: integer("sets").default(0),
+  reps: integer("reps").default(0),
+  volume: real("volume").default(0), // weight x reps
+  durationSeconds: integer("duration_seconds").default(0),
+  updatedAt: timestamp("updated_at").defaultNow().notNull(),
+}, (table) => ({
+  uniqueCell: unique().on(table.userId, table.week, table.muscleGroup, table.bodyPart),
+  userIdWeekIdx: index("muscle_volume_weekly_user_id_week_idx").on(table.userId, table.week),
+}));
+
+// Streak / adherence state per user (maintained by scripts/adherence_service.py, read by server/adherence.ts)
+// Days are UTC day numbers (days since 1970-01-01); weekBitmaps holds one 7-bit mask per
+// Sunday-first week starting at bitmapWeek (bit 0 = Sunday, like getDay())
+export const userAdherence = pgTable("user_adherence", {
+  id: serial("id").primaryKey(),
+  userId: integer("user_id").notNull().unique().references(() => users.id, { onDelete: "cascade" }),
+  runStarts: integer("run_starts").array().notNull().default([]), // Run-length encoded training days
+  runLengths: integer("run_lengths").array().notNull().default([]),
+  longestStreak: integer("longest_streak").notNull().default(0),
+  lastDay: integer("last_day"),
+  lastRunLength: integer("last_run_length").notNull().default(0),
+  totalDays: integer("total_days").notNull().default(0),
+  totalWorkouts: integer("total_workouts").notNull().default(0),
+  bitmapWeek: integer("bitmap_week").notNull().default(0),
+  weekBitmaps: integer("week_bitmaps").array().notNull().default([]),
+  lastWorkoutId: integer("last_workout_id").notNull().default(0), // Last user_workouts row applied
+  updatedAt: timestamp("updated_at").defaultNow().notNull(),
+});
+
+// Completed-workout summary frozen by scripts/freeze_workout_summaries.py; summary is the
+// GET /api/stats/workout-summary/:workoutId response as of the workout's last set
+export const workoutSummaries = pgTable("workout_summaries", {
+  id: serial("id").primaryKey(),
+  userId: integer("user_id").notNull().references(() => users.id, { onDelete: "cascade" }),
+  workoutId: text("workout_id").notNull(), // performance_logs.workout_id
+  summary: jsonb("summary").notNull(), // { exercises, stats }
+  totalVolume: real("total_volume").default(0),
+  totalSets: integer("total_sets").default(0),
+  exerciseCount: integer("exercise_count").default(0),
+  prsHit: integer("prs_hit").default(0),
+  durationSeconds: integer("duration_seconds").default(0),
+  startedAt: timestamp("started_at"),
+  completedAt: timestamp("completed_at"),
+  lastLogId: integer("last_log_id").notNull().default(0),
+  computedAt: timestamp("computed_at").defaultNow().notNull(),
+}, (table) => ({
+  uniqueUserWorkout: unique().on(table.userId, table.workoutId),
+}));
+
+// Upcoming-week generation jobs (scripts/plan_pregeneration_scheduler.py); weekStart is the
+// Monday (YYYY-MM-DD, like workout_days.date), jobs run in expectedOpen order
+export const planPregenerationQueue = pgTable("plan_pregeneration_queue", {
+  id: serial("id").primaryKey(),
+  userId: integer("user_id").notNull().references(() => users.id, { onDelete: "cascade" }),
+  weekStart: text("week_start").notNull(),
+  weekNumber: integer("week_number").notNull().default(1),
+  expectedOpen: timestamp("expected_open").notNull(), // Estimated next app open
+  status: text("status").notNull().default("pending"), // pending | running | done | failed
+  attempts: integer("attempts").notNull().default(0),
+  lastError: text("last_error"),
+  createdAt: timestamp("created_at").defaultNow().notNull(),
+  updatedAt: timestamp("updated_at").defaultNow().notNull(),
+}, (table) => ({
+  uniqueUserWeek: unique().on(table.userId, table.weekStart),
+  statusIdx: index("plan_pregeneration_queue_status_idx").on(table.status, table.expectedOpen),
+}));
+
+// Incremental batch job progress: last source row id processed per job/source
+// (e.g. "metrics_daily:user_workouts"), written by scripts/db_utils.py
+export const jobWatermarks = pgTable("job_watermarks", {
+  name: text("name").primaryKey(),
+  lastId: integer("last_id").notNull().default(0),
+  updatedAt: timestamp("updated_at").defaultNow().notNull(),
+});
+
 // Relations for new workout tables
 export const exercisesRelations = relations(exercises, ({ many }) => ({
   workoutSets: many(workoutSets),
@@ -616,6 +772,15 @@ export type InsertWorkoutEvent = z.infer<typeof insertWorkoutEventSchema>;
 export type MetricsDaily = typeof metricsDaily.$inferSelect;
 export type InsertMetricsDaily = z.infer<typeof insertMetricsDailySchema>;
 
+export type ExerciseStats = typeof exerciseStats.$inferSelect;
+export type PrState = typeof prState.$inferSelect;
+export type ProgressionCurve = typeof progressionCurves.$inferSelect;
+export type MuscleVolumeWeekly = typeof muscleVolumeWeekly.$inferSelect;
+export type UserAdherence = typeof userAdherence.$inferSelect;
+export type WorkoutSummary = typeof workoutSummaries.$inferSelect;
+export type PlanPregenerationJob = typeof planPregenerationQueue.$inferSelect;
+export type JobWatermark = typeof jobWatermarks.$inferSelect;
+
 export type AiLearningContext = typeof aiLearningContext.$inferSelect;
 export type InsertAiLearningContext = z.infer<typeof insertAiLearningContextSchema>;
 
@@ -0,0 +1,73 @@
+"""
+In-memory stand-in for the asyncpg connection calls the scripts/ jobs make.
+
+Only what the write paths need: type codecs, transactions, binary COPY and
+the statements db_utils.copy_upsert() issues. COPY encodes json/jsonb
+columns the way asyncpg's binary COPY does, so a codec registered in text
+format fails here exactly like it does against Postgres.
+"""
+import re
+from contextlib import asynccontextmanager
+
+
+class FakeInterfaceError(Exception):
+    """Stands in for asyncpg.exceptions.InterfaceError"""
+
+
+class FakeConnection:
+    def __init__(self, tables: dict):
+        """tables: {name: {column: postgres type}}"""
+        self.types = {name: dict(columns) for name, columns in tables.items()}
+        self.rows = {name: [] for name in tables}
+        self.codecs = {}
+        self.statements = []
+
+    async def set_type_codec(self, typename, *, encoder, decoder, schema='public', format='text'):
+        self.codecs[typename] = {'encoder': encoder, 'decoder': decoder, 'format': format}
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield
+
+    def _encode(self, pg_type: str, value):
+        if pg_type not in ('json', 'jsonb') or value is None:
+            return value
+        codec = self.codecs.get(pg_type)
+        if codec is None:
+            # Built-in binary codec: takes the JSON text only
+            if not isinstance(value, str):
+                raise FakeInterfaceError(f"invalid input for query argument: {value!r} (expected str)")
+            return value
+        if codec['format'] != 'binary':
+            raise FakeInterfaceError(f"no binary format encoder for type {pg_type}")
+        data = codec['encoder'](value)
+        if pg_type == 'jsonb':
+            assert data[:1] == b'\x01', 'binary jsonb starts with the version byte'
+        return codec['decoder'](data)
+
+    async def copy_records_to_table(self, table, *, records, columns):
+        types = self.types[table]
+        for record in records:
+            self.rows[table].append({c: self._encode(types[c], v) for c, v in zip(columns, record)})
+        return f"COPY {len(records)}"
+
+    async def execute(self, query: str, *args):
+        self.statements.append(' '.join(query.split()))
+        statement = self.statements[-1]
+        created = re.match(r'CREATE TEMP TABLE (\w+) .* AS SELECT (.+) FROM (\w+) WITH NO DATA', statement)
+        if created:
+            staging, columns, source = created.groups()
+            self.types[staging] = {c.strip(): self.types[source][c.strip()] for c in columns.split(',')}
+            self.rows[staging] = []
+            return 'SELECT 0'
+        inserted = re.match(r'INSERT INTO (\w+) \(.+?\) SELECT .+ FROM (\w+)', statement)
+        if inserted:
+            target, staging = inserted.groups()
+            moved = self.rows.pop(staging)
+            del self.types[staging]
+            self.rows[target].extend(moved)
+            return f"INSERT 0 {len(moved)}"
+        return 'OK'
+
+    async def executemany(self, query: str, args):
+        self.statements.append(' '.join(query.split()))
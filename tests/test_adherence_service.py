@@ -0,0 +1,170 @@
+"""
+Test suite for the streak & adherence service (scripts/adherence_service.py).
+
+Tests:
+1. Run-length state: appends, duplicates and out-of-order merges
+2. Incremental updates in any order give the same state as the bulk backfill
+3. Streak reads match ports of the coach insight streak and calculateStreak()
+4. Day-of-week bitmaps: window trimming, weekday counts, strong/weak days
+
+Run: pytest tests/test_adherence_service.py -v
+"""
+import os
+import sys
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+pd = pytest.importorskip('pandas')
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from adherence_service import BITMAP_WEEKS, AdherenceState, backfill_states, day_number, week_and_bit
+
+
+def _runs(state):
+    return list(zip(state.run_starts, state.run_lengths))
+
+
+def _same(a, b):
+    return (
+        _runs(a) == _runs(b)
+        and (a.longest_streak, a.total_days, a.total_workouts, a.last_workout_id)
+        == (b.longest_streak, b.total_days, b.total_workouts, b.last_workout_id)
+        and (a.bitmap_week, a.week_bitmaps) == (b.bitmap_week, b.week_bitmaps)
+    )
+
+
+def insight_streak(days_desc, today):
+    """coach-insights.ts buildInsightContext() streak over workout days, newest first"""
+    streak = 0
+    for day in days_desc:
+        diff = today - day
+        if diff == streak:
+            streak += 1
+        elif diff > streak:
+            break
+    return streak
+
+
+def calculate_streak(days, today):
+    """ai-user-context.ts calculateStreak()"""
+    if not days:
+        return 0
+    present = set(days)
+    streak = 0
+    for i in range(30):
+        if today - i in present:
+            streak += 1
+        elif i > 0:
+            break
+    return streak
+
+
+def _random_workouts(seed, users=4, count=300):
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1, 6)
+    rows = []
+    for i in range(count):
+        user_id = rng.randint(1, users)
+        day = rng.choice([rng.randint(0, 500), rng.randint(480, 520)])  # clusters make long runs
+        rows.append({'id': i + 1, 'user_id': user_id,
+                     'completed_at': start + timedelta(days=day, hours=rng.randint(0, 17))})
+    return pd.DataFrame(rows)
+
+
+class TestRunState:
+    """Run-length encoding"""
+
+    def test_appends_extend_and_start_runs(self):
+        state = AdherenceState()
+        for day, wid in [(100, 1), (101, 2), (101, 3), (102, 4), (105, 5)]:
+            state.add(day, wid)
+        assert _runs(state) == [(100, 3), (105, 1)]
+        assert (state.total_days, state.total_workouts, state.longest_streak) == (4, 5, 3)
+        assert (state.last_day, state.last_run_length, state.last_workout_id) == (105, 1, 5)
+
+    def test_out_of_order_merges(self):
+        state = AdherenceState()
+        for day in (10, 12, 20):
+            state.add(day)
+        assert state.add(11) is True       # joins 10 and 12
+        assert state.add(11) is False      # duplicate day
+        assert state.add(19) is True       # extends the next run backwards
+        assert state.add(5) is True        # new run before everything
+        assert _runs(state) == [(5, 1), (10, 3), (19, 2)]
+        assert state.longest_streak == 3
+        assert state.trained_on(11) and not state.trained_on(13)
+
+    @pytest.mark.parametrize('seed', [1, 2, 3])
+    def test_incremental_matches_backfill(self, seed):
+        workouts = _random_workouts(seed)
+        expected = backfill_states(workouts)
+        for order in ('id', 'shuffled'):
+            rows = workouts if order == 'id' else workouts.sample(frac=1, random_state=seed)
+            states = {}
+            for r in rows.itertuples(index=False):
+                states.setdefault(r.user_id, AdherenceState()).add(day_number(r.completed_at), r.id)
+            assert states.keys() == expected.keys()
+            for user_id, state in states.items():
+                assert _same(state, expected[user_id])
+
+
+class TestStreakReads:
+    """Streak values match the TS calculators"""
+
+    @pytest.mark.parametrize('seed', [4, 5])
+    def test_matches_ts_calculators(self, seed):
+        workouts = _random_workouts(seed, users=3)
+        states = backfill_states(workouts)
+        for user_id, state in states.items():
+            days = sorted((day_number(t) for t in workouts.loc[workouts['user_id'] == user_id, 'completed_at']),
+                          reverse=True)
+            for today in range(days[-1] - 2, days[0] + 3):
+                past = [d for d in days if d <= today]
+                if past and past[0] != state.last_day:
+                    continue  # reads are defined for "today" on or after the last training day
+                assert state.current_streak(today) == insight_streak(past, today)
+                assert state.recent_streak(today) == calculate_streak(past, today)
+
+    def test_long_run_cap(self):
+        state = AdherenceState()
+        for day in range(1000, 1040):
+            state.add(day)
+        assert state.current_streak(1039) == 40
+        assert state.recent_streak(1039) == 30
+        assert state.recent_streak(1040) == 29
+        assert state.recent_streak(1041) == 0
+
+
+class TestBitmaps:
+    """Day-of-week bitmaps"""
+
+    def test_week_and_bit_match_get_day(self):
+        for dt in (datetime(2025, 1, 12), datetime(2025, 1, 15), datetime(1970, 1, 1)):
+            _, bit = week_and_bit(day_number(dt))
+            assert bit == (dt.weekday() + 1) % 7
+
+    def test_window_is_trimmed(self):
+        state = AdherenceState()
+        sunday = day_number(datetime(2024, 1, 7))
+        for w in range(BITMAP_WEEKS + 5):
+            state.add(sunday + 7 * w)
+        assert len(state.week_bitmaps) == BITMAP_WEEKS
+        assert state.bitmap_week == week_and_bit(sunday)[0] + 5
+        assert set(state.week_bitmaps) == {1}
+        state.add(sunday)  # older than the window: runs only
+        assert len(state.week_bitmaps) == BITMAP_WEEKS and state.trained_on(sunday)
+
+    def test_strong_and_weak_days(self):
+        state = AdherenceState()
+        monday = day_number(datetime(2025, 1, 6))
+        for w in range(4):
+            for offset in (0, 2, 3, 5):        # Monday, Wednesday, Thursday, Saturday every week
+                state.add(monday + 7 * w + offset)
+        state.add(monday + 4)                  # one Friday
+        today = monday + 7 * 3 + 5
+        assert state.weekday_counts(today) == [0, 4, 0, 4, 4, 1, 4]
+        assert state.strong_weak_days(today) == ([1, 3, 4, 6], [5])
+        assert state.weeks_trained(today) == [5, 4, 4, 4]
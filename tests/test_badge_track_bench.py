@@ -0,0 +1,129 @@
+"""
+Test suite for the badge tracking write benchmark (scripts/bench_badge_track.py).
+
+Tests:
+1. Burst schedules are reproducible, sorted and sized users x bursts x burst size
+2. Expected stats and lost-increment counting
+3. TrackBatcher windows and full batches, BatchedTrackClient flushing
+4. Request bodies for single and batched tracks, and the summary
+
+Run: pytest tests/test_badge_track_bench.py -v
+"""
+import os
+import sys
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from bench_badge_track import (ACTION_WEIGHTS, BatchedTrackClient, TrackBatcher, burst_schedule, expected_stats,
+                               lost_updates, post_track, summarize)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+class FakeSession:
+    def __init__(self, status_code=200):
+        self.status_code = status_code
+        self.sent = []
+
+    def post(self, url, headers=None, json=None, timeout=None):
+        self.sent.append((url, headers, json))
+        return FakeResponse(self.status_code)
+
+
+class TestSchedule:
+    """Burst schedule and expected totals"""
+
+    def test_schedule(self):
+        schedule = burst_schedule(random.Random(3), users=10, bursts=4, burst_size=6, duration_s=5, spread_ms=200)
+        assert len(schedule) == 10 * 4 * 6
+        assert [e[0] for e in schedule] == sorted(e[0] for e in schedule)
+        assert all(0 <= t <= 5.2 and action in ACTION_WEIGHTS for t, _, action, _ in schedule)
+        assert all((value is not None) == (action == 'prBroken') for _, _, action, value in schedule)
+        assert burst_schedule(random.Random(3), 10, 4, 6, 5, 200) == schedule
+
+    def test_expected_and_lost(self):
+        schedule = [(0.1, 0, 'coachMessage', None), (0.2, 0, 'coachMessage', None), (0.3, 0, 'prBroken', 3),
+                    (0.4, 0, 'profileEdit', None), (0.5, 1, 'videoWatched', None)]
+        expected = expected_stats(schedule)
+        assert expected == {0: {'totalCoachMessages': 2, 'totalPRsBroken': 3, 'hasEditedProfile': True},
+                            1: {'totalVideosWatched': 1}}
+        stored = {0: {'totalCoachMessages': 1, 'totalPRsBroken': 3, 'hasEditedProfile': False},
+                  1: {'totalVideosWatched': 1}}
+        assert lost_updates(expected, stored) == {'increments': 2, 'users': 1}
+        assert lost_updates(expected, {0: None, 1: {'totalVideosWatched': 1}}) == {'increments': 6, 'users': 1}
+        assert lost_updates(expected, {0: expected[0], 1: expected[1]}) == {'increments': 0, 'users': 0}
+
+
+class TestBatcher:
+    """Coalescing per user"""
+
+    def test_window(self):
+        clock = FakeClock()
+        batcher = TrackBatcher(window_s=0.25, max_events=10, clock=clock)
+        batcher.add('a', {'action': 'coachMessage'})
+        clock.now = 0.1
+        batcher.add('b', {'action': 'videoWatched'})
+        batcher.add('a', {'action': 'workoutEdit'})
+        clock.now = 0.3
+        due = batcher.take_due()
+        assert [key for key, _ in due] == ['a']
+        assert [e['action'] for e, _ in due[0][1]] == ['coachMessage', 'workoutEdit']
+        assert [t for _, t in due[0][1]] == [0.0, 0.1]
+        clock.now = 0.4
+        assert [key for key, _ in batcher.take_due()] == ['b']
+        assert batcher.take_all() == []
+
+    def test_full_batch(self):
+        batcher = TrackBatcher(window_s=10, max_events=3, clock=FakeClock())
+        assert batcher.add('a', {'action': 'coachMessage'}) is None
+        assert batcher.add('a', {'action': 'coachMessage'}) is None
+        assert len(batcher.add('a', {'action': 'coachMessage'})) == 3
+        assert batcher.take_all() == []
+
+    def test_client_sends_every_event_once(self):
+        sent = []
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            client = BatchedTrackClient(lambda token, items: sent.append((token, len(items))) or len(items),
+                                        pool, window_s=0.01, max_events=5)
+            for i in range(23):
+                client.track(f"user{i % 3}", {'action': 'coachMessage'})
+            results = client.close()
+        assert sum(results) == 23 and sum(n for _, n in sent) == 23
+        assert all(n <= 5 for _, n in sent) and {token for token, _ in sent} == {'user0', 'user1', 'user2'}
+
+
+class TestRequests:
+    """Track payloads and summary"""
+
+    def test_bodies(self):
+        session = FakeSession()
+        items = [({'action': 'prBroken', 'value': 2}, 0.0), ({'action': 'coachMessage'}, 0.0)]
+        record = post_track(session, 'http://backend', 'tok', items[:1], batched=False)
+        assert session.sent[0] == ('http://backend/api/badges/track', {'Authorization': 'Bearer tok'},
+                                   {'action': 'prBroken', 'value': 2})
+        assert record['events'] == 1 and record['error'] is None
+        post_track(session, 'http://backend', 'tok', items, batched=True)
+        assert session.sent[1][2] == {'events': [{'action': 'prBroken', 'value': 2}, {'action': 'coachMessage'}]}
+        assert post_track(FakeSession(500), 'http://backend', 'tok', items, batched=True)['error'] == 'HTTP 500'
+
+    def test_summarize(self):
+        records = [{'events': 4, 'latency_ms': 20, 'eventLatencyMs': [250, 240, 30, 20], 'error': None},
+                   {'events': 2, 'latency_ms': 40, 'eventLatencyMs': [60, 40], 'error': None},
+                   {'events': 1, 'latency_ms': 5, 'eventLatencyMs': [5], 'error': 'HTTP 500'}]
+        summary = summarize(records, wall_seconds=2)
+        assert (summary['requests'], summary['events'], summary['eventsPerRequest']) == (3, 7, 2.33)
+        assert summary['eventsPerSecond'] == 3.0 and summary['errors'] == {'HTTP 500': 1}
+        assert summary['request']['count'] == 2 and summary['eventAck']['count'] == 6
@@ -0,0 +1,101 @@
+"""
+Test suite for the app asset build (apps/native/assets/build_assets.py).
+
+Tests:
+1. Density and variant outputs expand to the expected files
+2. The cache key follows the manifest entry and the source bytes
+3. A target is skipped only when its key and every output hash match
+4. Rendering a source image writes every size and format
+5. The real manifest builds every file app.config.js picks up
+
+Run: pytest tests/test_build_assets.py -v
+"""
+import os
+import re
+import sys
+
+NATIVE_DIR = os.path.join(os.path.dirname(__file__), '..', 'apps', 'native')
+sys.path.insert(0, os.path.join(NATIVE_DIR, 'assets'))
+
+from PIL import Image
+
+from build_assets import (
+    expand_outputs, is_up_to_date, load_manifest, output_paths, render_target, target_cache_key,
+)
+
+LOGO = {'name': 'logo', 'source': 'logo.png', 'size': [96, 29], 'densities': [1, 2, 3],
+        'out': 'images/logo', 'formats': ['png', 'webp'], 'webpLossless': True}
+
+
+def _source(assets_dir, color=(162, 89, 255, 255)):
+    Image.new('RGBA', (200, 60), color).save(os.path.join(assets_dir, 'logo.png'))
+
+
+class TestOutputs:
+    """Output names and sizes"""
+
+    def test_densities(self):
+        assert expand_outputs(LOGO) == [('images/logo', (96, 29)), ('images/logo@2x', (192, 58)),
+                                        ('images/logo@3x', (288, 87))]
+        assert [os.path.basename(p) for p in output_paths(LOGO, 'out')][:2] == ['logo.png', 'logo.webp']
+
+    def test_variants(self):
+        target = {'variants': [{'out': 'icon', 'size': [1024, 1024]}, {'out': 'favicon', 'size': [48, 48]}]}
+        assert expand_outputs(target) == [('icon', (1024, 1024)), ('favicon', (48, 48))]
+
+
+class TestCache:
+    """Content-hash skip logic"""
+
+    def test_key_follows_manifest_and_source(self, tmp_path):
+        _source(str(tmp_path))
+        key = target_cache_key(LOGO, str(tmp_path))
+        assert target_cache_key(dict(LOGO), str(tmp_path)) == key
+        assert target_cache_key({**LOGO, 'webpLossless': False}, str(tmp_path)) != key
+        _source(str(tmp_path), color=(0, 0, 0, 255))
+        assert target_cache_key(LOGO, str(tmp_path)) != key
+
+    def test_up_to_date(self, tmp_path):
+        assets_dir, out_dir = str(tmp_path), str(tmp_path / 'generated')
+        _source(assets_dir)
+        key = target_cache_key(LOGO, assets_dir)
+        entry = {'key': key, 'outputs': render_target(LOGO, assets_dir, out_dir)}
+        assert is_up_to_date(LOGO, entry, key, out_dir)
+        assert not is_up_to_date(LOGO, entry, 'other', out_dir)
+        assert not is_up_to_date(LOGO, None, key, out_dir)
+
+        # an output edited or deleted by hand is rebuilt
+        with open(os.path.join(out_dir, 'images', 'logo@2x.png'), 'ab') as f:
+            f.write(b'x')
+        assert not is_up_to_date(LOGO, entry, key, out_dir)
+        entry['outputs'] = render_target(LOGO, assets_dir, out_dir)
+        os.remove(os.path.join(out_dir, 'images', 'logo.webp'))
+        assert not is_up_to_date(LOGO, entry, key, out_dir)
+
+
+class TestRender:
+    """One target rendered end to end"""
+
+    def test_render_sizes_and_formats(self, tmp_path):
+        assets_dir, out_dir = str(tmp_path), str(tmp_path / 'generated')
+        _source(assets_dir)
+        written = render_target(LOGO, assets_dir, out_dir)
+        assert sorted(written) == sorted(os.path.relpath(p, out_dir) for p in output_paths(LOGO, out_dir))
+        with Image.open(os.path.join(out_dir, 'images', 'logo@3x.png')) as img:
+            assert img.size == (288, 87)
+        with Image.open(os.path.join(out_dir, 'images', 'logo.webp')) as img:
+            assert img.format == 'WEBP' and img.size == (96, 29)
+
+
+class TestManifest:
+    """assets.json against app.config.js"""
+
+    def test_config_assets_are_built(self):
+        with open(os.path.join(NATIVE_DIR, 'app.config.js'), encoding='utf-8') as f:
+            wanted = set(re.findall(r"generatedAsset\('([^']+)'\)", f.read()))
+        built = {os.path.relpath(p, 'out') for t in load_manifest()['targets'] for p in output_paths(t, 'out')}
+        assert wanted and wanted <= built
+
+    def test_adaptive_icon_foreground_is_full_size(self):
+        target = next(t for t in load_manifest()['targets'] if t['name'] == 'adaptive-icon')
+        assert ('adaptive-icon', (1024, 1024)) in expand_outputs(target)
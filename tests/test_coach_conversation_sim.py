@@ -0,0 +1,89 @@
+"""
+Test suite for the coach conversation simulator (scripts/simulate_coach_conversations.py).
+
+Tests:
+1. Conversation scripts open with a greeting and draw from the test categories
+2. Turns resend the growing history and record the prompt-size headers
+3. Per-turn aggregation and the growth exponent (linear vs super-linear)
+
+Run: pytest tests/test_coach_conversation_sim.py -v
+"""
+import os
+import sys
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from simulate_coach_conversations import CATEGORIES, conversation_script, growth_exponent, per_turn, run_conversation
+
+
+class FakeResponse:
+    def __init__(self, status_code, body, headers):
+        self.status_code, self._body, self.headers = status_code, body, headers
+
+    def json(self):
+        return self._body
+
+
+class FakeSession:
+    """Replies like /api/coach/chat; the prompt grows with the history it is sent"""
+
+    def __init__(self, fail_turn=None):
+        self.sent = []
+        self.fail_turn = fail_turn
+
+    def post(self, url, headers=None, timeout=None, json=None):
+        self.sent.append(json)
+        if len(self.sent) == self.fail_turn:
+            return FakeResponse(500, {'error': 'Failed to get coach response'}, {})
+        prompt = 4000 + sum(len(m['content']) for m in json['conversationHistory'][-6:]) + len(json['message'])
+        return FakeResponse(200, {'response': f"reply {len(self.sent)}", 'coach': 'Coach'},
+                            {'X-Coach-Prompt-Chars': str(prompt), 'X-Coach-System-Chars': '4000'})
+
+
+class TestScript:
+    """Message mix"""
+
+    def test_greeting_then_categories(self):
+        script = conversation_script(random.Random(1), 30)
+        assert len(script) == 30 and script[0] == ('greeting', 'Hello coach!')
+        assert all(message in CATEGORIES[category] for category, message in script)
+        assert len({category for category, _ in script}) > 5
+        assert conversation_script(random.Random(1), 30) == script
+
+
+class TestConversation:
+    """Multi-turn requests"""
+
+    def test_history_grows(self):
+        session = FakeSession()
+        script = [('greeting', 'Hello coach!'), ('form', 'How do I improve my squat form?'),
+                  ('nutrition', 'How much protein should I eat to build muscle?')]
+        records = run_conversation(session, 'http://backend', 'token', script)
+        assert [len(body['conversationHistory']) for body in session.sent] == [0, 2, 4]
+        assert session.sent[2]['conversationHistory'][1] == {'role': 'coach', 'content': 'reply 1'}
+        assert all(r['ok'] for r in records) and records[0]['systemChars'] == 4000
+        assert records[0]['promptChars'] < records[1]['promptChars'] < records[2]['promptChars']
+
+    def test_failed_turn_not_added_to_history(self):
+        session = FakeSession(fail_turn=2)
+        records = run_conversation(session, 'http://backend', 'token', conversation_script(random.Random(2), 3))
+        assert [r['error'] for r in records] == [None, 'HTTP 500', None]
+        assert len(session.sent[2]['conversationHistory']) == 2
+
+
+class TestAggregation:
+    """Per-turn table and growth"""
+
+    def test_per_turn(self):
+        records = [{'turn': t, 'ok': ok, 'latency_ms': ms, 'promptChars': 100 * t, 'systemChars': 50,
+                    'promptTokens': None, 'historySent': 2 * (t - 1)}
+                   for t, ok, ms in [(1, True, 100), (1, True, 300), (2, True, 400), (2, False, None)]]
+        rows = per_turn(records)
+        assert [(r['turn'], r['count'], r['errors'], r['p50']) for r in rows] == [(1, 2, 0, 200), (2, 2, 1, 400)]
+        assert rows[1]['promptChars'] == 200 and rows[1]['promptTokens'] is None
+
+    def test_growth_exponent(self):
+        assert growth_exponent([1000 + 50 * t for t in range(20)]) == 1.0
+        assert growth_exponent([1000 + 5 * t * t for t in range(20)]) == 2.0
+        assert growth_exponent([1000] * 20) is None
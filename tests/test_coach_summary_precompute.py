@@ -0,0 +1,210 @@
+"""
+Test suite for the coach summary precompute worker (scripts/precompute_coach_summaries.py).
+
+The stored summary must equal what coach-memory.ts::buildUserCoachSummary()
+would build at the same moment.
+
+Tests:
+1. Adherence patterns: empty history, strong/weak days, streak counting
+2. Summary fields and personality mapping
+3. Streak and weekday patterns from user_adherence match getAdherencePatterns()
+4. Batching of user ids
+5. Summary rows are stored with a jsonb data column through binary COPY
+
+Run: pytest tests/test_coach_summary_precompute.py -v
+"""
+import os
+import sys
+import random
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+import pandas as pd
+
+from adherence_service import STATE_COLUMNS, backfill_states, day_number, load_snapshots
+from db_utils import register_json_codecs
+from pg_fakes import FakeConnection
+from precompute_coach_summaries import (
+    SUMMARY_COLUMNS, batches, build_summary, calculate_adherence_patterns, store_summaries, summary_text,
+)
+from script_utils import js_iso
+
+NOW = datetime(2025, 6, 18, 15, 30, tzinfo=timezone.utc)  # Wednesday
+
+
+def _workouts(*days_ago, hour=9):
+    return [{'user_id': 1, 'completed_at': (NOW - timedelta(days=d)).replace(hour=hour, tzinfo=None)}
+            for d in days_ago]
+
+
+class TestAdherencePatterns:
+    """calculateAdherencePatterns() port"""
+
+    def test_no_workouts(self):
+        assert calculate_adherence_patterns([], NOW) == {
+            'averageCompletionRate': 0, 'strongDays': [], 'weakDays': [],
+            'lastWorkoutDate': None, 'currentStreak': 0, 'longestStreak': 0,
+        }
+
+    def test_streak_from_today(self):
+        patterns = calculate_adherence_patterns(_workouts(0, 1, 2, 5, 6), NOW)
+        assert patterns['currentStreak'] == 3
+        assert patterns['longestStreak'] == 3
+        assert patterns['lastWorkoutDate'] == '2025-06-18T09:30:00.000Z'
+
+    def test_streak_quirks_match_typescript(self):
+        # A gap resets tempStreak to 1 on every non-matching workout, and two
+        # workouts on the same day break the run
+        patterns = calculate_adherence_patterns(_workouts(0, 0, 1), NOW)
+        assert patterns['currentStreak'] == 2
+        assert patterns['longestStreak'] == 2
+
+    def test_strong_and_weak_days(self):
+        # Fourteen Wednesdays, one Monday
+        patterns = calculate_adherence_patterns(_workouts(*range(0, 98, 7), 2), NOW)
+        assert patterns['strongDays'] == [3]
+        assert patterns['weakDays'] == [1]
+
+    def test_completion_rate_is_zero_without_completed_column(self):
+        assert calculate_adherence_patterns(_workouts(0, 1), NOW)['averageCompletionRate'] == 0
+
+
+class TestBuildSummary:
+    """buildUserCoachSummary() fields"""
+
+    def test_defaults_and_personality(self):
+        user = {'id': 7, 'goal': None, 'fitness_level': None, 'coaching_style': 'strict-structured',
+                'training_days_per_week': None, 'injuries': 'left knee'}
+        summary = build_summary(user, [], NOW)
+        assert summary['goalSummary'] == 'General fitness'
+        assert summary['experienceLevel'] == 'beginner'
+        assert summary['coachPersonality'] == 'disciplined'
+        assert summary['trainingFrequency'] == 3
+        assert summary['injuries'] == []
+        assert summary['lastUpdated'] == summary['lastFullRefresh'] == js_iso(NOW)
+
+    def test_unknown_style_is_friendly(self):
+        user = {'id': 7, 'goal': 'strength', 'fitness_level': 'advanced', 'coaching_style': 'mystery',
+                'training_days_per_week': 5, 'injuries': None}
+        summary = build_summary(user, _workouts(0), NOW)
+        assert summary['coachPersonality'] == 'friendly'
+        assert summary['adherencePatterns']['currentStreak'] == 1
+
+
+def _ts_adherence_patterns(row: dict, newer: list, now: datetime, weeks: int = 4) -> dict:
+    """loadAdherenceSnapshot() + getAdherencePatterns() from server/adherence.ts, line by line"""
+    last_day, run_length = row['last_day'], row['last_run_length']
+    bitmap_week, bitmaps = row['bitmap_week'], list(row['week_bitmaps'])
+    for day in sorted({day_number(ts) for ts in newer}):
+        week, bit = (day + 4) // 7, (day + 4) % 7
+        if not bitmaps:
+            bitmap_week = week
+        offset = week - bitmap_week
+        if offset >= 0:
+            while len(bitmaps) <= offset:
+                bitmaps.append(0)
+            bitmaps[offset] |= 1 << bit
+        if last_day is not None and day <= last_day:
+            continue
+        run_length = run_length + 1 if last_day is not None and day == last_day + 1 else 1
+        last_day = day
+
+    today = day_number(now)
+    current_week = (today + 4) // 7
+    counts = [0] * 7
+    for week in range(current_week - weeks + 1, current_week + 1):
+        mask = bitmaps[week - bitmap_week] if 0 <= week - bitmap_week < len(bitmaps) else None
+        if week < bitmap_week or not mask:
+            continue
+        for bit in range(7):
+            counts[bit] += (mask >> bit) & 1
+    avg = sum(counts) / 7
+    return {
+        'currentStreak': run_length if last_day == today else 0,
+        'strongDays': [d for d, c in enumerate(counts) if c > avg * 1.2],
+        'weakDays': [d for d, c in enumerate(counts) if c < avg * 0.5 and c > 0],
+    }
+
+
+class _AdherenceConnection:
+    """fetch() for the two load_snapshots() queries"""
+
+    def __init__(self, state_rows: list, workouts: list):
+        self.state_rows, self.workouts = state_rows, workouts
+
+    async def fetch(self, query, user_ids):
+        if 'JOIN user_adherence' in query:
+            last_ids = {r['user_id']: r['last_workout_id'] for r in self.state_rows}
+            return [w for w in self.workouts
+                    if w['user_id'] in user_ids and w['id'] > last_ids.get(w['user_id'], float('inf'))]
+        return [r for r in self.state_rows if r['user_id'] in user_ids]
+
+
+class TestPrecomputedAdherence:
+    """The worker and the on-demand path read the same user_adherence state"""
+
+    def _history(self, rng, user_id):
+        # mostly a few fixed weekdays, plus the odd extra day
+        weekdays = rng.sample(range(7), rng.randint(1, 5))
+        days = {d for d in range(70) if (NOW - timedelta(days=d)).weekday() in weekdays and rng.random() < 0.95}
+        days |= set(rng.sample(range(70), rng.randint(0, 3)))
+        return [{'id': 0, 'user_id': user_id, 'completed_at': (NOW - timedelta(days=d)).replace(
+                 hour=rng.randint(0, 23), tzinfo=None)} for d in days]
+
+    def test_matches_get_adherence_patterns(self):
+        rng = random.Random(39)
+        workouts = [w for user_id in range(1, 41) for w in self._history(rng, user_id)]
+        rng.shuffle(workouts)
+        for i, w in enumerate(workouts, start=1):
+            w['id'] = i
+        # the state was written before the last third of the rows (old and new days) was logged
+        cut = len(workouts) * 2 // 3
+        states = backfill_states(pd.DataFrame(workouts[:cut]))
+        state_rows = [dict(zip(STATE_COLUMNS, s.record(user_id, None))) for user_id, s in states.items()]
+        snapshots = asyncio.run(load_snapshots(_AdherenceConnection(state_rows, workouts), list(range(1, 41))))
+        assert set(snapshots) == set(states)
+
+        user = {'id': 0, 'goal': None, 'fitness_level': None, 'coaching_style': None,
+                'training_days_per_week': None, 'injuries': None}
+        window_start = (NOW - timedelta(days=30)).replace(tzinfo=None)
+        for row in state_rows:
+            user_id = row['user_id']
+            mine = [w for w in workouts if w['user_id'] == user_id]
+            newer = [w['completed_at'] for w in mine if w['id'] > row['last_workout_id']]
+            recent = [w for w in mine if w['completed_at'] >= window_start]
+            patterns = build_summary(user, recent, NOW, snapshots[user_id])['adherencePatterns']
+            expected = _ts_adherence_patterns(row, newer, NOW)
+            assert {k: patterns[k] for k in expected} == expected, user_id
+
+    def test_without_state_walks_workouts(self):
+        user = {'id': 1, 'goal': None, 'fitness_level': None, 'coaching_style': None,
+                'training_days_per_week': None, 'injuries': None}
+        workouts = _workouts(0, 1, 2)
+        assert build_summary(user, workouts, NOW)['adherencePatterns'] == calculate_adherence_patterns(workouts, NOW)
+        assert asyncio.run(load_snapshots(_AdherenceConnection([], workouts), [1])) == {}
+
+
+class TestBatching:
+    def test_batches(self):
+        assert batches(list(range(7)), 3) == [[0, 1, 2], [3, 4, 5], [6]]
+
+
+class TestStore:
+    """coach_memory write"""
+
+    def test_summary_rows_are_written(self):
+        conn = FakeConnection({'coach_memory': {
+            'user_id': 'integer', 'kind': 'text', 'summary': 'text', 'data': 'jsonb',
+            'refreshed_at': 'timestamp', 'created_at': 'timestamp'}})
+        asyncio.run(register_json_codecs(conn))
+        user = {'id': 7, 'goal': 'strength', 'fitness_level': 'advanced', 'coaching_style': None,
+                'training_days_per_week': 4, 'injuries': None}
+        summary = build_summary(user, _workouts(0, 1), NOW)
+        refreshed_at = NOW.replace(tzinfo=None)
+        asyncio.run(store_summaries(conn, [7], [(7, 'summary', summary_text(summary), summary,
+                                                 refreshed_at, refreshed_at)]))
+        assert conn.statements[0].startswith("DELETE FROM coach_memory WHERE kind = 'summary'")
+        assert [row['data'] for row in conn.rows['coach_memory']] == [summary]
+        assert list(conn.rows['coach_memory'][0]) == SUMMARY_COLUMNS
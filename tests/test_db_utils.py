@@ -0,0 +1,86 @@
+"""
+Test suite for the shared database helpers (scripts/db_utils.py).
+
+Tests:
+1. json/jsonb codecs are binary and round-trip Python objects
+2. copy_upsert writes jsonb columns through binary COPY (a text codec fails)
+3. Live: copy_upsert into a jsonb table (needs DATABASE_URL and asyncpg)
+
+Run: pytest tests/test_db_utils.py -v
+"""
+import os
+import sys
+import json
+import asyncio
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from db_utils import copy_upsert, register_json_codecs
+from pg_fakes import FakeConnection, FakeInterfaceError
+
+TABLES = {'exercise_stats': {'user_id': 'integer', 'exercise_id': 'text', 'history': 'jsonb', 'meta': 'json'}}
+RECORDS = [(1, 'squat', [{'weight': 100, 'reps': 5}], {'source': 'engine'}),
+           (2, 'bench', {'best': {'weight': 80.5}}, None)]
+
+
+class TestCodecs:
+    """Codec registration"""
+
+    def test_binary_round_trip(self):
+        conn = FakeConnection(TABLES)
+        asyncio.run(register_json_codecs(conn))
+        assert {name: c['format'] for name, c in conn.codecs.items()} == {'jsonb': 'binary', 'json': 'binary'}
+        jsonb = conn.codecs['jsonb']
+        assert jsonb['encoder']({'a': [1, 2]}) == b'\x01{"a": [1, 2]}'
+        assert jsonb['decoder'](b'\x01{"a": [1, 2]}') == {'a': [1, 2]}
+        assert conn.codecs['json']['decoder'](conn.codecs['json']['encoder']([1, 'x'])) == [1, 'x']
+
+
+class TestCopyUpsert:
+    """Binary COPY into jsonb columns"""
+
+    def test_writes_jsonb(self):
+        conn = FakeConnection(TABLES)
+        asyncio.run(register_json_codecs(conn))
+        written = asyncio.run(copy_upsert(conn, 'exercise_stats', list(TABLES['exercise_stats']), RECORDS,
+                                          conflict=['user_id', 'exercise_id']))
+        assert written == 2
+        assert [row['history'] for row in conn.rows['exercise_stats']] == [r[2] for r in RECORDS]
+        assert conn.statements[-1].endswith(
+            'ON CONFLICT (user_id, exercise_id) DO UPDATE SET history = EXCLUDED.history, meta = EXCLUDED.meta')
+
+    def test_text_codec_cannot_copy(self):
+        conn = FakeConnection(TABLES)
+        asyncio.run(conn.set_type_codec('jsonb', encoder=json.dumps, decoder=json.loads, schema='pg_catalog'))
+        with pytest.raises(FakeInterfaceError, match='no binary format encoder for type jsonb'):
+            asyncio.run(copy_upsert(conn, 'exercise_stats', list(TABLES['exercise_stats']), RECORDS,
+                                    conflict=['user_id', 'exercise_id']))
+
+
+@pytest.mark.skipif(not os.environ.get('DATABASE_URL'), reason='live COPY needs DATABASE_URL')
+class TestLiveCopy:
+    """Against Postgres"""
+
+    def test_copy_upsert_jsonb(self):
+        pytest.importorskip('asyncpg')
+        from db_utils import connect
+
+        async def run():
+            conn = await connect()
+            try:
+                await conn.execute("""
+                    CREATE TEMP TABLE db_utils_copy_test (
+                        user_id INTEGER, exercise_id TEXT, history JSONB, meta JSON,
+                        PRIMARY KEY (user_id, exercise_id)
+                    )
+                """)
+                columns = list(TABLES['exercise_stats'])
+                await copy_upsert(conn, 'db_utils_copy_test', columns, RECORDS, conflict=['user_id', 'exercise_id'])
+                rows = await conn.fetch("SELECT history, meta FROM db_utils_copy_test ORDER BY user_id")
+                return [(r['history'], r['meta']) for r in rows]
+            finally:
+                await conn.close()
+
+        assert asyncio.run(run()) == [(r[2], r[3]) for r in RECORDS]
@@ -0,0 +1,101 @@
+"""
+Test suite for the near-duplicate exercise clustering job (scripts/cluster_exercise_duplicates.py).
+
+Tests:
+1. Name tokenization - word order, plurals, abbreviations
+2. MinHash/LSH clustering groups known variants and leaves distinct movements alone
+   (variants that differ in a modifier such as incline or seated, or in the
+   implement, stay apart; "single" and "one" are the same modifier)
+3. LSH compares far fewer pairs than all-pairs on a larger catalog
+
+Run: pytest tests/test_exercise_duplicate_clustering.py -v
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from cluster_exercise_duplicates import choose_bands, find_near_duplicates, jaccard, shingles, tokenize
+
+
+class TestTokenize:
+    """Names are reduced to comparable tokens"""
+
+    def test_word_order_ignored(self):
+        assert shingles('Incline Dumbbell Press') == shingles('Dumbbell Incline Press')
+
+    def test_plurals_and_abbreviations(self):
+        assert tokenize('Push-Ups') == tokenize('Pushup') == ['push', 'up']
+        assert tokenize('DB Bench Presses') == ['dumbbell', 'bench', 'press']
+        assert tokenize('Single Arm Row') == tokenize('One Arm Row') == ['one', 'arm', 'row']
+
+    def test_stopwords_removed(self):
+        assert tokenize('Row with the Band') == ['row', 'band']
+
+
+class TestClustering:
+    """Near-duplicates are grouped into merge candidates"""
+
+    CATALOG = [
+        {'id': 1, 'name': 'Dumbbell Incline Bench Press', 'video_url': None},
+        {'id': 2, 'name': 'Incline Dumbbell Press', 'video_url': 'https://res.cloudinary.com/x/incline.mp4'},
+        {'id': 3, 'name': 'DB Incline Press', 'video_url': None},
+        {'id': 4, 'name': 'Barbell Back Squat', 'video_url': None},
+        {'id': 5, 'name': 'Romanian Deadlift', 'video_url': None},
+    ]
+
+    def test_variants_cluster_together(self):
+        result = find_near_duplicates(self.CATALOG, threshold=0.6)
+        assert len(result['clusters']) == 1
+        cluster = result['clusters'][0]
+        ids = {cluster['keep']['id']} | {m['id'] for m in cluster['merge']}
+        assert ids == {1, 2, 3}
+
+    def test_keeper_prefers_exercise_with_video(self):
+        cluster = find_near_duplicates(self.CATALOG, threshold=0.6)['clusters'][0]
+        assert cluster['keep']['id'] == 2
+
+    def test_high_threshold_keeps_them_apart(self):
+        result = find_near_duplicates(self.CATALOG, threshold=0.95)
+        assert [c['keep']['id'] for c in result['clusters']] == [2]
+        assert {m['id'] for m in result['clusters'][0]['merge']} == {3}
+
+    def test_modifiers_block_merges(self):
+        catalog = [{'id': i, 'name': name} for i, name in enumerate([
+            'Dumbbell Bench Press', 'Incline Dumbbell Bench Press', 'Decline Dumbbell Bench Press',
+            'Dumbbell Incline Press', 'Seated Cable Row', 'Standing Cable Row', 'Cable Row',
+        ], 1)]
+        result = find_near_duplicates(catalog)
+        clusters = [{c['keep']['id']} | {m['id'] for m in c['merge']} for c in result['clusters']]
+        assert clusters == [{2, 4}]
+
+    def test_implements_block_merges(self):
+        catalog = [{'id': i, 'name': name} for i, name in enumerate([
+            'Bench Press', 'Dumbbell Bench Press', 'Lat Pulldown', 'Cable Lat Pulldown',
+            'One Arm Row', 'Single Arm Row',
+        ], 1)]
+        result = find_near_duplicates(catalog, threshold=0.6)
+        clusters = [{c['keep']['id']} | {m['id'] for m in c['merge']} for c in result['clusters']]
+        assert clusters == [{5, 6}]
+
+    def test_lsh_prunes_pairs(self):
+        movements = ['Squat', 'Lunge', 'Row', 'Curl', 'Deadlift', 'Press', 'Fly', 'Raise', 'Shrug', 'Crunch']
+        implements = ['Barbell', 'Dumbbell', 'Kettlebell', 'Cable', 'Machine', 'Band', 'Smith', 'Landmine']
+        modifiers = ['Seated', 'Standing', 'Incline', 'Decline', 'Single Arm', 'Pause', 'Tempo']
+        catalog = []
+        for m in movements:
+            for i in implements:
+                for mod in modifiers:
+                    catalog.append({'id': len(catalog) + 1, 'name': f'{mod} {i} {m}'})
+        result = find_near_duplicates(catalog, threshold=0.9)
+        all_pairs = len(catalog) * (len(catalog) - 1) // 2
+        assert result['candidate_pairs'] < all_pairs / 10
+        assert result['clusters'] == []
+
+    def test_choose_bands(self):
+        bands, rows = choose_bands(0.6)
+        assert bands * rows == 128
+        assert (1 / bands) ** (1 / rows) <= 0.6
+
+    def test_jaccard(self):
+        assert jaccard({'a', 'b'}, {'b', 'c'}) == 1 / 3
@@ -0,0 +1,81 @@
+"""
+Test suite for the offline exercise name index (scripts/build_exercise_name_index.py).
+
+Tests:
+1. Canonical names and catalog aliases resolve with exact, case-insensitive keys
+2. No approximate matches (word order / missing words do not resolve)
+3. Collision handling - names beat aliases, ambiguous aliases are dropped
+
+Run: pytest tests/test_exercise_name_index.py -v
+"""
+import os
+import sys
+import json
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from build_exercise_name_index import build_index, normalize_key, resolve, serialize_index
+
+CATALOG = [
+    {'id': 1, 'name': 'Inverted Row', 'aliases': ['bodyweight row', 'australian pull-up', 'ring row']},
+    {'id': 2, 'name': 'Dumbbell Incline Bench Press', 'aliases': []},
+    {'id': 3, 'name': 'Barbell Bench Press', 'aliases': json.dumps(['bench press', 'flat bench'])},
+    {'id': 4, 'name': 'Seated Cable Row', 'aliases': ['cable row', 'row machine']},
+    {'id': 5, 'name': 'Machine Row', 'aliases': ['row machine']},
+    {'id': 6, 'name': 'Ring Row', 'aliases': None},
+]
+
+
+class TestExactResolution:
+    """Names and aliases resolve exactly"""
+
+    def test_canonical_name_case_insensitive(self):
+        keys = build_index(CATALOG)['keys']
+        assert resolve(keys, ['barbell bench press', '  BARBELL   Bench press ']) == [3, 3]
+
+    def test_alias_resolves_to_exercise(self):
+        keys = build_index(CATALOG)['keys']
+        assert resolve(keys, ['Australian Pull-Up']) == [1]
+        assert resolve(keys, ['Flat Bench']) == [3]
+
+    def test_no_fuzzy_match_incline_dumbbell_press(self):
+        """'Incline Dumbbell Press' must NOT resolve to 'Dumbbell Incline Bench Press'"""
+        keys = build_index(CATALOG)['keys']
+        assert resolve(keys, ['Incline Dumbbell Press', 'Fake Exercise Name']) == [None, None]
+
+    def test_normalize_key(self):
+        assert normalize_key('  Lat\tPulldown ') == 'lat pulldown'
+        assert normalize_key('') == ''
+
+
+class TestCollisions:
+    """Collision rules are deterministic and reported"""
+
+    def test_name_beats_alias(self):
+        index = build_index(CATALOG)
+        assert index['keys']['ring row'] == 6
+        kinds = {c['key']: c['kind'] for c in index['collisions']}
+        assert kinds['ring row'] == 'alias_shadowed_by_name'
+
+    def test_ambiguous_alias_is_dropped(self):
+        index = build_index(CATALOG)
+        assert 'row machine' not in index['keys']
+        collision = next(c for c in index['collisions'] if c['key'] == 'row machine')
+        assert collision['kind'] == 'ambiguous_alias'
+        assert collision['ids'] == [4, 5]
+
+    def test_duplicate_names_lowest_id_wins(self):
+        index = build_index([
+            {'id': 9, 'name': 'Plank'},
+            {'id': 7, 'name': 'plank'},
+        ])
+        assert index['keys']['plank'] == 7
+        assert index['collisions'][0]['kind'] == 'duplicate_name'
+
+    def test_artifact_is_compact_json(self):
+        payload = serialize_index(build_index(CATALOG), len(CATALOG))
+        artifact = json.loads(payload)
+        assert artifact['version'] == 1
+        assert artifact['exerciseCount'] == len(CATALOG)
+        assert list(artifact['keys']) == sorted(artifact['keys'])
+        assert '": ' not in payload and '", "' not in payload
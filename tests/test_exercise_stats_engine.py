@@ -0,0 +1,174 @@
+"""
+Test suite for the vectorized exercise stats engine (scripts/exercise_stats_engine.py).
+
+The engine must return exactly what GET /api/stats/exercise/:exerciseId returns.
+These tests compare it against a row-by-row port of the route handler in
+server/routes.ts over randomized performance logs.
+
+Run: pytest tests/test_exercise_stats_engine.py -v
+"""
+import os
+import sys
+import math
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pd = pytest.importorskip('pandas')
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from exercise_stats_engine import LOG_COLUMNS, compute_exercise_stats, exercise_stats_payload
+
+
+def _one_rm(weight, reps):
+    if reps == 1:
+        return weight
+    if reps <= 0 or weight <= 0:
+        return 0
+    return weight * (1 + reps / 30)
+
+
+def _js_round(x):
+    return math.floor(x + 0.5)
+
+
+def _iso(dt):
+    return dt.strftime('%Y-%m-%dT%H:%M:%S.') + f"{dt.microsecond // 1000:03d}Z"
+
+
+def route_handler(logs, user_id, exercise_id):
+    """Port of the /api/stats/exercise/:exerciseId handler loop"""
+    history_rows = sorted(
+        [l for l in logs if l['user_id'] == user_id and l['exercise_id'] == exercise_id],
+        key=lambda l: (l['logged_at'], l['id']), reverse=True,
+    )[:500]
+    if not history_rows:
+        return {'ok': True, 'exerciseId': exercise_id, 'name': 'Unknown', 'history': [],
+                'pbs': None, 'lastSession': None, 'trend': 'neutral'}
+
+    max_weight = max_reps = max_volume = 0
+    best_set = best_volume_set = None
+    by_date, sessions = {}, {}
+    for log in history_rows:
+        weight = log['actual_weight'] or 0
+        reps = log['actual_reps'] or 0
+        volume = weight * reps
+        date_key = log['logged_at'].strftime('%Y-%m-%d')
+        workout_id = log['workout_id'] or date_key
+        if weight > max_weight:
+            max_weight, best_set = weight, log
+        if reps > max_reps:
+            max_reps = reps
+        if volume > max_volume:
+            max_volume, best_volume_set = volume, log
+        e1rm = _one_rm(weight, reps) if weight > 0 and reps > 0 else 0
+        day = by_date.get(date_key)
+        if day:
+            day['maxWeight'] = max(day['maxWeight'], weight)
+            day['totalReps'] += reps
+            day['totalSets'] += 1
+            day['totalVolume'] += volume
+            day['estimatedOneRM'] = max(day['estimatedOneRM'], e1rm)
+            day['sets'].append({'weight': weight, 'reps': reps, 'volume': volume})
+        else:
+            by_date[date_key] = {'date': date_key, 'maxWeight': weight, 'totalReps': reps, 'totalSets': 1,
+                                 'totalVolume': volume, 'estimatedOneRM': e1rm,
+                                 'sets': [{'weight': weight, 'reps': reps, 'volume': volume}]}
+        s = {'weight': weight, 'reps': reps, 'volume': volume}
+        if log['rpe']:
+            s['rpe'] = log['rpe']
+        if workout_id in sessions:
+            sessions[workout_id]['sets'].append({'setNumber': len(sessions[workout_id]['sets']) + 1, **s})
+        else:
+            sessions[workout_id] = {'workoutId': workout_id, 'date': date_key, 'sets': [{'setNumber': 1, **s}]}
+
+    all_history = sorted(by_date.values(), key=lambda h: h['date'])
+    last_session = sorted(sessions.values(), key=lambda x: x['date'], reverse=True)[0]
+    one_rm = _one_rm(best_set['actual_weight'], best_set['actual_reps']) \
+        if best_set and best_set['actual_weight'] and best_set['actual_reps'] else 0
+
+    trend = 'neutral'
+    if len(all_history) >= 4:
+        recent = sum(h['maxWeight'] for h in all_history[-2:]) / 2
+        older = sum(h['maxWeight'] for h in all_history[-4:-2]) / 2
+        if recent > older * 1.05:
+            trend = 'up'
+        elif recent < older * 0.95:
+            trend = 'down'
+
+    return {
+        'ok': True,
+        'exerciseId': exercise_id,
+        'name': history_rows[0]['exercise_name'],
+        'history': all_history[-5:],
+        'pbs': {
+            'maxWeight': max_weight,
+            'maxReps': max_reps,
+            'maxVolume': max_volume,
+            'estimatedOneRM': _js_round(one_rm),
+            'estimated3RM': _js_round(one_rm * 0.93),
+            'estimated5RM': _js_round(one_rm * 0.87),
+            'estimated10RM': _js_round(one_rm * 0.75),
+            'bestWeightSet': {'weight': best_set['actual_weight'], 'reps': best_set['actual_reps'],
+                              'date': _iso(best_set['logged_at'])} if best_set else None,
+            'bestVolumeSet': {'weight': best_volume_set['actual_weight'], 'reps': best_volume_set['actual_reps'],
+                              'volume': (best_volume_set['actual_weight'] or 0) * (best_volume_set['actual_reps'] or 0),
+                              'date': _iso(best_volume_set['logged_at'])} if best_volume_set else None,
+        },
+        'lastSession': last_session,
+        'trend': trend,
+        'totalSessions': len(all_history),
+    }
+
+
+def _random_logs(seed, users=4, exercises=5, rows=600):
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    logs = []
+    for i in range(rows):
+        logs.append({
+            'id': i + 1,
+            'user_id': rng.randint(1, users),
+            'workout_id': f"w{rng.randint(1, 40)}",
+            'exercise_id': f"ex-{rng.randint(1, exercises)}",
+            'exercise_name': 'Exercise',
+            'actual_weight': rng.choice([None, 0, 20, 40, 60, 80, 100, 102, 105]),
+            'actual_reps': rng.choice([None, 0, 1, 5, 8, 10, 12]),
+            'rpe': rng.choice([None, 0, 6, 7, 8, 9]),
+            'logged_at': start + timedelta(hours=rng.randint(0, 24 * 60), milliseconds=rng.randint(0, 999)),
+        })
+    return logs
+
+
+class TestStatsEngineParity:
+    """Vectorized results match the route handler exactly"""
+
+    @pytest.mark.parametrize('seed', [1, 2, 3])
+    def test_matches_route_handler(self, seed):
+        logs = _random_logs(seed)
+        stats = compute_exercise_stats(pd.DataFrame(logs, columns=LOG_COLUMNS))
+        pairs = {(l['user_id'], l['exercise_id']) for l in logs}
+        assert len(stats) == len(pairs)
+        for user_id, exercise_id in sorted(pairs):
+            assert exercise_stats_payload(stats, user_id, exercise_id) == route_handler(logs, user_id, exercise_id)
+
+    def test_history_limit_applies_per_pair(self):
+        logs = _random_logs(4, users=1, exercises=1, rows=80)
+        stats = compute_exercise_stats(pd.DataFrame(logs, columns=LOG_COLUMNS), history_limit=10)
+        newest = sorted(logs, key=lambda l: (l['logged_at'], l['id']), reverse=True)[:10]
+        assert stats.iloc[0]['max_reps'] == max(l['actual_reps'] or 0 for l in newest)
+
+    def test_unknown_exercise(self):
+        stats = compute_exercise_stats(pd.DataFrame(_random_logs(5), columns=LOG_COLUMNS))
+        payload = exercise_stats_payload(stats, 1, 'does-not-exist')
+        assert payload['name'] == 'Unknown' and payload['pbs'] is None
+
+    def test_all_zero_weights_have_no_best_set(self):
+        logs = [{'id': 1, 'user_id': 1, 'workout_id': 'w1', 'exercise_id': 'plank', 'exercise_name': 'Plank',
+                 'actual_weight': 0, 'actual_reps': 0, 'rpe': None,
+                 'logged_at': datetime(2025, 3, 1, tzinfo=timezone.utc)}]
+        payload = exercise_stats_payload(compute_exercise_stats(pd.DataFrame(logs, columns=LOG_COLUMNS)), 1, 'plank')
+        assert payload == route_handler(logs, 1, 'plank')
+        assert payload['pbs']['bestWeightSet'] is None
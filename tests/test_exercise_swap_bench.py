@@ -0,0 +1,72 @@
+"""
+Test suite for the exercise swap benchmark (scripts/bench_exercise_swap.py).
+
+Tests:
+1. Corpus covers exercises x injuries x equipment with the app's swap reasons
+2. Fallback path inferred from the canned fallback responses
+3. Summary: fallback and retry rates, LLM calls and hidden SDK retries
+
+Run: pytest tests/test_exercise_swap_bench.py -v
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from bench_exercise_swap import EQUIPMENT, EXERCISES, INJURIES, build_corpus, infer_path, summarize
+
+
+def _result(latency, path='llm', attempts=1, ok=True):
+    return {'ok': ok, 'latency_ms': latency, 'path': path if ok else None, 'attempts': attempts if ok else None,
+            'error': None if ok else 'HTTP 500'}
+
+
+class TestCorpus:
+    """Swap requests"""
+
+    def test_grid_and_reasons(self):
+        corpus = build_corpus()
+        assert len(corpus) == len(EXERCISES) * len(INJURIES) * len(EQUIPMENT)
+        reasons = {(c['injury'], c['equipment']): p['reason'] for c, p in corpus}
+        assert reasons[('knee', 'dumbbells')] == 'injury'
+        assert reasons[('none', 'bodyweight')] == 'equipment'
+        assert {p['reason'] for c, p in corpus if c['injury'] == 'none' and c['equipment'] == 'gym'} \
+            == {'too-hard', 'too-easy', 'prefer'}
+        cell, payload = next((c, p) for c, p in corpus if c['injury'] == 'knee' and c['equipment'] == 'dumbbells')
+        assert payload['additionalNotes'] == 'Left knee pain (meniscus). Only have dumbbells right now'
+        assert payload['exerciseCategory'] == payload['currentExercise']['category']
+        assert len(build_corpus(repeat=2)) == 2 * len(corpus)
+
+
+class TestInferPath:
+    """Response shapes of the three branches"""
+
+    def test_paths(self):
+        fallback = {'recommended': {'id': 'alt-0', 'name': 'Modified Pull-Up'},
+                    'alternatives': [{'id': 'alt-1', 'name': 'Bodyweight Alternative'}]}
+        safe = {'recommended': {'id': 'safe-0', 'name': 'Leg Press'}, 'alternatives': []}
+        llm = {'recommended': {'id': 'alt-0', 'name': 'Goblet Squat'},
+               'alternatives': [{'id': 'leg-press', 'name': 'Leg Press'}]}
+        assert infer_path(fallback) == 'fallback'
+        assert infer_path(safe) == 'injury_fallback'
+        assert infer_path(llm) == 'llm'
+
+
+class TestSummarize:
+    """Per-scenario report"""
+
+    def test_rates_and_sdk_retries(self):
+        results = [_result(1000), _result(1200), _result(2500, attempts=2),
+                   _result(9000, path='fallback', attempts=2), _result(None, ok=False)]
+        summary = summarize(results, 10.0, llm_calls=11)
+        assert summary['swaps'] == 5 and summary['failed'] == 1
+        assert summary['paths'] == {'llm': 3, 'fallback': 1, 'injury_fallback': 0}
+        assert summary['fallbackRate'] == 0.25 and summary['retryRate'] == 0.5
+        assert summary['latency']['max'] == 9000
+        assert summary['llmCallsPerSwap'] == 2.2
+        assert summary['sdkRetries'] == 11 - 6
+        assert summary['errors'] == {'HTTP 500': 1}
+
+    def test_without_headers(self):
+        summary = summarize([_result(800, attempts=None)], 1.0)
+        assert summary['retryRate'] is None and 'llmCallsPerSwap' not in summary
@@ -0,0 +1,121 @@
+"""
+Test suite for the local LLM stand-in (scripts/llm_standin.py).
+
+Tests:
+1. Workout prompts get a workout sized like the prompt asks
+2. Swap prompts get alternatives; other prompts get text; usage is reported
+3. HTTP round trip, injected failures, /stats and /config
+
+Run: pytest tests/test_llm_standin.py -v
+"""
+import os
+import sys
+import json
+import random
+import threading
+import urllib.error
+import urllib.request
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from llm_standin import completion, make_server
+from bench_workout_realism_sweep import check_realism, expected_count_range
+
+
+def _prompt(duration, experience):
+    return {'model': 'gpt-4o', 'messages': [
+        {'role': 'system', 'content': 'You are an expert personal trainer.'},
+        {'role': 'user', 'content': f"Session duration: {duration} minutes\n"
+                                    f"FOR THIS {duration}-MIN {experience.upper()} WORKOUT:\nMaximum exercises: 6"},
+    ]}
+
+
+def _post(url, body):
+    request = urllib.request.Request(url, data=json.dumps(body).encode(),
+                                     headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return response.status, json.loads(response.read())
+
+
+class TestReplies:
+    """Completion content"""
+
+    def test_workout_reply_fits_prompt(self):
+        rng = random.Random(3)
+        for experience in ('beginner', 'intermediate', 'advanced'):
+            for duration in (30, 45, 60):
+                reply = completion(_prompt(duration, experience), rng)
+                workout = json.loads(reply['choices'][0]['message']['content'])
+                low, high = expected_count_range(experience, duration)
+                assert low <= len(workout['exercises']) <= high
+                # after the server's enrichment (ids) it passes the sweep's realism checks
+                for i, ex in enumerate(workout['exercises']):
+                    ex['id'] = f"exercise-{i}"
+                assert check_realism(workout, experience, duration) == []
+
+    def test_swap_reply_and_invalid(self):
+        body = {'messages': [{'role': 'user', 'content': 'You are a professional fitness coach. A user wants to '
+                                                         'swap an exercise for a better alternative.\n\n'
+                                                         'Current Exercise: Walking Lunge\nSets: 3'}]}
+        reply = json.loads(completion(body, random.Random(2))['choices'][0]['message']['content'])
+        names = [a['name'] for a in reply['alternatives']]
+        assert len(names) == 4 and 'Walking Lunge' not in names
+        assert completion(body, random.Random(2), invalid=True)['choices'][0]['message']['content'] == '{}'
+
+    def test_text_reply_and_usage(self):
+        body = {'messages': [{'role': 'user', 'content': 'How long should I rest between sets?'}]}
+        reply = completion(body, random.Random(1))
+        assert not reply['choices'][0]['message']['content'].startswith('{')
+        usage = reply['usage']
+        assert usage['prompt_tokens'] == len('How long should I rest between sets?') // 4
+        assert usage['total_tokens'] == usage['prompt_tokens'] + usage['completion_tokens']
+
+
+class TestServer:
+    """OpenAI-compatible HTTP surface"""
+
+    def _serve(self, **kwargs):
+        server = make_server(port=0, latency_ms=0, seed=1, **kwargs)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+    def test_round_trip_and_stats(self):
+        server, base = self._serve()
+        try:
+            status, reply = _post(f"{base}/v1/chat/completions", _prompt(45, 'beginner'))
+            assert status == 200 and reply['object'] == 'chat.completion'
+            with urllib.request.urlopen(f"{base}/stats", timeout=10) as response:
+                stats = json.loads(response.read())
+            assert (stats['calls'], stats['failures'], stats['inFlight'], stats['peakInFlight']) == (1, 0, 0, 1)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_injected_failures(self):
+        server, base = self._serve(fail_rate=1.0)
+        try:
+            try:
+                _post(f"{base}/v1/chat/completions", _prompt(30, 'advanced'))
+                assert False, 'expected HTTP 500'
+            except urllib.error.HTTPError as e:
+                assert e.code == 500
+            assert server.stats.snapshot()['failures'] == 1
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_config_switches_injection(self):
+        server, base = self._serve()
+        try:
+            status, config = _post(f"{base}/config", {'failRate': 1, 'ignored': 5})
+            assert status == 200 and config['failRate'] == 1.0 and 'ignored' not in config
+            try:
+                _post(f"{base}/v1/chat/completions", _prompt(30, 'advanced'))
+                assert False, 'expected HTTP 500'
+            except urllib.error.HTTPError as e:
+                assert e.code == 500
+            _post(f"{base}/config", {'failRate': 0})
+            assert _post(f"{base}/v1/chat/completions", _prompt(30, 'advanced'))[0] == 200
+        finally:
+            server.shutdown()
+            server.server_close()
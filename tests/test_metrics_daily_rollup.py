@@ -0,0 +1,238 @@
+"""
+Test suite for the metrics_daily rollup job (scripts/metrics_daily_rollup.py).
+
+Tests:
+1. Daily aggregation of workouts, performance logs and PR events
+2. Recomputing only the touched buckets gives the same rows as a full rebuild
+3. Summary / weekly-trend / focus views over metrics_daily match ports of the
+   route handlers over raw user_workouts rows
+4. Live parity: the views over the user's metrics_daily rows match
+   GET /api/stats/summary, /api/stats/weekly-trend and /api/stats/focus-breakdown
+   (needs REACT_APP_BACKEND_URL, DATABASE_URL, PARITY_EMAIL and PARITY_PASSWORD,
+   and the rollup to have run after the user's last workout)
+
+Run: pytest tests/test_metrics_daily_rollup.py -v
+"""
+import os
+import sys
+import math
+import random
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+pd = pytest.importorskip('pandas')
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from metrics_daily_rollup import (
+    aggregate_daily, focus_breakdown_view, summary_view, weekly_trend_view, week_start,
+)
+
+TODAY = date(2025, 6, 18)  # a Wednesday
+
+
+def _random_sources(seed, users=3, rows=300):
+    rng = random.Random(seed)
+    start = datetime(2025, 3, 1, tzinfo=timezone.utc)
+    span = (datetime(2025, 6, 19, tzinfo=timezone.utc) - start).total_seconds()
+
+    def when():
+        return start + timedelta(seconds=rng.uniform(0, span))
+
+    workouts = [{'id': i + 1, 'user_id': rng.randint(1, users), 'duration': rng.choice([0, 20, 30, 45, 60]),
+                 'completed_at': when()} for i in range(rows // 3)]
+    logs = [{'id': i + 1, 'user_id': rng.randint(1, users), 'actual_weight': rng.choice([None, 0, 20, 55, 100]),
+             'actual_reps': rng.choice([None, 0, 5, 8, 12]), 'rpe': rng.choice([None, 0, 6, 7, 8, 9]),
+             'logged_at': when()} for i in range(rows)]
+    events = [{'id': i + 1, 'user_id': rng.randint(1, users),
+               'event_type': rng.choice(['start', 'set_complete', 'pr_complete', 'pb_hit', 'workout_complete']),
+               'achieved_at': when()} for i in range(rows // 3)]
+    return workouts, logs, events
+
+
+def _frames(workouts, logs, events):
+    return (pd.DataFrame(workouts, columns=['id', 'user_id', 'duration', 'completed_at']),
+            pd.DataFrame(logs, columns=['id', 'user_id', 'actual_weight', 'actual_reps', 'rpe', 'logged_at']),
+            pd.DataFrame(events, columns=['id', 'user_id', 'event_type', 'achieved_at']))
+
+
+def _js_round(x):
+    return math.floor(x + 0.5)
+
+
+def _midnight(day):
+    return datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+
+
+def summary_handler(workouts, today, weekly_goal):
+    """Port of the thisWeek/allTime part of the /api/stats/summary handler"""
+    start_this = _midnight(week_start(today))
+    start_last = start_this - timedelta(days=7)
+    this_week = [w for w in workouts if w['completed_at'] >= start_this]
+    last_week = [w for w in workouts if start_last <= w['completed_at'] < start_this]
+    minutes = sum(w['duration'] or 45 for w in this_week)
+    last_minutes = sum(w['duration'] or 45 for w in last_week)
+    return {
+        'thisWeek': {
+            'workoutsCompleted': len(this_week),
+            'workoutsChange': len(this_week) - len(last_week),
+            'activeMinutes': minutes,
+            'minutesChange': minutes - last_minutes,
+            'caloriesBurned': minutes * 8,
+            'caloriesChange': minutes * 8 - last_minutes * 8,
+            'weeklyGoal': weekly_goal,
+            'goalProgress': _js_round(len(this_week) / weekly_goal * 100),
+        },
+        'allTime': {
+            'totalWorkouts': len(workouts),
+            'totalMinutes': sum(w['duration'] or 45 for w in workouts),
+            'totalCalories': sum((w['duration'] or 45) * 8 for w in workouts),
+        },
+    }
+
+
+def weekly_trend_handler(workouts, today):
+    """Port of the /api/stats/weekly-trend handler"""
+    weeks = []
+    for i in range(11, -1, -1):
+        start = _midnight(week_start(today)) - timedelta(days=7 * i)
+        end = start + timedelta(days=7)
+        week = [w for w in workouts if start <= w['completed_at'] < end]
+        weeks.append({
+            'weekStart': start.strftime('%Y-%m-%d'),
+            'weekLabel': f"{start.month}/{start.day}",
+            'workouts': len(week),
+            'minutes': sum(w['duration'] or 45 for w in week),
+            'volume': len(week) * 15 * 10 * 50,
+        })
+    return {'weeks': weeks}
+
+
+class TestAggregateDaily:
+    """Daily rollup of the three source tables"""
+
+    def test_single_day(self):
+        at = datetime(2025, 6, 2, 18, 30, tzinfo=timezone.utc)
+        daily = aggregate_daily(*_frames(
+            [{'id': 1, 'user_id': 7, 'duration': 0, 'completed_at': at},
+             {'id': 2, 'user_id': 7, 'duration': 30, 'completed_at': at}],
+            [{'id': 1, 'user_id': 7, 'actual_weight': 100, 'actual_reps': 5, 'rpe': 7, 'logged_at': at},
+             {'id': 2, 'user_id': 7, 'actual_weight': 100, 'actual_reps': 5, 'rpe': 8, 'logged_at': at},
+             {'id': 3, 'user_id': 7, 'actual_weight': None, 'actual_reps': 10, 'rpe': None, 'logged_at': at}],
+            [{'id': 1, 'user_id': 7, 'event_type': 'pr_complete', 'achieved_at': at},
+             {'id': 2, 'user_id': 7, 'event_type': 'set_complete', 'achieved_at': at}],
+        ))
+        assert daily.to_dict('records') == [{
+            'user_id': 7, 'date': '2025-06-02', 'workouts_completed': 2, 'total_volume': 1000,
+            'total_duration': 75, 'average_rpe': 8, 'personal_records': 1, 'calories_burned': 600,
+        }]
+
+    def test_logs_only_day_has_no_workouts(self):
+        at = datetime(2025, 6, 3, tzinfo=timezone.utc)
+        daily = aggregate_daily(*_frames(
+            [], [{'id': 1, 'user_id': 1, 'actual_weight': 20, 'actual_reps': 10, 'rpe': 0, 'logged_at': at}], []))
+        row = daily.to_dict('records')[0]
+        assert row['workouts_completed'] == 0 and row['total_volume'] == 200
+        assert row['average_rpe'] is None and row['calories_burned'] == 0
+
+    def test_empty_sources(self):
+        assert aggregate_daily(*_frames([], [], [])).empty
+
+    @pytest.mark.parametrize('seed', [1, 2])
+    def test_incremental_matches_full_rebuild(self, seed):
+        """Recomputing buckets touched after a watermark reproduces a full rebuild"""
+        workouts, logs, events = _random_sources(seed)
+        full = aggregate_daily(*_frames(workouts, logs, events))
+
+        watermark = {'w': len(workouts) // 2, 'l': len(logs) // 2, 'e': len(events) // 2}
+        first = aggregate_daily(*_frames(workouts[:watermark['w']], logs[:watermark['l']], events[:watermark['e']]))
+
+        def day(row, column):
+            return (row['user_id'], row[column].strftime('%Y-%m-%d'))
+
+        touched = ({day(r, 'completed_at') for r in workouts[watermark['w']:]}
+                   | {day(r, 'logged_at') for r in logs[watermark['l']:]}
+                   | {day(r, 'achieved_at') for r in events[watermark['e']:]})
+        second = aggregate_daily(*_frames(
+            [r for r in workouts if day(r, 'completed_at') in touched],
+            [r for r in logs if day(r, 'logged_at') in touched],
+            [r for r in events if day(r, 'achieved_at') in touched],
+        ))
+
+        merged = {(r['user_id'], r['date']): r for r in first.to_dict('records')}
+        merged.update({(r['user_id'], r['date']): r for r in second.to_dict('records')})
+        assert merged == {(r['user_id'], r['date']): r for r in full.to_dict('records')}
+
+
+class TestEndpointViews:
+    """Views over metrics_daily match the route handlers over raw rows"""
+
+    @pytest.mark.parametrize('seed', [3, 4, 5])
+    def test_summary_and_trend(self, seed):
+        workouts, logs, events = _random_sources(seed)
+        daily = aggregate_daily(*_frames(workouts, logs, events))
+        for user_id in sorted({w['user_id'] for w in workouts}):
+            mine = [w for w in workouts if w['user_id'] == user_id]
+            rows = daily[daily['user_id'] == user_id]
+            assert summary_view(rows, TODAY, 4) == summary_handler(mine, TODAY, 4)
+            assert weekly_trend_view(rows, TODAY) == weekly_trend_handler(mine, TODAY)
+
+    def test_week_starts_on_sunday(self):
+        assert week_start(date(2025, 6, 15)) == date(2025, 6, 15)
+        assert week_start(date(2025, 6, 21)) == date(2025, 6, 15)
+
+    def test_focus_breakdown(self):
+        rows = [{'date': '2025-06-01', 'workouts_completed': 2}, {'date': '2025-06-02', 'workouts_completed': 1}]
+        assert focus_breakdown_view(rows) == [{'category': 'Full Body', 'sessions': 3, 'percentage': 100}]
+        assert [b['percentage'] for b in focus_breakdown_view([])] == [25, 25, 25, 25]
+
+
+LIVE_ENV = ('REACT_APP_BACKEND_URL', 'DATABASE_URL', 'PARITY_EMAIL', 'PARITY_PASSWORD')
+
+
+@pytest.mark.skipif(not all(os.environ.get(k) for k in LIVE_ENV),
+                    reason=f"live parity needs {', '.join(LIVE_ENV)}")
+class TestLiveEndpointParity:
+    """metrics_daily (after a rollup run) agrees with the live stats endpoints"""
+
+    @pytest.fixture(scope='class')
+    def live(self):
+        requests = pytest.importorskip('requests')
+        asyncpg = pytest.importorskip('asyncpg')
+        base_url = os.environ['REACT_APP_BACKEND_URL'].rstrip('/')
+
+        login = requests.post(f"{base_url}/api/auth/login", json={
+            'email': os.environ['PARITY_EMAIL'], 'password': os.environ['PARITY_PASSWORD'],
+        })
+        assert login.status_code == 200, f"Login failed: {login.text}"
+        data = login.json()
+        headers = {'Authorization': f"Bearer {data.get('accessToken') or data.get('token')}"}
+        user_id = data['user']['id']
+
+        async def fetch_daily():
+            conn = await asyncpg.connect(os.environ['DATABASE_URL'])
+            try:
+                rows = await conn.fetch("SELECT * FROM metrics_daily WHERE user_id = $1", user_id)
+            finally:
+                await conn.close()
+            return [dict(r) for r in rows]
+
+        responses = {
+            name: requests.get(f"{base_url}/api/stats/{name}", headers=headers).json()
+            for name in ('summary', 'weekly-trend', 'focus-breakdown')
+        }
+        return {'daily': asyncio.run(fetch_daily()), 'today': datetime.now(timezone.utc).date(), **responses}
+
+    def test_summary(self, live):
+        summary = live['summary']
+        expected = summary_view(live['daily'], live['today'], summary['thisWeek']['weeklyGoal'])
+        assert summary['thisWeek'] == expected['thisWeek']
+        assert summary['allTime'] == expected['allTime']
+
+    def test_weekly_trend(self, live):
+        assert live['weekly-trend'] == weekly_trend_view(live['daily'], live['today'])
+
+    def test_focus_breakdown(self, live):
+        assert live['focus-breakdown']['breakdown'] == focus_breakdown_view(live['daily'])
@@ -0,0 +1,122 @@
+"""
+Test suite for the weekly muscle volume cube (scripts/muscle_volume_cube.py).
+
+Tests:
+1. ISO week keys, including the Sunday and year boundaries
+2. Sets are credited to every muscle group and once to the '*' body-part total
+3. Recomputing one week from its rows gives the same cells as a full build
+4. Breakdown and heatmap reads
+
+Run: pytest tests/test_muscle_volume_cube.py -v
+"""
+import os
+import sys
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+pd = pytest.importorskip('pandas')
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from muscle_volume_cube import ALL_MUSCLES, breakdown_view, build_cube, iso_week, weekly_heatmap
+
+
+def _set(user_id, performed_at, body_part='chest', muscles=('chest',), sets=1, reps=10, weight=50, duration=None):
+    return {
+        'user_id': user_id, 'performed_at': performed_at, 'body_part': body_part,
+        'muscle_groups': list(muscles) if muscles is not None else None,
+        'sets': sets, 'reps': reps, 'weight': weight, 'duration': duration,
+    }
+
+
+def _cells(cube):
+    return {
+        (r.user_id, r.week, r.muscle_group, r.body_part): (r.sets, r.reps, r.volume, r.duration_seconds)
+        for r in cube.itertuples(index=False)
+    }
+
+
+class TestIsoWeek:
+    """ISO week bucketing"""
+
+    def test_week_keys(self):
+        weeks = iso_week([
+            datetime(2025, 1, 13, 0, 0),    # Monday
+            datetime(2025, 1, 19, 23, 59),  # Sunday, same ISO week
+            datetime(2024, 12, 30, 8, 0),   # belongs to 2025-W01
+            datetime(2021, 1, 3, 8, 0),     # belongs to 2020-W53
+        ])
+        assert weeks['week'].tolist() == ['2025-W03', '2025-W03', '2025-W01', '2020-W53']
+        assert weeks['week_start'].tolist() == ['2025-01-13', '2025-01-13', '2024-12-30', '2020-12-28']
+
+
+class TestBuildCube:
+    """Cube cells"""
+
+    def test_multi_muscle_set_and_totals(self):
+        monday = datetime(2025, 1, 13, 18)
+        cube = build_cube(pd.DataFrame([
+            _set(1, monday, 'Chest', ['Chest', 'triceps'], reps=10, weight=60),
+            _set(1, monday, 'legs', ['quads'], sets=3, reps=5, weight=100, duration=90),
+            _set(1, monday, None, None, reps=0, weight=0, duration=600),
+        ]))
+        cells = _cells(cube)
+        assert cells[(1, '2025-W03', 'chest', 'chest')] == (1, 10, 600.0, 0)
+        assert cells[(1, '2025-W03', 'triceps', 'chest')] == (1, 10, 600.0, 0)
+        assert cells[(1, '2025-W03', ALL_MUSCLES, 'chest')] == (1, 10, 600.0, 0)
+        assert cells[(1, '2025-W03', ALL_MUSCLES, 'legs')] == (3, 15, 1500.0, 90)
+        assert cells[(1, '2025-W03', 'unknown', 'unknown')] == (1, 0, 0.0, 600)
+        totals = cube[cube['muscle_group'] == ALL_MUSCLES]
+        assert totals['sets'].sum() == 5
+
+    def test_week_recompute_matches_full_build(self):
+        rng = random.Random(3)
+        start = datetime(2025, 1, 1)
+        rows = [
+            _set(rng.randint(1, 3), start + timedelta(hours=rng.randint(0, 24 * 60)),
+                 rng.choice(['chest', 'back', 'legs', None]),
+                 rng.choice([['chest'], ['lats', 'biceps'], ['quads', 'glutes'], [], None]),
+                 sets=rng.choice([1, 3]), reps=rng.randint(0, 12), weight=rng.choice([0, 20, 60, None]))
+            for _ in range(300)
+        ]
+        full = _cells(build_cube(pd.DataFrame(rows)))
+        frame = pd.DataFrame(rows)
+        keys = pd.concat([frame['user_id'], iso_week(frame['performed_at'])['week']], axis=1)
+        bucket = (1, keys.loc[keys['user_id'] == 1, 'week'].iloc[0])
+        in_bucket = (keys['user_id'] == bucket[0]) & (keys['week'] == bucket[1])
+        partial = _cells(build_cube(frame[in_bucket.to_numpy()]))
+        assert partial == {k: v for k, v in full.items() if (k[0], k[1]) == bucket}
+
+    def test_empty(self):
+        assert build_cube(pd.DataFrame()).empty
+
+
+class TestReads:
+    """Breakdowns over cube rows"""
+
+    def _cube(self):
+        t = datetime(2025, 1, 13, 18)
+        return build_cube(pd.DataFrame([
+            _set(1, t, 'chest', ['chest', 'triceps'], sets=3),
+            _set(1, t, 'back', ['lats'], sets=1),
+            _set(1, t + timedelta(days=7), 'legs', ['quads'], sets=4),
+        ]))
+
+    def test_body_part_breakdown(self):
+        assert breakdown_view(self._cube()) == [
+            {'body_part': 'legs', 'sets': 4, 'percentage': 50},
+            {'body_part': 'chest', 'sets': 3, 'percentage': 38},
+            {'body_part': 'back', 'sets': 1, 'percentage': 13},
+        ]
+
+    def test_muscle_breakdown_overlaps(self):
+        by_muscle = {r['muscle_group']: r['sets'] for r in breakdown_view(self._cube(), by='muscle_group')}
+        assert by_muscle == {'quads': 4, 'chest': 3, 'triceps': 3, 'lats': 1}
+
+    def test_heatmap(self):
+        assert weekly_heatmap(self._cube()) == {
+            '2025-W03': {'chest': 3, 'lats': 1, 'triceps': 3},
+            '2025-W04': {'quads': 4},
+        }
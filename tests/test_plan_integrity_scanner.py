@@ -0,0 +1,115 @@
+"""
+Test suite for the plan integrity scanner (scripts/plan_integrity_scanner.py).
+
+Tests:
+1. Real-workout rules match workout-validation.ts isRealWorkout()
+2. Effective training days match plan-service.ts getEffectiveTrainingDays()
+3. Per-week rest_only / under_filled / stuck violations
+4. Days still generating count as workouts, not rest
+5. Only plans ensurePlan() would regenerate, judged on all rows, are listed
+
+Run: pytest tests/test_plan_integrity_scanner.py -v
+"""
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from plan_integrity_scanner import (
+    effective_training_days, ensure_ids, ensure_regenerates, evaluate_chunk, is_real_workout, validation_day,
+)
+
+STUCK_BEFORE = datetime(2025, 1, 10, 11, 30)
+FRESH = datetime(2025, 1, 10, 11, 55)
+STALE = datetime(2025, 1, 10, 9, 0)
+
+WORKOUT = {'title': 'Upper Body Strength', 'type': 'Upper Body', 'exercises': [{'name': 'Bench Press'}]}
+REST = {'title': 'Rest Day', 'type': 'rest', 'isRestDay': True, 'exercises': []}
+
+
+def week(user_id, start_day, payloads, status='ready', updated_at=FRESH):
+    return [(user_id, f"2025-01-{start_day + i:02d}", status, p, updated_at) for i, p in enumerate(payloads)]
+
+
+class TestRealWorkout:
+    """isRealWorkout port"""
+
+    def test_workout_and_rest(self):
+        assert is_real_workout(validation_day(WORKOUT))
+        assert not is_real_workout(validation_day(REST))
+
+    def test_rest_words_in_type_or_title(self):
+        assert not is_real_workout(validation_day({**WORKOUT, 'type': 'Active_Recovery'}))
+        assert not is_real_workout(validation_day({**WORKOUT, 'title': 'Recovery Walk'}))
+        assert not is_real_workout(validation_day({**WORKOUT, 'isActivityDay': True}))
+
+    def test_empty_exercises(self):
+        assert not is_real_workout(validation_day({**WORKOUT, 'exercises': []}))
+        # a day still being generated counts
+        assert is_real_workout(validation_day({'type': 'generating', 'exercises': []}))
+        assert not is_real_workout(validation_day(None))
+
+
+class TestEffectiveTrainingDays:
+    """getEffectiveTrainingDays port"""
+
+    def test_capped_by_preferred_days(self):
+        assert effective_training_days(5, '["mon","wed","fri"]') == 3
+        assert effective_training_days(2, '["mon","wed","fri"]') == 2
+        assert effective_training_days(None, None) == 3
+        assert effective_training_days(4, 'not json') == 4
+
+
+class TestEvaluateChunk:
+    """Invariants per user-week"""
+
+    def test_violations(self):
+        users = [(1, 3, None), (2, 3, None), (3, 4, None), (4, 3, None), (5, 2, '["mon","thu"]')]
+        days = (
+            week(1, 6, [WORKOUT, REST, WORKOUT, REST, WORKOUT, REST, REST])        # valid
+            + week(2, 6, [REST] * 7)                                               # rest only
+            + week(3, 6, [WORKOUT, REST, WORKOUT, REST, WORKOUT, REST, REST])      # 3 of 4
+            + week(3, 13, [WORKOUT, WORKOUT, REST, WORKOUT, WORKOUT, REST, REST])  # next week fine
+            + week(5, 6, [WORKOUT, REST, REST, WORKOUT, REST, REST, REST])
+            + week(5, 13, [{'type': 'generating', 'exercises': []}], status='generating', updated_at=STALE)
+        )
+        stats, violations = evaluate_chunk(users, days, STUCK_BEFORE)
+        assert sorted(violations) == [
+            (2, '2025-01-06', 'rest_only', 0, 3, 7),
+            (3, '2025-01-06', 'under_filled', 3, 4, 7),
+            (5, '2025-01-13', 'stuck', 1, 2, 1),
+            (5, '2025-01-13', 'under_filled', 1, 2, 1),
+        ]
+        assert stats['users'] == 5 and stats['users_without_plan'] == 1
+        assert stats['weeks'] == 6 and stats['days'] == len(days)
+
+    def test_fresh_generation_is_not_stuck(self):
+        days = week(1, 6, [WORKOUT] * 3, status='generating', updated_at=FRESH)
+        assert evaluate_chunk([(1, 3, None)], days, STUCK_BEFORE)[1] == []
+
+    def test_generating_week_is_not_rest_only(self):
+        days = (week(1, 6, [WORKOUT, REST, WORKOUT, REST, WORKOUT, REST, REST])
+                + week(1, 13, [None] * 3 + [REST] * 4, status='pending', updated_at=FRESH))
+        assert evaluate_chunk([(1, 3, None)], days, STUCK_BEFORE)[1] == []
+
+
+class TestEnsure:
+    """ensurePlan() validates all of a user's rows together"""
+
+    def test_ensure_regenerates(self):
+        assert ensure_regenerates([], 3)
+        assert ensure_regenerates([('ready', REST)] * 7, 3)
+        assert ensure_regenerates([('ready', WORKOUT)] * 2 + [('ready', REST)] * 5, 3)
+        # an under-filled week is covered by the rest of the plan
+        assert not ensure_regenerates([('ready', WORKOUT)] * 4 + [('ready', REST)] * 10, 3)
+
+    def test_ensure_ids(self):
+        violations = [(7, '2025-01-06', 'stuck', 3, 3, 7), (4, '2025-01-06', 'rest_only', 0, 3, 7),
+                      (4, '2025-01-13', 'under_filled', 1, 3, 7), (9, '2025-01-13', 'under_filled', 2, 3, 7)]
+        plans = {
+            4: [('ready', WORKOUT)] + [('ready', REST)] * 13,
+            7: [('ready', REST)] * 7,
+            9: [('ready', WORKOUT)] * 5 + [('ready', REST)] * 9,
+        }
+        assert ensure_ids(violations, plans) == [4]
@@ -0,0 +1,75 @@
+"""
+Test suite for the plan pre-generation scheduler (scripts/plan_pregeneration_scheduler.py).
+
+Tests:
+1. Week boundaries match week-generator.ts (Monday-Sunday)
+2. Expected next app open from the user's usual training hour and weekdays
+3. Only plans ending within the lead time are queued, for the following week
+4. Token-bucket rate limit
+
+Run: pytest tests/test_plan_pregeneration_scheduler.py -v
+"""
+import os
+import sys
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from plan_pregeneration_scheduler import RateLimiter, expected_next_open, plan_jobs, week_start
+
+# Friday 2025-01-10 12:00 UTC
+NOW = datetime(2025, 1, 10, 12, 0)
+
+
+class TestExpectedOpen:
+    """Priority key"""
+
+    def test_week_start(self):
+        assert week_start(date(2025, 1, 12)) == date(2025, 1, 6)   # Sunday -> Monday before
+        assert week_start(date(2025, 1, 6)) == date(2025, 1, 6)
+
+    def test_usual_hour_on_usual_weekday(self):
+        # trains Monday and Wednesday evenings at 18:00, once at 07:00
+        events = [datetime(2024, 12, 30, 18, 5), datetime(2025, 1, 1, 18, 40), datetime(2025, 1, 6, 18, 15),
+                  datetime(2025, 1, 8, 7, 30)]
+        assert expected_next_open(events, NOW, NOW) == datetime(2025, 1, 13, 18)
+
+    def test_later_today(self):
+        events = [datetime(2025, 1, 3, 19, 0), datetime(2025, 1, 9, 19, 30)]   # Fridays and a Thursday
+        assert expected_next_open(events, NOW, NOW) == datetime(2025, 1, 10, 19)
+
+    def test_no_history_uses_fallback(self):
+        fallback = datetime(2025, 1, 13)
+        assert expected_next_open([], NOW, fallback) == fallback
+
+
+class TestPlanJobs:
+    """Candidates"""
+
+    def test_only_plans_ending_within_lead(self):
+        users = [
+            (1, date(2024, 12, 30), date(2025, 1, 12)),    # ends Sunday: expires in 2.5 days
+            (2, date(2024, 12, 30), date(2025, 1, 19)),    # next week already planned
+            (3, None, None),                                # no plan yet
+            (4, date(2024, 12, 16), date(2025, 1, 10)),    # ends today
+        ]
+        events = {1: [datetime(2025, 1, 6, 7, 0)]}
+        jobs = plan_jobs(users, events, NOW, timedelta(hours=72))
+        assert jobs == [
+            (1, '2025-01-13', 3, datetime(2025, 1, 13, 7)),
+            # no history: expected when the plan runs out (midnight after the last day)
+            (4, '2025-01-06', 4, datetime(2025, 1, 11)),
+        ]
+        assert plan_jobs(users, events, NOW, timedelta(hours=24)) == [jobs[1]]
+
+
+class TestRateLimiter:
+    """Token bucket"""
+
+    def test_spreads_starts(self):
+        clock = [0.0]
+        limiter = RateLimiter(per_minute=30, burst=2, clock=lambda: clock[0])
+        # burst of two, then one every 2 seconds
+        assert [limiter.reserve() for _ in range(4)] == [0.0, 0.0, 2.0, 4.0]
+        clock[0] = 10.0   # long idle refills to the burst size only
+        assert [limiter.reserve() for _ in range(3)] == [0.0, 0.0, 2.0]
@@ -0,0 +1,139 @@
+"""
+Test suite for the personal record stream processor (scripts/pr_stream_processor.py).
+
+Tests:
+1. Keyed store bests and baseline behaviour
+2. Streaming detection matches a full history rescan for every set
+3. Resuming from a reloaded store gives the same events as one pass
+4. Sources are interleaved by when the set was performed
+
+Run: pytest tests/test_pr_stream_processor.py -v
+"""
+import os
+import sys
+import json
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from pr_stream_processor import PRStore, detect_prs, one_rm, order_sets
+
+
+def _random_sets(seed, count=400):
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    sets = []
+    for i in range(count):
+        sets.append({
+            'id': i + 1, 'source': 'performance_logs', 'user_id': rng.randint(1, 3),
+            'exercise_key': str(rng.randint(1, 4)), 'exercise_name': 'Exercise',
+            'exercise_id': None, 'user_workout_id': None, 'set_id': None,
+            'actual_weight': rng.choice([None, 0, 40, 60, 80, 100, 120]),
+            'actual_reps': rng.choice([None, 0, 1, 3, 5, 8, 12]),
+            'performed_at': start + timedelta(minutes=i),
+        })
+    return sets
+
+
+def rescan_prs(sets):
+    """Reference: compare each set against every earlier set for the pair"""
+    expected = []
+    for i, s in enumerate(sets):
+        weight, reps = float(s['actual_weight'] or 0), float(s['actual_reps'] or 0)
+        if weight <= 0 and reps <= 0:
+            continue
+        earlier = [e for e in sets[:i] if (e['user_id'], e['exercise_key']) == (s['user_id'], s['exercise_key'])]
+        bests = {
+            'weight': max([float(e['actual_weight'] or 0) for e in earlier], default=0),
+            'reps': max([float(e['actual_reps'] or 0) for e in earlier], default=0),
+            'e1rm': max([one_rm(float(e['actual_weight'] or 0), float(e['actual_reps'] or 0)) for e in earlier],
+                        default=0),
+        }
+        values = {'weight': weight, 'reps': reps, 'e1rm': one_rm(weight, reps)}
+        records = [k for k in ('weight', 'reps', 'e1rm') if bests[k] > 0 and values[k] > bests[k]]
+        if records:
+            expected.append((s['id'], records))
+    return expected
+
+
+def _summary(events):
+    return [(json.loads(e[5])['sourceId'], json.loads(e[5])['records']) for e in events]
+
+
+class TestPRStore:
+    """Keyed best-value store"""
+
+    def test_first_set_is_baseline(self):
+        store = PRStore()
+        assert store.observe((1, '7'), 100, 5) == {}
+        assert store.get((1, '7')) == {'weight': 100, 'reps': 5, 'e1rm': one_rm(100, 5)}
+
+    def test_breaking_records_reports_previous_bests(self):
+        store = PRStore()
+        store.observe((1, '7'), 100, 5)
+        broken = store.observe((1, '7'), 105, 3)
+        assert broken == {'weight': 100}
+        assert store.observe((1, '7'), 90, 10) == {'reps': 5, 'e1rm': pytest.approx(one_rm(100, 5))}
+
+    def test_pairs_are_independent(self):
+        store = PRStore()
+        store.observe((1, '7'), 100, 5)
+        store.observe((2, '7'), 50, 5)
+        assert store.observe((2, '7'), 60, 5) == {'weight': 50, 'e1rm': pytest.approx(one_rm(50, 5))}
+        assert len(store) == 2
+
+    def test_dirty_records(self):
+        store = PRStore()
+        store.load((1, '7'), 100, 5, one_rm(100, 5))
+        store.observe((1, '7'), 90, 3)
+        assert store.state_records(datetime(2025, 1, 1)) == []
+        store.observe((1, '7'), 110, 3)
+        assert [r[:3] for r in store.state_records(datetime(2025, 1, 1))] == [(1, '7', 110)]
+
+
+class TestDetection:
+    """Streaming detection is equivalent to rescanning history"""
+
+    @pytest.mark.parametrize('seed', [1, 2, 3])
+    def test_matches_rescan(self, seed):
+        sets = _random_sets(seed)
+        assert _summary(detect_prs(PRStore(), sets)) == rescan_prs(sets)
+
+    def test_resume_from_reloaded_state(self):
+        sets = _random_sets(4)
+        first = PRStore()
+        events = detect_prs(first, sets[:150])
+
+        resumed = PRStore()
+        for key in first.slots:
+            best = first.get(key)
+            resumed.load(key, best['weight'], best['reps'], best['e1rm'])
+        events += detect_prs(resumed, sets[150:])
+        assert _summary(events) == _summary(detect_prs(PRStore(), sets))
+
+    def test_event_record_shape(self):
+        sets = _random_sets(5, count=2)
+        sets[0].update(actual_weight=100, actual_reps=5)
+        sets[1].update(user_id=sets[0]['user_id'], exercise_key=sets[0]['exercise_key'],
+                       actual_weight=110, actual_reps=5, user_workout_id=9, set_id=31)
+        (event,) = detect_prs(PRStore(), sets)
+        assert event[:5] == (sets[0]['user_id'], 9, 'pb_hit', None, 31)
+        assert json.loads(event[5])['previous'] == {'weight': 100, 'e1rm': pytest.approx(one_rm(100, 5))}
+        assert event[6] == sets[1]['performed_at']
+
+
+class TestOrdering:
+    """Sources are merged by performance time"""
+
+    def test_interleaves_sources(self):
+        t = datetime(2025, 1, 1)
+        batches = {
+            'performance_logs': [{'id': 1, 'performed_at': t + timedelta(minutes=2)}],
+            'workout_sets': [{'id': 5, 'performed_at': t}, {'id': 6, 'performed_at': t + timedelta(minutes=3)}],
+        }
+        assert [(r['source'], r['id']) for r in order_sets(batches)] == [
+            ('workout_sets', 5), ('performance_logs', 1), ('workout_sets', 6),
+        ]
@@ -0,0 +1,163 @@
+"""
+Test suite for the e1RM progression curve fitting library (scripts/progression_curves.py).
+
+Tests:
+1. Row-wise least squares matches per-series np.polyfit on ragged series
+2. Huber IRLS ignores a mis-logged set that tilts ordinary least squares
+3. Saturation fit recovers plateau and rate; model selection picks it only when it fits better
+4. Batch fitting gives the same parameters as fitting each series alone
+5. Daily series and suggested weight rules
+
+Run: pytest tests/test_progression_curves.py -v
+"""
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+np = pytest.importorskip('numpy')
+pd = pytest.importorskip('pandas')
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from progression_curves import (
+    RATE_GRID, daily_series, fit_curves, robust_linear_fit, saturation_fit, weighted_linear_fit, working_weight,
+)
+
+
+def _logs(series):
+    """performance_logs rows from {(user, exercise): [(day offset, weight, reps), ...]}"""
+    rows, start = [], datetime(2025, 1, 1, 12)
+    for (user_id, exercise_id), sets in series.items():
+        for day, weight, reps in sets:
+            rows.append({
+                'id': len(rows) + 1, 'user_id': user_id, 'workout_id': f"w{user_id}-{day}",
+                'exercise_id': exercise_id, 'exercise_name': f"Exercise {exercise_id}",
+                'actual_weight': weight, 'actual_reps': reps, 'rpe': None,
+                'logged_at': start + timedelta(days=day),
+            })
+    return pd.DataFrame(rows)
+
+
+def _weight_for(e1rm, reps=5):
+    return e1rm / (1 + reps / 30)
+
+
+class TestLinearFits:
+    """Vectorized least squares"""
+
+    def test_matches_polyfit_on_ragged_rows(self):
+        rng = np.random.default_rng(1)
+        lengths = [2, 5, 9, 14]
+        t = np.zeros((4, 14))
+        y = np.zeros((4, 14))
+        mask = np.zeros((4, 14), dtype=bool)
+        for i, n in enumerate(lengths):
+            t[i, :n] = np.sort(rng.uniform(0, 90, n))
+            y[i, :n] = 100 + rng.normal(0, 5, n) + 0.3 * t[i, :n]
+            mask[i, :n] = True
+        intercept, slope = weighted_linear_fit(t, y, mask.astype(float))
+        for i, n in enumerate(lengths):
+            expected_slope, expected_intercept = np.polyfit(t[i, :n], y[i, :n], 1)
+            assert slope[i] == pytest.approx(expected_slope)
+            assert intercept[i] == pytest.approx(expected_intercept)
+
+    def test_single_point_is_flat(self):
+        intercept, slope = weighted_linear_fit(np.array([[0.0, 0.0]]), np.array([[120.0, 0.0]]),
+                                               np.array([[1.0, 0.0]]))
+        assert (intercept[0], slope[0]) == (120.0, 0.0)
+
+    def test_huber_resists_outlier(self):
+        t = np.arange(12, dtype=float)[None, :]
+        y = 100 + 0.5 * t
+        y[0, 6] = 250  # e.g. pounds logged as kilograms
+        mask = np.ones_like(t, dtype=bool)
+        _, ols_slope = weighted_linear_fit(t, y, mask.astype(float))
+        intercept, slope, _, weights = robust_linear_fit(t, y, mask)
+        assert abs(ols_slope[0] - 0.5) > 0.5
+        assert slope[0] == pytest.approx(0.5, abs=0.05)
+        assert intercept[0] == pytest.approx(100, abs=1)
+        assert weights[0, 6] < 0.1
+
+
+class TestSaturation:
+    """Exponential saturation fit and model choice"""
+
+    def test_recovers_plateau_and_rate(self):
+        rate = RATE_GRID[20]
+        t = np.linspace(0, 120, 20)[None, :]
+        y = 140 - 40 * np.exp(-rate * t)
+        best = saturation_fit(t, y, np.ones_like(t))
+        assert best['plateau'][0] == pytest.approx(140, abs=1e-6)
+        assert best['gap'][0] == pytest.approx(40, abs=1e-6)
+        assert best['rate'][0] == pytest.approx(rate)
+
+    def test_declining_series_has_no_saturation_fit(self):
+        t = np.linspace(0, 60, 10)[None, :]
+        y = 100 + 20 * np.exp(-0.05 * t)
+        assert np.isinf(saturation_fit(t, y, np.ones_like(t))['sse'][0])
+
+    def test_model_selection(self):
+        days = list(range(0, 120, 6))
+        rate = RATE_GRID[22]
+        logs = _logs({
+            (1, 'squat'): [(d, _weight_for(140 - 40 * np.exp(-rate * d)), 5) for d in days],
+            (1, 'bench'): [(d, _weight_for(80 + 0.2 * d), 5) for d in days],
+            (2, 'squat'): [(d, _weight_for(60 + 0.4 * d), 5) for d in days[:4]],
+        })
+        curves = fit_curves(daily_series(logs)).set_index(['user_id', 'exercise_id'])
+        assert curves.loc[(1, 'squat'), 'model'] == 'saturation'
+        assert curves.loc[(1, 'squat'), 'plateau'] == pytest.approx(140, rel=0.01)
+        assert curves.loc[(1, 'bench'), 'model'] == 'linear'
+        assert curves.loc[(1, 'bench'), 'slope_per_week'] == pytest.approx(1.4, rel=0.01)
+        assert curves.loc[(2, 'squat'), 'model'] == 'linear'
+        assert np.isnan(curves.loc[(2, 'squat'), 'plateau'])
+        assert curves.loc[(2, 'squat'), 'confidence'] == 'medium'
+
+
+class TestBatch:
+    """Fitting together is the same as fitting alone"""
+
+    def test_batch_equals_single(self):
+        rng = np.random.default_rng(7)
+        series = {}
+        for user_id in range(1, 6):
+            for exercise_id in ('a', 'b'):
+                days = np.sort(rng.choice(200, size=rng.integers(1, 30), replace=False))
+                base, gain = rng.uniform(40, 150), rng.uniform(-0.1, 0.5)
+                series[(user_id, exercise_id)] = [
+                    (int(d), round(_weight_for(base + gain * d + rng.normal(0, 3))), 5) for d in days
+                ]
+        together = fit_curves(daily_series(_logs(series))).set_index(['user_id', 'exercise_id'])
+        numeric = ['intercept', 'slope_per_week', 'plateau', 'rate', 'r2', 'current_e1rm', 'suggested_weight']
+        for key, sets in series.items():
+            alone = fit_curves(daily_series(_logs({key: sets}))).iloc[0]
+            assert together.loc[key, 'model'] == alone['model']
+            for column in numeric:
+                assert together.loc[key, column] == pytest.approx(alone[column], nan_ok=True)
+
+
+class TestDailySeriesAndSuggestion:
+    """Series construction and suggested weight"""
+
+    def test_daily_best_and_top_set_reps(self):
+        logs = _logs({(1, 'squat'): [(0, 100, 5), (0, 110, 1), (0, 90, 12), (3, 0, 5), (5, 105, 5)]})
+        daily = daily_series(logs)
+        assert daily['date'].tolist() == ['2025-01-01', '2025-01-06']
+        assert daily['e1rm'].iloc[0] == pytest.approx(90 * (1 + 12 / 30))
+        assert daily['reps'].tolist() == [12, 5]
+
+    def test_working_weight_rounds_to_increment(self):
+        assert working_weight(116.67, 5).tolist() == 100.0
+        assert working_weight(100, 1).tolist() == 100.0
+        assert working_weight(np.array([121, 124]), np.array([5, 5])).tolist() == [102.5, 107.5]
+
+    def test_suggestion_stays_near_last_session(self):
+        # a steep line would project far beyond what the lifter did last time
+        logs = _logs({(1, 'press'): [(0, 40, 5), (2, 60, 5), (4, 80, 5)]})
+        curve = fit_curves(daily_series(logs)).iloc[0]
+        last_e1rm = 80 * (1 + 5 / 30)
+        assert curve['suggested_weight'] == working_weight(1.05 * last_e1rm, 5)
+        assert curve['suggested_reps'] == 5
+        assert curve['confidence'] == 'low'
@@ -0,0 +1,93 @@
+"""
+Test suite for the prompt token report (scripts/prompt_token_report.py).
+
+Tests:
+1. User context is split on its === SECTION === headers
+2. Bridge output maps to generator and coach sections
+3. The fallback token estimate
+4. Per-section stats, budget shares and dominant-section flags
+
+Run: pytest tests/test_prompt_token_report.py -v
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from prompt_token_report import aggregate, approximate_tokens, prompt_sections, section_key, split_sections
+
+USER_CONTEXT = """=== USER PROFILE ===
+Name: Sam
+Goal: build_muscle
+
+=== ADVANCED PREFERENCES (User shared these to help you personalize) ===
+Enjoys: pull-ups
+
+=== WORKOUT HISTORY ===
+Total workouts: 120"""
+
+
+class TestSections:
+    """Section splitting"""
+
+    def test_section_key(self):
+        assert section_key('ADVANCED PREFERENCES (User shared these to help you personalize)') == 'advanced_preferences'
+        assert section_key('LEARNED FROM PREVIOUS WORKOUTS') == 'learned_from_previous_workouts'
+
+    def test_split_on_headers(self):
+        sections = split_sections("Intro line\n" + USER_CONTEXT)
+        assert [key for key, _ in sections] == ['preamble', 'user_profile', 'advanced_preferences', 'workout_history']
+        assert ''.join(text for _, text in sections) == "Intro line\n" + USER_CONTEXT
+        assert sections[3][1].startswith('=== WORKOUT HISTORY ===')
+
+    def test_no_headers(self):
+        assert split_sections('No previous workout history available.') == [
+            ('preamble', 'No previous workout history available.')]
+
+    def test_prompt_sections(self):
+        summary = '=== USER COACH SUMMARY ===\nGoal: build muscle'
+        calls = prompt_sections({
+            'userContext': USER_CONTEXT,
+            'splitConstraints': ['Focus: push', 'Focus: pull, longer constraints'],
+            'coachSummary': summary,
+            'coachPrompt': f"You are a coach.\n\n{summary}\n\nRules.",
+        }, 'Push-up\nPull-up')
+        assert sorted(calls['generator']) == ['context:advanced_preferences', 'context:user_profile',
+                                              'context:workout_history', 'exercise_database', 'split_constraints']
+        assert calls['generator']['split_constraints'] == 'Focus: pull, longer constraints'
+        assert calls['coach'] == {'summary': summary, 'instructions': "You are a coach.\n\n\n\nRules."}
+
+
+class TestTokens:
+    """Fallback tokenizer"""
+
+    def test_approximate_tokens(self):
+        assert approximate_tokens('') == 0
+        assert approximate_tokens('Squat') == 2
+        assert approximate_tokens('Bench Press: 80kg x 5') == 9
+        assert approximate_tokens('word ' * 100) == 100
+
+
+class TestAggregate:
+    """Distribution and dominant sections"""
+
+    def test_shares_and_flags(self):
+        counts = [{'userId': user_id, 'calls': {
+            'generator': {'exercise_database': 6000, 'context:user_profile': 200, 'context:workout_history': history},
+            'coach': {'instructions': 900, 'summary': 100},
+        }} for user_id, history in [(1, 100), (2, 300), (3, 3000)]]
+        counts.append({'userId': 4, 'calls': {'generator': {'exercise_database': 6000, 'context:user_profile': 200}}})
+        report = aggregate(counts, 0.3)
+
+        generator = report['generator']
+        assert generator['users'] == 4 and generator['total']['max'] == 9200
+        assert list(generator['sections'])[0] == 'exercise_database'
+        history = generator['sections']['context:workout_history']
+        assert (history['users'], history['p50'], history['max']) == (3, 300, 3000)
+        assert [name for name, s in generator['sections'].items() if s['dominant']] == ['exercise_database']
+        assert generator['heaviestUsers'][0] == 3
+        assert abs(sum(s['share'] for s in generator['sections'].values()) - 1) < 1e-3
+
+        coach = report['coach']
+        assert coach['users'] == 3 and coach['sections']['instructions']['share'] == 0.9
+        assert coach['sections']['instructions']['dominant'] and not coach['sections']['summary']['dominant']
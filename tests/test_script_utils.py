@@ -0,0 +1,46 @@
+"""
+Test suite for the shared script helpers (scripts/script_utils.py).
+
+Tests:
+1. Percentiles and latency stats
+2. Math.round() halves
+3. Date.toISOString() for naive, aware and ISO string timestamps
+
+Run: pytest tests/test_script_utils.py -v
+"""
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from script_utils import js_iso, js_round, latency_stats, percentile, to_utc
+
+
+class TestStats:
+    """Benchmark statistics"""
+
+    def test_percentile(self):
+        assert percentile([], 50) == 0
+        assert percentile([5], 95) == 5
+        assert percentile([1, 2, 3, 4], 50) == 2.5
+        assert percentile([10, 20, 30, 40, 50], 95) == 48
+
+    def test_latency_stats(self):
+        assert latency_stats([]) == {'count': 0, 'mean': 0, 'p50': 0, 'p95': 0}
+        assert latency_stats([10, 20, 30]) == {'count': 3, 'mean': 20, 'p50': 20, 'p95': 29}
+
+
+class TestJs:
+    """JavaScript number and date formatting"""
+
+    def test_js_round(self):
+        assert int(js_round(2.5)) == 3 and int(js_round(-2.5)) == -2 and int(js_round(0.49)) == 0
+        assert list(js_round([0.5, 1.5, 2.5])) == [1, 2, 3]
+
+    def test_js_iso(self):
+        aware = datetime(2025, 6, 18, 15, 30, 1, 987654, tzinfo=timezone.utc)
+        assert js_iso(aware) == '2025-06-18T15:30:01.987Z'
+        assert js_iso(aware.replace(tzinfo=None)) == '2025-06-18T15:30:01.987Z'
+        assert js_iso(aware.astimezone(timezone(timedelta(hours=2)))) == '2025-06-18T15:30:01.987Z'
+        assert to_utc('2025-06-18T15:30:01.987Z') == aware.replace(microsecond=987000)
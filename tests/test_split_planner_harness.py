@@ -0,0 +1,116 @@
+"""
+Test suite for the split planner harness (scripts/split_planner_harness.py).
+
+Tests:
+1. Input grid size and stable, key-order independent input hashes
+2. Back-to-back run lengths wrap into the next week; only avoidable runs count
+3. Template invariants (sessions, activity conflicts, exercise counts)
+4. Bridge results stream back per case
+
+Run: pytest tests/test_split_planner_harness.py -v
+"""
+import os
+import sys
+import shlex
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from split_planner_harness import (
+    best_possible_run, build_inputs, check_template, input_hash, longest_run, run_bridge,
+)
+
+BASE = {'frequency': 3, 'experience': 'beginner', 'goals': ['muscle_gain'], 'equipment': ['dumbbells'],
+        'sessionDuration': 45, 'weekNumber': 1, 'scheduleFlexibility': True}
+
+
+def template(gym: dict, experience_max=2, counts=(4, 6), warmup=1, cooldown=1, coverage=5, external=()):
+    """Template with gym sessions {dayIndex: focus}, the rest rest days"""
+    days = []
+    for i in range(7):
+        if i in gym:
+            days.append({'dayIndex': i, 'focus': gym[i], 'isGymTraining': True,
+                         'exerciseCount': {'min': counts[0], 'max': counts[1]}, 'warmupCount': warmup,
+                         'mainCount': {'min': counts[0] - warmup - cooldown, 'max': counts[1] - warmup - cooldown},
+                         'cooldownCount': cooldown})
+        else:
+            days.append({'dayIndex': i, 'focus': 'external_activity' if i in external else 'rest',
+                         'isGymTraining': False, 'exerciseCount': {'min': 0, 'max': 0}, 'warmupCount': 0,
+                         'mainCount': {'min': 0, 'max': 0}, 'cooldownCount': 0})
+    return {'days': days, 'constraints': {'maxConsecutiveHeavyDays': experience_max},
+            'timeBudget': {'mainWorkMinutes': 32}, 'muscleGroupCoverage': ['x'] * coverage}
+
+
+class TestInputs:
+    """Input space"""
+
+    def test_grid_and_hash(self):
+        inputs = build_inputs(draws=2)
+        assert len(inputs) == 7 * 3 * 6 * 7 * 4 * 2 * 2
+        assert 'gymDaysAvailable' not in inputs[0] and 'weeklyActivities' not in inputs[0]
+        assert build_inputs(draws=2) == inputs
+        reordered = dict(reversed(list(BASE.items())))
+        assert input_hash(reordered) == input_hash(BASE) != input_hash({**BASE, 'weekNumber': 2})
+
+
+class TestRuns:
+    """Back-to-back hard days"""
+
+    def test_longest_run_wraps(self):
+        assert longest_run({5, 6, 0}) == 3
+        assert longest_run({1, 3, 5}) == 1
+        assert longest_run(set(range(7))) == 7
+
+    def test_best_possible_run(self):
+        assert best_possible_run([1, 2, 3, 4, 5], set(), 3) == 1
+        assert best_possible_run([1, 2, 3], set(), 3) == 3
+        assert best_possible_run([1, 3, 5], {2}, 2) == 2
+
+
+class TestCheckTemplate:
+    """Invariants"""
+
+    def test_valid(self):
+        assert check_template(BASE, template({1: 'full', 3: 'upper', 5: 'lower'})) == []
+
+    def test_back_to_back_only_when_avoidable(self):
+        crowded = template({1: 'full', 2: 'upper', 3: 'lower'})
+        assert check_template(BASE, crowded) == ['back_to_back_hard']
+        assert check_template({**BASE, 'gymDaysAvailable': [1, 2, 3]}, crowded) == []
+
+    def test_activity_conflicts_and_sessions(self):
+        football = {**BASE, 'weeklyActivities': [
+            {'name': 'Football', 'dayOfWeek': 5, 'timeWindow': 'evening', 'intensity': 'hard'}]}
+        assert 'gym_on_hard_activity' in check_template(football, template({1: 'full', 3: 'upper', 5: 'lower'}))
+        assert check_template(BASE, template({1: 'full', 4: 'upper'})) == ['sessions_short']
+        assert check_template({**BASE, 'gymDaysAvailable': [1, 3]}, template({1: 'full', 3: 'upper'})) == []
+
+    def test_counts(self):
+        # intermediate 60 min: the generator prompt asks for 7-9 exercises
+        long = {**BASE, 'experience': 'intermediate', 'sessionDuration': 60}
+        assert check_template(long, template({1: 'full', 3: 'upper', 5: 'lower'}, counts=(7, 9), warmup=2)) == []
+        assert check_template(long, template({1: 'full', 3: 'upper', 5: 'lower'}, counts=(6, 9), warmup=2)) \
+            == ['exercise_count_range']
+        broken = template({1: 'full', 3: 'upper', 5: 'lower'})
+        broken['days'][1]['warmupCount'] = 2
+        assert check_template(BASE, broken) == ['count_breakdown']
+
+    def test_same_focus_and_coverage(self):
+        assert check_template({**BASE, 'gymDaysAvailable': [1, 2]}, template({1: 'upper', 2: 'upper'}, coverage=2)) \
+            == ['muscle_coverage']
+        assert check_template({**BASE, 'frequency': 2, 'gymDaysAvailable': [1, 2, 4]},
+                              template({1: 'upper', 2: 'lower', 4: 'lower'})) == ['sessions_over']
+
+
+class TestBridge:
+    """CLI bridge protocol"""
+
+    def test_streams_results(self):
+        echo = ("import sys, json\n"
+                "for line in sys.stdin:\n"
+                "    case = json.loads(line)\n"
+                "    print(json.dumps({'id': case['id'], 'elapsedUs': 1.0, 'template': case['input']}))\n")
+        command = f"{shlex.quote(sys.executable)} -c {shlex.quote(echo)}"
+        cases = [(str(i), {'frequency': i}) for i in range(2000)]
+        results = list(run_bridge(command, cases))
+        assert [r['id'] for r in results] == [c[0] for c in cases]
+        assert results[-1]['template'] == {'frequency': 1999}
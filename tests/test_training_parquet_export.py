@@ -0,0 +1,106 @@
+"""
+Test suite for the training history Parquet exporter (scripts/export_training_parquet.py).
+
+Tests:
+1. User buckets are stable and spread consecutive ids
+2. Chunks land in month/bucket hive partitions with dictionary-encoded names
+3. Partition filters prune files when reading back
+4. Re-exporting a chunk overwrites it instead of duplicating rows
+5. Watermarks round-trip through the dataset directory
+
+Run: pytest tests/test_training_parquet_export.py -v
+"""
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+pa = pytest.importorskip('pyarrow')
+ds = pytest.importorskip('pyarrow.dataset')
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from export_training_parquet import (
+    TABLES, load_watermarks, save_watermarks, to_arrow, user_bucket, write_chunk,
+)
+
+
+def _event_rows(first_id=1, count=60):
+    start = datetime(2025, 5, 20)
+    return [{
+        'id': first_id + i, 'user_id': 1 + i % 5, 'user_workout_id': None,
+        'event_type': 'pb_hit' if i % 3 == 0 else 'set_complete', 'exercise_id': None, 'set_id': None,
+        'event_data': '{}', 'achieved_at': start + timedelta(days=i % 20),
+    } for i in range(count)]
+
+
+def _read(path, **kwargs):
+    return ds.dataset(path, format='parquet', partitioning='hive').to_table(**kwargs)
+
+
+class TestUserBucket:
+    """Hash buckets for user partitions"""
+
+    def test_stable_and_in_range(self):
+        buckets = user_bucket(range(1, 1001), 16)
+        assert list(buckets) == list(user_bucket(range(1, 1001), 16))
+        assert buckets.min() >= 0 and buckets.max() < 16
+
+    def test_spreads_consecutive_ids(self):
+        counts = {}
+        for b in user_bucket(range(1, 1601), 16):
+            counts[b] = counts.get(b, 0) + 1
+        assert len(counts) == 16 and max(counts.values()) < 2 * 100
+
+
+class TestExport:
+    """Partitioned Parquet output"""
+
+    def test_partitions_and_dictionary_columns(self, tmp_path):
+        rows = _event_rows()
+        write_chunk(to_arrow(rows, TABLES['workout_events']), str(tmp_path), rows[0]['id'])
+
+        months = sorted(p.name for p in tmp_path.iterdir())
+        assert months == ['month=2025-05', 'month=2025-06']
+        table = _read(str(tmp_path))
+        assert table.num_rows == len(rows)
+        assert pa.types.is_dictionary(table.schema.field('event_type').type)
+
+    def test_filters_prune_partitions(self, tmp_path):
+        rows = _event_rows()
+        write_chunk(to_arrow(rows, TABLES['workout_events']), str(tmp_path), rows[0]['id'])
+
+        bucket = int(user_bucket(3))
+        table = _read(str(tmp_path), filter=(ds.field('month') == '2025-06') & (ds.field('bucket') == bucket))
+        expected = [r['id'] for r in rows if r['achieved_at'].month == 6
+                    and user_bucket(r['user_id']) == bucket]
+        assert sorted(table.column('id').to_pylist()) == expected
+
+    def test_rewriting_a_chunk_does_not_duplicate(self, tmp_path):
+        rows = _event_rows()
+        for _ in range(2):
+            write_chunk(to_arrow(rows, TABLES['workout_events']), str(tmp_path), rows[0]['id'])
+        assert _read(str(tmp_path)).num_rows == len(rows)
+
+        more = _event_rows(first_id=61, count=10)
+        write_chunk(to_arrow(more, TABLES['workout_events']), str(tmp_path), more[0]['id'])
+        assert _read(str(tmp_path)).num_rows == len(rows) + len(more)
+
+    def test_null_list_and_int_columns(self, tmp_path):
+        row = {field.name: None for field in TABLES['performance_logs']['schema']}
+        row.update(id=1, user_id=9, workout_id='w1', exercise_id='12', exercise_name='Bench Press',
+                   muscle_groups=['chest', 'triceps'], logged_at=datetime(2025, 6, 1, 12))
+        write_chunk(to_arrow([row], TABLES['performance_logs']), str(tmp_path), 1)
+        table = _read(str(tmp_path))
+        assert table.column('muscle_groups').to_pylist() == [['chest', 'triceps']]
+        assert table.column('actual_weight').to_pylist() == [None]
+
+
+class TestWatermarks:
+    """Export progress lives next to the dataset"""
+
+    def test_round_trip(self, tmp_path):
+        assert load_watermarks(str(tmp_path)) == {}
+        save_watermarks(str(tmp_path), {'workout_events': 60})
+        assert load_watermarks(str(tmp_path)) == {'workout_events': 60}
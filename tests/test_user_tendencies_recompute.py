@@ -0,0 +1,234 @@
+"""
+Test suite for the batch user tendencies recompute (scripts/recompute_user_tendencies.py).
+
+The batch replay must give the same tendencies as calling
+updateUserTendencies() in learning-engine.ts for each user. These tests
+compare it against an event-by-event port of that function, and write the
+--apply rows through an in-memory binary COPY (tests/pg_fakes.py).
+
+Run: pytest tests/test_user_tendencies_recompute.py -v
+"""
+import os
+import sys
+import json
+import random
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pd = pytest.importorskip('pandas')
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from recompute_user_tendencies import (
+    TENDENCY_COLUMNS, default_tendencies, derive_progression_pace, diff_report, js_number,
+    parse_stored, recompute_tendencies, tendency_records, write_tendencies,
+)
+from db_utils import register_json_codecs
+from pg_fakes import FakeConnection
+from script_utils import js_iso
+
+JSONB_COLUMNS = ('movement_confidence', 'adherence_pattern', 'preferred_rep_style', 'recent_declines')
+
+NOW = datetime(2025, 6, 30, 12, tzinfo=timezone.utc)
+
+EVENT_TYPES = [
+    'suggestion_shown', 'suggestion_accepted', 'suggestion_rejected', 'weight_adjusted', 'exercise_swapped',
+    'workout_completed', 'workout_skipped', 'user_feedback', 'nudge_accepted', 'nudge_rejected', 'nudge_dismissed',
+]
+
+
+def _clamp(v):
+    return max(0.1, min(0.9, v))
+
+
+def apply_event(t, event, shift):
+    """Port of applyEventToTendencies()"""
+    p = event['payload'] or {}
+    kind = event['event_type']
+    mc = t['movementConfidence']
+    if kind == 'suggestion_accepted':
+        t['prefersConfirmation'] = _clamp(t['prefersConfirmation'] - shift)
+        t['confidenceWithLoad'] = _clamp(t['confidenceWithLoad'] + shift)
+        if p.get('movementPattern') and p['movementPattern'] in mc:
+            mc[p['movementPattern']] = _clamp(mc[p['movementPattern']] + shift)
+    elif kind == 'suggestion_rejected':
+        t['prefersConfirmation'] = _clamp(t['prefersConfirmation'] + shift)
+        t['confidenceWithLoad'] = _clamp(t['confidenceWithLoad'] - shift * 0.5)
+        if p.get('movementPattern') and p['movementPattern'] in mc:
+            mc[p['movementPattern']] = _clamp(mc[p['movementPattern']] - shift * 0.5)
+    elif kind == 'weight_adjusted':
+        delta = p.get('delta') or 0
+        if delta < 0:
+            t['confidenceWithLoad'] = _clamp(t['confidenceWithLoad'] - shift)
+            t['recoveryNeed'] = _clamp(t['recoveryNeed'] + shift * 0.5)
+        elif delta > 0:
+            t['confidenceWithLoad'] = _clamp(t['confidenceWithLoad'] + shift)
+    elif kind == 'exercise_swapped':
+        t['swapFrequency'] = _clamp(t['swapFrequency'] + shift)
+    elif kind == 'user_feedback':
+        fb = p.get('feedbackType')
+        if fb in ('too_hard', 'tired'):
+            t['recoveryNeed'] = _clamp(t['recoveryNeed'] + shift)
+            t['confidenceWithLoad'] = _clamp(t['confidenceWithLoad'] - shift * 0.5)
+        elif fb in ('too_easy', 'great'):
+            t['recoveryNeed'] = _clamp(t['recoveryNeed'] - shift)
+            t['confidenceWithLoad'] = _clamp(t['confidenceWithLoad'] + shift)
+        elif fb == 'pain':
+            t['recoveryNeed'] = _clamp(t['recoveryNeed'] + shift * 2)
+    elif kind == 'workout_completed':
+        t['adherencePattern']['consistencyScore'] = _clamp(t['adherencePattern']['consistencyScore'] + shift * 0.5)
+    elif kind == 'workout_skipped':
+        t['adherencePattern']['consistencyScore'] = _clamp(t['adherencePattern']['consistencyScore'] - shift)
+        t['recoveryNeed'] = _clamp(t['recoveryNeed'] + shift * 0.3)
+    elif kind == 'nudge_accepted':
+        t['prefersConfirmation'] = _clamp(t['prefersConfirmation'] - shift * 0.5)
+    elif kind in ('nudge_rejected', 'nudge_dismissed'):
+        t['prefersConfirmation'] = _clamp(t['prefersConfirmation'] + shift * 0.3)
+
+
+def update_user_tendencies(events, stored_row):
+    """Port of updateUserTendencies() for one user (events already in window)"""
+    t = parse_stored(stored_row) if stored_row else default_tendencies()
+    current_declines = [dict(d) for d in t['recentDeclines']]
+    events = sorted(events, key=lambda e: (e['created_at'], e['id']), reverse=True)
+    for e in events:
+        age = (NOW - e['created_at']).total_seconds() / (86400 * 7)
+        apply_event(t, e, 0.05 * 0.85 ** age)
+    t['progressionPace'] = derive_progression_pace(t)
+
+    active = [d for d in current_declines
+              if (NOW - datetime.fromisoformat(d['lastDeclined'].replace('Z', '+00:00'))).total_seconds() < 14 * 86400]
+    for e in events:
+        if e['event_type'] in ('suggestion_rejected', 'nudge_rejected'):
+            topic = e['topic'] or 'general'
+            d = next((d for d in active if d['topic'] == topic), None)
+            if d:
+                d['count'] += 1
+                d['lastDeclined'] = js_iso(e['created_at'])
+            else:
+                active.append({'topic': topic, 'count': 1, 'lastDeclined': js_iso(e['created_at'])})
+    for e in events:
+        if e['event_type'] in ('suggestion_accepted', 'nudge_accepted'):
+            d = next((d for d in active if d['topic'] == (e['topic'] or 'general')), None)
+            if d:
+                d['count'] = max(0, d['count'] - 2)
+    t['recentDeclines'] = active
+    return t
+
+
+def _random_events(seed, users=6, count=500):
+    rng = random.Random(seed)
+    events = []
+    for i in range(count):
+        payload = {}
+        kind = rng.choice(EVENT_TYPES)
+        if kind.startswith('suggestion'):
+            payload['movementPattern'] = rng.choice([None, 'squat', 'push', 'hinge', 'lunge'])
+        if kind == 'weight_adjusted':
+            payload['delta'] = rng.choice([-5, 0, 5, None])
+        if kind == 'user_feedback':
+            payload['feedbackType'] = rng.choice(['too_hard', 'too_easy', 'pain', 'tired', 'great', 'skipped'])
+        events.append({
+            'id': i + 1, 'user_id': rng.randint(1, users), 'event_type': kind,
+            'topic': rng.choice([None, 'weight', 'progression', 'swap']), 'payload': payload,
+            'created_at': NOW - timedelta(hours=rng.uniform(0, 24 * 40)),
+        })
+    return events
+
+
+def _stored(seed, users=6):
+    rng = random.Random(seed)
+    stored = {}
+    for user_id in range(1, users + 1, 2):
+        stored[user_id] = {
+            'user_id': user_id, 'progression_pace': 'moderate',
+            'prefers_confirmation': str(rng.uniform(0.1, 0.9)), 'confidence_with_load': '0.8',
+            'movement_confidence': {'squat': 0.6, 'push': 0.4}, 'swap_frequency': None,
+            'adherence_pattern': {'weekdayBias': 0.2, 'weekendDrop': 0.1, 'consistencyScore': 0.7},
+            'preferred_rep_style': None, 'recovery_need': '0.2',
+            'recent_declines': [{'topic': 'weight', 'count': 2, 'lastDeclined': js_iso(NOW - timedelta(days=3))},
+                                {'topic': 'old', 'count': 5, 'lastDeclined': js_iso(NOW - timedelta(days=20))}],
+        }
+    return stored
+
+
+def _frame(events):
+    return pd.DataFrame(events, columns=['id', 'user_id', 'event_type', 'topic', 'payload', 'created_at'])
+
+
+def _assert_same(actual, expected):
+    for key in ('prefersConfirmation', 'confidenceWithLoad', 'swapFrequency', 'recoveryNeed'):
+        assert actual[key] == pytest.approx(expected[key], abs=1e-12), key
+    for key in ('movementConfidence', 'adherencePattern'):
+        assert actual[key] == pytest.approx(expected[key], abs=1e-12), key
+    assert actual['preferredRepStyle'] == expected['preferredRepStyle']
+    assert actual['progressionPace'] == expected['progressionPace']
+    assert actual['recentDeclines'] == expected['recentDeclines']
+
+
+class TestReplayParity:
+    """Vectorized replay equals per-user updateUserTendencies()"""
+
+    @pytest.mark.parametrize('seed', [1, 2, 3])
+    def test_matches_learning_engine(self, seed):
+        events, stored = _random_events(seed), _stored(seed)
+        results = recompute_tendencies(_frame(events), stored, NOW)
+        window = [e for e in events if e['created_at'] >= NOW - timedelta(days=30)]
+        assert set(results) == {e['user_id'] for e in window}
+        for user_id, actual in results.items():
+            mine = [e for e in window if e['user_id'] == user_id]
+            _assert_same(actual, update_user_tendencies(mine, stored.get(user_id)))
+
+    def test_from_defaults_ignores_stored(self):
+        events, stored = _random_events(4), _stored(4)
+        results = recompute_tendencies(_frame(events), stored, NOW, from_defaults=True)
+        window = [e for e in events if e['created_at'] >= NOW - timedelta(days=30)]
+        for user_id, actual in results.items():
+            _assert_same(actual, update_user_tendencies([e for e in window if e['user_id'] == user_id], None))
+
+    def test_clamps_at_bounds(self):
+        events = [{'id': i, 'user_id': 1, 'event_type': 'exercise_swapped', 'topic': None, 'payload': {},
+                   'created_at': NOW - timedelta(minutes=i)} for i in range(1, 40)]
+        results = recompute_tendencies(_frame(events), {}, NOW)
+        assert results[1]['swapFrequency'] == 0.9
+
+    def test_no_events_in_window(self):
+        events = [{'id': 1, 'user_id': 1, 'event_type': 'exercise_swapped', 'topic': None, 'payload': {},
+                   'created_at': NOW - timedelta(days=45)}]
+        assert recompute_tendencies(_frame(events), {}, NOW) == {}
+
+
+class TestReportAndRecords:
+    """Diff report and stored value formatting"""
+
+    def test_diff_report(self):
+        events, stored = _random_events(5), _stored(5)
+        results = recompute_tendencies(_frame(events), stored, NOW)
+        report = diff_report(results, stored)
+        assert report['summary']['usersRecomputed'] == len(results)
+        assert report['summary']['usersNew'] == len([u for u in results if u not in stored])
+        assert diff_report({1: parse_stored(stored[1])}, stored)['users'] == []
+
+    def test_js_number(self):
+        assert js_number(0.5) == '0.5'
+        assert js_number(1.0) == '1'
+        assert js_number(0.1 + 0.2) == '0.30000000000000004'
+
+    def test_records_are_json_serializable(self):
+        results = recompute_tendencies(_frame(_random_events(6)), {}, NOW)
+        for record in tendency_records(results, NOW.replace(tzinfo=None)):
+            json.dumps(record[:-1])
+            assert isinstance(record[2], str)
+
+    def test_apply_writes_jsonb_columns(self):
+        results = recompute_tendencies(_frame(_random_events(7)), _stored(7), NOW)
+        conn = FakeConnection({'user_tendencies': {
+            c: 'jsonb' if c in JSONB_COLUMNS else 'text' for c in TENDENCY_COLUMNS}})
+        asyncio.run(register_json_codecs(conn))
+        assert asyncio.run(write_tendencies(conn, results, NOW.replace(tzinfo=None))) == len(results)
+        written = {row['user_id']: row for row in conn.rows['user_tendencies']}
+        for user_id, t in results.items():
+            assert written[user_id]['movement_confidence'] == t['movementConfidence']
+            assert written[user_id]['recent_declines'] == t['recentDeclines']
@@ -0,0 +1,82 @@
+"""
+Test suite for the exercise video payload audit (scripts/audit_exercise_videos.py).
+
+Tests:
+1. ffprobe output parsing
+2. Re-encode flags (bitrate outliers, resolution, codec, audio)
+3. Typical workout download estimate
+
+Run: pytest tests/test_video_audit.py -v
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from audit_exercise_videos import estimate_workout_bytes, flag_outliers
+from video_catalog import parse_ffprobe
+
+
+def _row(slug, bitrate, width=720, height=1280, fps=30, codec='h264', audio=None, duration=12.0):
+    return {'slug': slug, 'bitrate': bitrate, 'width': width, 'height': height, 'fps': fps,
+            'codec': codec, 'audioCodec': audio, 'duration': duration, 'size': bitrate * duration // 8}
+
+
+class TestParseFfprobe:
+    """ffprobe JSON is reduced to the audited fields"""
+
+    def test_parses_streams_and_format(self):
+        info = parse_ffprobe({
+            'streams': [
+                {'codec_type': 'video', 'codec_name': 'h264', 'width': 720, 'height': 1280, 'avg_frame_rate': '30000/1001'},
+                {'codec_type': 'audio', 'codec_name': 'aac'},
+            ],
+            'format': {'duration': '10.5', 'size': '2100000', 'bit_rate': '1600000'},
+        })
+        assert info == {'duration': 10.5, 'width': 720, 'height': 1280, 'fps': 29.97, 'codec': 'h264',
+                        'audioCodec': 'aac', 'bitrate': 1600000, 'size': 2100000}
+
+    def test_bitrate_derived_from_size(self):
+        info = parse_ffprobe({'streams': [], 'format': {'duration': '8', 'size': '1000000'}})
+        assert info['bitrate'] == 1000000
+        assert info['codec'] is None
+
+
+class TestFlags:
+    """Videos that need re-encoding are flagged"""
+
+    def test_bitrate_outlier(self):
+        rows = [_row(f'ex{i}', 1_000_000 + i * 10_000) for i in range(10)] + [_row('huge', 9_000_000)]
+        flags = {r['slug']: r['flags'] for r in flag_outliers(rows)}
+        assert 'bitrate_outlier' in flags['huge']
+        assert flags['ex3'] == []
+
+    def test_bitrate_outlier_with_zero_mad(self):
+        rows = [_row(f'ex{i}', 1_000_000) for i in range(10)] + [_row('huge', 9_000_000)]
+        flags = {r['slug']: r['flags'] for r in flag_outliers(rows)}
+        assert 'bitrate_outlier' in flags['huge']
+        assert all(flags[f'ex{i}'] == [] for i in range(10))
+
+    def test_resolution_codec_audio_length(self):
+        rows = flag_outliers([
+            _row('4k', 1_000_000, width=2160, height=3840),
+            _row('old', 1_000_000, codec='mpeg4'),
+            _row('noisy', 1_000_000, audio='aac'),
+            _row('long', 1_000_000, duration=90),
+        ])
+        flags = {r['slug']: r['flags'] for r in rows}
+        assert 'above_1080p' in flags['4k']
+        assert 'legacy_codec' in flags['old']
+        assert 'has_audio' in flags['noisy']
+        assert 'long_clip' in flags['long']
+
+
+class TestWorkoutEstimate:
+    """Typical workout download"""
+
+    def test_uniform_sizes(self):
+        estimate = estimate_workout_bytes([100] * 20, per_workout=6)
+        assert estimate == {'exercisesPerWorkout': 6, 'mean': 600, 'p50': 600, 'p90': 600}
+
+    def test_small_catalog_caps_exercise_count(self):
+        assert estimate_workout_bytes([10, 20], per_workout=6)['exercisesPerWorkout'] == 2
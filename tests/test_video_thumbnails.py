@@ -0,0 +1,68 @@
+"""
+Test suite for the exercise video thumbnail batch job (scripts/extract_video_thumbnails.py).
+
+Tests:
+1. Catalog loading from a directory and from a JSON manifest
+2. Thumbnails are keyed by video content hash (incremental reruns)
+3. Mapping file rows are ready for a thumbnail_url bulk update
+
+Run: pytest tests/test_video_thumbnails.py -v
+"""
+import os
+import sys
+import json
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from extract_video_thumbnails import build_mapping, missing_sizes, thumbnail_relpath
+from video_catalog import HashCache, load_video_entries
+
+
+def _write(path, data=b'video'):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+class TestVideoCatalog:
+    """Directory and manifest catalogs resolve to the same entries"""
+
+    def test_directory_uses_filename_as_slug(self, tmp_path):
+        _write(str(tmp_path / 'barbell-squat.mp4'))
+        _write(str(tmp_path / 'notes.txt'))
+        entries = load_video_entries(str(tmp_path))
+        assert [e['slug'] for e in entries] == ['barbell-squat']
+
+    def test_manifest_resolves_relative_paths(self, tmp_path):
+        _write(str(tmp_path / 'videos' / 'a.mp4'))
+        manifest = tmp_path / 'manifest.json'
+        manifest.write_text(json.dumps([{'id': 7, 'slug': 'push-up', 'path': 'videos/a.mp4'}]))
+        entries = load_video_entries(str(manifest))
+        assert entries == [{'slug': 'push-up', 'path': str(tmp_path / 'videos' / 'a.mp4'), 'id': 7}]
+
+    def test_hash_cache_reuses_unchanged_files(self, tmp_path):
+        video = str(tmp_path / 'a.mp4')
+        _write(video, b'one')
+        cache = HashCache(str(tmp_path / 'hashes.json'))
+        first = cache.hash(video)
+        cache.save()
+        assert HashCache(str(tmp_path / 'hashes.json')).hash(video) == first
+
+
+class TestThumbnailMapping:
+    """Output layout and mapping rows"""
+
+    def test_missing_sizes_only_lists_absent_files(self, tmp_path):
+        content_hash = 'ab' * 32
+        _write(str(tmp_path / thumbnail_relpath(content_hash, 160)), b'webp')
+        assert missing_sizes(content_hash, [160, 320], str(tmp_path)) == [320]
+
+    def test_mapping_rows(self):
+        entries = [{'slug': 'push-up', 'path': '/v/a.mp4', 'id': 3}, {'slug': 'squat', 'path': '/v/b.mp4'}]
+        hashes = {'/v/a.mp4': 'cd' * 32}
+        mapping = build_mapping(entries, hashes, [160, 320], 320, 'https://cdn.example.com/thumbs/')
+        assert len(mapping) == 1
+        row = mapping[0]
+        assert row['id'] == 3
+        assert row['thumbnail_url'] == 'https://cdn.example.com/thumbs/cd/' + 'cd' * 8 + '/w320.webp'
+        assert set(row['thumbnails']) == {'160', '320'}
@@ -0,0 +1,80 @@
+"""
+Test suite for the week generation benchmark (scripts/bench_week_generation.py).
+
+Tests:
+1. Fan-out overlap: covered vs summed time, parallelism, peak overlap
+2. Day spans from the generate-week timings (skipped days excluded)
+3. Run summary: throughput, failures, off-schema weeks
+4. Synthetic profiles select as many days as they train
+
+Run: pytest tests/test_week_generation_bench.py -v
+"""
+import os
+import sys
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from bench_week_generation import DAY_CODES, overlap_profile, summarize, synthetic_profile, week_spans
+
+
+class TestOverlap:
+    """Fan-out parallelism"""
+
+    def test_fully_parallel_week(self):
+        profile = overlap_profile([(0, 1000)] * 7)
+        assert profile == {'spans': 7, 'coveredMs': 1000, 'busyMs': 7000, 'parallelism': 7.0, 'peakOverlap': 7}
+
+    def test_serial_days(self):
+        profile = overlap_profile([(0, 100), (100, 200), (200, 300)])
+        assert (profile['coveredMs'], profile['parallelism'], profile['peakOverlap']) == (300, 1.0, 1)
+
+    def test_partial_overlap_and_gaps(self):
+        profile = overlap_profile([(0, 100), (50, 150), (400, 500)])
+        assert (profile['coveredMs'], profile['busyMs']) == (250, 300)
+        assert profile['parallelism'] == 1.2 and profile['peakOverlap'] == 2
+
+    def test_empty(self):
+        assert overlap_profile([])['spans'] == 0
+
+
+class TestSummary:
+    """Week results"""
+
+    def test_week_spans(self):
+        response = {'timings': [
+            {'date': '2025-01-06', 'status': 'ready', 'startedAt': 10, 'finishedAt': 900},
+            {'date': '2025-01-07', 'status': 'skipped', 'startedAt': 11, 'finishedAt': 15},
+            {'date': '2025-01-08', 'status': 'error', 'startedAt': 12, 'finishedAt': 400},
+        ]}
+        assert week_spans(response) == [(10, 900), (12, 400)]
+        assert week_spans({}) == []
+
+    def test_summarize(self):
+        def week(latency, spans, schema_errors=()):
+            return {'ok': True, 'latency_ms': latency, 'error': None, 'spans': spans,
+                    'fanout': overlap_profile(spans), 'schemaErrors': list(schema_errors)}
+        weeks = [
+            week(1000, [(0, 900)] * 4),
+            week(1200, [(100, 1100), (200, 1200)], ['$.weekDates: 6 items, expected at least 7']),
+            {'ok': False, 'latency_ms': None, 'error': 'HTTP 500', 'spans': [], 'schemaErrors': []},
+        ]
+        result = summarize(weeks, wall_seconds=30)
+        assert (result['weeks'], result['failed'], result['invalid']) == (3, 1, 1)
+        assert result['weeksPerMinute'] == 4.0
+        assert result['daysPerWeek'] == 3.0
+        assert result['meanParallelism'] == round((4.0 + 2000 / 1100) / 2, 2)
+        assert result['serverPeakDays'] == 6
+        assert result['weekLatency']['count'] == 2
+
+
+class TestProfiles:
+    """Synthetic users"""
+
+    def test_selected_days_match_training_days(self):
+        rng = random.Random(1)
+        for i in range(50):
+            profile = synthetic_profile(rng, 'abc', i)
+            assert len(profile['selectedDays']) == profile['trainingDays']
+            assert profile['selectedDays'] == sorted(profile['selectedDays'], key=DAY_CODES.index)
+            assert profile['email'] == f"bench_week_abc_{i}@example.com"
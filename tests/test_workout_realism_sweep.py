@@ -0,0 +1,120 @@
+"""
+Test suite for the workout realism sweep (scripts/bench_workout_realism_sweep.py).
+
+Tests:
+1. Count ranges match the generator prompt and the realism test
+2. Realism checks (schema, count, warmup/cooldown, duration, rest days)
+3. Token cost from headers or estimated from size
+4. Per-cell aggregation and heatmap layout
+
+Run: pytest tests/test_workout_realism_sweep.py -v
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from bench_workout_realism_sweep import (
+    aggregate, build_cases, check_realism, expected_count_range, heatmap, run_case, token_cost,
+)
+
+
+def _workout(main=3, warmup=1, cooldown=1, duration=45):
+    def exercise(name, category):
+        return {'id': name.lower(), 'name': name, 'sets': 3, 'reps': '8-10', 'restTime': 60, 'category': category}
+    exercises = ([exercise('Jumping Jacks', 'warmup')] * warmup
+                 + [exercise('Squat', 'main')] * main
+                 + [exercise("Child's Pose", 'cooldown')] * cooldown)
+    return {'title': 'Leg Day', 'type': 'Lower Body', 'duration': duration, 'exercises': exercises}
+
+
+class _Response:
+    def __init__(self, status, body, headers=None):
+        self.status_code = status
+        self._body = body
+        self.headers = headers or {}
+        self.text = str(body)
+
+    def json(self):
+        return self._body
+
+
+class _Session:
+    def __init__(self, response):
+        self.response = response
+
+    def post(self, url, data, headers, timeout):
+        return self.response
+
+
+class TestRealismChecks:
+    """Same rules as backend_test_workout_realism.py"""
+
+    def test_count_ranges(self):
+        assert expected_count_range('beginner', 30) == (3, 4)
+        assert expected_count_range('beginner', 45) == (4, 6)
+        assert expected_count_range('beginner', 60) == (5, 7)
+        assert expected_count_range('intermediate', 45) == (5, 7)
+        assert expected_count_range('intermediate', 60) == (7, 9)
+        assert expected_count_range('advanced', 45) == (6, 8)
+        assert expected_count_range('advanced', 90) == (8, 10)
+
+    def test_realistic_workout(self):
+        assert check_realism(_workout(main=3), 'beginner', 45) == []
+
+    def test_problems(self):
+        problems = check_realism(_workout(main=8, warmup=0, duration=60), 'beginner', 45)
+        assert problems == ['9 exercises (expected 4-6)', 'no warmup', 'duration 60 != 45']
+        assert check_realism({'error': 'x'}, 'beginner', 45)[0] == "schema $: missing 'title'"
+
+    def test_rest_day_is_not_checked(self):
+        rest = {'title': 'Rest Day', 'type': 'rest', 'duration': 0, 'exercises': [], 'isRestDay': True}
+        assert check_realism(rest, 'advanced', 60) == []
+
+
+class TestTokens:
+    """Token cost"""
+
+    def test_headers(self):
+        headers = {'X-LLM-Prompt-Tokens': '3100', 'X-LLM-Completion-Tokens': '650'}
+        assert token_cost(headers, '{}', '{}') == (3100, 650, False)
+
+    def test_estimate(self):
+        assert token_cost({}, 'x' * 400, 'y' * 81) == (100, 20, True)
+
+
+class TestAggregation:
+    """Cells and heatmaps"""
+
+    def test_run_case_and_aggregate(self):
+        cases = build_cases(['beginner'], [45], {'gym': ['barbell']}, {'none': None}, [1, 2], repeat=2)
+        assert len(cases) == 4
+        assert cases[0][1]['userProfile']['sessionDuration'] == 45 and cases[0][1]['dayOfWeek'] == 1
+
+        good = _Session(_Response(200, _workout(main=3), {'X-LLM-Prompt-Tokens': '100', 'X-LLM-Completion-Tokens': '50'}))
+        bad = _Session(_Response(200, _workout(main=6)))
+        rest = _Session(_Response(200, {'title': 'Rest Day', 'type': 'rest', 'duration': 0,
+                                     'exercises': [], 'isRestDay': True}))
+        error = _Session(_Response(500, {'error': 'Failed to generate workout'}))
+        results = [run_case(s, 'http://x', cell, payload)
+                   for s, (cell, payload) in zip([good, bad, rest, error], cases)]
+        assert [r['kind'] for r in results] == ['workout', 'workout', 'rest', 'workout']
+        assert results[3]['problems'] == ['HTTP 500']
+
+        (cell,) = aggregate(results)
+        assert (cell['requests'], cell['restDays'], cell['failures']) == (4, 1, 2)
+        assert cell['failureRate'] == round(2 / 3, 3)
+        assert cell['problems'] == {'exercise count': 1, 'HTTP 500': 1}
+        assert cell['latency']['count'] == 4
+        assert cell['estimatedTokens'] is True
+
+    def test_heatmap_layout(self):
+        summary = [
+            {'experience': 'beginner', 'duration': 30, 'equipment': 'gym', 'injuries': 'none', 'v': 1200},
+            {'experience': 'beginner', 'duration': 30, 'equipment': 'bodyweight', 'injuries': 'knee', 'v': 900},
+            {'experience': 'advanced', 'duration': 60, 'equipment': 'gym', 'injuries': 'none', 'v': 2500},
+        ]
+        lines = heatmap(summary, lambda c: c['v']).splitlines()
+        assert lines[0].split() == ['exp/min', 'gym/none', 'bodyw/knee']
+        assert lines[1].split() == ['beg/30', '1200', '900']
+        assert lines[2].split() == ['adv/60', '2500', '-']
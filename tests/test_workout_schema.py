@@ -0,0 +1,145 @@
+"""
+Test suite for the generated workout schema validator (scripts/workout_schema.py).
+
+Tests:
+1. Compiled keywords (type, enum, const, pattern, ranges, if/then/else)
+2. Workout shape: training, rest and activity days
+3. Day and week-plan shapes
+4. Throughput of the compiled validator
+
+Run: pytest tests/test_workout_schema.py -v
+"""
+import os
+import sys
+import copy
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from workout_schema import compile_validator, iter_errors, validate_day, validate_plan, validate_workout
+
+
+def _exercise(name='Goblet Squat', category='main', **extra):
+    return {'id': name.lower().replace(' ', '-'), 'name': name, 'sets': 3, 'reps': '8-10',
+            'restTime': 90, 'category': category, 'setType': 'normal', 'videoUrl': None, **extra}
+
+
+def _workout(**extra):
+    return {
+        'title': 'Lower Body Strength', 'type': 'Lower Body', 'difficulty': 'beginner', 'duration': 45,
+        'exercises': [_exercise('Leg Swings', 'warmup'), _exercise(), _exercise('Romanian Deadlift'),
+                      _exercise('Walking Lunge'), _exercise("Child's Pose", 'cooldown')],
+        'overview': '5 exercises', 'targetMuscles': 'Legs', 'caloriesBurn': 360, **extra,
+    }
+
+
+REST_DAY = {'title': 'Rest Day', 'type': 'rest', 'difficulty': 'easy', 'duration': 0, 'exercises': [],
+            'overview': 'Rest and recovery - no workout today', 'targetMuscles': 'None',
+            'caloriesBurn': 0, 'isRestDay': True}
+
+
+class TestCompiler:
+    """JSON Schema keywords"""
+
+    def test_keywords(self):
+        validate = compile_validator({
+            'type': 'object',
+            'required': ['n'],
+            'properties': {
+                'n': {'type': 'integer', 'minimum': 1, 'maximum': 3},
+                'kind': {'enum': ['a', 'b']},
+                'date': {'type': 'string', 'pattern': r'^\d{4}-\d{2}-\d{2}$'},
+                'tags': {'type': 'array', 'minItems': 1, 'items': {'type': 'string', 'minLength': 2}},
+            },
+        })
+        assert validate({'n': 2, 'kind': 'a', 'date': '2025-01-06', 'tags': ['ok']}) == []
+        assert validate({'n': 2.0}) == []
+        assert validate({'n': True}) == ['$.n: expected integer, got bool']
+        assert validate({'n': 4, 'kind': 'c', 'date': '6/1/2025', 'tags': ['x', 1]}) == [
+            '$.n: 4 is above 3',
+            "$.kind: 'c' is not one of ['a', 'b']",
+            "$.date: '6/1/2025' does not match ^\\d{4}-\\d{2}-\\d{2}$",
+            '$.tags[0]: shorter than 2 characters',
+            '$.tags[1]: expected string, got int',
+        ]
+        assert validate([]) == ['$: expected object, got list']
+
+    def test_if_then_else(self):
+        validate = compile_validator({
+            'if': {'required': ['rest'], 'properties': {'rest': {'const': True}}},
+            'then': {'properties': {'items': {'maxItems': 0}}},
+            'else': {'properties': {'items': {'minItems': 1}}},
+        })
+        assert validate({'rest': True, 'items': []}) == []
+        assert validate({'rest': True, 'items': [1]}) == ['$.items: 1 items, expected at most 0']
+        assert validate({'rest': False, 'items': []}) == ['$.items: 0 items, expected at least 1']
+
+
+class TestShapes:
+    """Workout, day and plan responses"""
+
+    def test_training_workout(self):
+        assert validate_workout(_workout()) == []
+        broken = _workout(duration='45')
+        broken['exercises'][1]['category'] = 'strength'
+        del broken['exercises'][2]['name']
+        broken['exercises'][3]['sets'] = 0
+        assert validate_workout(broken) == [
+            '$.duration: expected number, got str',
+            "$.exercises[1].category: 'strength' is not one of ['cooldown', 'main', 'warmup']",
+            "$.exercises[2]: missing 'name'",
+            '$.exercises[3].sets: 0 is below 1',
+        ]
+
+    def test_exercise_count_limits(self):
+        workout = _workout()
+        workout['exercises'] = workout['exercises'][:2]
+        assert validate_workout(workout) == ['$.exercises: 2 items, expected at least 3']
+
+    def test_rest_and_activity_days(self):
+        assert validate_workout(REST_DAY) == []
+        activity = dict(REST_DAY, title='Football', type='external_activity', duration=60, isActivityDay=True)
+        del activity['isRestDay']
+        assert validate_workout(activity) == []
+        assert validate_workout(dict(REST_DAY, exercises=[_exercise()])) == \
+            ['$.exercises: 1 items, expected at most 0']
+
+    def test_day_row(self):
+        day = {'id': 7, 'userId': 3, 'date': '2025-01-06', 'status': 'ready', 'payloadJson': _workout(),
+               'completedAt': None, 'createdAt': '2025-01-05T10:00:00.000Z'}
+        assert validate_day(day) == []
+        assert validate_day(dict(day, status='pending', payloadJson=None)) == []
+        assert validate_day(dict(day, payloadJson={'error': 'timeout'})) == ["$.payloadJson: missing 'title'",
+                                                                           "$.payloadJson: missing 'type'",
+                                                                           "$.payloadJson: missing 'duration'",
+                                                                           "$.payloadJson: missing 'exercises'"]
+
+    def test_week_plan(self):
+        dates = [f"2025-01-{d:02d}" for d in range(6, 13)]
+        plan = {
+            'success': True, 'message': 'Week generated successfully', 'weekDates': dates,
+            'workouts': [{'date': d, 'status': 'ready', 'workout': _workout() if i % 2 == 0 else REST_DAY}
+                         for i, d in enumerate(dates)],
+        }
+        assert validate_plan(plan) == []
+        plan['workouts'][3] = {'date': dates[3], 'status': 'error', 'workout': {'error': 'LLM timeout'}}
+        assert validate_plan(plan) == []
+        plan['weekDates'] = dates[:6]
+        assert validate_plan(plan) == ['$.weekDates: 6 items, expected at least 7']
+
+    def test_iter_errors(self):
+        docs = [_workout(), {'title': ''}, REST_DAY]
+        ((index, errors),) = iter_errors(docs)
+        assert index == 1 and errors[0] == "$: missing 'type'"
+
+
+class TestThroughput:
+    """Fast enough to validate every load-test response inline"""
+
+    def test_thousands_per_second(self):
+        docs = [copy.deepcopy(_workout()) for _ in range(2000)]
+        started = time.perf_counter()
+        for doc in docs:
+            validate_workout(doc)
+        rate = len(docs) / (time.perf_counter() - started)
+        assert rate > 2000
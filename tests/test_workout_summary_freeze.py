@@ -0,0 +1,130 @@
+"""
+Test suite for frozen workout summaries (scripts/freeze_workout_summaries.py).
+
+Tests:
+1. Summary matches the /api/stats/workout-summary/:workoutId rules
+2. toFixed(1) rounding of the improvement
+3. Freezing uses history up to the workout, so later sessions do not change it
+4. Stored record columns; total_sets is the log count the endpoint compares
+5. Records are upserted with the jsonb summary column through binary COPY
+
+Run: pytest tests/test_workout_summary_freeze.py -v
+"""
+import os
+import sys
+import asyncio
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from db_utils import register_json_codecs
+from freeze_workout_summaries import (
+    SUMMARY_COLUMNS, build_workout_summary, freeze_user_workouts, js_to_fixed, store_summaries, summary_records,
+)
+from pg_fakes import FakeConnection
+
+T0 = datetime(2025, 3, 1, 18, 0)
+
+
+def _log(log_id, workout_id, exercise_id, weight, reps, minutes, rpe=None, start_time=None):
+    return {
+        'id': log_id, 'user_id': 1, 'workout_id': workout_id, 'exercise_id': exercise_id,
+        'exercise_name': exercise_id.title(), 'actual_weight': weight, 'actual_reps': reps, 'rpe': rpe,
+        'start_time': start_time, 'logged_at': T0 + timedelta(minutes=minutes),
+    }
+
+
+def _history(logs):
+    return sorted(logs, key=lambda l: (l['logged_at'], l['id']), reverse=True)
+
+
+class TestEndpointRules:
+    """Same response as the endpoint"""
+
+    def test_summary_shape(self):
+        logs = [
+            _log(1, 'w1', 'squat', 100, 5, 0),
+            _log(2, 'w2', 'squat', 100, 5, 60 * 24, rpe=7),
+            _log(3, 'w2', 'squat', 110, 3, 60 * 24 + 5, rpe=8),
+            _log(4, 'w2', 'squat', 110, 2, 60 * 24 + 10),
+            _log(5, 'w2', 'plank', None, None, 60 * 24 + 15),
+        ]
+        summary = build_workout_summary(_history(logs), 'w2')
+        # newest first: plank was logged last, squat sets are numbered from the newest
+        plank, squat = summary['exercises']
+        assert (plank['exerciseId'], squat['exerciseId']) == ('plank', 'squat')
+        assert [(s['setNumber'], s['weight'], s['reps']) for s in squat['sets']] == [(1, 110, 2), (2, 110, 3), (3, 100, 5)]
+        assert squat['totalVolume'] == 220 + 330 + 500
+        assert (squat['todayMax'], squat['repsAtMax'], squat['previousMax']) == (110, 2, 100)
+        assert squat['isPR'] is True and squat['improvement'] == '10.0'
+        assert (plank['todayMax'], plank['repsAtMax'], plank['previousMax']) == (0, 0, 0)
+        assert plank['isPR'] is False and plank['improvement'] is None
+        assert summary['stats'] == {'totalVolume': 1050, 'totalSets': 4, 'exerciseCount': 2, 'prsHit': 1}
+
+    def test_unknown_workout(self):
+        assert build_workout_summary(_history([_log(1, 'w1', 'squat', 100, 5, 0)]), 'nope') == \
+            {'exercises': [], 'stats': None}
+
+    def test_to_fixed(self):
+        assert js_to_fixed(0.25) == '0.3'
+        assert js_to_fixed(12.25) == '12.3'
+        assert js_to_fixed(1.005) == '1.0'   # 1.00499999... in binary
+        assert js_to_fixed(-0.04) == '-0.0'
+        assert js_to_fixed((95 - 100) / 100 * 100) == '-5.0'
+
+
+class TestFreezing:
+    """Frozen as of the workout's last set"""
+
+    def test_later_sessions_do_not_change_frozen_summary(self):
+        logs = [
+            _log(1, 'w1', 'bench', 80, 5, 0),
+            _log(2, 'w2', 'bench', 85, 5, 60 * 24),
+            _log(3, 'w3', 'bench', 90, 5, 60 * 48),
+        ]
+        (frozen,) = [f for f in freeze_user_workouts(logs) if f[0] == 'w2']
+        assert frozen[1]['exercises'][0]['isPR'] is True
+        assert frozen[1]['exercises'][0]['previousMax'] == 80
+        # the live endpoint also counts w3, so the same page later shows no PR
+        live = build_workout_summary(_history(logs), 'w2')
+        assert live['exercises'][0]['isPR'] is False
+
+    def test_history_limit_counts_back_from_the_workout(self):
+        logs = [_log(i, f"old{i}", 'row', 50, 5, i) for i in range(1, 6)]
+        logs.append(_log(6, 'w', 'row', 40, 5, 10))
+        (frozen,) = freeze_user_workouts(logs, {'w'}, history_limit=3)
+        # only the two newest earlier logs are inside the 3-row window
+        assert frozen[1]['exercises'][0]['previousMax'] == 50
+        (frozen,) = freeze_user_workouts(logs, {'w'}, history_limit=1)
+        assert frozen[1]['exercises'][0]['previousMax'] == 0
+
+    def test_only_requested_workouts(self):
+        logs = [_log(1, 'a', 'row', 50, 5, 0), _log(2, 'b', 'row', 60, 5, 30)]
+        assert [f[0] for f in freeze_user_workouts(logs, {'b'})] == ['b']
+
+
+class TestRecords:
+    """workout_summaries rows"""
+
+    def test_record_columns(self):
+        logs = [
+            _log(7, 'w', 'squat', 100, 5, 0, start_time=T0 - timedelta(minutes=2)),
+            _log(9, 'w', 'squat', 100, 5, 40),
+        ]
+        computed_at = datetime(2025, 3, 2)
+        (record,) = summary_records(1, freeze_user_workouts(logs), computed_at)
+        assert record[0:2] == (1, 'w')
+        assert record[3:8] == (1000.0, 2, 1, 0, 42 * 60)
+        assert record[8:] == (T0 - timedelta(minutes=2), T0 + timedelta(minutes=40), 9, computed_at)
+
+    def test_store_writes_jsonb_summary(self):
+        logs = [_log(1, 'a', 'squat', 100, 5, 0), _log(2, 'a', 'squat', 105, 3, 5), _log(3, 'b', 'row', 60, 8, 90)]
+        records = summary_records(1, freeze_user_workouts(logs), datetime(2025, 3, 2))
+        types = {c: 'integer' for c in SUMMARY_COLUMNS}
+        conn = FakeConnection({'workout_summaries': {**types, 'workout_id': 'text', 'summary': 'jsonb'}})
+        asyncio.run(register_json_codecs(conn))
+        assert asyncio.run(store_summaries(conn, records, until=3)) == 2
+        rows = {row['workout_id']: row for row in conn.rows['workout_summaries']}
+        assert rows['a']['summary'] == records[0][2] and rows['a']['summary']['stats']['totalSets'] == 2
+        assert [rows[w]['total_sets'] for w in ('a', 'b')] == [2, 1]
+        assert conn.statements[-1].startswith('INSERT INTO job_watermarks')